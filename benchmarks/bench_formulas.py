@@ -0,0 +1,70 @@
+"""
+Benchmark the per-file cost of compute formulas.
+
+Evaluates a few formulas, from a single placeholder to nested function
+calls, for many in-memory files. Each formula is timed twice: parsed again
+for every file, as before formulas were compiled, and compiled once and then
+evaluated per file.
+
+Usage:
+    python benchmarks/bench_formulas.py [--files 100000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fmu.functions import EvaluationContext  # noqa: E402
+from fmu.formulas import compile_formula, _compile_formula_text  # noqa: E402
+
+FORMULAS = [
+    '$frontmatter.title',
+    '=concat(/post/, $frontmatter.slug)',
+    '=concat($slice($frontmatter.tags, 0, 2), $hash($filepath, 8))',
+    '=coalesce($frontmatter.summary, $truncate($frontmatter.title, 20), $basename($filepath))',
+]
+
+
+def create_files(file_count):
+    """Return file_count (file_path, frontmatter, content) tuples."""
+    return [
+        (
+            f'/site/content/posts/post-{i}.md',
+            {'title': f'A post about item number {i}', 'slug': f'post-{i}', 'tags': ['a', 'b', f'tag{i % 50}']},
+            'Body text'
+        )
+        for i in range(file_count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000, help='Number of files to evaluate formulas for')
+    args = parser.parse_args()
+
+    files = create_files(args.files)
+    for formula in FORMULAS:
+        print(formula)
+
+        context = EvaluationContext()
+        start = time.perf_counter()
+        for file_path, frontmatter, content in files:
+            _compile_formula_text.cache_clear()
+            compile_formula(formula).evaluate(context.for_file(file_path, frontmatter, content))
+        parse_time = time.perf_counter() - start
+        print(f"  Parsed per file:  {parse_time:.2f}s ({parse_time / args.files * 1e6:.2f} us per file)")
+
+        context = EvaluationContext()
+        start = time.perf_counter()
+        tree = compile_formula(formula)
+        for file_path, frontmatter, content in files:
+            tree.evaluate(context.for_file(file_path, frontmatter, content))
+        compiled_time = time.perf_counter() - start
+        print(f"  Compiled once:    {compiled_time:.2f}s ({compiled_time / args.files * 1e6:.2f} us per file)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark update operations on long list values.
+
+Applies a few replace, remove and case operations to an aliases list of many
+entries. Each operation is timed twice: prepared again for every item, as
+before operations were compiled, and compiled once, as update does for a
+run, then applied to the whole list in one loop.
+
+Usage:
+    python benchmarks/bench_operations.py [--items 5000] [--repeat 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fmu.update import compile_operation  # noqa: E402
+
+OPERATIONS = [
+    {'type': 'replace', 'from': '^/old/', 'to': '/new/', 'ignore_case': False, 'regex': True},
+    {'type': 'replace', 'from': 'POSTS', 'to': 'articles', 'ignore_case': True, 'regex': False},
+    {'type': 'remove', 'value': '/OLD/POSTS/ITEM-7', 'ignore_case': True, 'regex': False},
+    {'type': 'remove', 'value': r'-\d*5$', 'ignore_case': False, 'regex': True},
+    {'type': 'case', 'case_type': 'Title Case'},
+    {'type': 'case', 'case_type': 'kebab-case'},
+]
+
+
+def describe(operation):
+    """Return a short description of an operation."""
+    return ' '.join(f"{key}={value!r}" for key, value in operation.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--items', type=int, default=5000, help='Number of entries in the list')
+    parser.add_argument('--repeat', type=int, default=20, help='Number of times each operation is applied')
+    args = parser.parse_args()
+
+    aliases = [f'/old/posts/item-{i} can\'t stop' for i in range(args.items)]
+    for operation in OPERATIONS:
+        print(describe(operation))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            [compile_operation(operation)(alias) for alias in aliases]
+        per_item_time = time.perf_counter() - start
+        print(f"  Prepared per item: {per_item_time / args.repeat * 1e3:.2f} ms per list")
+
+        apply = compile_operation(operation)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            apply(aliases)
+        compiled_time = time.perf_counter() - start
+        print(f"  Compiled once:     {compiled_time / args.repeat * 1e3:.2f} ms per list")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark --schema validation against the equivalent flag-based rules.
+
+Uses the corpus of bench_validation.py. For each of its scalar and list fields
+the schema requires the scalar field, matches it against a pattern and bounds
+the list size; the flag-based rules do the same with exist, match and
+list-size rules.
+
+Usage:
+    python benchmarks/bench_schema.py [--files 100000]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_validation import FIELDS, create_corpus  # noqa: E402
+from fmu.core import parse_file, get_files_from_patterns, FrontmatterKeys  # noqa: E402
+from fmu.schema import compile_schema, iter_schema_failures  # noqa: E402
+from fmu.validation import validate_frontmatter, compile_validations, _resolve_field  # noqa: E402
+
+
+def build_equivalents():
+    """Build a schema and the list of flag-based rules checking the same constraints."""
+    schema = {'type': 'object', 'required': [], 'properties': {}}
+    rules = []
+    for f in range(FIELDS):
+        schema['required'].append(f'field{f}')
+        schema['properties'][f'field{f}'] = {'type': 'string', 'pattern': r'^value-\d+$'}
+        schema['properties'][f'list{f}'] = {'type': 'array', 'minItems': 1, 'maxItems': 3}
+        rules.append({'type': 'exist', 'field': f'field{f}'})
+        rules.append({'type': 'match', 'field': f'field{f}', 'regex': r'^value-\d+$'})
+        rules.append({'type': 'list-size', 'field': f'list{f}', 'min': 1, 'max': 3})
+    return schema, rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000, help='Number of files to generate')
+    args = parser.parse_args()
+
+    schema, rules = build_equivalents()
+    directory = tempfile.mkdtemp(prefix='fmu-bench-')
+    try:
+        create_corpus(directory, args.files)
+        schema_file = os.path.join(directory, 'schema.yaml')
+        with open(schema_file, 'w', encoding='utf-8') as f:
+            yaml.safe_dump(schema, f)
+
+        parsed = [parse_file(file_path)[0] for file_path in get_files_from_patterns([os.path.join(directory, '*.md')])]
+
+        start = time.perf_counter()
+        plan = compile_validations(rules)
+        plan_fields = list(dict.fromkeys(field for field, _ in plan))
+        for frontmatter in parsed:
+            keys = FrontmatterKeys(frontmatter)
+            resolved = {field: _resolve_field(keys, field, False) for field in plan_fields}
+            for field, check in plan:
+                check(*resolved[field])
+        print(f"Flag rules ({len(rules)}), checks only: {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        validator = compile_schema(schema)
+        for frontmatter in parsed:
+            for _ in iter_schema_failures(validator, frontmatter):
+                pass
+        print(f"Schema, checks only:          {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        validate_frontmatter([os.path.join(directory, '*.md')], rules)
+        print(f"Flag rules, end to end:       {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        validate_frontmatter([os.path.join(directory, '*.md')], [{'type': 'schema', 'schema': schema_file}])
+        print(f"Schema, end to end:           {time.perf_counter() - start:.2f}s")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark validate_frontmatter with many rules over many files.
+
+Generates a corpus of markdown files in a temporary directory and validates it
+with 50 rules (10 of each of exist, eq, contain, match and list-size). Rule
+checks are also timed on already parsed frontmatter, since YAML parsing
+dominates the end-to-end time.
+
+Usage:
+    python benchmarks/bench_validation.py [--files 100000] [--rules 50]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fmu.core import parse_file, get_files_from_patterns, FrontmatterKeys  # noqa: E402
+from fmu.validation import validate_frontmatter, compile_validations, _resolve_field  # noqa: E402
+
+FIELDS = 10
+
+
+def create_corpus(directory, file_count):
+    """Write file_count markdown files with FIELDS scalar and list fields each."""
+    for i in range(file_count):
+        lines = ['---']
+        for f in range(FIELDS):
+            lines.append(f'field{f}: value-{(i + f) % 100}')
+            lines.append(f'list{f}: [tag{i % 7}, tag{(i + f) % 11}, tag{f}]')
+        lines.append('---')
+        lines.append('')
+        lines.append(f'Body of post {i}.')
+        with open(os.path.join(directory, f'post{i:06d}.md'), 'w', encoding='utf-8') as fh:
+            fh.write('\n'.join(lines))
+
+
+def build_rules(rule_count):
+    """Build rule_count rules cycling through the common rule types."""
+    rules = []
+    for i in range(rule_count):
+        f = i % FIELDS
+        kind = (i // FIELDS) % 5
+        if kind == 0:
+            rules.append({'type': 'exist', 'field': f'field{f}'})
+        elif kind == 1:
+            rules.append({'type': 'eq', 'field': f'field{f}', 'value': f'value-{f}'})
+        elif kind == 2:
+            rules.append({'type': 'contain', 'field': f'list{f}', 'value': f'TAG{f}'})
+        elif kind == 3:
+            rules.append({'type': 'match', 'field': f'field{f}', 'regex': rf'^value-\d*{f}$'})
+        else:
+            rules.append({'type': 'list-size', 'field': f'list{f}', 'min': 1, 'max': 3})
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000, help='Number of files to generate')
+    parser.add_argument('--rules', type=int, default=50, help='Number of validation rules')
+    parser.add_argument('--ignore-case', action='store_true', help='Validate case-insensitively')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='fmu-bench-')
+    try:
+        start = time.perf_counter()
+        create_corpus(directory, args.files)
+        print(f"Generated {args.files} files in {time.perf_counter() - start:.2f}s")
+
+        rules = build_rules(args.rules)
+
+        start = time.perf_counter()
+        parsed = [parse_file(file_path)[0] for file_path in get_files_from_patterns([directory])]
+        print(f"Parse only:        {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        plan = compile_validations(rules, args.ignore_case)
+        plan_fields = list(dict.fromkeys(field for field, _ in plan))
+        checks = 0
+        for frontmatter in parsed:
+            keys = FrontmatterKeys(frontmatter)
+            resolved = {field: _resolve_field(keys, field, args.ignore_case) for field in plan_fields}
+            for field, check in plan:
+                check(*resolved[field])
+                checks += 1
+        check_time = time.perf_counter() - start
+        print(f"Rule checks only:  {check_time:.2f}s ({check_time / checks * 1e9:.0f} ns per rule per file)")
+
+        start = time.perf_counter()
+        failures = validate_frontmatter([directory], rules, ignore_case=args.ignore_case)
+        print(f"validate_frontmatter: {time.perf_counter() - start:.2f}s ({len(failures)} failures)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark writing updated files behind the update loop.
+
+Creates many files in a directory and updates a field of each, first writing
+every file before going on to the next (--write-queue 0), then with the
+files written by a background thread while the next file is updated. The
+gain depends on the disk: compare a fast one with a slow one, for example
+tmpfs with a loop device mounted with sync writes:
+
+    mkdir -p /mnt/fast /mnt/slow
+    mount -t tmpfs tmpfs /mnt/fast
+    truncate -s 512M /tmp/slow.img && mkfs.ext4 -q /tmp/slow.img
+    mount -o loop,sync /tmp/slow.img /mnt/slow
+
+With --write-delay, each write also sleeps, as if the disk were that slow.
+
+Usage:
+    python benchmarks/bench_write_behind.py [--dir /mnt/slow] [--files 2000]
+        [--write-queue 16] [--durability none] [--write-delay 0]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fmu.fileio import AtomicWriter, DEFAULT_WRITE_QUEUE, DURABILITY_LEVELS  # noqa: E402
+from fmu.update import update_frontmatter  # noqa: E402
+
+OPERATIONS = [
+    {'type': 'compute', 'formula': '=concat($frontmatter.title, -, $hash($filepath, 8))'},
+]
+
+
+def create_files(directory, file_count):
+    """Write file_count markdown files to directory and return their paths."""
+    paths = []
+    for i in range(file_count):
+        file_path = os.path.join(directory, f'post-{i}.md')
+        tags = '\n'.join(f'  - tag{j}' for j in range(i % 20))
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(f"---\ntitle: Post {i}\ntags:\n{tags}\n---\n" + "Body text.\n" * 200)
+        paths.append(file_path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dir', help='Directory to create the files in (default: a temporary directory)')
+    parser.add_argument('--files', type=int, default=2000, help='Number of files to update')
+    parser.add_argument('--write-queue', type=int, default=DEFAULT_WRITE_QUEUE, help='Queue depth to compare with 0')
+    parser.add_argument('--durability', choices=DURABILITY_LEVELS, default='none', help='Durability of the writes')
+    parser.add_argument('--write-delay', type=float, default=0, help='Milliseconds each write sleeps for')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(dir=args.dir)
+    atomic_write = AtomicWriter.write
+
+    def delayed_write(writer, file_path, text):
+        time.sleep(args.write_delay / 1000)
+        atomic_write(writer, file_path, text)
+
+    try:
+        for write_queue in (0, args.write_queue):
+            create_files(directory, args.files)
+            with patch.object(AtomicWriter, 'write', delayed_write if args.write_delay else atomic_write):
+                start = time.perf_counter()
+                results = update_frontmatter(
+                    [os.path.join(directory, '*.md')], 'title', OPERATIONS,
+                    durability=args.durability, write_queue=write_queue
+                )
+                elapsed = time.perf_counter() - start
+            updated = sum(result['changes_made'] for result in results)
+            print(f"write queue {write_queue:>3}: {elapsed:.2f}s for {updated} files "
+                  f"({elapsed / args.files * 1e3:.3f} ms per file)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -8,9 +8,9 @@ __version__ = "0.24.0"
 __author__ = "Gerald Nguyen The Huy"
 
 from .core import parse_frontmatter, extract_content, parse_file
-from .search import search_frontmatter
+from .search import search_frontmatter, search_duplicates
 from .validation import validate_frontmatter, validate_and_output
-from .update import update_frontmatter, update_and_output
+from .update import update_frontmatter, update_frontmatter_fields, update_and_output
 from .specs import save_specs_file, execute_specs_file
 
 __all__ = [
@@ -18,9 +18,11 @@ __all__ = [
     "extract_content", 
     "parse_file",
     "search_frontmatter",
+    "search_duplicates",
     "validate_frontmatter",
     "validate_and_output",
     "update_frontmatter",
+    "update_frontmatter_fields",
     "update_and_output",
     "save_specs_file",
     "execute_specs_file",
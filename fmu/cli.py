@@ -3,20 +3,37 @@ Command Line Interface for fmu.
 """
 
 import argparse
+import io
 import os
 import sys
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from . import __version__
 from .core import parse_file, get_files_from_patterns
-from .search import search_and_output
+from .search import search_and_output, search_frontmatter, WhereClause
+from .duplicates import DEFAULT_MEMORY_BUDGET
 from .validation import validate_and_output
-from .update import update_and_output
+from .validation_cache import DEFAULT_CACHE_FILE
+from .formulas import compile_formula
+from .update import update_and_output, update_fields_and_output
+from .fileio import DURABILITY_LEVELS, DEFAULT_DURABILITY, DEFAULT_WRITE_QUEUE, WriteBehindWriter, write_text_file
+from .functions import EvaluationContext, load_function_files, parse_timestamp
+from .transaction import default_journal_file, rollback_transaction
+from .stats import (
+    DEFAULT_PRECISION,
+    cardinality_frontmatter,
+    load_sketches,
+    merge_sketches,
+    save_sketches,
+    output_cardinality_results
+)
 from .specs import (
     save_specs_file, 
     convert_read_args_to_options,
     convert_search_args_to_options,
     convert_validate_args_to_options,
-    convert_update_args_to_options
+    convert_update_args_to_options,
+    convert_stats_args_to_options,
+    split_update_args
 )
 
 
@@ -140,20 +157,27 @@ def _render_template(template: str, file_path: str, frontmatter: Dict[str, Any],
     return result
 
 
-def _build_map_from_items(map_items: List[tuple], file_path: str, frontmatter: Dict[str, Any], content: str) -> Dict[str, Any]:
+def _build_map_from_items(
+    map_items: List[tuple],
+    file_path: str,
+    frontmatter: Dict[str, Any],
+    content: str,
+    context: Optional[EvaluationContext] = None
+) -> Dict[str, Any]:
     """
     Build a map/dictionary from map items by evaluating each value.
     
     Args:
-        map_items: List of (key, value) tuples
+        map_items: List of (key, value) tuples, where each value is a formula
+                   compiled with compile_formula
         file_path: Full path to the file
         frontmatter: Frontmatter dictionary
         content: Content string
+        context: Evaluation context of the run (default: a new context)
         
     Returns:
         Dictionary with evaluated values
     """
-    from .update import evaluate_formula
     import datetime
     
     def _convert_to_json_serializable(obj):
@@ -167,10 +191,14 @@ def _build_map_from_items(map_items: List[tuple], file_path: str, frontmatter: D
         else:
             return obj
     
+    if context is None:
+        context = EvaluationContext()
+    context.for_file(file_path, frontmatter, content)
+    
     result_map = {}
     for key, value in map_items:
         # Evaluate the value using the same logic as compute operations
-        evaluated_value = evaluate_formula(value, file_path, frontmatter, content)
+        evaluated_value = value.evaluate(context)
         # Convert to JSON-serializable format
         result_map[key] = _convert_to_json_serializable(evaluated_value)
     
@@ -200,6 +228,8 @@ def cmd_help():
     print("  search PATTERNS   Search for specific frontmatter fields")
     print("  validate PATTERNS Validate frontmatter fields against rules")
     print("  update PATTERNS   Update frontmatter fields")
+    print("  stats PATTERNS    Estimate distinct values of frontmatter fields")
+    print("  rollback JOURNAL  Restore the files of a transactional update")
     print("  execute SPECS     Execute commands from specs file")
     print()
     print("All commands support --save-specs option to save command configuration:")
@@ -211,7 +241,8 @@ def cmd_help():
 
 def cmd_read(patterns: List[str], output: str = "both", skip_heading: bool = False, format_type: str = "yaml", 
              escape: bool = False, template: str = None, file_output: str = None, individual: bool = False, 
-             map_items: List[tuple] = None, pretty: bool = False, compact: bool = False, save_specs=None):
+             map_items: List[tuple] = None, pretty: bool = False, compact: bool = False, save_specs=None,
+             function_files: List[str] = None, now: str = None, write_queue: int = DEFAULT_WRITE_QUEUE):
     """
     Handle read command.
     
@@ -228,6 +259,11 @@ def cmd_read(patterns: List[str], output: str = "both", skip_heading: bool = Fal
         pretty: Whether to prettify JSON/YAML output
         compact: Whether to minify JSON/YAML output
         save_specs: Tuple of (description, specs_file) for saving specs
+        function_files: Python files registering functions for --map formulas
+        now: Timestamp returned by now() for every file (default: the time the command starts)
+        write_queue: Number of individual output files waiting to be written by a
+                     background thread while the next file is read; 0 writes each
+                     file before going on
     """
     # Validate template requirement
     if output == 'template' and not template:
@@ -256,19 +292,29 @@ def cmd_read(patterns: List[str], output: str = "both", skip_heading: bool = Fal
             'individual': individual,
             'map': map_items,
             'pretty': pretty,
-            'compact': compact
+            'compact': compact,
+            'functions': function_files,
+            'now': now,
+            'write_queue': write_queue
         })())
         save_specs_file(specs_file, 'read', description, patterns, options)
         print(f"Specs saved to {specs_file}")
         return
     
+    _load_function_files(function_files)
+    context = EvaluationContext(_parse_now(now))
+    
+    # Compile the map formulas once for all files
+    compiled_map_items = [(key, compile_formula(value)) for key, value in map_items or []]
+    
     # Determine output destination
     output_file = None
+    write_behind = None
     
     # If individual mode is enabled, we'll create separate output files for each input file
     if individual and file_output:
-        # In individual mode, we process each file with its own output file
-        pass  # Will be handled in the loop
+        # Each output is rendered in memory, then written, directory and all, in the background
+        write_behind = WriteBehindWriter(write_text_file, write_queue)
     elif file_output:
         try:
             output_file = open(file_output, 'w', encoding='utf-8')
@@ -290,16 +336,7 @@ def cmd_read(patterns: List[str], output: str = "both", skip_heading: bool = Fal
                     file_dir = os.path.dirname(os.path.abspath(file_path))
                     # Create the output path relative to the file's directory
                     individual_output_path = os.path.join(file_dir, file_output)
-                    
-                    # Create directory if needed
-                    os.makedirs(os.path.dirname(individual_output_path) if os.path.dirname(individual_output_path) else '.', exist_ok=True)
-                    
-                    try:
-                        output_file = open(individual_output_path, 'w', encoding='utf-8')
-                        output_stream = output_file
-                    except IOError as e:
-                        print(f"Error: Cannot open file {individual_output_path}: {e}", file=sys.stderr)
-                        continue
+                    output_stream = io.StringIO()
                 
                 frontmatter, content = parse_file(file_path, format_type)
                 
@@ -315,7 +352,7 @@ def cmd_read(patterns: List[str], output: str = "both", skip_heading: bool = Fal
                     print(result, file=output_stream)
                 elif output in ['json', 'yaml']:
                     # Build map and serialize to JSON/YAML
-                    result_map = _build_map_from_items(map_items, file_path, frontmatter, content)
+                    result_map = _build_map_from_items(compiled_map_items, file_path, frontmatter, content, context)
                     
                     if output == 'json':
                         import json
@@ -353,14 +390,21 @@ def cmd_read(patterns: List[str], output: str = "both", skip_heading: bool = Fal
                             print("\nContent:", file=output_stream)
                         print(content.rstrip(), file=output_stream)
                 
-                # Close individual output file after each file
-                if individual and file_output and output_file:
-                    output_file.close()
-                    output_file = None
+                # Queue the individual output file to be written
+                if write_behind:
+                    write_behind.write(
+                        individual_output_path,
+                        output_stream.getvalue(),
+                        on_error=lambda e, path=individual_output_path: print(
+                            f"Error: Cannot open file {path}: {e}", file=sys.stderr
+                        )
+                    )
                     
             except (FileNotFoundError, ValueError, UnicodeDecodeError) as e:
                 print(f"Error processing {file_path}: {e}", file=sys.stderr)
     finally:
+        if write_behind:
+            write_behind.close()
         if output_file:
             output_file.close()
 
@@ -373,8 +417,16 @@ def cmd_search(
     regex: bool = False,
     csv_file: str = None,
     format_type: str = "yaml",
-    save_specs=None
-):
+    save_specs=None,
+    content: str = None,
+    content_regex: str = None,
+    index_file: str = None,
+    limit: int = None,
+    first: bool = False,
+    exists: bool = False,
+    duplicates: str = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET
+) -> int:
     """
     Handle search command.
     
@@ -387,7 +439,27 @@ def cmd_search(
         csv_file: Optional CSV file for output
         format_type: Format of frontmatter
         save_specs: Tuple of (description, specs_file) for saving specs
+        content: Optional phrase the content body must contain
+        content_regex: Optional regex the content body must match
+        index_file: Optional trigram index file for content searches
+        limit: Optional maximum number of results
+        first: Whether to stop at the first result (same as limit=1)
+        exists: Whether to only report, through the exit code, if any file matches
+        duplicates: Optional field name; report files sharing a value of this field instead
+        memory_budget: Maximum number of values held in memory by a duplicates search
+        
+    Returns:
+        Exit code: 0, or for exists mode 0 if a match was found and 1 otherwise
     """
+    # A duplicates search reports every group it finds; there is no result to limit or test for
+    if duplicates is not None and (limit is not None or first or exists):
+        print("Error: --duplicates cannot be combined with --limit, --first or --exists", file=sys.stderr)
+        return 1
+    # Specs files bypass the argument parser, which already rejects both content filters
+    if content is not None and content_regex is not None:
+        print("Error: --content cannot be combined with --content-regex", file=sys.stderr)
+        return 1
+    
     # Save specs if requested
     if save_specs:
         description, specs_file = save_specs
@@ -396,13 +468,41 @@ def cmd_search(
             'value': value,
             'ignore_case': ignore_case,
             'regex': regex,
-            'csv_file': csv_file
+            'csv_file': csv_file,
+            'content': content,
+            'content_regex': content_regex,
+            'index': index_file,
+            'limit': limit,
+            'first': first,
+            'exists': exists,
+            'duplicates': duplicates,
+            'memory_budget': memory_budget
         })())
         save_specs_file(specs_file, 'search', description, patterns, options)
         print(f"Specs saved to {specs_file}")
-        return
+        return 0
     
-    search_and_output(patterns, name, value, ignore_case, regex, csv_file, format_type)
+    if duplicates is not None:
+        return 0 if search_and_output(
+            patterns, None, ignore_case=ignore_case, csv_file=csv_file, format_type=format_type,
+            duplicates=duplicates, memory_budget=memory_budget
+        ) == 0 else 1
+    
+    if first or exists:
+        limit = 1
+    
+    if exists:
+        results = search_frontmatter(
+            patterns, name, value, ignore_case, regex, format_type,
+            content=content, content_regex=content_regex, index_path=index_file, limit=limit
+        )
+        return 0 if results else 1
+    
+    search_and_output(
+        patterns, name, value, ignore_case, regex, csv_file, format_type,
+        content=content, content_regex=content_regex, index_path=index_file, limit=limit
+    )
+    return 0
 
 
 def cmd_validate(
@@ -412,7 +512,15 @@ def cmd_validate(
     csv_file: str = None,
     format_type: str = "yaml",
     save_specs=None,
-    args=None
+    args=None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    max_failures: int = None,
+    max_failures_per_file: int = None,
+    cache_file: str = None,
+    jsonl_file: str = None,
+    junit_file: str = None,
+    sarif_file: str = None,
+    vocab_report: str = None
 ) -> int:
     """
     Handle validate command.
@@ -425,6 +533,14 @@ def cmd_validate(
         format_type: Format of frontmatter
         save_specs: Tuple of (description, specs_file) for saving specs
         args: Original arguments object for specs conversion
+        memory_budget: Maximum number of values held in memory per unique rule
+        max_failures: Optional number of failures after which validation stops
+        max_failures_per_file: Optional maximum number of failures reported per file
+        cache_file: Optional validation cache file; None disables the cache
+        jsonl_file: Optional JSON Lines file for output
+        junit_file: Optional JUnit XML file for output
+        sarif_file: Optional SARIF file for output
+        vocab_report: Optional CSV file for the values rejected by in-vocab rules
         
     Returns:
         Exit code: 0 if all validations pass, non-zero if any fail
@@ -437,10 +553,24 @@ def cmd_validate(
         print(f"Specs saved to {specs_file}")
         return 0
     
-    failure_count = validate_and_output(patterns, validations, ignore_case, csv_file, format_type)
+    try:
+        failure_count = validate_and_output(
+            patterns, validations, ignore_case, csv_file, format_type, memory_budget,
+            max_failures=max_failures, max_failures_per_file=max_failures_per_file, cache_file=cache_file,
+            jsonl_file=jsonl_file, junit_file=junit_file, sarif_file=sarif_file, vocab_report=vocab_report,
+            on_stop=_report_stop
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
     return 1 if failure_count > 0 else 0
 
 
+def _report_stop(failure_count: int) -> None:
+    """Tell the user that validation stopped at --max-failures with files left unchecked."""
+    print(f"Stopped after {failure_count} failure(s); remaining files were not checked", file=sys.stderr)
+
+
 def cmd_update(
     patterns: List[str],
     frontmatter_name: str,
@@ -448,7 +578,18 @@ def cmd_update(
     deduplication: bool = True,
     format_type: str = "yaml",
     save_specs=None,
-    args=None
+    args=None,
+    updates: List[Dict[str, Any]] = None,
+    durability: str = DEFAULT_DURABILITY,
+    jobs: int = 1,
+    transactional: bool = False,
+    journal_file: str = None,
+    disk_budget: int = None,
+    function_files: List[str] = None,
+    now: str = None,
+    write_queue: int = DEFAULT_WRITE_QUEUE,
+    where: List[str] = None,
+    where_ignore_case: bool = False
 ):
     """
     Handle update command.
@@ -461,6 +602,20 @@ def cmd_update(
         format_type: Format of frontmatter
         save_specs: Tuple of (description, specs_file) for saving specs
         args: Original arguments object for specs conversion
+        updates: Optional list of field updates applied in one pass; when given it
+                 replaces frontmatter_name, operations and deduplication
+        durability: How written files are synced to disk: 'none', 'file' or 'batch'
+        jobs: Number of worker processes updating files in parallel
+        transactional: Whether to write every file or none; implied by journal_file
+        journal_file: Journal of a transactional update (default: a new file in .fmu-journal)
+        disk_budget: Optional limit, in bytes, on the staged files and backups of a
+                     transactional update
+        function_files: Python files registering functions for compute formulas
+        now: Timestamp returned by now() for every file (default: the time the update starts)
+        write_queue: Number of files waiting to be written by a background thread
+                     while the next file is updated; 0 writes each file before going on
+        where: Conditions (NAME, NAME=VALUE or NAME~REGEX) a file must all meet to be updated
+        where_ignore_case: Whether the where conditions ignore case
     """
     # Save specs if requested
     if save_specs and args:
@@ -470,7 +625,139 @@ def cmd_update(
         print(f"Specs saved to {specs_file}")
         return
     
-    update_and_output(patterns, frontmatter_name, operations, deduplication, format_type)
+    _load_function_files(function_files)
+    now = _parse_now(now)
+    for expression in where or []:
+        try:
+            WhereClause(expression, where_ignore_case)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    
+    if transactional and not journal_file:
+        journal_file = default_journal_file()
+    if journal_file:
+        journal_dir = os.path.dirname(journal_file)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+    
+    if updates:
+        update_fields_and_output(
+            patterns, updates, format_type, durability, jobs, journal_file, disk_budget, now, write_queue,
+            where, where_ignore_case
+        )
+    else:
+        update_and_output(
+            patterns, frontmatter_name, operations, deduplication, format_type,
+            durability, jobs, journal_file, disk_budget, now, write_queue, where, where_ignore_case
+        )
+
+
+def _load_function_files(function_files: Optional[List[str]]) -> None:
+    """Load the --functions files, exiting with an error if one cannot be loaded."""
+    if not function_files:
+        return
+    try:
+        load_function_files(function_files)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _parse_now(now: Any) -> Optional[str]:
+    """Normalize a --now timestamp, which specs files may give as a date or datetime, exiting if it is invalid."""
+    if now is None:
+        return None
+    try:
+        return parse_timestamp(now.isoformat() if hasattr(now, 'isoformat') else str(now))
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def cmd_rollback(journal_file: str) -> int:
+    """
+    Handle rollback command.
+    
+    Args:
+        journal_file: Journal of a transactional update
+        
+    Returns:
+        Exit code: 0 on success, 1 on error
+    """
+    try:
+        restored = rollback_transaction(journal_file)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Restored {restored} file(s) from {journal_file}")
+    return 0
+
+
+def cmd_stats(
+    patterns: List[str],
+    cardinality: List[str] = None,
+    ignore_case: bool = False,
+    precision: int = DEFAULT_PRECISION,
+    sketch_out: str = None,
+    merge_sketch_files: List[str] = None,
+    format_type: str = "yaml",
+    save_specs=None
+) -> int:
+    """
+    Handle stats command.
+    
+    Args:
+        patterns: List of glob patterns or file paths
+        cardinality: Names of fields whose distinct values are estimated
+        ignore_case: Whether to match field names and values case-insensitively
+        precision: HyperLogLog precision (registers = 2**precision)
+        sketch_out: Optional file to save the resulting sketches to
+        merge_sketch_files: Optional sketch files (e.g. from other shards) to merge in
+        format_type: Format of frontmatter
+        save_specs: Tuple of (description, specs_file) for saving specs
+        
+    Returns:
+        Exit code: 0 on success, 1 on error
+    """
+    # Save specs if requested
+    if save_specs:
+        description, specs_file = save_specs
+        options = convert_stats_args_to_options(type('Args', (), {
+            'cardinality': cardinality,
+            'ignore_case': ignore_case,
+            'precision': precision,
+            'sketch_out': sketch_out,
+            'merge_sketches': merge_sketch_files
+        })())
+        save_specs_file(specs_file, 'stats', description, patterns, options)
+        print(f"Specs saved to {specs_file}")
+        return 0
+    
+    sketches = {}
+    try:
+        for sketch_file in merge_sketch_files or []:
+            merge_sketches(sketches, load_sketches(sketch_file))
+        
+        if patterns:
+            fields = cardinality or list(sketches)
+            merge_sketches(sketches, cardinality_frontmatter(patterns, fields, ignore_case, format_type, precision))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    
+    if cardinality:
+        sketches = {field: sketches[field] for field in cardinality if field in sketches}
+    
+    output_cardinality_results(sketches)
+    
+    if sketch_out:
+        try:
+            save_sketches(sketch_out, sketches)
+        except IOError as e:
+            print(f"Error: Cannot write sketch file {sketch_out}: {e}", file=sys.stderr)
+            return 1
+    return 0
 
 
 def cmd_execute(
@@ -507,6 +794,62 @@ def cmd_execute(
         return 1
 
 
+class _RecordUpdateOption(argparse.Action):
+    """
+    Store an update option and record it in command line order.
+    
+    Behaves like the 'store', 'append' (with append=True) or 'store_true'
+    (with nargs=0) actions, and also appends (dest, value) to
+    namespace.update_sequence so that options can be grouped by the --name
+    before them.
+    """
+    
+    def __init__(self, option_strings, dest, append=False, **kwargs):
+        self.append = append
+        super().__init__(option_strings, dest, **kwargs)
+    
+    def __call__(self, parser, namespace, values, option_string=None):
+        if self.nargs == 0:
+            values = self.const
+        if self.append:
+            setattr(namespace, self.dest, (getattr(namespace, self.dest) or []) + [values])
+        else:
+            setattr(namespace, self.dest, values)
+        if getattr(namespace, 'update_sequence', None) is None:
+            namespace.update_sequence = []
+        namespace.update_sequence.append((self.dest, values))
+
+
+def _positive_int(text: str) -> int:
+    """Parse a positive integer command line value."""
+    try:
+        number = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid positive integer: '{text}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: '{text}'")
+    return number
+
+
+def _non_negative_int(text: str) -> int:
+    """Parse a non-negative integer command line value."""
+    try:
+        number = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid non-negative integer: '{text}'")
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be at least 0: '{text}'")
+    return number
+
+
+def _timestamp(text: str) -> str:
+    """Parse an ISO 8601 command line timestamp into the format returned by now()."""
+    try:
+        return parse_timestamp(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
 def create_parser():
     """Create argument parser."""
     parser = argparse.ArgumentParser(
@@ -577,6 +920,26 @@ def create_parser():
         action='store_true',
         help='Minify JSON/YAML output (only applies with --output json or yaml)'
     )
+    read_parser.add_argument(
+        '--functions',
+        action='append',
+        metavar='MODULE',
+        help='Python file registering additional functions for --map formulas. Can be used multiple times.'
+    )
+    read_parser.add_argument(
+        '--now',
+        type=_timestamp,
+        metavar='TIMESTAMP',
+        help='ISO 8601 time returned by now() for every file, for reproducible output (default: the time the command starts)'
+    )
+    read_parser.add_argument(
+        '--write-queue',
+        dest='write_queue',
+        type=_non_negative_int,
+        default=DEFAULT_WRITE_QUEUE,
+        metavar='DEPTH',
+        help=f'With --individual, write up to DEPTH output files in the background while the next file is read; 0 writes each file before going on (default: {DEFAULT_WRITE_QUEUE})'
+    )
     read_parser.add_argument(
         '--save-specs',
         nargs=2,
@@ -587,8 +950,15 @@ def create_parser():
     # Search command
     search_parser = subparsers.add_parser('search', help='Search for specific frontmatter fields')
     search_parser.add_argument('patterns', nargs='+', help='Glob patterns or file paths')
-    search_parser.add_argument('--name', required=True, help='Name of frontmatter field to search for')
+    search_parser.add_argument('--name', help='Name of frontmatter field to search for (required unless --content or --content-regex is used)')
     search_parser.add_argument('--value', help='Value to match (optional)')
+    content_group = search_parser.add_mutually_exclusive_group()
+    content_group.add_argument('--content', help='Only match files whose content contains this phrase')
+    content_group.add_argument('--content-regex', dest='content_regex', help='Only match files whose content matches this regex')
+    search_parser.add_argument(
+        '--index',
+        help='Trigram index file used to speed up --content/--content-regex searches (created or refreshed as needed)'
+    )
     search_parser.add_argument(
         '--ignore-case',
         action='store_true',
@@ -600,6 +970,33 @@ def create_parser():
         help='Use regex pattern matching for values (default: false)'
     )
     search_parser.add_argument('--csv', dest='csv_file', help='Output to CSV file')
+    search_parser.add_argument(
+        '--limit',
+        type=_positive_int,
+        help='Stop after N results (files are scanned in sorted order)'
+    )
+    search_parser.add_argument(
+        '--first',
+        action='store_true',
+        help='Stop after the first result (same as --limit 1)'
+    )
+    search_parser.add_argument(
+        '--exists',
+        action='store_true',
+        help='Print nothing; exit with 0 if any file matches and 1 otherwise'
+    )
+    search_parser.add_argument(
+        '--duplicates',
+        metavar='FIELD',
+        help='Report every file sharing a value of FIELD with another file (exits with 1 if any)'
+    )
+    search_parser.add_argument(
+        '--memory-budget',
+        dest='memory_budget',
+        type=_positive_int,
+        default=DEFAULT_MEMORY_BUDGET,
+        help=f'Values held in memory by --duplicates before spilling sorted runs to disk (default: {DEFAULT_MEMORY_BUDGET})'
+    )
     search_parser.add_argument(
         '--save-specs',
         nargs=2,
@@ -622,6 +1019,23 @@ def create_parser():
     validate_parser.add_argument('--not-match', action='append', nargs=2, metavar=('FIELD', 'REGEX'), dest='not_match', help='Require field does not match regex')
     validate_parser.add_argument('--not-empty', action='append', help='Require field to be an array with at least 1 value')
     validate_parser.add_argument('--list-size', action='append', nargs=3, metavar=('FIELD', 'MIN', 'MAX'), help='Require field to be an array with count between min and max inclusively')
+    validate_parser.add_argument('--unique', action='append', help='Require each value of field to appear in only one file')
+    validate_parser.add_argument('--in-vocab', action='append', nargs=2, metavar=('FIELD', 'VOCAB_FILE'), dest='in_vocab', help='Require every value of field to be a term of the vocabulary file (one term per line)')
+    validate_parser.add_argument('--not-in-vocab', action='append', nargs=2, metavar=('FIELD', 'VOCAB_FILE'), dest='not_in_vocab', help='Require no value of field to be a term of the vocabulary file')
+    validate_parser.add_argument(
+        '--schema',
+        action='append',
+        metavar='SCHEMA_FILE',
+        help='Validate frontmatter against a JSON Schema (YAML or JSON file; local $ref only)'
+    )
+    validate_parser.add_argument(
+        '--references',
+        action='append',
+        nargs='+',
+        metavar=('FIELD', 'TARGET_FIELD [TARGET_PATTERN]'),
+        help='Require every value of FIELD to be a value of TARGET_FIELD (a field name or formula) '
+             'in the files matching TARGET_PATTERN (default: the validated files)'
+    )
     
     validate_parser.add_argument(
         '--ignore-case',
@@ -629,6 +1043,50 @@ def create_parser():
         help='Case-insensitive matching (default: false)'
     )
     validate_parser.add_argument('--csv', dest='csv_file', help='Output to CSV file')
+    validate_parser.add_argument('--jsonl', dest='jsonl_file', metavar='FILE', help='Output to JSON Lines file, one failure per line')
+    validate_parser.add_argument('--junit', dest='junit_file', metavar='FILE', help='Output to JUnit XML file')
+    validate_parser.add_argument('--sarif', dest='sarif_file', metavar='FILE', help='Output to SARIF 2.1.0 file')
+    validate_parser.add_argument('--vocab-report', dest='vocab_report', metavar='FILE', help='Write the values rejected by --in-vocab rules, with their counts, to a CSV file')
+    validate_parser.add_argument(
+        '--max-failures',
+        dest='max_failures',
+        type=_positive_int,
+        metavar='N',
+        help='Stop discovering and checking files after N failures'
+    )
+    validate_parser.add_argument(
+        '--fail-fast',
+        action='store_true',
+        help='Stop at the first failure (same as --max-failures 1)'
+    )
+    validate_parser.add_argument(
+        '--max-failures-per-file',
+        dest='max_failures_per_file',
+        type=_positive_int,
+        metavar='N',
+        help='Report at most N failures per file'
+    )
+    validate_parser.add_argument(
+        '--memory-budget',
+        dest='memory_budget',
+        type=_positive_int,
+        default=DEFAULT_MEMORY_BUDGET,
+        help=f'Values held in memory per --unique rule before spilling sorted runs to disk (default: {DEFAULT_MEMORY_BUDGET})'
+    )
+    validate_parser.add_argument(
+        '--cache-file',
+        dest='cache_file',
+        nargs='?',
+        const=DEFAULT_CACHE_FILE,
+        metavar='FILE',
+        help=f'Cache per-file results in FILE so unchanged files are not validated again (FILE defaults to {DEFAULT_CACHE_FILE}; without this option no cache is used)'
+    )
+    validate_parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        dest='no_cache',
+        help='Validate every file without reading or writing the cache'
+    )
     validate_parser.add_argument(
         '--save-specs',
         nargs=2,
@@ -639,17 +1097,25 @@ def create_parser():
     # Update command
     update_parser = subparsers.add_parser('update', help='Update frontmatter fields')
     update_parser.add_argument('patterns', nargs='+', help='Glob patterns or file paths')
-    update_parser.add_argument('--name', required=True, help='Name of frontmatter field to update')
+    update_parser.add_argument(
+        '--name',
+        action=_RecordUpdateOption,
+        required=True,
+        help='Name of frontmatter field to update. Repeat to update several fields in one pass: '
+             'the options after each --name apply to that field'
+    )
     
     # Update operation options
     update_parser.add_argument(
         '--deduplication',
+        action=_RecordUpdateOption,
         choices=['true', 'false'],
         default='true',
         help='Eliminate exact duplicates in array values (default: true)'
     )
     update_parser.add_argument(
         '--case',
+        action=_RecordUpdateOption,
         choices=['upper', 'lower', 'Sentence case', 'Title Case', 'snake_case', 'kebab-case'],
         help='Transform the case of the frontmatter value(s)'
     )
@@ -657,14 +1123,16 @@ def create_parser():
     # Compute operation
     update_parser.add_argument(
         '--compute',
-        action='append',
+        action=_RecordUpdateOption,
+        append=True,
         help='Compute and set frontmatter value using formula (literal, placeholder, or function call). Can be used multiple times.'
     )
     
     # Replace operations (can appear multiple times)
     update_parser.add_argument(
         '--replace',
-        action='append',
+        action=_RecordUpdateOption,
+        append=True,
         nargs=2,
         metavar=('FROM', 'TO'),
         help='Replace values matching FROM with TO (can be used multiple times)'
@@ -673,7 +1141,8 @@ def create_parser():
     # Remove operations (can appear multiple times)
     update_parser.add_argument(
         '--remove',
-        action='append',
+        action=_RecordUpdateOption,
+        append=True,
         nargs='?',
         const=None,
         help='Remove values matching the specified pattern. If no value provided, removes the entire frontmatter field (can be used multiple times)'
@@ -682,14 +1151,84 @@ def create_parser():
     # Shared options for replace and remove operations
     update_parser.add_argument(
         '--ignore-case',
-        action='store_true',
+        action=_RecordUpdateOption,
+        nargs=0,
+        const=True,
+        default=False,
         help='Ignore case when performing replacements and removals (default: false)'
     )
     update_parser.add_argument(
         '--regex',
-        action='store_true',
+        action=_RecordUpdateOption,
+        nargs=0,
+        const=True,
+        default=False,
         help='Treat patterns as regex for replacements and removals (default: false)'
     )
+    update_parser.add_argument(
+        '--durability',
+        choices=DURABILITY_LEVELS,
+        default=DEFAULT_DURABILITY,
+        help='Sync written files to disk: none, file (each file before it replaces the original) '
+             f'or batch (all files once at the end) (default: {DEFAULT_DURABILITY})'
+    )
+    update_parser.add_argument(
+        '--transactional',
+        action='store_true',
+        help='Write every file or none: stage all new files, back up the originals and '
+             'write a journal before replacing any file (undo with fmu rollback JOURNAL)'
+    )
+    update_parser.add_argument(
+        '--journal',
+        dest='journal_file',
+        metavar='JOURNAL',
+        help='Journal file of a transactional update, implies --transactional (default: a new file in .fmu-journal)'
+    )
+    update_parser.add_argument(
+        '--disk-budget',
+        dest='disk_budget',
+        type=_positive_int,
+        metavar='BYTES',
+        help='Abort a transactional update, changing nothing, if its staged files and backups exceed BYTES'
+    )
+    update_parser.add_argument(
+        '--jobs',
+        type=_positive_int,
+        default=1,
+        help='Update files in N worker processes; results are still reported in file order (default: 1)'
+    )
+    update_parser.add_argument(
+        '--functions',
+        action='append',
+        metavar='MODULE',
+        help='Python file registering additional functions for --compute formulas. Can be used multiple times.'
+    )
+    update_parser.add_argument(
+        '--now',
+        type=_timestamp,
+        metavar='TIMESTAMP',
+        help='ISO 8601 time returned by now() for every file, for reproducible output (default: the time the update starts)'
+    )
+    update_parser.add_argument(
+        '--write-queue',
+        dest='write_queue',
+        type=_non_negative_int,
+        default=DEFAULT_WRITE_QUEUE,
+        metavar='DEPTH',
+        help=f'Write up to DEPTH updated files in the background while the next file is updated; 0 writes each file before going on. Not used with --jobs or --transactional (default: {DEFAULT_WRITE_QUEUE})'
+    )
+    update_parser.add_argument(
+        '--where',
+        action='append',
+        metavar='EXPR',
+        help='Only update files whose frontmatter matches EXPR: NAME (the field exists), NAME=VALUE (the field, or an item of it, equals VALUE) or NAME~REGEX. Can be used multiple times; all must match.'
+    )
+    update_parser.add_argument(
+        '--where-ignore-case',
+        dest='where_ignore_case',
+        action='store_true',
+        help='Match --where field names and values case-insensitively'
+    )
     update_parser.add_argument(
         '--save-specs',
         nargs=2,
@@ -697,6 +1236,47 @@ def create_parser():
         help='Save command specs to YAML file'
     )
     
+    # Stats command
+    stats_parser = subparsers.add_parser('stats', help='Estimate distinct values of frontmatter fields')
+    stats_parser.add_argument('patterns', nargs='*', help='Glob patterns or file paths')
+    stats_parser.add_argument(
+        '--cardinality',
+        nargs='+',
+        metavar='FIELD',
+        help='Estimate the number of distinct values of each field (HyperLogLog sketch)'
+    )
+    stats_parser.add_argument(
+        '--ignore-case',
+        action='store_true',
+        help='Case-insensitive matching of field names and values (default: false)'
+    )
+    stats_parser.add_argument(
+        '--precision',
+        type=int,
+        choices=range(4, 19),
+        default=DEFAULT_PRECISION,
+        metavar='{4..18}',
+        help=f'Sketch precision: 2^P registers per field, standard error 1.04/sqrt(2^P) (default: {DEFAULT_PRECISION})'
+    )
+    stats_parser.add_argument('--sketch-out', dest='sketch_out', help='Save the sketches to a file for later merging')
+    stats_parser.add_argument(
+        '--merge-sketches',
+        dest='merge_sketches',
+        nargs='+',
+        metavar='SKETCH_FILE',
+        help='Merge sketch files (e.g. from per-shard runs) without re-reading files'
+    )
+    stats_parser.add_argument(
+        '--save-specs',
+        nargs=2,
+        metavar=('DESCRIPTION', 'SPECS_FILE'),
+        help='Save command specs to YAML file'
+    )
+    
+    # Rollback command
+    rollback_parser = subparsers.add_parser('rollback', help='Restore the files of a transactional update')
+    rollback_parser.add_argument('journal_file', metavar='JOURNAL', help='Journal written by update --transactional')
+    
     # Execute command
     execute_parser = subparsers.add_parser('execute', help='Execute commands from specs file')
     execute_parser.add_argument('specs_file', help='Path to YAML specs file')
@@ -829,6 +1409,37 @@ def _parse_validation_args(args) -> List[Dict[str, Any]]:
                 print(f"Error: Invalid list-size parameters. Min and max must be integers: {min_str}, {max_str}", file=sys.stderr)
                 sys.exit(1)
     
+    # Handle --in-vocab
+    if getattr(args, 'in_vocab', None):
+        for field, vocab_file in args.in_vocab:
+            validations.append({'type': 'in-vocab', 'field': field, 'vocab': vocab_file})
+    
+    # Handle --not-in-vocab
+    if getattr(args, 'not_in_vocab', None):
+        for field, vocab_file in args.not_in_vocab:
+            validations.append({'type': 'not-in-vocab', 'field': field, 'vocab': vocab_file})
+    
+    # Handle --unique
+    if getattr(args, 'unique', None):
+        for field in args.unique:
+            validations.append({'type': 'unique', 'field': field})
+    
+    # Handle --schema
+    if getattr(args, 'schema', None):
+        for schema_file in args.schema:
+            validations.append({'type': 'schema', 'schema': schema_file})
+    
+    # Handle --references
+    if getattr(args, 'references', None):
+        for reference in args.references:
+            if len(reference) not in (2, 3):
+                print("Error: --references requires FIELD TARGET_FIELD [TARGET_PATTERN]", file=sys.stderr)
+                sys.exit(1)
+            validation = {'type': 'references', 'field': reference[0], 'target_field': reference[1]}
+            if len(reference) == 3:
+                validation['target_patterns'] = [reference[2]]
+            validations.append(validation)
+    
     return validations
 
 
@@ -854,10 +1465,16 @@ def main():
             map_items=args.map if hasattr(args, 'map') and args.map else None,
             pretty=args.pretty if hasattr(args, 'pretty') else False,
             compact=args.compact if hasattr(args, 'compact') else False,
-            save_specs=args.save_specs if hasattr(args, 'save_specs') else None
+            save_specs=args.save_specs if hasattr(args, 'save_specs') else None,
+            function_files=args.functions if hasattr(args, 'functions') else None,
+            now=args.now if hasattr(args, 'now') else None,
+            write_queue=args.write_queue if hasattr(args, 'write_queue') else DEFAULT_WRITE_QUEUE
         )
     elif args.command == 'search':
-        cmd_search(
+        if not args.name and args.content is None and args.content_regex is None and not args.duplicates:
+            print("Error: --name, --content, --content-regex or --duplicates is required", file=sys.stderr)
+            sys.exit(1)
+        exit_code = cmd_search(
             patterns=args.patterns,
             name=args.name,
             value=args.value,
@@ -865,8 +1482,18 @@ def main():
             regex=args.regex,
             csv_file=args.csv_file,
             format_type=args.format,
-            save_specs=args.save_specs if hasattr(args, 'save_specs') else None
+            save_specs=args.save_specs if hasattr(args, 'save_specs') else None,
+            content=args.content,
+            content_regex=args.content_regex,
+            index_file=args.index,
+            limit=args.limit,
+            first=args.first,
+            exists=args.exists,
+            duplicates=args.duplicates,
+            memory_budget=args.memory_budget
         )
+        if exit_code:
+            sys.exit(exit_code)
     elif args.command == 'validate':
         validations = _parse_validation_args(args)
         if not validations and not (hasattr(args, 'save_specs') and args.save_specs):
@@ -879,23 +1506,69 @@ def main():
             csv_file=args.csv_file,
             format_type=args.format,
             save_specs=args.save_specs if hasattr(args, 'save_specs') else None,
-            args=args
+            args=args,
+            memory_budget=args.memory_budget,
+            max_failures=1 if args.fail_fast else args.max_failures,
+            max_failures_per_file=args.max_failures_per_file,
+            cache_file=None if args.no_cache else args.cache_file,
+            jsonl_file=args.jsonl_file,
+            junit_file=args.junit_file,
+            sarif_file=args.sarif_file,
+            vocab_report=args.vocab_report
         )
         sys.exit(exit_code)
     elif args.command == 'update':
-        operations = _parse_update_args(args)
-        if not operations and not (hasattr(args, 'save_specs') and args.save_specs):
+        updates = [
+            {
+                'name': group.name,
+                'operations': _parse_update_args(group),
+                'deduplication': group.deduplication == 'true'
+            }
+            for group in split_update_args(args)
+        ]
+        if any(not update['operations'] for update in updates) and not (hasattr(args, 'save_specs') and args.save_specs):
             print("Error: No update operations specified", file=sys.stderr)
             sys.exit(1)
         cmd_update(
             patterns=args.patterns,
-            frontmatter_name=args.name,
-            operations=operations,
-            deduplication=(args.deduplication == 'true'),
+            frontmatter_name=updates[0]['name'],
+            operations=updates[0]['operations'],
+            deduplication=updates[0]['deduplication'],
             format_type=args.format,
             save_specs=args.save_specs if hasattr(args, 'save_specs') else None,
-            args=args
+            args=args,
+            updates=updates,
+            durability=args.durability,
+            jobs=args.jobs,
+            transactional=args.transactional,
+            journal_file=args.journal_file,
+            disk_budget=args.disk_budget,
+            function_files=args.functions,
+            now=args.now,
+            write_queue=args.write_queue,
+            where=args.where,
+            where_ignore_case=args.where_ignore_case
+        )
+    elif args.command == 'stats':
+        if not args.cardinality and not args.merge_sketches:
+            print("Error: --cardinality or --merge-sketches is required", file=sys.stderr)
+            sys.exit(1)
+        if args.cardinality and not args.patterns and not args.merge_sketches:
+            print("Error: No file patterns specified", file=sys.stderr)
+            sys.exit(1)
+        exit_code = cmd_stats(
+            patterns=args.patterns,
+            cardinality=args.cardinality,
+            ignore_case=args.ignore_case,
+            precision=args.precision,
+            sketch_out=args.sketch_out,
+            merge_sketch_files=args.merge_sketches,
+            format_type=args.format,
+            save_specs=args.save_specs if hasattr(args, 'save_specs') else None
         )
+        sys.exit(exit_code)
+    elif args.command == 'rollback':
+        sys.exit(cmd_rollback(args.journal_file))
     elif args.command == 'execute':
         exit_code = cmd_execute(
             specs_file=args.specs_file,
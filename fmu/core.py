@@ -4,8 +4,9 @@ Core frontmatter parsing functionality for fmu.
 
 import re
 import yaml
-from typing import Dict, Any, Tuple, Optional
+from typing import Dict, Any, Tuple, Optional, Iterator, List
 import glob
+import heapq
 import os
 
 
@@ -56,6 +57,29 @@ def extract_content(content: str, format_type: str = "yaml") -> str:
     return content_only
 
 
+# Frontmatter delimited by ---, matched the same way as in parse_frontmatter
+_HEADER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---\s*\n', re.DOTALL)
+
+
+def extract_header(content: str, format_type: str = "yaml") -> Optional[str]:
+    """
+    Extract the raw frontmatter text from a string, without parsing it.
+    
+    Args:
+        content: The file content as a string
+        format_type: The format of the frontmatter
+        
+    Returns:
+        The text between the frontmatter delimiters, as parse_frontmatter finds
+        them, or None if there is no frontmatter
+    """
+    if format_type.lower() != "yaml":
+        raise ValueError(f"Format '{format_type}' not supported. Currently only 'yaml' is supported.")
+    
+    match = _HEADER_PATTERN.match(content)
+    return match.group(1) if match else None
+
+
 def parse_file(file_path: str, format_type: str = "yaml") -> Tuple[Optional[Dict[str, Any]], str]:
     """
     Parse frontmatter from a file.
@@ -67,16 +91,91 @@ def parse_file(file_path: str, format_type: str = "yaml") -> Tuple[Optional[Dict
     Returns:
         Tuple of (frontmatter_dict, content)
     """
+    return parse_frontmatter(read_file(file_path), format_type)
+
+
+def read_file(file_path: str, newline: Optional[str] = None) -> str:
+    """
+    Read the text of a file.
+    
+    Args:
+        file_path: Path to the file to read
+        newline: Newline mode passed to open(); '' keeps line endings as they are
+                 in the file, the default translates them to '\n'
+        
+    Returns:
+        The file content as a string
+        
+    Raises:
+        FileNotFoundError: If the file does not exist
+        ValueError: If the file is not valid UTF-8
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        return parse_frontmatter(content, format_type)
+        with open(file_path, 'r', encoding='utf-8', newline=newline) as f:
+            return f.read()
     except FileNotFoundError:
         raise FileNotFoundError(f"File not found: {file_path}")
     except UnicodeDecodeError:
         raise ValueError(f"Unable to decode file as UTF-8: {file_path}")
 
 
+class FrontmatterKeys:
+    """
+    Field name lookups for one parsed frontmatter dictionary.
+    
+    Case-insensitive lookups use a casefold(key) -> original keys map that is
+    built lazily, at most once per frontmatter, and shared by every lookup made
+    against that file. The map is not refreshed if the dictionary is modified
+    afterwards.
+    """
+    
+    __slots__ = ('frontmatter', '_folded')
+    
+    def __init__(self, frontmatter: Optional[Dict[str, Any]]):
+        self.frontmatter = frontmatter if frontmatter is not None else {}
+        self._folded = None
+    
+    def _folded_keys(self) -> Dict[str, List[str]]:
+        """Build the case-folded key map on first use."""
+        if self._folded is None:
+            folded = {}
+            for key in self.frontmatter:
+                if isinstance(key, str):
+                    folded.setdefault(key.casefold(), []).append(key)
+            self._folded = folded
+        return self._folded
+    
+    def find_all(self, name: str, ignore_case: bool = False) -> List[str]:
+        """
+        Find all original keys matching a field name.
+        
+        Args:
+            name: Field name to look up
+            ignore_case: Whether to match keys case-insensitively
+            
+        Returns:
+            Matching keys in frontmatter order (several only when ignoring case)
+        """
+        if ignore_case:
+            return self._folded_keys().get(name.casefold(), [])
+        return [name] if name in self.frontmatter else []
+    
+    def find(self, name: str, ignore_case: bool = False) -> Optional[str]:
+        """Find the first original key matching a field name, or None."""
+        keys = self.find_all(name, ignore_case)
+        return keys[0] if keys else None
+    
+    def get(self, name: str, ignore_case: bool = False) -> Any:
+        """Get the value of the first key matching a field name, or None."""
+        key = self.find(name, ignore_case)
+        return self.frontmatter[key] if key is not None else None
+
+
+# Directories where fmu keeps its own state, such as update journals and the
+# validation cache; walking a directory never collects them as input files
+STATE_DIRS = frozenset({'.fmu-journal', '.fmu-cache'})
+
+
 def get_files_from_patterns(patterns: list) -> list:
     """
     Get list of files from glob patterns.
@@ -87,19 +186,69 @@ def get_files_from_patterns(patterns: list) -> list:
     Returns:
         List of file paths
     """
-    files = []
+    return list(iter_files_from_patterns(patterns))
+
+
+def iter_files_from_patterns(patterns: list) -> Iterator[str]:
+    """
+    Lazily yield files from glob patterns in sorted order, without duplicates.
+    
+    Directories are walked on demand, so callers that stop early (e.g. a search
+    with a result limit) never list the rest of the tree. Glob patterns are
+    expanded in full, since glob results have to be sorted anyway.
+    
+    Args:
+        patterns: List of glob patterns or file paths
+        
+    Yields:
+        File paths, in the same order as get_files_from_patterns returns them
+    """
+    streams = []
     for pattern in patterns:
         if os.path.isfile(pattern):
-            files.append(pattern)
+            streams.append(iter([pattern]))
         elif os.path.isdir(pattern):
-            # If it's a directory, add all files in it
-            for root, _, filenames in os.walk(pattern):
-                for filename in filenames:
-                    files.append(os.path.join(root, filename))
+            # If it's a directory, add all files in it, except fmu's own state
+            streams.append(_walk_sorted(pattern))
         else:
             # Treat as glob pattern
-            matched_files = glob.glob(pattern, recursive=True)
-            files.extend(matched_files)
+            streams.append(iter(sorted(glob.glob(pattern, recursive=True))))
+    
+    # Merge the sorted streams and drop duplicates
+    previous = None
+    for file_path in heapq.merge(*streams):
+        if file_path != previous:
+            yield file_path
+            previous = file_path
+
+
+def _walk_sorted(directory: str) -> Iterator[str]:
+    """
+    Yield all files below a directory in sorted path order.
+    
+    Mirrors os.walk (symlinked directories are not followed, unreadable
+    directories are skipped) but visits entries so that the joined paths come
+    out sorted: a subdirectory sorts as its name plus a separator, which is
+    where its children fall among sibling files. STATE_DIRS are not entered.
+    """
+    try:
+        with os.scandir(directory) as scanner:
+            entries = list(scanner)
+    except OSError:
+        return
+    
+    keyed_entries = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        keyed_entries.append((entry.name + os.sep if is_dir else entry.name, is_dir, entry))
+    keyed_entries.sort(key=lambda item: item[0])
     
-    # Remove duplicates and sort
-    return sorted(list(set(files)))
\ No newline at end of file
+    for _, is_dir, entry in keyed_entries:
+        path = os.path.join(directory, entry.name)
+        if not is_dir:
+            yield path
+        elif not entry.is_symlink() and entry.name not in STATE_DIRS:
+            yield from _walk_sorted(path)
@@ -0,0 +1,117 @@
+"""
+Corpus-wide duplicate detection with bounded memory.
+"""
+
+import heapq
+import itertools
+import json
+import os
+import tempfile
+from typing import List, Iterator, Tuple, Any
+
+
+# Number of (value, file) entries held in memory before a sorted run is spilled to disk
+DEFAULT_MEMORY_BUDGET = 1000000
+
+
+def iter_field_values(value: Any) -> List[Any]:
+    """Return the individual values of a field: each item of an array, or the scalar itself."""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class DuplicateCollector:
+    """
+    Collect field values per file and find the values shared by several files.
+
+    Entries are kept in memory until the memory budget is reached. They are
+    then sorted and spilled to a temporary run file, and the runs are merged
+    at the end (external sort/merge), so any corpus size can be processed with
+    a fixed amount of memory.
+    """
+
+    def __init__(self, ignore_case: bool = False, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        """
+        Args:
+            ignore_case: Whether values differing only in case are duplicates
+            memory_budget: Maximum number of entries held in memory
+        """
+        if memory_budget < 1:
+            raise ValueError("memory_budget must be at least 1")
+        self.ignore_case = ignore_case
+        self.memory_budget = memory_budget
+        self._entries: List[Tuple[str, str, str, str]] = []
+        self._runs: List[str] = []
+
+    def add(self, file_path: str, field_name: str, value: Any) -> None:
+        """
+        Record the values of a field in a file.
+
+        Args:
+            file_path: Path to the file
+            field_name: Field name as written in the file
+            value: Field value; each item of an array is recorded separately
+        """
+        for item in iter_field_values(value):
+            item_str = str(item)
+            key = item_str.casefold() if self.ignore_case else item_str
+            self._entries.append((key, file_path, field_name, item_str))
+            if len(self._entries) >= self.memory_budget:
+                self._spill()
+
+    def duplicates(self) -> Iterator[Tuple[str, List[Tuple[str, str, str]]]]:
+        """
+        Yield every value shared by more than one file, in sorted value order.
+
+        Yields:
+            Tuples (value_key, entries) where entries are (file_path, field_name,
+            value) tuples sorted by file path, one per file sharing the value
+        """
+        try:
+            if self._runs:
+                self._spill()
+                entries = heapq.merge(*(self._read_run(run) for run in self._runs))
+            else:
+                entries = iter(sorted(self._entries))
+
+            for key, group in itertools.groupby(entries, key=lambda entry: entry[0]):
+                per_file = []
+                previous_path = None
+                for _, file_path, field_name, value in group:
+                    # A value repeated within one file is not a cross-file duplicate
+                    if file_path != previous_path:
+                        per_file.append((file_path, field_name, value))
+                        previous_path = file_path
+                if len(per_file) > 1:
+                    yield key, per_file
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Release memory and delete any spilled run files."""
+        self._entries = []
+        for run in self._runs:
+            try:
+                os.remove(run)
+            except OSError:
+                pass
+        self._runs = []
+
+    def _spill(self) -> None:
+        """Sort the in-memory entries and write them to a new run file."""
+        self._entries.sort()
+        fd, run_path = tempfile.mkstemp(prefix='fmu-duplicates-', suffix='.run')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for entry in self._entries:
+                f.write(json.dumps(entry, ensure_ascii=False))
+                f.write('\n')
+        self._runs.append(run_path)
+        self._entries = []
+
+    @staticmethod
+    def _read_run(run_path: str) -> Iterator[Tuple[str, str, str, str]]:
+        """Stream the entries of a run file back in sorted order."""
+        with open(run_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield tuple(json.loads(line))
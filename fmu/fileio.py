@@ -0,0 +1,299 @@
+"""
+Atomic file rewriting.
+"""
+
+import os
+import queue
+import stat
+import tempfile
+import threading
+from typing import Callable, List, Optional, Set, Tuple, Union
+
+
+# How written files are flushed to disk:
+#   none  - leave it to the operating system
+#   file  - fsync each file before it replaces the original, and its directory after
+#   batch - fsync every written file and directory once, when the writer is closed
+DURABILITY_LEVELS = ('none', 'file', 'batch')
+DEFAULT_DURABILITY = 'none'
+
+# Number of files a WriteBehindWriter holds in memory waiting to be written;
+# 0 writes each file synchronously
+DEFAULT_WRITE_QUEUE = 16
+
+
+class AtomicWriter:
+    """
+    Replace files atomically: each file is written to a temporary file in the
+    same directory, which then replaces the original with os.replace, so a
+    crash never leaves a partially written file. The original's permission
+    bits are kept, and symlinks are written through to their target.
+    """
+
+    def __init__(self, durability: str = DEFAULT_DURABILITY):
+        """
+        Args:
+            durability: One of DURABILITY_LEVELS
+
+        Raises:
+            ValueError: If the durability level is unknown
+        """
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"Invalid durability '{durability}': expected one of {', '.join(DURABILITY_LEVELS)}"
+            )
+        self.durability = durability
+        # Files and directories to sync on close with 'batch' durability
+        self._pending_files: List[str] = []
+        self._pending_dirs: Set[str] = set()
+
+    def write(self, file_path: str, text: Union[str, bytes]) -> None:
+        """
+        Atomically replace the content of a file.
+
+        Args:
+            file_path: Path to the file
+            text: New content, written as UTF-8 text, or bytes written as they are
+        """
+        target, temp_path = stage_file(file_path, text, fsync=self.durability == 'file')
+        try:
+            os.replace(temp_path, target)
+        except BaseException:
+            _remove(temp_path)
+            raise
+
+        directory = os.path.dirname(target)
+        if self.durability == 'file':
+            _fsync_directory(directory)
+        elif self.durability == 'batch':
+            self.sync_later(target)
+
+    def sync_later(self, file_path: str) -> None:
+        """
+        Queue a file and its directory to be synced when the writer is closed.
+
+        Used with 'batch' durability for files written by another writer, for
+        example in a worker process.
+
+        Args:
+            file_path: Path to the file
+        """
+        target = os.path.realpath(file_path)
+        self._pending_files.append(target)
+        self._pending_dirs.add(os.path.dirname(target))
+
+    def close(self) -> None:
+        """Sync the files written with 'batch' durability."""
+        files, self._pending_files = self._pending_files, []
+        directories, self._pending_dirs = self._pending_dirs, set()
+        for file_path in files:
+            try:
+                fd = os.open(file_path, os.O_RDONLY)
+            except OSError:
+                # Replaced or removed since it was written
+                continue
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        for directory in sorted(directories):
+            _fsync_directory(directory)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class WriteBehindWriter:
+    """
+    Write files on a background thread, so that the caller can prepare the
+    next file while the previous one is written.
+
+    Writes are queued, at most queue_depth of them, and done in order by one
+    thread; write() blocks while the queue is full. A failed write is
+    reported to the on_error callback given with it, from the calling thread,
+    when the writer is closed: results reported through the callbacks are
+    complete once close() returns. With a queue depth of 0 files are written
+    synchronously, and on_error is called straight away.
+    """
+
+    def __init__(self, write_file: Callable[[str, Union[str, bytes]], None], queue_depth: int = DEFAULT_WRITE_QUEUE):
+        """
+        Args:
+            write_file: Function writing the content of a file, such as AtomicWriter.write
+            queue_depth: Number of files waiting to be written at most
+
+        Raises:
+            ValueError: If the queue depth is negative
+        """
+        if queue_depth < 0:
+            raise ValueError(f"Invalid write queue depth {queue_depth}: must be 0 or more")
+        self.write_file = write_file
+        self.queue_depth = queue_depth
+        # Failed writes, as (on_error, exception), reported on close
+        self._failures: List[Tuple[Optional[Callable[[Exception], None]], Exception]] = []
+        self._queue: Optional[queue.Queue] = None
+        self._thread: Optional[threading.Thread] = None
+        if queue_depth:
+            self._queue = queue.Queue(maxsize=queue_depth)
+            self._thread = threading.Thread(target=self._run, name='fmu-write-behind', daemon=True)
+            self._thread.start()
+
+    def write(
+        self,
+        file_path: str,
+        text: Union[str, bytes],
+        on_error: Optional[Callable[[Exception], None]] = None
+    ) -> None:
+        """
+        Queue the content of a file to be written.
+
+        Args:
+            file_path: Path to the file
+            text: New content
+            on_error: Called with the exception if the write fails; without it,
+                      the first failure is raised by close()
+        """
+        if self._thread is None:
+            try:
+                self.write_file(file_path, text)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(e)
+            return
+        self._queue.put((file_path, text, on_error))
+
+    def _run(self) -> None:
+        """Write the queued files until the end of the queue is reached."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            file_path, text, on_error = item
+            try:
+                self.write_file(file_path, text)
+            except Exception as e:
+                self._failures.append((on_error, e))
+
+    def close(self) -> None:
+        """
+        Wait for the queued files to be written and report failed writes.
+
+        Raises:
+            Exception: The first failed write that had no on_error callback
+        """
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        failures, self._failures = self._failures, []
+        unhandled = None
+        for on_error, error in failures:
+            if on_error is None:
+                unhandled = unhandled or error
+            else:
+                on_error(error)
+        if unhandled is not None:
+            raise unhandled
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def write_text_file(file_path: str, text: str) -> None:
+    """
+    Write a new text file, creating its directory if needed.
+
+    Args:
+        file_path: Path to the file
+        text: Content, written as UTF-8 text
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def stage_file(file_path: str, text: Union[str, bytes], fsync: bool = False) -> Tuple[str, str]:
+    """
+    Write the new content of a file to a temporary file next to it.
+
+    The temporary file gets the original's permission bits, so that moving it
+    over the original with os.replace completes an atomic rewrite.
+
+    Args:
+        file_path: Path to the file; symlinks are resolved to their target
+        text: New content, written as UTF-8 text, or bytes written as they are
+        fsync: Whether to sync the temporary file to disk
+
+    Returns:
+        Tuple of (resolved target path, temporary file path)
+    """
+    target = os.path.realpath(file_path)
+    directory = os.path.dirname(target)
+    try:
+        mode = stat.S_IMODE(os.stat(target).st_mode)
+    except FileNotFoundError:
+        mode = None
+
+    # New files get the usual default mode, 0o666 less the umask, which the
+    # kernel applies; reading the umask would briefly change it for every thread
+    fd, temp_path = _create_temp_file(directory, os.path.basename(target), 0o666 if mode is None else 0o600)
+    try:
+        if isinstance(text, bytes):
+            f = os.fdopen(fd, 'wb')
+        else:
+            f = os.fdopen(fd, 'w', encoding='utf-8')
+        with f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(temp_path, mode)
+    except BaseException:
+        _remove(temp_path)
+        raise
+    return target, temp_path
+
+
+def _create_temp_file(directory: str, name: str, mode: int) -> Tuple[int, str]:
+    """Create a uniquely named temporary file for a file in a directory, like tempfile.mkstemp but with a mode."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_CLOEXEC', 0)
+    for _ in range(tempfile.TMP_MAX):
+        temp_path = os.path.join(directory, f'.{name}.{os.urandom(6).hex()}.tmp')
+        try:
+            return os.open(temp_path, flags, mode), temp_path
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"No usable temporary file name for {name} in {directory}")
+
+
+def _remove(file_path: str) -> None:
+    """Remove a file if it still exists."""
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def _fsync_directory(directory: str) -> None:
+    """Sync a directory so that renames within it are durable, where the platform allows it."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        # Directories cannot be opened on some platforms, such as Windows
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
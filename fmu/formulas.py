@@ -0,0 +1,274 @@
+"""
+Compute formulas: literals, placeholders such as $frontmatter.title, and
+function calls such as =concat(/post/, $frontmatter.id).
+
+Formulas are compiled once into a tree of nodes and evaluated per file in an
+EvaluationContext. Updates, read --map and 'references' validation rules all
+evaluate formulas through this module.
+"""
+
+import functools
+import re
+from typing import Any, Dict, List, Optional
+from .functions import EvaluationContext, call_function
+
+
+def _resolve_placeholder(placeholder: str, file_path: str, frontmatter: Dict[str, Any], content: str) -> Any:
+    """
+    Resolve a placeholder reference or function call.
+    
+    Args:
+        placeholder: Placeholder string (e.g., "$filename", "$frontmatter.title", "$concat(...)")
+        file_path: Full path to the file
+        frontmatter: Frontmatter dictionary
+        content: Content string
+        
+    Returns:
+        Resolved value, or the placeholder itself if it cannot be resolved
+    """
+    return evaluate_formula(placeholder, file_path, frontmatter, content)
+
+
+def _parse_function_call(formula: str) -> tuple:
+    """
+    Parse a function call from a formula.
+    
+    Args:
+        formula: Formula string starting with '=' or '$'
+        
+    Returns:
+        Tuple of (function_name, parameters)
+    """
+    # Remove the leading '=' or '$'
+    if formula.startswith('=') or formula.startswith('$'):
+        formula = formula[1:].strip()
+    
+    # Parse function name and parameters
+    # Pattern: function_name(param1, param2, ...)
+    match = re.match(r'([a-zA-Z_][a-zA-Z0-9_]*)\((.*)\)$', formula)
+    if not match:
+        return None, []
+    
+    function_name = match.group(1)
+    params_str = match.group(2)
+    
+    # Parse parameters - handle quoted strings, nested commas, and nested parentheses
+    parameters = []
+    if params_str.strip():
+        # Parameter parsing - split by comma but respect quotes and nested parentheses
+        current_param = []
+        in_quotes = False
+        quote_char = None
+        paren_depth = 0
+        
+        for char in params_str:
+            if char in ('"', "'") and not in_quotes:
+                in_quotes = True
+                quote_char = char
+            elif char == quote_char and in_quotes:
+                in_quotes = False
+                quote_char = None
+            elif char == '(' and not in_quotes:
+                paren_depth += 1
+            elif char == ')' and not in_quotes:
+                paren_depth -= 1
+            elif char == ',' and not in_quotes and paren_depth == 0:
+                param = ''.join(current_param).strip()
+                if param:
+                    # Remove quotes if present
+                    if (param.startswith('"') and param.endswith('"')) or \
+                       (param.startswith("'") and param.endswith("'")):
+                        param = param[1:-1]
+                    parameters.append(param)
+                current_param = []
+                continue
+            
+            current_param.append(char)
+        
+        # Don't forget the last parameter
+        param = ''.join(current_param).strip()
+        if param:
+            # Remove quotes if present
+            if (param.startswith('"') and param.endswith('"')) or \
+               (param.startswith("'") and param.endswith("'")):
+                param = param[1:-1]
+            parameters.append(param)
+    
+    return function_name, parameters
+
+
+def _execute_function(
+    function_name: str,
+    parameters: List[Any],
+    context: Optional[EvaluationContext] = None
+) -> Any:
+    """
+    Execute a registered function.
+    
+    Args:
+        function_name: Name of the function to execute
+        parameters: List of parameters (already resolved)
+        context: Evaluation context of the run, if any
+        
+    Returns:
+        Result of function execution
+    """
+    return call_function(function_name, parameters, context)
+
+
+class LiteralNode:
+    """Compiled formula node for a literal value."""
+    
+    __slots__ = ('value',)
+    
+    def __init__(self, value: Any):
+        self.value = value
+    
+    def evaluate(self, context: EvaluationContext) -> Any:
+        return self.value
+
+
+class PlaceholderNode:
+    """
+    Compiled formula node for a placeholder such as $filename or $frontmatter.tags[0].
+    
+    The placeholder is taken apart once, when it is compiled. Evaluating it
+    returns the placeholder text itself if the field or index is missing.
+    """
+    
+    __slots__ = ('text', 'kind', 'field_name', 'index')
+    
+    def __init__(self, text: str, kind: str, field_name: Optional[str] = None, index: Optional[int] = None):
+        self.text = text
+        self.kind = kind
+        self.field_name = field_name
+        self.index = index
+    
+    def evaluate(self, context: EvaluationContext) -> Any:
+        kind = self.kind
+        if kind == 'frontmatter':
+            frontmatter = context.frontmatter
+            if self.field_name not in frontmatter:
+                return self.text
+            value = frontmatter[self.field_name]
+            if self.index is None:
+                return value
+            if isinstance(value, list) and self.index < len(value):
+                return value[self.index]
+            return self.text
+        elif kind == 'filename':
+            return context.filename
+        elif kind == 'filepath':
+            return context.file_path
+        elif kind == 'folderpath':
+            return context.folderpath
+        elif kind == 'foldername':
+            return context.foldername
+        else:
+            return context.content
+
+
+class FunctionNode:
+    """Compiled formula node for a function call; its arguments are compiled nodes."""
+    
+    __slots__ = ('function_name', 'arguments')
+    
+    def __init__(self, function_name: str, arguments: List[Any]):
+        self.function_name = function_name
+        self.arguments = arguments
+    
+    def evaluate(self, context: EvaluationContext) -> Any:
+        parameters = [argument.evaluate(context) for argument in self.arguments]
+        return call_function(self.function_name, parameters, context)
+
+
+# Placeholders that need no parsing, by the kind of PlaceholderNode they compile to
+_SIMPLE_PLACEHOLDERS = {
+    '$filename': 'filename',
+    '$filepath': 'filepath',
+    '$folderpath': 'folderpath',
+    '$foldername': 'foldername',
+    '$content': 'content',
+}
+
+_FRONTMATTER_PLACEHOLDER = re.compile(r'\$frontmatter\.([a-zA-Z_][a-zA-Z0-9_]*)(?:\[(\d+)\])?')
+
+
+def compile_formula(formula: Any):
+    """
+    Compile a compute formula into a tree of nodes that can be evaluated per file.
+    
+    Formula strings are compiled once and cached, so evaluating the same
+    formula for many files does not parse it again. Unknown functions are
+    only reported when the formula is evaluated.
+    
+    Args:
+        formula: Formula (literal, placeholder, or function); any value that is
+                 not a string is a literal
+        
+    Returns:
+        LiteralNode, PlaceholderNode or FunctionNode; call evaluate(context)
+        on it, with an EvaluationContext set to the file, for the value
+    """
+    if not isinstance(formula, str):
+        return LiteralNode(formula)
+    return _compile_formula_text(formula)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_formula_text(formula: str):
+    """Compile a formula string; see compile_formula."""
+    # Function call (starts with =, or with $ and contains parentheses)
+    if formula.startswith('=') or (formula.startswith('$') and '(' in formula):
+        function_name, parameters = _parse_function_call(formula)
+        if not function_name:
+            # Invalid function syntax, treat as literal
+            return LiteralNode(formula)
+        # Parameters may themselves be placeholders or nested function calls
+        return FunctionNode(function_name, [_compile_formula_text(param) for param in parameters])
+    
+    if formula.startswith('$'):
+        kind = _SIMPLE_PLACEHOLDERS.get(formula)
+        if kind:
+            return PlaceholderNode(formula, kind)
+        if formula.startswith('$frontmatter.'):
+            match = _FRONTMATTER_PLACEHOLDER.match(formula)
+            if match:
+                index = int(match.group(2)) if match.group(2) is not None else None
+                return PlaceholderNode(formula, 'frontmatter', match.group(1), index)
+    
+    # A literal, or a placeholder that never resolves
+    return LiteralNode(formula)
+
+
+def evaluate_formula(
+    formula: Any,
+    file_path: str,
+    frontmatter: Dict[str, Any],
+    content: str,
+    context: Optional[EvaluationContext] = None
+) -> Any:
+    """
+    Evaluate a compute formula.
+    
+    The formula is compiled once (see compile_formula) and the compiled form
+    is evaluated for this file.
+    
+    Args:
+        formula: Formula to evaluate (literal, placeholder, or function)
+                 Can be a string or any other type (bool, int, etc.)
+        file_path: Full path to the file
+        frontmatter: Frontmatter dictionary
+        content: Content string
+        context: Evaluation context of the run, switched to this file; pass the
+                 same context for every file of a run so they share one now()
+                 and its caches (default: a new context)
+        
+    Returns:
+        Evaluated result
+    """
+    if context is None:
+        context = EvaluationContext()
+    if context.file_path != file_path or context.frontmatter is not frontmatter or context.content is not content:
+        context.for_file(file_path, frontmatter, content)
+    return compile_formula(formula).evaluate(context)
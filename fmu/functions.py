@@ -0,0 +1,535 @@
+"""
+Registry of the functions available to compute formulas.
+
+Each function is registered under its name with the number of parameters it
+accepts and whether it is pure. A pure function always returns the same
+result for the same parameters, so its results are memoized for the run in
+the EvaluationContext: =hash($filepath, 8) is only computed once per
+distinct path.
+
+Further functions can be registered by a Python file given with --functions,
+or by an installed package through the 'fmu.functions' entry point group:
+
+    from fmu.functions import register_function
+
+    @register_function('slugify', min_args=1, max_args=1, pure=True)
+    def slugify(text):
+        return '-'.join(str(text).lower().split())
+"""
+
+import functools
+import hashlib
+import importlib.util
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Entry point group of packages that provide formula functions
+ENTRY_POINT_GROUP = 'fmu.functions'
+
+# Number of results memoized per pure function in a context
+MEMO_SIZE = 65536
+
+# Format of the timestamps returned by now()
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+# Placeholder patterns that should be skipped by coalesce when unresolved
+UNRESOLVED_PLACEHOLDER_PATTERNS = ['$frontmatter.', '$filename', '$filepath', '$content', '$folderpath', '$foldername']
+
+
+def parse_timestamp(text: str) -> str:
+    """
+    Normalize an ISO 8601 date or time to the format returned by now().
+
+    Times without an offset are taken to be UTC.
+
+    Args:
+        text: Date or time, such as 2024-05-01, 2024-05-01T12:00:00Z or
+              2024-05-01T14:00:00+02:00
+
+    Returns:
+        The UTC time formatted as YYYY-MM-DDTHH:MM:SSZ
+
+    Raises:
+        ValueError: If text is not an ISO 8601 date or time
+    """
+    value = text.strip()
+    if value.endswith(('Z', 'z')):
+        value = value[:-1] + '+00:00'
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid timestamp: {text}")
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+class EvaluationContext:
+    """
+    State shared by the formula evaluations of one run.
+
+    now() is frozen when the context is created, so every file of a run gets
+    the same timestamp. The context also holds the compiled regular
+    expressions and update operations, and the memoized results of pure
+    functions, for the run. Per file, set with for_file(), it holds the file
+    being evaluated and computes its path parts on first use.
+    """
+
+    def __init__(self, now: Optional[str] = None):
+        """
+        Args:
+            now: Timestamp returned by now(), as from parse_timestamp
+                 (default: the current UTC time)
+        """
+        self.now = now if now is not None else datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+        # Memoized pure functions, by FormulaFunction
+        self.memo: Dict[Any, Any] = {}
+        # Compiled update operations, by their parameters
+        self.operations: Dict[Any, Any] = {}
+        self._regexes: Dict[Any, Any] = {}
+        self.for_file('', {}, '')
+
+    def for_file(self, file_path: str, frontmatter: Dict[str, Any], content: str) -> 'EvaluationContext':
+        """
+        Switch the context to another file.
+
+        Args:
+            file_path: Full path to the file
+            frontmatter: Frontmatter dictionary; changes to it are seen by later evaluations
+            content: Content string
+
+        Returns:
+            The context itself
+        """
+        self.file_path = file_path
+        self.frontmatter = frontmatter
+        self.content = content
+        self._filename = None
+        self._folderpath = None
+        self._foldername = None
+        return self
+
+    @property
+    def filename(self) -> str:
+        """Base name of the file, as for $filename."""
+        if self._filename is None:
+            self._filename = os.path.basename(self.file_path)
+        return self._filename
+
+    @property
+    def folderpath(self) -> str:
+        """Path of the folder of the file, as for $folderpath."""
+        if self._folderpath is None:
+            self._folderpath = os.path.dirname(self.file_path)
+        return self._folderpath
+
+    @property
+    def foldername(self) -> str:
+        """Name of the folder of the file, as for $foldername."""
+        if self._foldername is None:
+            self._foldername = os.path.basename(self.folderpath)
+        return self._foldername
+
+    def regex(self, pattern: str, flags: int = 0):
+        """
+        Compile a regular expression once per run.
+
+        Raises:
+            re.error: If pattern is not a valid regular expression
+        """
+        key = (pattern, flags)
+        compiled = self._regexes.get(key)
+        if compiled is None:
+            compiled = self._regexes[key] = re.compile(pattern, flags)
+        return compiled
+
+    def memoized(self, function: 'FormulaFunction', parameters: List[Any]) -> Any:
+        """Call a pure function, reusing its result for parameters of the same values and types."""
+        cached = self.memo.get(function)
+        if cached is None:
+            cached = self.memo[function] = functools.lru_cache(maxsize=MEMO_SIZE, typed=True)(function.func)
+        try:
+            return cached(*parameters)
+        except TypeError:
+            # Lists and dictionaries cannot be memo keys; a TypeError raised
+            # by the function itself is raised again here
+            return function.func(*parameters)
+
+
+class FormulaFunction:
+    """A registered formula function, with its arity and purity."""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[..., Any],
+        min_args: int = 0,
+        max_args: Optional[int] = None,
+        pure: bool = False,
+        usage: Optional[str] = None,
+        needs_context: bool = False
+    ):
+        """
+        Args:
+            name: Name the function is called by in formulas
+            func: Callable taking the resolved parameters as positional arguments
+            min_args: Minimum number of parameters
+            max_args: Maximum number of parameters, or None for no limit
+            pure: Whether the result depends only on the parameters
+            usage: Description of the required parameters, used in the error
+                   raised when too few are given
+            needs_context: Whether func takes the EvaluationContext, or None,
+                           before the parameters
+        """
+        self.name = name
+        self.func = func
+        self.min_args = min_args
+        self.max_args = max_args
+        self.pure = pure
+        self.usage = usage
+        self.needs_context = needs_context
+
+    def __call__(self, parameters: List[Any], context: Optional[EvaluationContext] = None) -> Any:
+        """
+        Call the function with a list of resolved parameters.
+
+        Results of pure functions are memoized in the context, if one is given.
+
+        Raises:
+            ValueError: If the number of parameters is out of range
+        """
+        if len(parameters) < self.min_args:
+            if self.usage:
+                raise ValueError(f"{self.name}() requires {self.usage}")
+            raise ValueError(f"{self.name}() requires at least {self.min_args} parameter(s)")
+        if self.max_args is not None and len(parameters) > self.max_args:
+            raise ValueError(f"{self.name}() takes at most {self.max_args} parameter(s)")
+
+        if self.needs_context:
+            return self.func(context, *parameters)
+        if self.pure and context is not None:
+            return context.memoized(self, parameters)
+        return self.func(*parameters)
+
+
+_REGISTRY: Dict[str, FormulaFunction] = {}
+
+# Python files loaded with load_function_files, by real path
+_LOADED_FILES: Dict[str, str] = {}
+
+_entry_points_loaded = False
+
+
+def register_function(
+    name: str,
+    func: Optional[Callable[..., Any]] = None,
+    min_args: int = 0,
+    max_args: Optional[int] = None,
+    pure: bool = False,
+    usage: Optional[str] = None,
+    needs_context: bool = False
+):
+    """
+    Register a function for use in compute formulas.
+
+    Can be called directly, or used as a decorator by leaving out func.
+
+    Args:
+        name: Name the function is called by in formulas
+        func: Callable taking the resolved parameters as positional arguments
+        min_args: Minimum number of parameters
+        max_args: Maximum number of parameters, or None for no limit
+        pure: Whether the result depends only on the parameters; results of
+              pure functions are memoized for the run
+        usage: Description of the required parameters, for error messages
+        needs_context: Whether func takes the EvaluationContext of the run, or
+                       None outside of one, before the parameters
+
+    Returns:
+        func, or a decorator registering the function it decorates
+
+    Raises:
+        ValueError: If a function is already registered under name
+    """
+    def register(target: Callable[..., Any]) -> Callable[..., Any]:
+        if name in _REGISTRY:
+            raise ValueError(f"Function already registered: {name}")
+        _REGISTRY[name] = FormulaFunction(name, target, min_args, max_args, pure, usage, needs_context)
+        return target
+
+    if func is None:
+        return register
+    return register(func)
+
+
+def unregister_function(name: str) -> None:
+    """Remove a registered function; unknown names are ignored."""
+    _REGISTRY.pop(name, None)
+
+
+def get_function(name: str) -> Optional[FormulaFunction]:
+    """
+    Look up a registered function.
+
+    Functions of the 'fmu.functions' entry point group are loaded the first
+    time a name is not found among the registered functions.
+
+    Args:
+        name: Name of the function
+
+    Returns:
+        The registered function, or None if there is none by that name
+    """
+    function = _REGISTRY.get(name)
+    if function is None and not _entry_points_loaded:
+        load_entry_point_functions()
+        function = _REGISTRY.get(name)
+    return function
+
+
+def call_function(name: str, parameters: List[Any], context: Optional[EvaluationContext] = None) -> Any:
+    """
+    Call a registered function.
+
+    Args:
+        name: Name of the function
+        parameters: List of parameters (already resolved)
+        context: Evaluation context of the run, if any
+
+    Returns:
+        Result of the function
+
+    Raises:
+        ValueError: If there is no such function or its parameters are invalid
+    """
+    function = get_function(name)
+    if function is None:
+        raise ValueError(f"Unknown function: {name}")
+    return function(parameters, context)
+
+
+def load_function_files(file_paths: List[str]) -> None:
+    """
+    Load Python files that register formula functions.
+
+    Each file is run as a module once per process; loading it again is a no-op.
+
+    Args:
+        file_paths: Paths to the Python files
+
+    Raises:
+        ValueError: If a file cannot be loaded
+    """
+    for file_path in file_paths:
+        real_path = os.path.realpath(file_path)
+        if real_path in _LOADED_FILES:
+            continue
+        # The path hash keeps files with the same name in different directories apart in sys.modules
+        path_hash = hashlib.sha256(real_path.encode('utf-8')).hexdigest()[:12]
+        module_name = f"fmu_functions_{os.path.splitext(os.path.basename(real_path))[0]}_{path_hash}"
+        try:
+            spec = importlib.util.spec_from_file_location(module_name, real_path)
+            if spec is None or spec.loader is None:
+                raise ImportError("not a Python file")
+            module = importlib.util.module_from_spec(spec)
+            sys.modules[module_name] = module
+            spec.loader.exec_module(module)
+        except Exception as e:
+            sys.modules.pop(module_name, None)
+            raise ValueError(f"Cannot load functions from '{file_path}': {e}")
+        _LOADED_FILES[real_path] = file_path
+
+
+def loaded_function_files() -> List[str]:
+    """Return the paths of the Python files loaded so far, for worker processes to load."""
+    return list(_LOADED_FILES.values())
+
+
+def load_entry_point_functions() -> None:
+    """
+    Load the functions of installed packages, from the 'fmu.functions' entry point group.
+
+    An entry point may name a module, whose functions register themselves
+    when it is imported, or a callable, which is registered under the entry
+    point's name as an impure function of any arity.
+
+    Raises:
+        ValueError: If an entry point cannot be loaded
+    """
+    global _entry_points_loaded
+    _entry_points_loaded = True
+    for entry_point in _entry_points():
+        try:
+            loaded = entry_point.load()
+        except Exception as e:
+            raise ValueError(f"Cannot load functions from entry point '{entry_point.name}': {e}")
+        if callable(loaded) and entry_point.name not in _REGISTRY:
+            register_function(entry_point.name, loaded)
+
+
+def _entry_points() -> List[Any]:
+    """Return the entry points of ENTRY_POINT_GROUP, on any supported Python version."""
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8
+        return []
+    found = entry_points()
+    if hasattr(found, 'select'):
+        return list(found.select(group=ENTRY_POINT_GROUP))
+    return list(found.get(ENTRY_POINT_GROUP, []))
+
+
+def _is_unresolved_placeholder(value: str) -> bool:
+    """
+    Check if a string is an unresolved placeholder.
+
+    Unresolved placeholders are returned as-is by compiled formulas when
+    they cannot be resolved (e.g., non-existent frontmatter field).
+
+    Args:
+        value: String to check
+
+    Returns:
+        True if the string is an unresolved placeholder, False otherwise
+    """
+    return any(value.startswith(pattern) or value == pattern for pattern in UNRESOLVED_PLACEHOLDER_PATTERNS)
+
+
+def _to_int(value: Any, name: str) -> int:
+    """Convert a parameter to an integer, naming it in the error otherwise."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"{name} must be an integer")
+
+
+@register_function('now', needs_context=True)
+def _now(context: Optional[EvaluationContext], *_: Any) -> str:
+    # Return the time of the run in ISO 8601 format
+    if context is not None:
+        return context.now
+    return datetime.now(timezone.utc).strftime(TIMESTAMP_FORMAT)
+
+
+@register_function('list')
+def _list(*parameters: Any) -> List[Any]:
+    # Return an empty list
+    return []
+
+
+@register_function('hash', min_args=2, pure=True, usage="2 parameters: string and hash_length")
+def _hash(string_to_hash: Any, hash_length: Any, *_: Any) -> str:
+    # Create a deterministic hash using SHA256, trimmed to the requested length
+    hash_length = _to_int(hash_length, 'hash_length')
+    return hashlib.sha256(str(string_to_hash).encode('utf-8')).hexdigest()[:hash_length]
+
+
+@register_function('concat', pure=True)
+def _concat(*parameters: Any) -> str:
+    # Concatenate all parameters
+    return ''.join(str(param) for param in parameters)
+
+
+@register_function('slice', min_args=2, usage="at least 2 parameters: list and start")
+def _slice(input_list: Any, start: Any, *stop_and_step: Any) -> List[Any]:
+    # Slice a list with Python-like slicing semantics
+    if not isinstance(input_list, list):
+        raise ValueError("First parameter of slice() must be a list")
+    start = _to_int(start, 'start parameter')
+    stop = _to_int(stop_and_step[0], 'stop parameter') if len(stop_and_step) >= 1 else None
+    step = _to_int(stop_and_step[1], 'step parameter') if len(stop_and_step) >= 2 else None
+    return input_list[start:stop:step]
+
+
+@register_function('coalesce', pure=True)
+def _coalesce(*parameters: Any) -> Any:
+    # Return the first parameter that is not nil, not empty, not blank
+    for param in parameters:
+        if param is None:
+            continue
+        if isinstance(param, str):
+            # Skip unresolved placeholders and blank strings
+            if _is_unresolved_placeholder(param):
+                continue
+            if param.strip():
+                return param
+        elif isinstance(param, (list, dict)):
+            if param:
+                return param
+        else:
+            # Other types (numbers, booleans, etc.)
+            return param
+    return None
+
+
+@register_function('basename', min_args=1, pure=True, usage="1 parameter: file_path")
+def _basename(file_path: Any, *_: Any) -> str:
+    # Return the base name (without extension) of the file path
+    return os.path.splitext(os.path.basename(str(file_path)))[0]
+
+
+@register_function('ltrim', min_args=1, pure=True, usage="1 parameter: string")
+def _ltrim(string_to_trim: Any, *_: Any) -> str:
+    return str(string_to_trim).lstrip()
+
+
+@register_function('rtrim', min_args=1, pure=True, usage="1 parameter: string")
+def _rtrim(string_to_trim: Any, *_: Any) -> str:
+    return str(string_to_trim).rstrip()
+
+
+@register_function('trim', min_args=1, pure=True, usage="1 parameter: string")
+def _trim(string_to_trim: Any, *_: Any) -> str:
+    return str(string_to_trim).strip()
+
+
+@register_function('truncate', min_args=2, pure=True, usage="2 parameters: string and max_length")
+def _truncate(string_to_truncate: Any, max_length: Any, *_: Any) -> str:
+    # Truncate string to max_length
+    max_length = _to_int(max_length, 'max_length')
+    return str(string_to_truncate)[:max_length]
+
+
+@register_function('wtruncate', min_args=3, pure=True, usage="3 parameters: string, max_length, and suffix")
+def _wtruncate(string_to_truncate: Any, max_length: Any, suffix: Any, *_: Any) -> str:
+    # Truncate string to word boundary with suffix
+    string_to_truncate = str(string_to_truncate)
+    max_length = _to_int(max_length, 'max_length')
+    suffix = str(suffix)
+
+    if len(string_to_truncate) <= max_length:
+        return string_to_truncate
+
+    # Space left for the content once the suffix is added
+    available_space = max_length - len(suffix)
+    if available_space <= 0:
+        return suffix[:max_length]
+
+    truncated = string_to_truncate[:available_space]
+    # Cut at the last word boundary, if there is one
+    last_space = truncated.rfind(' ')
+    if last_space > 0:
+        truncated = truncated[:last_space]
+    return truncated + suffix
+
+
+@register_function('path', min_args=1, pure=True, usage="at least 1 parameter: path segments")
+def _path(*path_segments: Any) -> str:
+    # Form a path from the segments using the OS path separator
+    return os.path.join(*[str(segment) for segment in path_segments])
+
+
+@register_function('flat_list', min_args=1, usage="at least 1 parameter: elements")
+def _flat_list(*parameters: Any) -> List[Any]:
+    # Flatten the elements, expanding any nested lists
+    result = []
+    for param in parameters:
+        if isinstance(param, list):
+            result.extend(param)
+        else:
+            result.append(param)
+    return result
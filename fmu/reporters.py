@@ -0,0 +1,253 @@
+"""
+Streaming reporters for validation failures.
+
+Reporters receive failures one at a time as validation produces them, so
+output is written with bounded memory however many failures there are.
+"""
+
+import abc
+import csv
+import json
+import os
+import pathlib
+import re
+import shutil
+import tempfile
+from typing import Any, List, Optional
+from urllib.parse import quote
+from xml.sax.saxutils import escape, quoteattr
+from . import __version__
+
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+
+# Rule id reported for every SARIF result
+SARIF_RULE_ID = 'fmu/validate'
+
+# Characters that are not allowed in XML 1.0 documents
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+class ValidationReporter(abc.ABC):
+    """
+    Base class of validation reporters.
+
+    Subclasses implement report(), which is called once per failure in the
+    order failures are found, and close(), which completes the output.
+    Reporters can be used as context managers.
+    """
+
+    @abc.abstractmethod
+    def report(self, file_path: str, field_name: str, field_value: Any, failure_reason: str) -> None:
+        """
+        Report one validation failure.
+
+        Args:
+            file_path: Path of the file that failed validation
+            field_name: Name of the frontmatter field
+            field_value: Value of the field, or None if it is absent
+            failure_reason: Description of the failure
+        """
+
+    def close(self) -> None:
+        """Complete the output after the last failure."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ConsoleReporter(ValidationReporter):
+    """Print failures to stdout."""
+
+    def report(self, file_path: str, field_name: str, field_value: Any, failure_reason: str) -> None:
+        print(f"{file_path}:")
+        print(f"- \t{field_name}: {field_value} --> {failure_reason}")
+
+
+class CsvReporter(ValidationReporter):
+    """Write failures as rows of a CSV file."""
+
+    def __init__(self, csv_file: str):
+        """
+        Open the CSV file and write its header.
+
+        Args:
+            csv_file: Path to the CSV file
+        """
+        self._file = open(csv_file, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(['File Path', 'Front Matter Name', 'Front Matter Value', 'Failure Reason'])
+
+    def report(self, file_path: str, field_name: str, field_value: Any, failure_reason: str) -> None:
+        self._writer.writerow([file_path, field_name, field_value, failure_reason])
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JsonlReporter(ValidationReporter):
+    """Write each failure as a JSON object on its own line."""
+
+    def __init__(self, jsonl_file: str):
+        """
+        Open the JSON Lines file.
+
+        Args:
+            jsonl_file: Path to the JSON Lines file
+        """
+        self._file = open(jsonl_file, 'w', encoding='utf-8')
+
+    def report(self, file_path: str, field_name: str, field_value: Any, failure_reason: str) -> None:
+        record = {'file': file_path, 'field': field_name, 'value': field_value, 'reason': failure_reason}
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class JUnitReporter(ValidationReporter):
+    """
+    Write failures as a JUnit XML report, one failed test case per failure.
+
+    The suite header carries the failure count, which is only known at the
+    end, so test cases are spooled to a temporary file and copied after it.
+    """
+
+    def __init__(self, junit_file: str):
+        """
+        Open the JUnit XML file and the spool of test cases.
+
+        Args:
+            junit_file: Path to the JUnit XML file
+        """
+        self._file = open(junit_file, 'w', encoding='utf-8')
+        self._spool = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._count = 0
+
+    def report(self, file_path: str, field_name: str, field_value: Any, failure_reason: str) -> None:
+        self._count += 1
+        details = _xml_text(f"{field_name}: {field_value} --> {failure_reason}")
+        self._spool.write(
+            f'    <testcase classname={_xml_attr(file_path)} name={_xml_attr(field_name)}>\n'
+            f'      <failure message={_xml_attr(failure_reason)} type="validation">{escape(details)}</failure>\n'
+            f'    </testcase>\n'
+        )
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            self._file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            self._file.write(f'<testsuites name="fmu validate" tests="{self._count}" failures="{self._count}">\n')
+            self._file.write(
+                f'  <testsuite name="fmu validate" tests="{self._count}" failures="{self._count}" errors="0">\n'
+            )
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, self._file)
+            self._file.write('  </testsuite>\n</testsuites>\n')
+        finally:
+            self._spool.close()
+            self._file.close()
+
+
+class SarifReporter(ValidationReporter):
+    """Write failures as the results of a SARIF 2.1.0 log, streamed as they arrive."""
+
+    def __init__(self, sarif_file: str):
+        """
+        Open the SARIF file and write everything that precedes the results.
+
+        Args:
+            sarif_file: Path to the SARIF file
+        """
+        self._file = open(sarif_file, 'w', encoding='utf-8')
+        self._count = 0
+        driver = {
+            'name': 'fmu',
+            'version': __version__,
+            'informationUri': 'https://github.com/geraldnguyen/frontmatter-utils',
+            'rules': [{
+                'id': SARIF_RULE_ID,
+                'shortDescription': {'text': 'Frontmatter validation rule failed'}
+            }]
+        }
+        # Leave the results array open so results can be appended one at a time
+        self._file.write(
+            f'{{"version": "2.1.0", "$schema": {json.dumps(SARIF_SCHEMA)}, '
+            f'"runs": [{{"tool": {json.dumps({"driver": driver})}, "results": ['
+        )
+
+    def report(self, file_path: str, field_name: str, field_value: Any, failure_reason: str) -> None:
+        result = {
+            'ruleId': SARIF_RULE_ID,
+            'level': 'error',
+            'message': {'text': failure_reason},
+            'locations': [{'physicalLocation': {'artifactLocation': {'uri': _artifact_uri(file_path)}}}],
+            'properties': {'field': field_name, 'value': field_value}
+        }
+        separator = ',\n' if self._count else '\n'
+        self._file.write(separator + json.dumps(result, ensure_ascii=False, default=str))
+        self._count += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        try:
+            self._file.write('\n]}]}\n')
+        finally:
+            self._file.close()
+
+
+def create_reporters(
+    csv_file: Optional[str] = None,
+    jsonl_file: Optional[str] = None,
+    junit_file: Optional[str] = None,
+    sarif_file: Optional[str] = None
+) -> List[ValidationReporter]:
+    """
+    Create the reporters for the requested outputs.
+
+    Args:
+        csv_file: Optional path to a CSV file
+        jsonl_file: Optional path to a JSON Lines file
+        junit_file: Optional path to a JUnit XML file
+        sarif_file: Optional path to a SARIF file
+
+    Returns:
+        List of reporters; a console reporter if no output file is given
+    """
+    reporters: List[ValidationReporter] = []
+    try:
+        if csv_file:
+            reporters.append(CsvReporter(csv_file))
+        if jsonl_file:
+            reporters.append(JsonlReporter(jsonl_file))
+        if junit_file:
+            reporters.append(JUnitReporter(junit_file))
+        if sarif_file:
+            reporters.append(SarifReporter(sarif_file))
+    except OSError:
+        for reporter in reporters:
+            reporter.close()
+        raise
+    return reporters or [ConsoleReporter()]
+
+
+def _xml_text(text: str) -> str:
+    """Remove characters that cannot appear in an XML document."""
+    return _INVALID_XML_CHARS.sub('', text)
+
+
+def _xml_attr(value: str) -> str:
+    """Quote a value for use as an XML attribute."""
+    return quoteattr(_xml_text(str(value)), {'\n': '&#10;', '\r': '&#13;', '\t': '&#9;'})
+
+
+def _artifact_uri(file_path: str) -> str:
+    """Return the SARIF artifact URI of a file: relative paths stay relative."""
+    if os.path.isabs(file_path):
+        return pathlib.Path(file_path).as_uri()
+    return quote(file_path.replace(os.sep, '/'))
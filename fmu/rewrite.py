@@ -0,0 +1,152 @@
+"""
+Format-preserving frontmatter rewriting.
+
+Rather than re-dumping the whole header, only the top-level keys that
+changed are re-serialized and spliced into the original text, so comments,
+quoting and flow-style values of every other key stay byte-identical.
+"""
+
+import re
+import yaml
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+
+# Same delimiters as parse_frontmatter; group 1 is the header, without its last line break
+_FRONTMATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---\s*\n(.*)$', re.DOTALL)
+
+_STR_TAG = 'tag:yaml.org,2002:str'
+
+
+def splice_frontmatter(
+    original_content: str,
+    frontmatter_data: Dict[str, Any],
+    changed_fields: Iterable[str]
+) -> Optional[str]:
+    """
+    Rewrite only the changed top-level keys of a file's YAML frontmatter.
+
+    Each changed key that is still present is replaced in place by its newly
+    serialized value, a key that is no longer present is deleted, and a new
+    key is appended to the end of the header. Everything else is kept as it
+    was. The result is parsed again and only returned if it gives back
+    frontmatter_data, so a caller can fall back to a full re-dump otherwise.
+
+    Args:
+        original_content: Original text of the file
+        frontmatter_data: Updated frontmatter dictionary
+        changed_fields: Names of the top-level fields that changed
+
+    Returns:
+        New text of the file, or None if the header cannot be rewritten in place
+    """
+    match = _FRONTMATTER_PATTERN.match(original_content)
+    if not match:
+        return None
+
+    header_start = match.start(1)
+    # Include the header's last line break, so that every key span ends with one
+    header_end = match.end(1) + 1
+    header = original_content[header_start:header_end]
+    newline = '\r\n' if '\r\n' in header else '\n'
+
+    spans = _top_level_spans(header)
+    if spans is None:
+        return None
+
+    replacements = []
+    appended = []
+    for name in dict.fromkeys(changed_fields):
+        span = spans.get(name)
+        if name in frontmatter_data:
+            text = _dump_field(name, frontmatter_data[name], newline)
+            if span is None:
+                appended.append(text)
+            else:
+                replacements.append((span, text))
+        elif span is not None:
+            replacements.append((span, ''))
+
+    # Splice from the end of the header so earlier offsets stay valid
+    new_header = header
+    if appended:
+        if not new_header.endswith('\n'):
+            new_header += newline
+        new_header += ''.join(appended)
+    for (start, end), text in sorted(replacements, reverse=True):
+        new_header = new_header[:start] + text + new_header[end:]
+
+    if not new_header.endswith('\n'):
+        return None
+    new_content = original_content[:header_start] + new_header[:-1] + original_content[header_end - 1:]
+
+    # Verify the splice; anchors, aliases and unusual layouts can defeat it
+    new_match = _FRONTMATTER_PATTERN.match(new_content)
+    if not new_match or new_match.group(2) != match.group(2):
+        return None
+    try:
+        if yaml.safe_load(new_match.group(1)) != frontmatter_data:
+            return None
+    except yaml.YAMLError:
+        return None
+
+    return new_content
+
+
+def _top_level_spans(header: str) -> Optional[Dict[str, Tuple[int, int]]]:
+    """
+    Locate the text of each top-level key of a block mapping header.
+
+    A key's span runs from the start of its line to the end of the last line
+    of its value, leaving out the comments and blank lines that follow it.
+
+    Args:
+        header: Text of the frontmatter header
+
+    Returns:
+        Dictionary of key name to (start, end) offsets in header, or None if the
+        header is not a block mapping with unique, unindented string keys
+    """
+    try:
+        node = yaml.compose(header, Loader=yaml.SafeLoader)
+    except yaml.YAMLError:
+        return None
+    if not isinstance(node, yaml.MappingNode) or node.flow_style:
+        return None
+
+    spans = {}
+    for key_node, value_node in node.value:
+        if not isinstance(key_node, yaml.ScalarNode) or key_node.start_mark.column != 0:
+            return None
+        if key_node.tag != _STR_TAG:
+            # Keys such as 1 or true are not field names, and are never spliced
+            continue
+        if key_node.value in spans:
+            return None
+
+        start = key_node.start_mark.index
+        end = value_node.end_mark.index
+        if end == 0 or header[end - 1] != '\n':
+            line_end = header.find('\n', end)
+            end = len(header) if line_end == -1 else line_end + 1
+
+        # Trailing comments and blank lines belong with whatever follows
+        while True:
+            line_start = header.rfind('\n', start, end - 1) + 1
+            if line_start <= start:
+                break
+            line = header[line_start:end]
+            if line.strip() and not line.startswith('#'):
+                break
+            end = line_start
+
+        spans[key_node.value] = (start, end)
+
+    return spans
+
+
+def _dump_field(name: str, value: Any, newline: str) -> str:
+    """Serialize one top-level field the way a full re-dump of the header would."""
+    text = yaml.dump({name: value}, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    if newline != '\n':
+        text = text.replace('\n', newline)
+    return text
@@ -0,0 +1,354 @@
+"""
+JSON Schema subset validation for frontmatter.
+
+Schemas are compiled once into a tree of validator functions and applied to
+the frontmatter of each file. The supported keywords are:
+
+- type, enum, const
+- properties, required, additionalProperties, minProperties, maxProperties
+- items, minItems, maxItems, uniqueItems
+- minLength, maxLength, pattern
+- minimum, maximum, exclusiveMinimum, exclusiveMaximum, multipleOf
+- allOf, anyOf, oneOf, not
+- $ref to local definitions ('#/definitions/...' or '#/$defs/...')
+
+Other keywords (such as format, title or description) are ignored, as JSON
+Schema prescribes for unknown keywords. References are never fetched.
+"""
+
+import datetime
+import os
+import re
+import yaml
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+
+# A compiled validator takes a value and its path, and yields (path, value, reason) failures
+SchemaValidator = Callable[[Any, str], Iterator[Tuple[str, Any, str]]]
+
+# Compiled validators by absolute schema path, with the (mtime_ns, size) they were compiled from
+_VALIDATOR_CACHE: Dict[str, Tuple[Tuple[int, int], SchemaValidator]] = {}
+
+_TYPE_CHECKS = {
+    'string': lambda value: isinstance(value, (str, datetime.date)),
+    'number': lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    'integer': lambda value: (
+        (isinstance(value, int) and not isinstance(value, bool))
+        or (isinstance(value, float) and value.is_integer())
+    ),
+    'boolean': lambda value: isinstance(value, bool),
+    'array': lambda value: isinstance(value, list),
+    'object': lambda value: isinstance(value, dict),
+    'null': lambda value: value is None,
+}
+
+
+def load_schema_validator(schema_file: str) -> SchemaValidator:
+    """
+    Load and compile a schema file, reusing the compiled validator while the file is unchanged.
+
+    Args:
+        schema_file: Path to a YAML or JSON schema file
+
+    Returns:
+        Compiled validator
+
+    Raises:
+        ValueError: If the schema file is missing, unreadable or invalid
+    """
+    path = os.path.abspath(schema_file)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise ValueError(f"Schema file not found: {schema_file}")
+    stat_key = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _VALIDATOR_CACHE.get(path)
+    if cached is not None and cached[0] == stat_key:
+        return cached[1]
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            schema = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        raise ValueError(f"Invalid schema file {schema_file}: {e}")
+
+    validator = compile_schema(schema)
+    _VALIDATOR_CACHE[path] = (stat_key, validator)
+    return validator
+
+
+def compile_schema(schema: Any) -> SchemaValidator:
+    """
+    Compile a schema into a validator.
+
+    Args:
+        schema: Schema dictionary (or boolean schema)
+
+    Returns:
+        Validator yielding (path, value, reason) for each failure; the path of the
+        frontmatter itself is '' and nested paths look like 'author.name' or 'tags[0]'
+
+    Raises:
+        ValueError: If the schema is invalid or uses non-local references
+    """
+    return _SchemaCompiler(schema).compile(schema)
+
+
+def iter_schema_failures(validator: SchemaValidator, frontmatter: Dict[str, Any]) -> Iterator[Tuple[str, Any, str]]:
+    """
+    Apply a compiled schema to frontmatter.
+
+    Args:
+        validator: Validator returned by compile_schema or load_schema_validator
+        frontmatter: Frontmatter dictionary
+
+    Returns:
+        Iterator of (field_name, field_value, failure_reason); failures of the
+        frontmatter as a whole are reported with the field name 'frontmatter'
+    """
+    for path, value, reason in validator(frontmatter, ''):
+        yield (path or 'frontmatter', value, reason)
+
+
+def _child_path(path: str, key: str) -> str:
+    return f"{path}.{key}" if path else key
+
+
+def _label(path: str) -> str:
+    return f"Field '{path}'" if path else "Frontmatter"
+
+
+def _as_text(value: Any) -> Any:
+    """Dates parsed from YAML are validated as the strings they were written as."""
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def _freeze(value: Any) -> Any:
+    """Return a hashable form of a value for enum and uniqueness checks."""
+    value = _as_text(value)
+    if isinstance(value, list):
+        return ('list', tuple(_freeze(item) for item in value))
+    if isinstance(value, dict):
+        return ('dict', tuple(sorted((str(k), _freeze(v)) for k, v in value.items())))
+    if isinstance(value, bool):
+        return ('bool', value)
+    return value
+
+
+class _SchemaCompiler:
+    """Compile one schema document, resolving local references lazily."""
+
+    def __init__(self, root: Any):
+        self.root = root
+        self.refs: Dict[str, SchemaValidator] = {}
+
+    def compile(self, schema: Any) -> SchemaValidator:
+        if schema is True or schema == {}:
+            return lambda value, path: iter(())
+        if schema is False:
+            return lambda value, path: iter([(path, value, f"{_label(path)} is not allowed by schema")])
+        if not isinstance(schema, dict):
+            raise ValueError(f"Invalid schema: expected an object, got {schema!r}")
+
+        checks: List[SchemaValidator] = []
+        if '$ref' in schema:
+            checks.append(self._ref(schema['$ref']))
+        if 'type' in schema:
+            checks.append(self._type(schema['type']))
+        if 'enum' in schema:
+            checks.append(self._enum(schema['enum']))
+        if 'const' in schema:
+            checks.append(self._const(schema['const']))
+        self._string_checks(schema, checks)
+        self._number_checks(schema, checks)
+        self._array_checks(schema, checks)
+        self._object_checks(schema, checks)
+        self._combinators(schema, checks)
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            for check in checks:
+                yield from check(value, path)
+        return validate
+
+    def _ref(self, ref: str) -> SchemaValidator:
+        match = re.match(r'^#/(definitions|\$defs)/([^/]+)$', ref)
+        if not match:
+            raise ValueError(f"Unsupported $ref '{ref}': only '#/definitions/NAME' and '#/$defs/NAME' are supported")
+        definitions = self.root.get(match.group(1)) if isinstance(self.root, dict) else None
+        if not isinstance(definitions, dict) or match.group(2) not in definitions:
+            raise ValueError(f"Unresolved $ref '{ref}'")
+
+        if ref not in self.refs:
+            # Register before compiling so recursive references resolve to this entry
+            self.refs[ref] = None
+            self.refs[ref] = self.compile(definitions[match.group(2)])
+        refs = self.refs
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            return refs[ref](value, path)
+        return validate
+
+    def _type(self, type_spec: Any) -> SchemaValidator:
+        types = type_spec if isinstance(type_spec, list) else [type_spec]
+        unknown = [t for t in types if t not in _TYPE_CHECKS]
+        if unknown:
+            raise ValueError(f"Invalid schema: unknown type '{unknown[0]}'")
+        type_checks = [_TYPE_CHECKS[t] for t in types]
+        expected = ' or '.join(types)
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            if not any(check(value) for check in type_checks):
+                yield (path, value, f"{_label(path)} value '{_as_text(value)}' is not of type '{expected}'")
+        return validate
+
+    def _enum(self, options: List[Any]) -> SchemaValidator:
+        if not isinstance(options, list):
+            raise ValueError("Invalid schema: 'enum' must be an array")
+        allowed = {_freeze(option) for option in options}
+        listed = ', '.join(f"'{option}'" for option in options)
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            if _freeze(value) not in allowed:
+                yield (path, value, f"{_label(path)} value '{_as_text(value)}' is not one of {listed}")
+        return validate
+
+    def _const(self, const: Any) -> SchemaValidator:
+        expected = _freeze(const)
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            if _freeze(value) != expected:
+                yield (path, value, f"{_label(path)} value '{_as_text(value)}' does not equal '{const}'")
+        return validate
+
+    def _string_checks(self, schema: Dict[str, Any], checks: List[SchemaValidator]) -> None:
+        min_length = schema.get('minLength')
+        max_length = schema.get('maxLength')
+        pattern = schema.get('pattern')
+        if min_length is None and max_length is None and pattern is None:
+            return
+        compiled = None
+        if pattern is not None:
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid regex pattern '{pattern}' in schema: {e}")
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            if not _TYPE_CHECKS['string'](value):
+                return
+            text = _as_text(value)
+            if min_length is not None and len(text) < min_length:
+                yield (path, value, f"{_label(path)} value '{text}' is shorter than {min_length} characters")
+            if max_length is not None and len(text) > max_length:
+                yield (path, value, f"{_label(path)} value '{text}' is longer than {max_length} characters")
+            if compiled is not None and not compiled.search(text):
+                yield (path, value, f"{_label(path)} value '{text}' does not match pattern '{pattern}'")
+        checks.append(validate)
+
+    def _number_checks(self, schema: Dict[str, Any], checks: List[SchemaValidator]) -> None:
+        bounds = [
+            (schema.get('minimum'), lambda v, b: v < b, "is less than"),
+            (schema.get('maximum'), lambda v, b: v > b, "is greater than"),
+            (schema.get('exclusiveMinimum'), lambda v, b: v <= b, "is not greater than"),
+            (schema.get('exclusiveMaximum'), lambda v, b: v >= b, "is not less than"),
+            (schema.get('multipleOf'), lambda v, b: (v / b) % 1 != 0, "is not a multiple of"),
+        ]
+        bounds = [bound for bound in bounds if bound[0] is not None]
+        if not bounds:
+            return
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            if not _TYPE_CHECKS['number'](value):
+                return
+            for bound, fails, message in bounds:
+                if fails(value, bound):
+                    yield (path, value, f"{_label(path)} value '{value}' {message} {bound}")
+        checks.append(validate)
+
+    def _array_checks(self, schema: Dict[str, Any], checks: List[SchemaValidator]) -> None:
+        items = self.compile(schema['items']) if 'items' in schema else None
+        min_items = schema.get('minItems')
+        max_items = schema.get('maxItems')
+        unique_items = schema.get('uniqueItems', False)
+        if items is None and min_items is None and max_items is None and not unique_items:
+            return
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                yield (path, value, f"{_label(path)} array has {len(value)} items but should have at least {min_items} items")
+            if max_items is not None and len(value) > max_items:
+                yield (path, value, f"{_label(path)} array has {len(value)} items but should have at most {max_items} items")
+            if unique_items and len({_freeze(item) for item in value}) != len(value):
+                yield (path, value, f"{_label(path)} array has duplicate items")
+            if items is not None:
+                for i, item in enumerate(value):
+                    yield from items(item, f"{path}[{i}]")
+        checks.append(validate)
+
+    def _object_checks(self, schema: Dict[str, Any], checks: List[SchemaValidator]) -> None:
+        properties = {name: self.compile(sub) for name, sub in (schema.get('properties') or {}).items()}
+        required = schema.get('required') or []
+        additional = schema.get('additionalProperties', True)
+        additional_validator = self.compile(additional) if isinstance(additional, dict) else None
+        min_properties = schema.get('minProperties')
+        max_properties = schema.get('maxProperties')
+        if (not properties and not required and additional is True
+                and min_properties is None and max_properties is None):
+            return
+
+        def validate(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+            if not isinstance(value, dict):
+                return
+            for name in required:
+                if name not in value:
+                    yield (_child_path(path, name), None, f"Field '{_child_path(path, name)}' is required")
+            if min_properties is not None and len(value) < min_properties:
+                yield (path, value, f"{_label(path)} has {len(value)} fields but should have at least {min_properties}")
+            if max_properties is not None and len(value) > max_properties:
+                yield (path, value, f"{_label(path)} has {len(value)} fields but should have at most {max_properties}")
+            for name, item in value.items():
+                child = _child_path(path, str(name))
+                if name in properties:
+                    yield from properties[name](item, child)
+                elif additional is False:
+                    yield (child, item, f"Field '{child}' is not allowed by schema")
+                elif additional_validator is not None:
+                    yield from additional_validator(item, child)
+        checks.append(validate)
+
+    def _combinators(self, schema: Dict[str, Any], checks: List[SchemaValidator]) -> None:
+        for sub in schema.get('allOf') or []:
+            checks.append(self.compile(sub))
+
+        if 'anyOf' in schema:
+            options = [self.compile(sub) for sub in schema['anyOf']]
+
+            def any_of(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+                if not any(next(option(value, path), None) is None for option in options):
+                    yield (path, value, f"{_label(path)} value '{_as_text(value)}' does not match any of the allowed schemas")
+            checks.append(any_of)
+
+        if 'oneOf' in schema:
+            one_of_options = [self.compile(sub) for sub in schema['oneOf']]
+
+            def one_of(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+                matches = sum(1 for option in one_of_options if next(option(value, path), None) is None)
+                if matches != 1:
+                    yield (path, value, f"{_label(path)} value '{_as_text(value)}' matches {matches} of the allowed schemas but should match exactly one")
+            checks.append(one_of)
+
+        if 'not' in schema:
+            negated = self.compile(schema['not'])
+
+            def not_(value: Any, path: str) -> Iterator[Tuple[str, Any, str]]:
+                if next(negated(value, path), None) is None:
+                    yield (path, value, f"{_label(path)} value '{_as_text(value)}' matches a disallowed schema")
+            checks.append(not_)
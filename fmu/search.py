@@ -5,37 +5,170 @@ Search functionality for frontmatter in files.
 import csv
 import os
 import re
-from typing import List, Dict, Any, Optional, Tuple
-from .core import parse_file, get_files_from_patterns
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from .core import parse_file, iter_files_from_patterns, FrontmatterKeys
+from .trigram import TrigramIndex, required_literal
+from .duplicates import DuplicateCollector, DEFAULT_MEMORY_BUDGET
+import yaml
+
+
+# Field name reported for matches found by a content-only search
+CONTENT_FIELD_NAME = '$content'
+
+# Literals that YAML writes as they are, unless escaped: no whitespace, which
+# line folding could turn into a line break, and no quotes
+_SAFE_LITERAL = re.compile(r'[\w.\-/+:@%]+', re.ASCII)
+
+
+class WhereClause:
+    """
+    A condition on one frontmatter field, as given to update --where:
+
+    - NAME: the field exists
+    - NAME=VALUE: the field equals VALUE, or is a list with an item equal to it
+    - NAME~REGEX: the field, or an item of it, matches REGEX
+
+    Fields and values are matched as search_frontmatter matches them. Before
+    a header is parsed, may_match rules out the files whose raw header text
+    does not even contain the literal field name or value.
+    """
+
+    def __init__(self, expression: str, ignore_case: bool = False):
+        """
+        Args:
+            expression: NAME, NAME=VALUE or NAME~REGEX
+            ignore_case: Whether to match field names and values case-insensitively
+
+        Raises:
+            ValueError: If the field name is missing or the regex is invalid
+        """
+        match = re.match(r'([^=~]*)(?:([=~])(.*))?$', expression, re.DOTALL)
+        name, operator, value = match.groups()
+        if not name:
+            raise ValueError(f"Invalid --where expression '{expression}': expected NAME, NAME=VALUE or NAME~REGEX")
+        self.expression = expression
+        self.name = name
+        self.value = value
+        self.ignore_case = ignore_case
+        self.pattern = None
+        if operator == '~':
+            try:
+                self.pattern = re.compile(value, re.IGNORECASE if ignore_case else 0)
+            except re.error as e:
+                raise ValueError(f"Invalid --where regex '{value}': {e}")
+        
+        # Literals every matching header contains, unless it uses escape sequences
+        literals = [name]
+        if operator == '=':
+            literals.append(value)
+        self._literals = [
+            literal.casefold() if ignore_case else literal
+            for literal in literals if literal and _is_safe_literal(literal)
+        ]
+
+    def may_match(self, header: Optional[str]) -> bool:
+        """
+        Check whether a raw frontmatter header can satisfy the condition.
+
+        Args:
+            header: Unparsed frontmatter text, as from extract_header
+
+        Returns:
+            False only if no frontmatter with this text can match
+        """
+        if header is None:
+            return False
+        if not self._literals or '\\' in header:
+            return True
+        text = header.casefold() if self.ignore_case else header
+        return all(literal in text for literal in self._literals)
+
+    def matches(self, frontmatter: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether parsed frontmatter satisfies the condition.
+
+        Args:
+            frontmatter: Parsed frontmatter dictionary
+
+        Returns:
+            True if a field with the name exists and, with a value or regex, matches it
+        """
+        if not isinstance(frontmatter, dict):
+            return False
+        for key in FrontmatterKeys(frontmatter).find_all(self.name, self.ignore_case):
+            if self.value is None or _value_matches(frontmatter[key], self.value, self.ignore_case, self.pattern):
+                return True
+        return False
+
+
+def _is_safe_literal(text: str) -> bool:
+    """Check that a string can only appear in YAML as itself, so its absence from a header rules the header out."""
+    if not _SAFE_LITERAL.fullmatch(text):
+        return False
+    # Values are matched by their str(): 'None' matches null, '1e+30' matches 1.0e+30
+    if text in ('None', 'True', 'False'):
+        return False
+    try:
+        float(text)
+        return False
+    except ValueError:
+        pass
+    try:
+        # Plain scalars such as 'true', '12' or '2024-05-01' are loaded as other types
+        return yaml.safe_load(text) == text
+    except yaml.YAMLError:
+        return False
 
 
 def search_frontmatter(
     patterns: List[str],
-    name: str,
+    name: Optional[str],
     value: Optional[str] = None,
     ignore_case: bool = False,
     regex: bool = False,
-    format_type: str = "yaml"
+    format_type: str = "yaml",
+    content: Optional[str] = None,
+    content_regex: Optional[str] = None,
+    index_path: Optional[str] = None,
+    limit: Optional[int] = None
 ) -> List[Tuple[str, str, Any]]:
     """
     Search for frontmatter in files matching glob patterns.
     
     Args:
         patterns: List of glob patterns or file paths
-        name: Name of the frontmatter field to search for
+        name: Name of the frontmatter field to search for (None to search content only)
         value: Optional value to match (if None, just check for field presence)
         ignore_case: Whether to perform case-insensitive matching
         regex: Whether to use regex pattern matching for values
         format_type: The format of the frontmatter
+        content: Optional phrase the content body must contain
+        content_regex: Optional regex the content body must match
+        index_path: Optional path to an on-disk trigram index used to narrow
+                    the files whose content is checked (created if missing)
+        limit: Optional maximum number of results. Files are discovered and
+               parsed lazily in sorted path order, so the search stops as soon
+               as the limit is reached and returns the first matches.
         
     Returns:
-        List of tuples (file_path, field_name, field_value)
+        List of tuples (file_path, field_name, field_value). Content-only
+        searches report the matched text under the field name '$content'.
+        
+    Raises:
+        ValueError: If both content and content_regex are given
     """
     results = []
-    files = get_files_from_patterns(patterns)
+    files = iter_files_from_patterns(patterns)
+    
+    content_matcher, literal = _compile_content_matcher(content, content_regex, ignore_case)
     
-    # Prepare search terms for case-insensitive comparison if needed
-    search_name = name.lower() if ignore_case else name
+    # Narrow content searches to the files whose indexed trigrams cover the query
+    index = None
+    candidates = None
+    if content_matcher and index_path:
+        index = TrigramIndex.load(index_path)
+        if literal:
+            candidates = index.candidates(literal)
     
     # Compile regex pattern if regex mode is enabled
     regex_pattern = None
@@ -48,31 +181,158 @@ def search_frontmatter(
             regex_pattern = None
     
     for file_path in files:
+        if limit is not None and len(results) >= limit:
+            break
         try:
-            frontmatter, _ = parse_file(file_path, format_type)
-            if frontmatter is None:
+            if candidates is not None and file_path not in candidates and index.is_fresh(file_path):
+                # Indexed, unchanged and missing a required trigram
+                continue
+            
+            frontmatter, body = parse_file(file_path, format_type)
+            
+            if index is not None and not index.is_fresh(file_path):
+                index.add(file_path, body)
+            
+            if content_matcher:
+                content_match = content_matcher(body)
+                if content_match is None:
+                    continue
+                if name is None:
+                    results.append((file_path, CONTENT_FIELD_NAME, content_match))
+                    continue
+            
+            if frontmatter is None or name is None:
                 continue
                 
-            # Search through frontmatter fields
-            for fm_name, fm_value in frontmatter.items():
-                # Check if field name matches
-                check_name = fm_name.lower() if ignore_case else fm_name
-                if check_name == search_name:
-                    # If no value specified, just match the field name
-                    if value is None:
+            # Look up the matching frontmatter fields
+            for fm_name in FrontmatterKeys(frontmatter).find_all(name, ignore_case):
+                fm_value = frontmatter[fm_name]
+                # If no value specified, just match the field name
+                if value is None:
+                    results.append((file_path, fm_name, fm_value))
+                else:
+                    # Check if value matches (supports arrays and regex)
+                    if _value_matches(fm_value, value, ignore_case, regex_pattern):
                         results.append((file_path, fm_name, fm_value))
-                    else:
-                        # Check if value matches (supports arrays and regex)
-                        if _value_matches(fm_value, value, ignore_case, regex_pattern):
-                            results.append((file_path, fm_name, fm_value))
                             
         except (FileNotFoundError, ValueError, UnicodeDecodeError):
             # Skip files that can't be processed
             continue
+    
+    if limit is not None:
+        # A single file can match more than once with ignore_case
+        del results[limit:]
+    
+    if index is not None and index.dirty:
+        try:
+            index.save(index_path)
+        except OSError:
+            # The index is only an accelerator; a failed save must not fail the search
+            pass
             
     return results
 
 
+def search_duplicates(
+    patterns: List[str],
+    name: str,
+    ignore_case: bool = False,
+    format_type: str = "yaml",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET
+) -> List[Tuple[str, str, Any]]:
+    """
+    Find every file that shares a value of a frontmatter field with another file.
+    
+    Values are compared as strings and each item of an array field counts as a
+    value. Files are read in a single pass; when more than memory_budget values
+    are held, sorted runs are spilled to disk and merged at the end.
+    
+    Args:
+        patterns: List of glob patterns or file paths
+        name: Name of the frontmatter field to check
+        ignore_case: Whether to match the field name and values case-insensitively
+        format_type: The format of the frontmatter
+        memory_budget: Maximum number of values held in memory
+        
+    Returns:
+        List of tuples (file_path, field_name, duplicated_value), grouped by value
+        in sorted value order and by file path within each value
+    """
+    collector = DuplicateCollector(ignore_case, memory_budget)
+    
+    for file_path in iter_files_from_patterns(patterns):
+        try:
+            frontmatter, _ = parse_file(file_path, format_type)
+        except (FileNotFoundError, ValueError, UnicodeDecodeError):
+            # Skip files that can't be processed
+            continue
+        
+        keys = FrontmatterKeys(frontmatter)
+        for fm_name in keys.find_all(name, ignore_case):
+            collector.add(file_path, fm_name, frontmatter[fm_name])
+    
+    results = []
+    for _, entries in collector.duplicates():
+        results.extend(entries)
+    return results
+
+
+def _compile_content_matcher(
+    content: Optional[str],
+    content_regex: Optional[str],
+    ignore_case: bool
+) -> Tuple[Optional[Callable[[str], Optional[str]]], Optional[str]]:
+    """
+    Build a function that checks a content body against the content filter.
+    
+    Args:
+        content: Phrase the content must contain
+        content_regex: Regex the content must match (falls back to literal
+                       matching if the regex is invalid)
+        ignore_case: Whether to perform case-insensitive matching
+        
+    Returns:
+        Tuple (matcher, literal): a function returning the matched text or None,
+        or None if no content filter is set, and a string every matching body
+        contains (up to case), used to look up the trigram index, or None
+        
+    Raises:
+        ValueError: If both content and content_regex are given
+    """
+    if content is not None and content_regex is not None:
+        raise ValueError("content and content_regex cannot be combined")
+    
+    if content_regex is not None:
+        flags = re.IGNORECASE if ignore_case else 0
+        try:
+            pattern = re.compile(content_regex, flags)
+        except re.error:
+            # If regex is invalid, fall back to literal matching
+            content = content_regex
+        else:
+            def match_regex(body: str) -> Optional[str]:
+                match = pattern.search(body)
+                return match.group(0) if match else None
+            return match_regex, required_literal(content_regex)
+    
+    if content is None:
+        return None, None
+    
+    if ignore_case:
+        # Searching the body itself returns the text as written, even where
+        # lowercasing would change its length
+        phrase_pattern = re.compile(re.escape(content), re.IGNORECASE)
+        
+        def match_phrase_ignore_case(body: str) -> Optional[str]:
+            match = phrase_pattern.search(body)
+            return match.group(0) if match else None
+        return match_phrase_ignore_case, content
+    
+    def match_phrase(body: str) -> Optional[str]:
+        return content if content in body else None
+    return match_phrase, content
+
+
 def _value_matches(fm_value: Any, search_value: str, ignore_case: bool, regex_pattern: Optional[re.Pattern]) -> bool:
     """
     Check if a frontmatter value matches the search criteria.
@@ -151,13 +411,19 @@ def output_search_results(
 
 def search_and_output(
     patterns: List[str],
-    name: str,
+    name: Optional[str],
     value: Optional[str] = None,
     ignore_case: bool = False,
     regex: bool = False,
     csv_file: Optional[str] = None,
-    format_type: str = "yaml"
-) -> None:
+    format_type: str = "yaml",
+    content: Optional[str] = None,
+    content_regex: Optional[str] = None,
+    index_path: Optional[str] = None,
+    limit: Optional[int] = None,
+    duplicates: Optional[str] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET
+) -> int:
     """
     Search for frontmatter and output results.
     
@@ -169,6 +435,23 @@ def search_and_output(
         regex: Whether to use regex pattern matching for values
         csv_file: Optional path to CSV file for output
         format_type: The format of the frontmatter
+        content: Optional phrase the content body must contain
+        content_regex: Optional regex the content body must match
+        index_path: Optional path to an on-disk trigram index for content searches
+        limit: Optional maximum number of results
+        duplicates: Optional field name; if set, report files sharing a value of
+                    this field instead of running a regular search
+        memory_budget: Maximum number of values held in memory by a duplicates search
+        
+    Returns:
+        Number of search results
     """
-    results = search_frontmatter(patterns, name, value, ignore_case, regex, format_type)
-    output_search_results(results, csv_file)
\ No newline at end of file
+    if duplicates is not None:
+        results = search_duplicates(patterns, duplicates, ignore_case, format_type, memory_budget)
+    else:
+        results = search_frontmatter(
+            patterns, name, value, ignore_case, regex, format_type,
+            content=content, content_regex=content_regex, index_path=index_path, limit=limit
+        )
+    output_search_results(results, csv_file)
+    return len(results)
\ No newline at end of file
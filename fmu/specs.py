@@ -8,6 +8,9 @@ import re
 import yaml
 import time
 from typing import Dict, Any, List, Tuple
+from .stats import DEFAULT_PRECISION
+from .duplicates import DEFAULT_MEMORY_BUDGET
+from .fileio import DEFAULT_DURABILITY, DEFAULT_WRITE_QUEUE
 
 
 def save_specs_file(
@@ -22,7 +25,7 @@ def save_specs_file(
     
     Args:
         specs_file: Path to the specs file
-        command: Command name (read, search, validate, update)
+        command: Command name (read, search, validate, update, stats)
         description: Short description of the command
         patterns: List of glob patterns or file paths
         options: Dictionary of command options
@@ -87,6 +90,15 @@ def convert_read_args_to_options(args) -> Dict[str, Any]:
     
     if hasattr(args, 'compact') and args.compact:
         options['compact'] = True
+    
+    if hasattr(args, 'functions') and args.functions:
+        options['functions'] = args.functions
+    
+    if hasattr(args, 'now') and args.now:
+        options['now'] = args.now
+    
+    if hasattr(args, 'write_queue') and args.write_queue is not None and args.write_queue != DEFAULT_WRITE_QUEUE:
+        options['write_queue'] = args.write_queue
         
     return options
 
@@ -95,12 +107,18 @@ def convert_search_args_to_options(args) -> Dict[str, Any]:
     """Convert search command arguments to options dictionary."""
     options = {}
     
-    if hasattr(args, 'name'):
+    if hasattr(args, 'name') and args.name is not None:
         options['name'] = args.name
     
     if hasattr(args, 'value') and args.value:
         options['value'] = args.value
     
+    if hasattr(args, 'content') and args.content is not None:
+        options['content'] = args.content
+    
+    if hasattr(args, 'content_regex') and args.content_regex is not None:
+        options['content_regex'] = args.content_regex
+    
     if hasattr(args, 'ignore_case') and args.ignore_case:
         options['ignore_case'] = True
     
@@ -109,6 +127,24 @@ def convert_search_args_to_options(args) -> Dict[str, Any]:
         
     if hasattr(args, 'csv_file') and args.csv_file:
         options['csv'] = args.csv_file
+    
+    if hasattr(args, 'index') and args.index:
+        options['index'] = args.index
+    
+    if hasattr(args, 'limit') and args.limit:
+        options['limit'] = args.limit
+    
+    if hasattr(args, 'first') and args.first:
+        options['first'] = True
+    
+    if hasattr(args, 'exists') and args.exists:
+        options['exists'] = True
+    
+    if hasattr(args, 'duplicates') and args.duplicates:
+        options['duplicates'] = args.duplicates
+    
+    if hasattr(args, 'memory_budget') and args.memory_budget and args.memory_budget != DEFAULT_MEMORY_BUDGET:
+        options['memory_budget'] = args.memory_budget
         
     return options
 
@@ -163,19 +199,176 @@ def convert_validate_args_to_options(args) -> Dict[str, Any]:
         for field, min_str, max_str in args.list_size:
             options['list_size'].extend([field, min_str, max_str])
     
+    if hasattr(args, 'unique') and args.unique:
+        options['unique'] = args.unique
+    
+    if hasattr(args, 'in_vocab') and args.in_vocab:
+        options['in_vocab'] = []
+        for field, vocab_file in args.in_vocab:
+            options['in_vocab'].extend([field, vocab_file])
+    
+    if hasattr(args, 'not_in_vocab') and args.not_in_vocab:
+        options['not_in_vocab'] = []
+        for field, vocab_file in args.not_in_vocab:
+            options['not_in_vocab'].extend([field, vocab_file])
+    
+    if hasattr(args, 'schema') and args.schema:
+        options['schema'] = args.schema
+    
+    if hasattr(args, 'references') and args.references:
+        options['references'] = [list(reference) for reference in args.references]
+    
     if hasattr(args, 'ignore_case') and args.ignore_case:
         options['ignore_case'] = True
         
     if hasattr(args, 'csv_file') and args.csv_file:
         options['csv'] = args.csv_file
+    
+    if hasattr(args, 'memory_budget') and args.memory_budget and args.memory_budget != DEFAULT_MEMORY_BUDGET:
+        options['memory_budget'] = args.memory_budget
+    
+    if hasattr(args, 'max_failures') and args.max_failures:
+        options['max_failures'] = args.max_failures
+    
+    if hasattr(args, 'fail_fast') and args.fail_fast:
+        options['fail_fast'] = True
+    
+    if hasattr(args, 'max_failures_per_file') and args.max_failures_per_file:
+        options['max_failures_per_file'] = args.max_failures_per_file
+    
+    if hasattr(args, 'jsonl_file') and args.jsonl_file:
+        options['jsonl'] = args.jsonl_file
+    
+    if hasattr(args, 'junit_file') and args.junit_file:
+        options['junit'] = args.junit_file
+    
+    if hasattr(args, 'sarif_file') and args.sarif_file:
+        options['sarif'] = args.sarif_file
+    
+    if hasattr(args, 'vocab_report') and args.vocab_report:
+        options['vocab_report'] = args.vocab_report
+    
+    if hasattr(args, 'cache_file') and args.cache_file:
+        options['cache_file'] = args.cache_file
+    
+    if hasattr(args, 'no_cache') and args.no_cache:
+        options['no_cache'] = True
         
     return options
 
 
+# Update options given per --name group -> whether repeated values accumulate
+UPDATE_GROUP_OPTIONS = {
+    'case': False,
+    'compute': True,
+    'replace': True,
+    'remove': True,
+    'deduplication': False,
+    'ignore_case': False,
+    'regex': False,
+}
+
+
+def split_update_args(args) -> List[Any]:
+    """
+    Split update arguments into one arguments object per --name group.
+    
+    The CLI records update options in command line order in
+    args.update_sequence as (dest, value) pairs. Each option belongs to the
+    nearest --name before it; options before the first --name belong to the
+    first group. Arguments without a recorded order form a single group.
+    
+    Args:
+        args: Update command arguments
+        
+    Returns:
+        List of arguments objects, each with a name and that group's options
+    """
+    sequence = getattr(args, 'update_sequence', None)
+    if not sequence:
+        return [args]
+    
+    groups = []
+    leading = []
+    for dest, value in sequence:
+        if dest == 'name':
+            group = {'name': value, 'case': None, 'compute': None, 'replace': None, 'remove': None,
+                     'deduplication': 'true', 'ignore_case': False, 'regex': False}
+            groups.append(group)
+            if len(groups) == 1:
+                for leading_dest, leading_value in leading:
+                    _set_update_option(group, leading_dest, leading_value)
+        elif groups:
+            _set_update_option(groups[-1], dest, value)
+        else:
+            leading.append((dest, value))
+    
+    if not groups:
+        return [args]
+    return [type('Args', (), group)() for group in groups]
+
+
+def _set_update_option(group: Dict[str, Any], dest: str, value: Any) -> None:
+    """Set or accumulate an update option of a --name group."""
+    if UPDATE_GROUP_OPTIONS.get(dest):
+        group[dest] = (group[dest] or []) + [value]
+    else:
+        group[dest] = value
+
+
+def _update_sequence_from_specs(updates: List[Dict[str, Any]]) -> List[Tuple[str, Any]]:
+    """Convert the 'updates' groups of a specs entry to a recorded update option sequence."""
+    sequence = []
+    for update in updates:
+        sequence.append(('name', update.get('name', '')))
+        if update.get('case'):
+            sequence.append(('case', update['case']))
+        for formula in update.get('compute') or []:
+            sequence.append(('compute', formula))
+        for pair in _parse_update_pairs_from_array(update.get('replace', [])) or []:
+            sequence.append(('replace', list(pair)))
+        for remove_val in update.get('remove') or []:
+            sequence.append(('remove', remove_val))
+        if 'deduplication' in update:
+            sequence.append(('deduplication', update['deduplication']))
+        if update.get('ignore_case'):
+            sequence.append(('ignore_case', True))
+        if update.get('regex'):
+            sequence.append(('regex', True))
+    return sequence
+
+
 def convert_update_args_to_options(args) -> Dict[str, Any]:
     """Convert update command arguments to options dictionary."""
     options = {}
     
+    if hasattr(args, 'durability') and args.durability and args.durability != DEFAULT_DURABILITY:
+        options['durability'] = args.durability
+    if hasattr(args, 'jobs') and args.jobs and args.jobs != 1:
+        options['jobs'] = args.jobs
+    if hasattr(args, 'transactional') and args.transactional:
+        options['transactional'] = True
+    if hasattr(args, 'journal_file') and args.journal_file:
+        options['journal'] = args.journal_file
+    if hasattr(args, 'disk_budget') and args.disk_budget:
+        options['disk_budget'] = args.disk_budget
+    if hasattr(args, 'functions') and args.functions:
+        options['functions'] = args.functions
+    if hasattr(args, 'now') and args.now:
+        options['now'] = args.now
+    if hasattr(args, 'write_queue') and args.write_queue is not None and args.write_queue != DEFAULT_WRITE_QUEUE:
+        options['write_queue'] = args.write_queue
+    if hasattr(args, 'where') and args.where:
+        options['where'] = args.where
+    if hasattr(args, 'where_ignore_case') and args.where_ignore_case:
+        options['where_ignore_case'] = True
+    
+    groups = split_update_args(args)
+    if len(groups) > 1:
+        options['updates'] = [convert_update_args_to_options(group) for group in groups]
+        return options
+    args = groups[0]
+    
     if hasattr(args, 'name'):
         options['name'] = args.name
     
@@ -206,6 +399,28 @@ def convert_update_args_to_options(args) -> Dict[str, Any]:
     return options
 
 
+def convert_stats_args_to_options(args) -> Dict[str, Any]:
+    """Convert stats command arguments to options dictionary."""
+    options = {}
+    
+    if hasattr(args, 'cardinality') and args.cardinality:
+        options['cardinality'] = args.cardinality
+    
+    if hasattr(args, 'ignore_case') and args.ignore_case:
+        options['ignore_case'] = True
+    
+    if hasattr(args, 'precision') and args.precision and args.precision != DEFAULT_PRECISION:
+        options['precision'] = args.precision
+    
+    if hasattr(args, 'sketch_out') and args.sketch_out:
+        options['sketch_out'] = args.sketch_out
+    
+    if hasattr(args, 'merge_sketches') and args.merge_sketches:
+        options['merge_sketches'] = args.merge_sketches
+        
+    return options
+
+
 def load_specs_file(specs_file: str) -> Dict[str, Any]:
     """
     Load specs from a YAML specs file.
@@ -298,6 +513,22 @@ def format_command_text(command_entry: Dict[str, Any]) -> str:
             parts.append(f"--name {format_value(value)}")
         elif key == 'value':
             parts.append(f"--value {format_value(value)}")
+        elif key == 'content':
+            parts.append(f"--content {format_value(value)}")
+        elif key == 'content_regex':
+            parts.append(f"--content-regex {format_value(value)}")
+        elif key == 'index':
+            parts.append(f"--index {format_value(value)}")
+        elif key == 'limit':
+            parts.append(f"--limit {value}")
+        elif key == 'first' and value:
+            parts.append("--first")
+        elif key == 'exists' and value:
+            parts.append("--exists")
+        elif key == 'duplicates':
+            parts.append(f"--duplicates {format_value(value)}")
+        elif key == 'memory_budget':
+            parts.append(f"--memory-budget {value}")
         elif key == 'ignore_case' and value:
             parts.append("--ignore-case")
         elif key == 'regex' and value:
@@ -350,6 +581,39 @@ def format_command_text(command_entry: Dict[str, Any]) -> str:
                 if i + 2 < len(value):
                     field, min_val, max_val = value[i], value[i + 1], value[i + 2]
                     parts.append(f"--list-size {format_value(field)} {min_val} {max_val}")
+        elif key == 'max_failures':
+            parts.append(f"--max-failures {value}")
+        elif key == 'fail_fast' and value:
+            parts.append("--fail-fast")
+        elif key == 'max_failures_per_file':
+            parts.append(f"--max-failures-per-file {value}")
+        elif key == 'jsonl':
+            parts.append(f"--jsonl {format_value(value)}")
+        elif key == 'junit':
+            parts.append(f"--junit {format_value(value)}")
+        elif key == 'sarif':
+            parts.append(f"--sarif {format_value(value)}")
+        elif key in ('in_vocab', 'not_in_vocab') and isinstance(value, list):
+            option = '--' + key.replace('_', '-')
+            for i in range(0, len(value), 2):
+                if i + 1 < len(value):
+                    field, vocab_file = value[i], value[i + 1]
+                    parts.append(f"{option} {format_value(field)} {format_value(vocab_file)}")
+        elif key == 'vocab_report':
+            parts.append(f"--vocab-report {format_value(value)}")
+        elif key == 'cache_file':
+            parts.append(f"--cache-file {format_value(value)}")
+        elif key == 'no_cache' and value:
+            parts.append("--no-cache")
+        elif key == 'schema' and isinstance(value, list):
+            for schema_file in value:
+                parts.append(f"--schema {format_value(schema_file)}")
+        elif key == 'references' and isinstance(value, list):
+            for reference in value:
+                parts.append("--references " + ' '.join(format_value(item) for item in reference))
+        elif key == 'unique' and isinstance(value, list):
+            for field in value:
+                parts.append(f"--unique {format_value(field)}")
         elif key == 'case':
             parts.append(f"--case {format_value(value)}")
         elif key == 'compute' and isinstance(value, list):
@@ -370,6 +634,41 @@ def format_command_text(command_entry: Dict[str, Any]) -> str:
                     parts.append(f"--remove {format_value(remove_val)}")
         elif key == 'deduplication' and value != 'true':
             parts.append(f"--deduplication {value}")
+        elif key == 'durability':
+            parts.append(f"--durability {value}")
+        elif key == 'jobs':
+            parts.append(f"--jobs {value}")
+        elif key == 'transactional' and value:
+            parts.append("--transactional")
+        elif key == 'journal':
+            parts.append(f"--journal {format_value(value)}")
+        elif key == 'disk_budget':
+            parts.append(f"--disk-budget {value}")
+        elif key == 'functions' and isinstance(value, list):
+            for function_file in value:
+                parts.append(f"--functions {format_value(function_file)}")
+        elif key == 'now':
+            parts.append(f"--now {format_value(str(value))}")
+        elif key == 'write_queue':
+            parts.append(f"--write-queue {value}")
+        elif key == 'where' and isinstance(value, list):
+            for expression in value:
+                parts.append(f"--where {format_value(expression)}")
+        elif key == 'where_ignore_case' and value:
+            parts.append("--where-ignore-case")
+        elif key == 'updates' and isinstance(value, list):
+            # Each group is formatted like a single-field update, starting with its --name
+            for update in value:
+                group_text = format_command_text({'command': 'update', 'name': update.get('name', ''), **update})
+                parts.append(group_text[len('fmu update '):])
+        elif key == 'cardinality' and isinstance(value, list):
+            parts.append("--cardinality " + ' '.join(format_value(field) for field in value))
+        elif key == 'precision':
+            parts.append(f"--precision {value}")
+        elif key == 'sketch_out':
+            parts.append(f"--sketch-out {format_value(value)}")
+        elif key == 'merge_sketches' and isinstance(value, list):
+            parts.append("--merge-sketches " + ' '.join(format_value(path) for path in value))
     
     return ' '.join(parts)
 
@@ -402,15 +701,26 @@ def convert_specs_to_args(command_entry: Dict[str, Any]):
             'individual': command_entry.get('individual', False),
             'map': command_entry.get('map'),
             'pretty': command_entry.get('pretty', False),
-            'compact': command_entry.get('compact', False)
+            'compact': command_entry.get('compact', False),
+            'functions': command_entry.get('functions'),
+            'now': command_entry.get('now'),
+            'write_queue': command_entry.get('write_queue', DEFAULT_WRITE_QUEUE)
         })
     elif command == 'search':
         args_dict.update({
-            'name': command_entry.get('name', ''),
+            'name': command_entry.get('name'),
             'value': command_entry.get('value'),
             'ignore_case': command_entry.get('ignore_case', False),
             'regex': command_entry.get('regex', False),
-            'csv_file': command_entry.get('csv')
+            'csv_file': command_entry.get('csv'),
+            'content': command_entry.get('content'),
+            'content_regex': command_entry.get('content_regex'),
+            'index': command_entry.get('index'),
+            'limit': command_entry.get('limit'),
+            'first': command_entry.get('first', False),
+            'exists': command_entry.get('exists', False),
+            'duplicates': command_entry.get('duplicates'),
+            'memory_budget': command_entry.get('memory_budget', DEFAULT_MEMORY_BUDGET)
         })
     elif command == 'validate':
         args_dict.update({
@@ -424,8 +734,23 @@ def convert_specs_to_args(command_entry: Dict[str, Any]):
             'not_match': _parse_validation_pairs_from_array(command_entry.get('not_match', [])),
             'not_empty': command_entry.get('not_empty'),
             'list_size': _parse_list_size_triplets_from_array(command_entry.get('list_size', [])),
+            'in_vocab': _parse_validation_pairs_from_array(command_entry.get('in_vocab', [])),
+            'not_in_vocab': _parse_validation_pairs_from_array(command_entry.get('not_in_vocab', [])),
+            'unique': command_entry.get('unique'),
+            'references': command_entry.get('references'),
+            'schema': command_entry.get('schema'),
             'ignore_case': command_entry.get('ignore_case', False),
-            'csv_file': command_entry.get('csv')
+            'csv_file': command_entry.get('csv'),
+            'memory_budget': command_entry.get('memory_budget', DEFAULT_MEMORY_BUDGET),
+            'max_failures': command_entry.get('max_failures'),
+            'fail_fast': command_entry.get('fail_fast', False),
+            'max_failures_per_file': command_entry.get('max_failures_per_file'),
+            'cache_file': command_entry.get('cache_file'),
+            'no_cache': command_entry.get('no_cache', False),
+            'jsonl_file': command_entry.get('jsonl'),
+            'junit_file': command_entry.get('junit'),
+            'sarif_file': command_entry.get('sarif'),
+            'vocab_report': command_entry.get('vocab_report')
         })
     elif command == 'update':
         args_dict.update({
@@ -436,7 +761,28 @@ def convert_specs_to_args(command_entry: Dict[str, Any]):
             'remove': command_entry.get('remove'),
             'deduplication': command_entry.get('deduplication', 'true'),
             'ignore_case': command_entry.get('ignore_case', False),
-            'regex': command_entry.get('regex', False)
+            'regex': command_entry.get('regex', False),
+            'durability': command_entry.get('durability', DEFAULT_DURABILITY),
+            'jobs': command_entry.get('jobs', 1),
+            'transactional': command_entry.get('transactional', False),
+            'journal_file': command_entry.get('journal'),
+            'disk_budget': command_entry.get('disk_budget'),
+            'functions': command_entry.get('functions'),
+            'now': command_entry.get('now'),
+            'write_queue': command_entry.get('write_queue', DEFAULT_WRITE_QUEUE),
+            'where': command_entry.get('where'),
+            'where_ignore_case': command_entry.get('where_ignore_case', False)
+        })
+        if command_entry.get('updates'):
+            args_dict['name'] = command_entry['updates'][0].get('name', '')
+            args_dict['update_sequence'] = _update_sequence_from_specs(command_entry['updates'])
+    elif command == 'stats':
+        args_dict.update({
+            'cardinality': command_entry.get('cardinality'),
+            'ignore_case': command_entry.get('ignore_case', False),
+            'precision': command_entry.get('precision', DEFAULT_PRECISION),
+            'sketch_out': command_entry.get('sketch_out'),
+            'merge_sketches': command_entry.get('merge_sketches')
         })
     
     # Convert to object
@@ -519,7 +865,7 @@ def execute_command(command_entry: Dict[str, Any]) -> int:
         Exit code (0 for success, non-zero for failure)
     """
     try:
-        from .cli import cmd_read, cmd_search, cmd_validate, cmd_update, _parse_validation_args, _parse_update_args
+        from .cli import cmd_read, cmd_search, cmd_validate, cmd_update, cmd_stats, _parse_validation_args, _parse_update_args
         
         command = command_entry.get('command')
         args = convert_specs_to_args(command_entry)
@@ -536,20 +882,30 @@ def execute_command(command_entry: Dict[str, Any]) -> int:
                 individual=args.individual,
                 map_items=args.map,
                 pretty=args.pretty,
-                compact=args.compact
+                compact=args.compact,
+                function_files=args.functions,
+                now=args.now,
+                write_queue=args.write_queue
             )
             return 0
         elif command == 'search':
-            cmd_search(
+            return cmd_search(
                 patterns=args.patterns,
                 name=args.name,
                 value=args.value,
                 ignore_case=args.ignore_case,
                 regex=args.regex,
                 csv_file=args.csv_file,
-                format_type=args.format
+                format_type=args.format,
+                content=args.content,
+                content_regex=args.content_regex,
+                index_file=args.index,
+                limit=args.limit,
+                first=args.first,
+                exists=args.exists,
+                duplicates=args.duplicates,
+                memory_budget=args.memory_budget
             )
-            return 0
         elif command == 'validate':
             validations = _parse_validation_args(args)
             exit_code = cmd_validate(
@@ -557,19 +913,55 @@ def execute_command(command_entry: Dict[str, Any]) -> int:
                 validations=validations,
                 ignore_case=args.ignore_case,
                 csv_file=args.csv_file,
-                format_type=args.format
+                format_type=args.format,
+                memory_budget=args.memory_budget,
+                max_failures=1 if args.fail_fast else args.max_failures,
+                max_failures_per_file=args.max_failures_per_file,
+                cache_file=None if args.no_cache else args.cache_file,
+                jsonl_file=args.jsonl_file,
+                junit_file=args.junit_file,
+                sarif_file=args.sarif_file,
+                vocab_report=args.vocab_report
             )
             return exit_code
         elif command == 'update':
-            operations = _parse_update_args(args)
+            updates = [
+                {
+                    'name': group.name,
+                    'operations': _parse_update_args(group),
+                    'deduplication': group.deduplication == 'true'
+                }
+                for group in split_update_args(args)
+            ]
             cmd_update(
                 patterns=args.patterns,
-                frontmatter_name=args.name,
-                operations=operations,
-                deduplication=(args.deduplication == 'true'),
-                format_type=args.format
+                frontmatter_name=updates[0]['name'],
+                operations=updates[0]['operations'],
+                deduplication=updates[0]['deduplication'],
+                format_type=args.format,
+                updates=updates,
+                durability=args.durability,
+                jobs=args.jobs,
+                transactional=args.transactional,
+                journal_file=args.journal_file,
+                disk_budget=args.disk_budget,
+                function_files=args.functions,
+                now=args.now,
+                write_queue=args.write_queue,
+                where=args.where,
+                where_ignore_case=args.where_ignore_case
             )
             return 0
+        elif command == 'stats':
+            return cmd_stats(
+                patterns=args.patterns,
+                cardinality=args.cardinality,
+                ignore_case=args.ignore_case,
+                precision=args.precision,
+                sketch_out=args.sketch_out,
+                merge_sketch_files=args.merge_sketches,
+                format_type=args.format
+            )
         else:
             print(f"Unknown command: {command}")
             return 1
@@ -590,7 +982,7 @@ def _create_empty_stats():
         'total_commands': 0,
         'executed_commands': 0,
         'failed_commands': 0,
-        'command_counts': {'read': 0, 'search': 0, 'validate': 0, 'update': 0},
+        'command_counts': {'read': 0, 'search': 0, 'validate': 0, 'update': 0, 'stats': 0},
         'total_elapsed_time': 0,
         'total_execution_time': 0,
         'average_execution_time': 0,
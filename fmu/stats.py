@@ -0,0 +1,225 @@
+"""
+Corpus statistics for frontmatter fields.
+"""
+
+import base64
+import hashlib
+import json
+import math
+import zlib
+from typing import List, Dict, Any
+from .core import parse_file, iter_files_from_patterns, FrontmatterKeys
+
+
+# Sketch file layout version, checked when merging sketches
+SKETCH_FILE_VERSION = 1
+
+# Default HyperLogLog precision: 2**14 registers, ~0.8% standard error, 16 KiB per field
+DEFAULT_PRECISION = 14
+MIN_PRECISION = 4
+MAX_PRECISION = 18
+
+
+class HyperLogLog:
+    """
+    HyperLogLog sketch estimating the number of distinct values in a stream.
+
+    Values are hashed to 64 bits; the first `precision` bits select a register
+    and the register keeps the longest run of leading zeros seen in the rest.
+    Memory is fixed at 2**precision bytes regardless of how many values are
+    added, and two sketches with the same precision merge by taking the
+    register-wise maximum.
+    """
+
+    def __init__(self, precision: int = DEFAULT_PRECISION):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision must be between {MIN_PRECISION} and {MAX_PRECISION}")
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+        # Number of values added (not distinct), reported alongside the estimate
+        self.total = 0
+
+    def add(self, value: str) -> None:
+        """Add a value to the sketch."""
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        suffix_bits = 64 - self.precision
+        index = hashed >> suffix_bits
+        suffix = hashed & ((1 << suffix_bits) - 1)
+        rank = suffix_bits - suffix.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+        self.total += 1
+
+    def merge(self, other: 'HyperLogLog') -> None:
+        """Merge another sketch into this one."""
+        if other.precision != self.precision:
+            raise ValueError(
+                f"Cannot merge sketches with different precision ({self.precision} and {other.precision})"
+            )
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        self.total += other.total
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added."""
+        m = len(self.registers)
+        if m >= 128:
+            alpha = 0.7213 / (1 + 1.079 / m)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[m]
+
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            # Small range correction: linear counting is more accurate here
+            estimate = m * math.log(m / zeros)
+        # 64-bit hashes make the large range correction unnecessary
+        return int(round(estimate))
+
+    @property
+    def standard_error(self) -> float:
+        """Relative standard error of the estimate (1.04 / sqrt(registers))."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the sketch to a JSON-compatible dictionary."""
+        return {
+            'precision': self.precision,
+            'total': self.total,
+            'registers': base64.b64encode(zlib.compress(bytes(self.registers))).decode('ascii')
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'HyperLogLog':
+        """Deserialize a sketch produced by to_dict."""
+        sketch = cls(data['precision'])
+        registers = zlib.decompress(base64.b64decode(data['registers']))
+        if len(registers) != len(sketch.registers):
+            raise ValueError("Corrupt sketch: register count does not match precision")
+        sketch.registers = bytearray(registers)
+        sketch.total = data.get('total', 0)
+        return sketch
+
+
+def cardinality_frontmatter(
+    patterns: List[str],
+    fields: List[str],
+    ignore_case: bool = False,
+    format_type: str = "yaml",
+    precision: int = DEFAULT_PRECISION
+) -> Dict[str, HyperLogLog]:
+    """
+    Estimate the number of distinct values of frontmatter fields.
+
+    Each item of an array field is counted as a separate value. Files that
+    cannot be parsed are skipped.
+
+    Args:
+        patterns: List of glob patterns or file paths
+        fields: Names of the frontmatter fields to count
+        ignore_case: Whether to match field names and values case-insensitively
+        format_type: The format of the frontmatter
+        precision: HyperLogLog precision (registers = 2**precision)
+
+    Returns:
+        Dictionary mapping each field name to its sketch
+    """
+    sketches = {field: HyperLogLog(precision) for field in fields}
+
+    # Files are discovered as they are read, so no list of paths grows with the corpus
+    for file_path in iter_files_from_patterns(patterns):
+        try:
+            frontmatter, _ = parse_file(file_path, format_type)
+        except (FileNotFoundError, ValueError, UnicodeDecodeError):
+            continue
+
+        keys = FrontmatterKeys(frontmatter)
+        for field, sketch in sketches.items():
+            value = keys.get(field, ignore_case)
+            if value is None:
+                continue
+            for item in (value if isinstance(value, list) else [value]):
+                item_str = str(item)
+                sketch.add(item_str.casefold() if ignore_case else item_str)
+
+    return sketches
+
+
+def save_sketches(sketch_file: str, sketches: Dict[str, HyperLogLog]) -> None:
+    """
+    Save sketches to a JSON file so they can be merged later.
+
+    Args:
+        sketch_file: Path to the sketch file
+        sketches: Dictionary mapping field names to sketches
+    """
+    data = {
+        'version': SKETCH_FILE_VERSION,
+        'sketches': {field: sketch.to_dict() for field, sketch in sketches.items()}
+    }
+    with open(sketch_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+def load_sketches(sketch_file: str) -> Dict[str, HyperLogLog]:
+    """
+    Load sketches saved by save_sketches.
+
+    Args:
+        sketch_file: Path to the sketch file
+
+    Returns:
+        Dictionary mapping field names to sketches
+
+    Raises:
+        FileNotFoundError: If the sketch file doesn't exist
+        ValueError: If the sketch file is invalid
+    """
+    try:
+        with open(sketch_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Sketch file not found: {sketch_file}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid sketch file {sketch_file}: {e}")
+
+    if not isinstance(data, dict) or data.get('version') != SKETCH_FILE_VERSION:
+        raise ValueError(f"Invalid sketch file {sketch_file}: unsupported format")
+
+    try:
+        return {field: HyperLogLog.from_dict(sketch) for field, sketch in data['sketches'].items()}
+    except (KeyError, TypeError, zlib.error, ValueError) as e:
+        raise ValueError(f"Invalid sketch file {sketch_file}: {e}")
+
+
+def merge_sketches(target: Dict[str, HyperLogLog], source: Dict[str, HyperLogLog]) -> None:
+    """
+    Merge sketches field by field into a target dictionary.
+
+    Args:
+        target: Dictionary of sketches to merge into (modified in place)
+        source: Dictionary of sketches to merge from
+    """
+    for field, sketch in source.items():
+        if field in target:
+            target[field].merge(sketch)
+        else:
+            merged = HyperLogLog(sketch.precision)
+            merged.merge(sketch)
+            target[field] = merged
+
+
+def output_cardinality_results(sketches: Dict[str, HyperLogLog]) -> None:
+    """
+    Print the cardinality estimate of each field with its error bounds.
+
+    Args:
+        sketches: Dictionary mapping field names to sketches
+    """
+    for field, sketch in sketches.items():
+        estimate = sketch.count()
+        error = sketch.standard_error
+        low = int(estimate * (1 - 2 * error))
+        high = int(math.ceil(estimate * (1 + 2 * error)))
+        print(f"{field}: ~{estimate:,} distinct values ({sketch.total:,} values counted)")
+        print(f"- standard error: ±{error:.2%}; 95% range: {low:,} - {high:,}")
@@ -0,0 +1,230 @@
+"""
+Transactional updates with a journal and compressed backups.
+
+A transaction stages the new content of every file as a temporary file next
+to it. Only when every file has been staged are the originals backed up to
+a tar.gz archive and a journal written; the staged files then replace the
+originals with renames. A journal can later be rolled back, restoring every
+original from the archive.
+
+The journal is a JSON Lines file: a header naming the backup archive, one
+line per file (its path, staged temporary file and archive member), and a
+final status line once the transaction is committed or rolled back.
+"""
+
+import datetime
+import json
+import os
+import tarfile
+from typing import List, Optional, Tuple
+from .fileio import AtomicWriter, DEFAULT_DURABILITY, stage_file, _remove
+
+
+# Default directory of journals, relative to the working directory; one of
+# core.STATE_DIRS, so updating the working directory does not collect them
+JOURNAL_DIR = '.fmu-journal'
+
+JOURNAL_VERSION = 1
+
+# Compression level of backup archives: close to the best ratio, at a fraction of the time of 9
+_BACKUP_COMPRESSLEVEL = 6
+
+
+def default_journal_file() -> str:
+    """Return a new journal path in JOURNAL_DIR, named after the current time."""
+    timestamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+    return os.path.join(JOURNAL_DIR, f'update-{timestamp}.jsonl')
+
+
+def backup_file_for(journal_file: str) -> str:
+    """Return the path of the backup archive of a journal."""
+    return journal_file + '.tar.gz'
+
+
+class StagingWriter:
+    """
+    Writer that stages new file contents instead of replacing the files.
+
+    It has the same write() method as AtomicWriter, so it can stand in for
+    one; the staged files are then handed to a Transaction.
+    """
+
+    def __init__(self):
+        self.staged: List[Tuple[str, str]] = []
+
+    def write(self, file_path: str, text: str) -> None:
+        """
+        Stage the new content of a file.
+
+        Args:
+            file_path: Path to the file
+            text: New content, written as UTF-8 text
+        """
+        self.staged.append(stage_file(file_path, text))
+
+
+class Transaction:
+    """Commit staged files together, backing up the originals first."""
+
+    def __init__(
+        self,
+        journal_file: str,
+        disk_budget: Optional[int] = None,
+        durability: str = DEFAULT_DURABILITY
+    ):
+        """
+        Args:
+            journal_file: Path of the journal to write on commit; the backup
+                          archive is written next to it
+            disk_budget: Optional limit, in bytes, on the staged files and the
+                         backup archive together
+            durability: 'none' leaves syncing to the operating system; otherwise
+                        the backup and journal are synced before any file is
+                        replaced, and the replaced files once at the end
+        """
+        # Check the durability level up front, before anything is staged
+        AtomicWriter(durability)
+        self.journal_file = journal_file
+        self.backup_file = backup_file_for(journal_file)
+        self.disk_budget = disk_budget
+        self.durability = durability
+        self.staged: List[Tuple[str, str]] = []
+        self._staged_bytes = 0
+
+    def add(self, staged: List[Tuple[str, str]]) -> None:
+        """
+        Add the staged files of one file update.
+
+        Args:
+            staged: List of (target path, temporary file path), as from StagingWriter
+
+        Raises:
+            OSError: If the staged files exceed the disk budget; they are removed
+        """
+        size = sum(os.path.getsize(temp_path) for _, temp_path in staged)
+        if self.disk_budget is not None and self._staged_bytes + size > self.disk_budget:
+            for _, temp_path in staged:
+                _remove(temp_path)
+            raise OSError(f"Disk budget of {self.disk_budget} bytes exceeded")
+        self._staged_bytes += size
+        self.staged.extend(staged)
+
+    def discard(self) -> None:
+        """Remove every staged file, leaving the originals untouched."""
+        for _, temp_path in self.staged:
+            _remove(temp_path)
+        self.staged = []
+
+    def commit(self) -> None:
+        """
+        Back up the originals, write the journal and replace the files.
+
+        If the backup cannot be written, or exceeds the disk budget, the
+        staged files are discarded and no file is changed. If replacing the
+        files fails part way, the files already replaced are rolled back.
+
+        Raises:
+            OSError: If the transaction could not be committed
+        """
+        try:
+            self._write_backup()
+            self._write_journal()
+        except BaseException:
+            self.discard()
+            _remove(self.backup_file)
+            _remove(self.journal_file)
+            raise
+
+        try:
+            for target, temp_path in self.staged:
+                os.replace(temp_path, target)
+        except BaseException:
+            rollback_transaction(self.journal_file)
+            raise
+
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'status': 'committed'}) + '\n')
+
+        if self.durability != 'none':
+            with AtomicWriter('batch') as writer:
+                for target, _ in self.staged:
+                    writer.sync_later(target)
+
+    def _write_backup(self) -> None:
+        """Write the originals of the staged files to the backup archive."""
+        directory = os.path.dirname(self.backup_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.backup_file, 'wb') as raw:
+            with tarfile.open(fileobj=raw, mode='w:gz', compresslevel=_BACKUP_COMPRESSLEVEL) as archive:
+                for index, (target, _) in enumerate(self.staged):
+                    archive.add(target, arcname=str(index), recursive=False)
+                    if self.disk_budget is not None and self._staged_bytes + raw.tell() > self.disk_budget:
+                        raise OSError(f"Disk budget of {self.disk_budget} bytes exceeded")
+            if self.durability != 'none':
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    def _write_journal(self) -> None:
+        """Write the journal of the staged files."""
+        with open(self.journal_file, 'w', encoding='utf-8') as f:
+            header = {
+                'version': JOURNAL_VERSION,
+                'backup': os.path.abspath(self.backup_file),
+                'created': datetime.datetime.now().isoformat()
+            }
+            f.write(json.dumps(header) + '\n')
+            for index, (target, temp_path) in enumerate(self.staged):
+                f.write(json.dumps({'path': target, 'staged': temp_path, 'member': str(index)}) + '\n')
+            if self.durability != 'none':
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def rollback_transaction(journal_file: str) -> int:
+    """
+    Restore the files of a transaction from its backup archive.
+
+    Files whose staged replacement was never moved into place are left as
+    they are, and the staged file is removed. The journal is marked as rolled
+    back; rolling it back again restores the same originals.
+
+    Args:
+        journal_file: Path to the journal
+
+    Returns:
+        Number of files restored
+
+    Raises:
+        ValueError: If the journal or its backup archive cannot be read
+    """
+    try:
+        with open(journal_file, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Cannot read journal '{journal_file}': {e}")
+    if not lines or lines[0].get('version') != JOURNAL_VERSION:
+        raise ValueError(f"Not an fmu journal: {journal_file}")
+
+    backup_file = lines[0]['backup']
+    entries = [line for line in lines[1:] if 'path' in line]
+    restored = 0
+    try:
+        with tarfile.open(backup_file, 'r:gz') as archive:
+            writer = AtomicWriter()
+            for entry in entries:
+                if os.path.exists(entry['staged']):
+                    # Never committed: the original is still in place
+                    _remove(entry['staged'])
+                    continue
+                member = archive.extractfile(entry['member'])
+                if member is None:
+                    raise ValueError(f"Backup of '{entry['path']}' is not a file")
+                writer.write(entry['path'], member.read())
+                restored += 1
+    except (OSError, tarfile.TarError, KeyError) as e:
+        raise ValueError(f"Cannot restore from backup '{backup_file}': {e}")
+
+    with open(journal_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'status': 'rolled back'}) + '\n')
+    return restored
@@ -0,0 +1,236 @@
+"""
+Trigram index for full-text search of content bodies.
+"""
+
+import json
+import os
+from typing import Dict, List, Optional, Set
+
+
+# Bump when the on-disk layout changes so stale indexes are rebuilt
+INDEX_VERSION = 1
+
+# Characters that give a regex pattern special meaning
+_REGEX_META_CHARS = '.^$+[]()'
+
+
+def extract_trigrams(text: str) -> Set[str]:
+    """
+    Extract the set of lowercased trigrams from a text.
+
+    Trigrams are always lowercased so that one index serves both
+    case-sensitive and case-insensitive queries; candidates are verified
+    against the real content afterwards.
+
+    Args:
+        text: Text to extract trigrams from
+
+    Returns:
+        Set of 3-character substrings
+    """
+    text = text.lower()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def required_literal(pattern: str) -> Optional[str]:
+    """
+    Find the longest literal substring every match of a regex must contain.
+
+    The analysis is deliberately conservative: patterns using alternation or
+    groups are not analysed, since a literal inside them may be optional.
+
+    Args:
+        pattern: Regular expression pattern
+
+    Returns:
+        The longest required literal, or None if none could be determined
+    """
+    if '|' in pattern or '(' in pattern:
+        return None
+
+    segments = []
+    current = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            escaped = pattern[i + 1:i + 2]
+            if escaped and not escaped.isalnum():
+                # Escaped metacharacter, e.g. \. is a literal dot
+                current.append(escaped)
+            else:
+                # Character class such as \d or \w ends the literal
+                segments.append(''.join(current))
+                current = []
+            i += 2
+            continue
+        if char in '*?{':
+            # The preceding character is optional or repeated a variable number of times
+            if current:
+                current.pop()
+            segments.append(''.join(current))
+            current = []
+            if char == '{':
+                closing = pattern.find('}', i)
+                i = closing if closing != -1 else len(pattern)
+        elif char == '[':
+            segments.append(''.join(current))
+            current = []
+            closing = pattern.find(']', i + 2)
+            i = closing if closing != -1 else len(pattern)
+        elif char in _REGEX_META_CHARS:
+            segments.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+        i += 1
+    segments.append(''.join(current))
+
+    longest = max(segments, key=len)
+    return longest or None
+
+
+def _stat_key(file_path: str) -> Optional[List[int]]:
+    """Return the (mtime_ns, size) key used to detect changed files."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+class TrigramIndex:
+    """
+    On-disk trigram index mapping content trigrams to the files containing them.
+
+    Each indexed file is stored with its (mtime_ns, size) key. Files whose key
+    no longer matches are treated as unindexed: they are always verified and
+    re-indexed when next parsed.
+    """
+
+    def __init__(self):
+        self.files: Dict[str, List[int]] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        self._next_id = 0
+        self._stale_ids: Set[int] = set()
+        self.dirty = False
+
+    @classmethod
+    def load(cls, index_path: str) -> 'TrigramIndex':
+        """
+        Load an index from disk.
+
+        A missing, unreadable or outdated index file yields an empty index.
+
+        Args:
+            index_path: Path to the index file
+
+        Returns:
+            TrigramIndex instance
+        """
+        index = cls()
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            return index
+
+        index.files = data.get('files', {})
+        index.postings = {trigram: set(ids) for trigram, ids in data.get('postings', {}).items()}
+        index._next_id = data.get('next_id', 0)
+        return index
+
+    def save(self, index_path: str) -> None:
+        """
+        Save the index to disk, dropping entries for files that no longer exist.
+
+        Args:
+            index_path: Path to the index file
+        """
+        for file_path in list(self.files):
+            if not os.path.exists(file_path):
+                self._remove(file_path)
+        self._sweep()
+
+        data = {
+            'version': INDEX_VERSION,
+            'next_id': self._next_id,
+            'files': self.files,
+            'postings': {trigram: sorted(ids) for trigram, ids in self.postings.items()}
+        }
+        with open(index_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        self.dirty = False
+
+    def is_fresh(self, file_path: str) -> bool:
+        """Check whether a file is indexed and unchanged since it was indexed."""
+        entry = self.files.get(file_path)
+        return entry is not None and entry[1:] == _stat_key(file_path)
+
+    def add(self, file_path: str, content: str) -> None:
+        """
+        Index (or re-index) the content body of a file.
+
+        Args:
+            file_path: Path to the file
+            content: Content body as returned by parse_frontmatter
+        """
+        stat_key = _stat_key(file_path)
+        if stat_key is None:
+            return
+        self._remove(file_path)
+
+        file_id = self._next_id
+        self._next_id += 1
+        self.files[file_path] = [file_id] + stat_key
+        for trigram in extract_trigrams(content):
+            self.postings.setdefault(trigram, set()).add(file_id)
+        self.dirty = True
+
+    def candidates(self, literal: str) -> Optional[Set[str]]:
+        """
+        Find the indexed files that may contain a literal string.
+
+        Posting lists are intersected from the shortest upwards. Only indexed
+        files are returned; callers must still verify unindexed or stale files.
+
+        Args:
+            literal: Literal text every match must contain
+
+        Returns:
+            Set of candidate file paths, or None if the literal is too short to narrow
+        """
+        trigrams = extract_trigrams(literal)
+        if not trigrams:
+            return None
+
+        postings = sorted((self.postings.get(trigram, set()) for trigram in trigrams), key=len)
+        ids = set(postings[0])
+        for posting in postings[1:]:
+            if not ids:
+                break
+            ids &= posting
+        ids -= self._stale_ids
+
+        return {file_path for file_path, entry in self.files.items() if entry[0] in ids}
+
+    def _remove(self, file_path: str) -> None:
+        """Forget a file; its ids are purged from posting lists on the next sweep."""
+        entry = self.files.pop(file_path, None)
+        if entry is not None:
+            self._stale_ids.add(entry[0])
+            self.dirty = True
+
+    def _sweep(self) -> None:
+        """Purge ids of removed files from all posting lists in a single pass."""
+        if not self._stale_ids:
+            return
+        for trigram in list(self.postings):
+            ids = self.postings[trigram]
+            ids -= self._stale_ids
+            if not ids:
+                del self.postings[trigram]
+        self._stale_ids = set()
@@ -6,70 +6,71 @@ import re
 import csv
 import sys
 import os
-import hashlib
 import random
 import string
-from datetime import datetime
-from typing import List, Dict, Any, Union, Optional
-from .core import parse_file, get_files_from_patterns
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Dict, Any, Union, Optional
+from .core import parse_frontmatter, extract_header, extract_content, read_file, get_files_from_patterns
+from .fileio import AtomicWriter, WriteBehindWriter, DEFAULT_DURABILITY, DEFAULT_WRITE_QUEUE
+from .formulas import evaluate_formula
+from .functions import EvaluationContext, load_function_files, loaded_function_files
+from .rewrite import splice_frontmatter
+from .search import WhereClause
+from .transaction import StagingWriter, Transaction
 import yaml
 
 
-# Placeholder patterns that should be skipped by coalesce when unresolved
-UNRESOLVED_PLACEHOLDER_PATTERNS = ['$frontmatter.', '$filename', '$filepath', '$content', '$folderpath', '$foldername']
+# Reason given for fields whose update leaves the file byte-identical
+UNCHANGED_REASON = "Unchanged: file content is identical"
 
+# Reason given for fields left unwritten because a transactional update was aborted
+TRANSACTION_ABORTED_REASON = "Not written: transaction aborted"
 
-def _is_unresolved_placeholder(value: str) -> bool:
-    """
-    Check if a string is an unresolved placeholder.
-    
-    Unresolved placeholders are returned as-is by _resolve_placeholder when
-    they cannot be resolved (e.g., non-existent frontmatter field).
-    
-    Args:
-        value: String to check
-        
-    Returns:
-        True if the string is an unresolved placeholder, False otherwise
-    """
-    return any(value.startswith(pattern) or value == pattern for pattern in UNRESOLVED_PLACEHOLDER_PATTERNS)
+# Reason given for the fields of files left alone because they do not match --where
+WHERE_SKIPPED_REASON = "Skipped: does not match --where"
+
+# Prefixes of the reasons given for files that could not be updated
+ERROR_REASONS = ('Error processing file', 'Error saving file')
 
 
 def transform_case(value: str, case_type: str) -> str:
     """Transform a string to the specified case."""
-    if case_type == 'upper':
-        return value.upper()
-    elif case_type == 'lower':
-        return value.lower()
-    elif case_type == 'Sentence case':
-        return value.capitalize()
-    elif case_type == 'Title Case':
-        # Handle contractions properly by using a custom title case logic
-        return _title_case_with_contractions(value)
-    elif case_type == 'snake_case':
-        # Convert to snake_case
-        # First, handle camelCase by inserting underscores before uppercase letters
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', value)
-        # Then handle sequences of uppercase letters
-        s2 = re.sub('([a-z0-9])([A-Z])', r'\1_\2', s1)
-        # Replace spaces and hyphens with underscores, collapse multiple
-        s3 = re.sub(r'[-\s]+', '_', s2)
-        # Remove any double underscores
-        s4 = re.sub(r'_+', '_', s3)
-        return s4.lower()
-    elif case_type == 'kebab-case':
-        # Convert to kebab-case
-        # First, handle camelCase by inserting hyphens before uppercase letters
-        s1 = re.sub('(.)([A-Z][a-z]+)', r'\1-\2', value)
-        # Then handle sequences of uppercase letters
-        s2 = re.sub('([a-z0-9])([A-Z])', r'\1-\2', s1)
-        # Replace spaces and underscores with hyphens, collapse multiple
-        s3 = re.sub(r'[_\s]+', '-', s2)
-        # Remove any double hyphens
-        s4 = re.sub(r'-+', '-', s3)
-        return s4.lower()
-    else:
-        return value
+    transform = _CASE_TRANSFORMS.get(case_type)
+    return transform(value) if transform else value
+
+
+# Patterns of snake_case and kebab-case, compiled once
+_CAMEL_WORD = re.compile('(.)([A-Z][a-z]+)')
+_CAMEL_BOUNDARY = re.compile('([a-z0-9])([A-Z])')
+_SNAKE_SEPARATORS = re.compile(r'[-\s]+')
+_REPEATED_UNDERSCORES = re.compile(r'_+')
+_KEBAB_SEPARATORS = re.compile(r'[_\s]+')
+_REPEATED_HYPHENS = re.compile(r'-+')
+
+
+def _snake_case(value: str) -> str:
+    """Convert to snake_case."""
+    # First, handle camelCase by inserting underscores before uppercase letters
+    s1 = _CAMEL_WORD.sub(r'\1_\2', value)
+    # Then handle sequences of uppercase letters
+    s2 = _CAMEL_BOUNDARY.sub(r'\1_\2', s1)
+    # Replace spaces and hyphens with underscores, collapse multiple
+    s3 = _SNAKE_SEPARATORS.sub('_', s2)
+    # Remove any double underscores
+    return _REPEATED_UNDERSCORES.sub('_', s3).lower()
+
+
+def _kebab_case(value: str) -> str:
+    """Convert to kebab-case."""
+    # First, handle camelCase by inserting hyphens before uppercase letters
+    s1 = _CAMEL_WORD.sub(r'\1-\2', value)
+    # Then handle sequences of uppercase letters
+    s2 = _CAMEL_BOUNDARY.sub(r'\1-\2', s1)
+    # Replace spaces and underscores with hyphens, collapse multiple
+    s3 = _KEBAB_SEPARATORS.sub('-', s2)
+    # Remove any double hyphens
+    return _REPEATED_HYPHENS.sub('-', s3).lower()
 
 
 def _title_case_with_contractions(value: str) -> str:
@@ -78,131 +79,202 @@ def _title_case_with_contractions(value: str) -> str:
     
     This fixes the bug where contractions like "can't" become "Can'T" instead of "Can't".
     """
-    # Split into words
-    words = value.split()
-    result_words = []
-    
-    for word in words:
-        # Check if this word contains an apostrophe (potential contraction)
-        if "'" in word:
-            # Handle contractions specially
-            parts = word.split("'")
-            if len(parts) == 2:
-                # Standard contraction like "can't", "aren't", etc.
-                first_part = parts[0].capitalize()
-                second_part = parts[1].lower()  # Keep the part after apostrophe lowercase
-                result_words.append(f"{first_part}'{second_part}")
-            else:
-                # Multiple apostrophes or other cases, just capitalize normally
-                result_words.append(word.capitalize())
-        else:
-            # Regular word, capitalize normally
-            result_words.append(word.capitalize())
+    return ' '.join([_title_case_word(word) for word in value.split()])
+
+
+def _title_case_word(word: str) -> str:
+    """Capitalize one word, keeping the part after the apostrophe of a contraction lowercase."""
+    if "'" in word:
+        first_part, _, second_part = word.partition("'")
+        if "'" not in second_part:
+            # Standard contraction like "can't", "aren't", etc.
+            return f"{first_part.capitalize()}'{second_part.lower()}"
+    # Regular word, or several apostrophes: capitalize normally
+    return word.capitalize()
+
+
+# String transformation of each case type
+_CASE_TRANSFORMS = {
+    'upper': str.upper,
+    'lower': str.lower,
+    'Sentence case': str.capitalize,
+    'Title Case': _title_case_with_contractions,
+    'snake_case': _snake_case,
+    'kebab-case': _kebab_case,
+}
+
+
+def _compile_pattern(pattern: str, flags: int, context: Optional[EvaluationContext]):
+    """Compile a regular expression, once per run if there is an evaluation context."""
+    if context is not None:
+        return context.regex(pattern, flags)
+    return re.compile(pattern, flags)
+
+
+def compile_operation(
+    operation: Dict[str, Any],
+    context: Optional[EvaluationContext] = None
+) -> Callable[[Any], Any]:
+    """
+    Compile a case, replace or remove operation into a function of the field value.
+    
+    Patterns are compiled and operands lowered once, so applying the
+    operation to a long list is a single loop over its items. Like the
+    apply_* functions, the compiled operation transforms strings and the
+    strings of a list, and returns any other value as it is.
     
-    return ' '.join(result_words)
+    Args:
+        operation: Operation dictionary, as for update_frontmatter
+        context: Evaluation context whose regular expression cache is used, if any
+    
+    Returns:
+        Function taking the current value and returning the new value; None
+        means the field is to be removed
+    
+    Raises:
+        ValueError: If the operation type is not case, replace or remove
+    """
+    op_type = operation['type']
+    if op_type == 'case':
+        transform = _CASE_TRANSFORMS.get(operation['case_type'])
+        if transform is None:
+            return _unchanged
+        return _map_strings(transform)
+    elif op_type == 'replace':
+        return _map_strings(_compile_replace(
+            operation['from'],
+            operation['to'],
+            operation.get('ignore_case', False),
+            operation.get('regex', False),
+            context
+        ))
+    elif op_type == 'remove':
+        if operation['value'] is None:
+            # Remove the entire field
+            return _remove_field
+        return _filter_strings(_compile_match(
+            operation['value'],
+            operation.get('ignore_case', False),
+            operation.get('regex', False),
+            context
+        ))
+    raise ValueError(f"Cannot compile operation: {op_type}")
 
 
-def apply_replace_operation(value: Any, from_val: str, to_val: str, ignore_case: bool = False, use_regex: bool = False) -> Any:
-    """Apply replace operation to a value or list of values."""
-    if isinstance(value, list):
-        result = []
-        for item in value:
-            if isinstance(item, str):
-                result.append(apply_replace_operation(item, from_val, to_val, ignore_case, use_regex))
-            else:
-                result.append(item)
-        return result
-    elif isinstance(value, str):
-        if use_regex:
-            flags = re.IGNORECASE if ignore_case else 0
+def _unchanged(value: Any) -> Any:
+    return value
+
+
+def _remove_field(value: Any) -> None:
+    return None
+
+
+def _map_strings(transform: Callable[[str], str]) -> Callable[[Any], Any]:
+    """Return a function applying transform to a string, or to each string of a list."""
+    def apply(value: Any) -> Any:
+        if isinstance(value, list):
+            return [transform(item) if isinstance(item, str) else item for item in value]
+        elif isinstance(value, str):
+            return transform(value)
+        return value
+    return apply
+
+
+def _filter_strings(matches: Callable[[str], bool]) -> Callable[[Any], Any]:
+    """Return a function dropping the matching strings of a list, or a matching string (giving None)."""
+    def apply(value: Any) -> Any:
+        if isinstance(value, list):
+            return [item for item in value if not (isinstance(item, str) and matches(item))]
+        elif isinstance(value, str):
+            return None if matches(value) else value
+        return value
+    return apply
+
+
+def _compile_replace(
+    from_val: str,
+    to_val: str,
+    ignore_case: bool,
+    use_regex: bool,
+    context: Optional[EvaluationContext]
+) -> Callable[[str], str]:
+    """Compile the string replacement of a replace operation."""
+    if use_regex:
+        try:
+            pattern = _compile_pattern(from_val, re.IGNORECASE if ignore_case else 0, context)
+        except re.error:
+            # Invalid regex, leave values as they are
+            return _unchanged
+        
+        def replace(value: str) -> str:
             try:
-                return re.sub(from_val, to_val, value, flags=flags)
+                return pattern.sub(to_val, value)
             except re.error:
-                # Invalid regex, treat as literal string
                 return value
-        else:
-            # For non-regex, do substring replacement
-            if ignore_case:
-                # Case insensitive substring replacement
-                # Use a regex with re.IGNORECASE for case-insensitive replacement
-                pattern = re.escape(from_val)
-                return re.sub(pattern, to_val, value, flags=re.IGNORECASE)
-            else:
-                # Case sensitive substring replacement
-                return value.replace(from_val, to_val)
+        return replace
+    elif ignore_case:
+        # Case insensitive substring replacement
+        pattern = _compile_pattern(re.escape(from_val), re.IGNORECASE, context)
+        return lambda value: pattern.sub(to_val, value)
     else:
-        return value
+        return lambda value: value.replace(from_val, to_val)
+
 
+def _compile_match(
+    remove_val: str,
+    ignore_case: bool,
+    use_regex: bool,
+    context: Optional[EvaluationContext]
+) -> Callable[[str], bool]:
+    """Compile the string test of a remove operation."""
+    if use_regex:
+        try:
+            pattern = _compile_pattern(remove_val, re.IGNORECASE if ignore_case else 0, context)
+        except re.error:
+            # Invalid regex, remove nothing
+            return lambda value: False
+        return lambda value: pattern.search(value) is not None
+    elif ignore_case:
+        lowered = remove_val.lower()
+        return lambda value: value.lower() == lowered
+    else:
+        return lambda value: value == remove_val
 
-def apply_remove_operation(value: Any, remove_val: Optional[str], ignore_case: bool = False, use_regex: bool = False) -> Any:
+
+def apply_replace_operation(
+    value: Any,
+    from_val: str,
+    to_val: str,
+    ignore_case: bool = False,
+    use_regex: bool = False,
+    context: Optional[EvaluationContext] = None
+) -> Any:
+    """Apply replace operation to a value or list of values; context, if given, caches compiled patterns."""
+    operation = {'type': 'replace', 'from': from_val, 'to': to_val, 'ignore_case': ignore_case, 'regex': use_regex}
+    return compile_operation(operation, context)(value)
+
+
+def apply_remove_operation(
+    value: Any,
+    remove_val: Optional[str],
+    ignore_case: bool = False,
+    use_regex: bool = False,
+    context: Optional[EvaluationContext] = None
+) -> Any:
     """
     Apply remove operation to a value or list of values.
     
     If remove_val is None, the entire field should be removed (return None for any value).
-    If remove_val is provided, only matching values are removed.
+    If remove_val is provided, only matching values are removed. context, if
+    given, caches compiled patterns.
     """
-    # If remove_val is None, we want to remove the entire field
-    if remove_val is None:
-        return None
-    
-    if isinstance(value, list):
-        result = []
-        for item in value:
-            if isinstance(item, str):
-                should_remove = False
-                if use_regex:
-                    flags = re.IGNORECASE if ignore_case else 0
-                    try:
-                        should_remove = bool(re.search(remove_val, item, flags=flags))
-                    except re.error:
-                        # Invalid regex, treat as literal string
-                        should_remove = False
-                else:
-                    if ignore_case:
-                        should_remove = item.lower() == remove_val.lower()
-                    else:
-                        should_remove = item == remove_val
-                
-                if not should_remove:
-                    result.append(item)
-            else:
-                result.append(item)
-        return result
-    elif isinstance(value, str):
-        should_remove = False
-        if use_regex:
-            flags = re.IGNORECASE if ignore_case else 0
-            try:
-                should_remove = bool(re.search(remove_val, value, flags=flags))
-            except re.error:
-                # Invalid regex, treat as literal string
-                should_remove = False
-        else:
-            if ignore_case:
-                should_remove = value.lower() == remove_val.lower()
-            else:
-                should_remove = value == remove_val
-        
-        # For scalar values, return None to indicate removal
-        return None if should_remove else value
-    else:
-        return value
+    operation = {'type': 'remove', 'value': remove_val, 'ignore_case': ignore_case, 'regex': use_regex}
+    return compile_operation(operation, context)(value)
 
 
 def apply_case_transformation(value: Any, case_type: str) -> Any:
     """Apply case transformation to a value or list of values."""
-    if isinstance(value, list):
-        result = []
-        for item in value:
-            if isinstance(item, str):
-                result.append(transform_case(item, case_type))
-            else:
-                result.append(item)
-        return result
-    elif isinstance(value, str):
-        return transform_case(value, case_type)
-    else:
-        return value
+    return compile_operation({'type': 'case', 'case_type': case_type})(value)
 
 
 def deduplicate_array(value: Any) -> Any:
@@ -221,412 +293,13 @@ def deduplicate_array(value: Any) -> Any:
         return value
 
 
-def _resolve_placeholder(placeholder: str, file_path: str, frontmatter: Dict[str, Any], content: str) -> Any:
-    """
-    Resolve a placeholder reference or function call.
-    
-    Args:
-        placeholder: Placeholder string (e.g., "$filename", "$frontmatter.title", "$concat(...)")
-        file_path: Full path to the file
-        frontmatter: Frontmatter dictionary
-        content: Content string
-        
-    Returns:
-        Resolved value
-    """
-    # Check if it's a function call (starts with $ and contains parentheses)
-    if placeholder.startswith('$') and '(' in placeholder:
-        # This is a function call, use evaluate_formula to handle it
-        return evaluate_formula(placeholder, file_path, frontmatter, content)
-    
-    if placeholder == '$filename':
-        return os.path.basename(file_path)
-    elif placeholder == '$filepath':
-        return file_path
-    elif placeholder == '$folderpath':
-        return os.path.dirname(file_path)
-    elif placeholder == '$foldername':
-        return os.path.basename(os.path.dirname(file_path))
-    elif placeholder == '$content':
-        return content
-    elif placeholder.startswith('$frontmatter.'):
-        # Extract field name and optional index
-        pattern = r'\$frontmatter\.([a-zA-Z_][a-zA-Z0-9_]*)(?:\[(\d+)\])?'
-        match = re.match(pattern, placeholder)
-        if match:
-            field_name = match.group(1)
-            index_str = match.group(2)
-            
-            if field_name not in frontmatter:
-                return placeholder  # Return placeholder if field not found
-            
-            value = frontmatter[field_name]
-            
-            if index_str is not None:
-                # Array indexing
-                index = int(index_str)
-                if isinstance(value, list) and 0 <= index < len(value):
-                    return value[index]
-                else:
-                    return placeholder
-            else:
-                return value
-    
-    return placeholder
-
-
-def _parse_function_call(formula: str) -> tuple:
-    """
-    Parse a function call from a formula.
-    
-    Args:
-        formula: Formula string starting with '=' or '$'
-        
-    Returns:
-        Tuple of (function_name, parameters)
-    """
-    # Remove the leading '=' or '$'
-    if formula.startswith('=') or formula.startswith('$'):
-        formula = formula[1:].strip()
-    
-    # Parse function name and parameters
-    # Pattern: function_name(param1, param2, ...)
-    match = re.match(r'([a-zA-Z_][a-zA-Z0-9_]*)\((.*)\)$', formula)
-    if not match:
-        return None, []
-    
-    function_name = match.group(1)
-    params_str = match.group(2)
-    
-    # Parse parameters - handle quoted strings, nested commas, and nested parentheses
-    parameters = []
-    if params_str.strip():
-        # Parameter parsing - split by comma but respect quotes and nested parentheses
-        current_param = []
-        in_quotes = False
-        quote_char = None
-        paren_depth = 0
-        
-        for char in params_str:
-            if char in ('"', "'") and not in_quotes:
-                in_quotes = True
-                quote_char = char
-            elif char == quote_char and in_quotes:
-                in_quotes = False
-                quote_char = None
-            elif char == '(' and not in_quotes:
-                paren_depth += 1
-            elif char == ')' and not in_quotes:
-                paren_depth -= 1
-            elif char == ',' and not in_quotes and paren_depth == 0:
-                param = ''.join(current_param).strip()
-                if param:
-                    # Remove quotes if present
-                    if (param.startswith('"') and param.endswith('"')) or \
-                       (param.startswith("'") and param.endswith("'")):
-                        param = param[1:-1]
-                    parameters.append(param)
-                current_param = []
-                continue
-            
-            current_param.append(char)
-        
-        # Don't forget the last parameter
-        param = ''.join(current_param).strip()
-        if param:
-            # Remove quotes if present
-            if (param.startswith('"') and param.endswith('"')) or \
-               (param.startswith("'") and param.endswith("'")):
-                param = param[1:-1]
-            parameters.append(param)
-    
-    return function_name, parameters
-
-
-def _execute_function(function_name: str, parameters: List[Any]) -> Any:
-    """
-    Execute a built-in function.
-    
-    Args:
-        function_name: Name of the function to execute
-        parameters: List of parameters (already resolved)
-        
-    Returns:
-        Result of function execution
-    """
-    if function_name == 'now':
-        # Return current datetime in ISO 8601 format
-        from datetime import timezone
-        return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
-    
-    elif function_name == 'list':
-        # Return an empty list
-        return []
-    
-    elif function_name == 'hash':
-        # Create a hash of the given string with specified length
-        if len(parameters) < 2:
-            raise ValueError("hash() requires 2 parameters: string and hash_length")
-        
-        string_to_hash = str(parameters[0])
-        try:
-            hash_length = int(parameters[1])
-        except (ValueError, TypeError):
-            raise ValueError("hash_length must be an integer")
-        
-        # Create a deterministic hash using SHA256
-        hash_obj = hashlib.sha256(string_to_hash.encode('utf-8'))
-        hash_hex = hash_obj.hexdigest()
-        
-        # Use only alphanumeric characters and trim to requested length
-        # Use the hex representation and convert to alphanumeric
-        result = hash_hex[:hash_length]
-        
-        return result
-    
-    elif function_name == 'concat':
-        # Concatenate all parameters
-        return ''.join(str(param) for param in parameters)
-    
-    elif function_name == 'slice':
-        # Slice a list with Python-like slicing semantics
-        if len(parameters) < 2:
-            raise ValueError("slice() requires at least 2 parameters: list and start")
-        
-        # First parameter should be a list
-        input_list = parameters[0]
-        if not isinstance(input_list, list):
-            raise ValueError("First parameter of slice() must be a list")
-        
-        # Parse slice parameters
-        try:
-            start = int(parameters[1])
-        except (ValueError, TypeError):
-            raise ValueError("start parameter must be an integer")
-        
-        stop = None
-        step = None
-        
-        if len(parameters) >= 3:
-            try:
-                stop = int(parameters[2])
-            except (ValueError, TypeError):
-                raise ValueError("stop parameter must be an integer")
-        
-        if len(parameters) >= 4:
-            try:
-                step = int(parameters[3])
-            except (ValueError, TypeError):
-                raise ValueError("step parameter must be an integer")
-        
-        # Perform the slice operation using Python's slice notation
-        if stop is None and step is None:
-            # slice(list, start)
-            return input_list[start:]
-        elif step is None:
-            # slice(list, start, stop)
-            return input_list[start:stop]
-        else:
-            # slice(list, start, stop, step)
-            return input_list[start:stop:step]
-    
-    elif function_name == 'coalesce':
-        # Return the first parameter that is not nil, not empty, not blank
-        for param in parameters:
-            # Check if parameter is not None
-            if param is None:
-                continue
-            
-            # Check if parameter is not empty (for strings, lists, etc.)
-            if isinstance(param, str):
-                # Skip unresolved placeholders
-                if _is_unresolved_placeholder(param):
-                    continue
-                # Not blank (contains non-whitespace characters)
-                if param.strip():
-                    return param
-            elif isinstance(param, (list, dict)):
-                # Not empty
-                if param:
-                    return param
-            else:
-                # Other types (numbers, booleans, etc.)
-                return param
-        
-        # If all parameters are nil/empty/blank, return None
-        return None
-    
-    elif function_name == 'basename':
-        # Return the base name (without extension) of the file path
-        if len(parameters) < 1:
-            raise ValueError("basename() requires 1 parameter: file_path")
-        
-        file_path = str(parameters[0])
-        # Get the base name and remove extension
-        base = os.path.basename(file_path)
-        # Remove extension
-        name_without_ext = os.path.splitext(base)[0]
-        return name_without_ext
-    
-    elif function_name == 'ltrim':
-        # Trim left whitespace from string
-        if len(parameters) < 1:
-            raise ValueError("ltrim() requires 1 parameter: string")
-        
-        string_to_trim = str(parameters[0])
-        return string_to_trim.lstrip()
-    
-    elif function_name == 'rtrim':
-        # Trim right whitespace from string
-        if len(parameters) < 1:
-            raise ValueError("rtrim() requires 1 parameter: string")
-        
-        string_to_trim = str(parameters[0])
-        return string_to_trim.rstrip()
-    
-    elif function_name == 'trim':
-        # Trim both left and right whitespace from string
-        if len(parameters) < 1:
-            raise ValueError("trim() requires 1 parameter: string")
-        
-        string_to_trim = str(parameters[0])
-        return string_to_trim.strip()
-    
-    elif function_name == 'truncate':
-        # Truncate string to max_length
-        if len(parameters) < 2:
-            raise ValueError("truncate() requires 2 parameters: string and max_length")
-        
-        string_to_truncate = str(parameters[0])
-        try:
-            max_length = int(parameters[1])
-        except (ValueError, TypeError):
-            raise ValueError("max_length must be an integer")
-        
-        if len(string_to_truncate) <= max_length:
-            return string_to_truncate
-        else:
-            return string_to_truncate[:max_length]
-    
-    elif function_name == 'wtruncate':
-        # Truncate string to word boundary with suffix
-        if len(parameters) < 3:
-            raise ValueError("wtruncate() requires 3 parameters: string, max_length, and suffix")
-        
-        string_to_truncate = str(parameters[0])
-        try:
-            max_length = int(parameters[1])
-        except (ValueError, TypeError):
-            raise ValueError("max_length must be an integer")
-        
-        suffix = str(parameters[2])
-        
-        # If string is already shorter than max_length, return as-is
-        if len(string_to_truncate) <= max_length:
-            return string_to_truncate
-        
-        # Calculate available space for actual content (max_length - suffix_length)
-        available_space = max_length - len(suffix)
-        
-        if available_space <= 0:
-            # If suffix is longer than max_length, just return truncated suffix
-            return suffix[:max_length]
-        
-        # Truncate to available space
-        truncated = string_to_truncate[:available_space]
-        
-        # Find the last word boundary (space)
-        last_space = truncated.rfind(' ')
-        
-        if last_space > 0:
-            # Truncate at word boundary
-            truncated = truncated[:last_space]
-        # If no space found, use the truncated string as-is
-        
-        return truncated + suffix
-    
-    elif function_name == 'path':
-        # Form a path from provided path segments using OS-appropriate separator
-        if len(parameters) < 1:
-            raise ValueError("path() requires at least 1 parameter: path segments")
-        
-        # Convert all parameters to strings and join with OS path separator
-        path_segments = [str(param) for param in parameters]
-        return os.path.join(*path_segments)
-    
-    elif function_name == 'flat_list':
-        # Flatten a list of elements, expanding any nested lists
-        if len(parameters) < 1:
-            raise ValueError("flat_list() requires at least 1 parameter: elements")
-        
-        result = []
-        for param in parameters:
-            if isinstance(param, list):
-                # If parameter is a list, add all its elements to result
-                result.extend(param)
-            else:
-                # If parameter is not a list, add it as-is
-                result.append(param)
-        
-        return result
-    
-    else:
-        raise ValueError(f"Unknown function: {function_name}")
-
-
-def evaluate_formula(
-    formula: Any,
-    file_path: str,
-    frontmatter: Dict[str, Any],
-    content: str
-) -> Any:
-    """
-    Evaluate a compute formula.
-    
-    Args:
-        formula: Formula to evaluate (literal, placeholder, or function)
-                 Can be a string or any other type (bool, int, etc.)
-        file_path: Full path to the file
-        frontmatter: Frontmatter dictionary
-        content: Content string
-        
-    Returns:
-        Evaluated result
-    """
-    # If formula is not a string, return it as-is (it's already a literal value)
-    if not isinstance(formula, str):
-        return formula
-    
-    # Check if it's a function call (starts with = or $)
-    if formula.startswith('=') or (formula.startswith('$') and '(' in formula):
-        function_name, parameters = _parse_function_call(formula)
-        if function_name:
-            # Resolve parameters recursively (they may contain placeholders or nested functions)
-            resolved_params = []
-            for param in parameters:
-                # Recursively evaluate each parameter
-                resolved_params.append(evaluate_formula(param, file_path, frontmatter, content))
-            
-            return _execute_function(function_name, resolved_params)
-        else:
-            # Invalid function syntax, treat as literal
-            return formula
-    
-    # Check if it's a placeholder
-    elif formula.startswith('$'):
-        return _resolve_placeholder(formula, file_path, frontmatter, content)
-    
-    # Otherwise, it's a literal value
-    else:
-        return formula
-
-
 def apply_compute_operation(
     frontmatter: Dict[str, Any],
     frontmatter_name: str,
     formula: str,
     file_path: str,
-    content: str
+    content: str,
+    context: Optional[EvaluationContext] = None
 ) -> tuple:
     """
     Apply compute operation to frontmatter.
@@ -637,12 +310,13 @@ def apply_compute_operation(
         formula: Formula to compute
         file_path: Full path to the file
         content: Content string
+        context: Evaluation context of the run (default: a new context)
         
     Returns:
         Tuple of (updated_frontmatter, changes_made)
     """
     # Evaluate the formula
-    computed_value = evaluate_formula(formula, file_path, frontmatter, content)
+    computed_value = evaluate_formula(formula, file_path, frontmatter, content, context)
     
     changes_made = False
     
@@ -674,7 +348,15 @@ def update_frontmatter(
     frontmatter_name: str,
     operations: List[Dict[str, Any]],
     deduplication: bool = True,
-    format_type: str = "yaml"
+    format_type: str = "yaml",
+    durability: str = DEFAULT_DURABILITY,
+    jobs: int = 1,
+    journal_file: Optional[str] = None,
+    disk_budget: Optional[int] = None,
+    now: Optional[str] = None,
+    write_queue: int = DEFAULT_WRITE_QUEUE,
+    where: Optional[List[str]] = None,
+    where_ignore_case: bool = False
 ) -> List[Dict[str, Any]]:
     """
     Update frontmatter in files.
@@ -685,195 +367,551 @@ def update_frontmatter(
         operations: List of update operations to apply
         deduplication: Whether to deduplicate array values (applied last)
         format_type: Format type (default: 'yaml')
+        durability: How written files are synced to disk: 'none', 'file' or 'batch'
+        jobs: Number of worker processes updating files in parallel (default: 1)
+        journal_file: If given, update transactionally: every file is written, or
+                      none if any fails, and the journal records how to roll back
+        disk_budget: Optional limit, in bytes, on the staged files and backups of
+                     a transactional update
+        now: Timestamp returned by now() for every file, as from parse_timestamp
+             (default: the time the update starts)
+        write_queue: Number of files waiting to be written by a background thread
+                     while the next file is updated, with one job and no journal;
+                     0 writes each file before going on (default: DEFAULT_WRITE_QUEUE)
+        where: Conditions a file must all meet to be updated, each NAME, NAME=VALUE
+               or NAME~REGEX (see WhereClause); they are checked against the header
+               before any operation runs, and other files are reported as skipped
+        where_ignore_case: Whether the where conditions ignore case
     
     Returns:
         List of update results with file paths and changes made
     """
-    files = get_files_from_patterns(patterns)
+    updates = [{'name': frontmatter_name, 'operations': operations, 'deduplication': deduplication}]
+    return update_frontmatter_fields(
+        patterns, updates, format_type, durability, jobs, journal_file, disk_budget, now, write_queue,
+        where, where_ignore_case
+    )
+
+
+def update_frontmatter_fields(
+    patterns: List[str],
+    updates: List[Dict[str, Any]],
+    format_type: str = "yaml",
+    durability: str = DEFAULT_DURABILITY,
+    jobs: int = 1,
+    journal_file: Optional[str] = None,
+    disk_budget: Optional[int] = None,
+    now: Optional[str] = None,
+    write_queue: int = DEFAULT_WRITE_QUEUE,
+    where: Optional[List[str]] = None,
+    where_ignore_case: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Update several frontmatter fields in one pass over the files.
+    
+    The updates are applied in order to the same parsed frontmatter, so a
+    later update sees the result of earlier ones, and each file is read and
+    written at most once. Files are replaced atomically (see AtomicWriter).
+    Formulas of every file are evaluated in one EvaluationContext, so now()
+    gives the same time for all of them.
+    
+    Args:
+        patterns: List of glob patterns or file paths
+        updates: List of field updates, each a dictionary with 'name' (field name),
+                 'operations' (list of update operations) and optionally
+                 'deduplication' (whether to deduplicate array values last, default True)
+        format_type: Format type (default: 'yaml')
+        durability: How written files are synced to disk: 'none', 'file' or 'batch'
+        jobs: Number of worker processes updating files in parallel (default: 1)
+        journal_file: If given, update transactionally: every file is written, or
+                      none if any fails, and the journal records how to roll back
+        disk_budget: Optional limit, in bytes, on the staged files and backups of
+                     a transactional update
+        now: Timestamp returned by now() for every file, as from parse_timestamp
+             (default: the time the update starts)
+        write_queue: Number of files waiting to be written by a background thread
+                     while the next file is updated, with one job and no journal;
+                     0 writes each file before going on (default: DEFAULT_WRITE_QUEUE)
+        where: Conditions a file must all meet to be updated, each NAME, NAME=VALUE
+               or NAME~REGEX (see WhereClause); they are checked against the header
+               before any operation runs, and other files are reported as skipped
+        where_ignore_case: Whether the where conditions ignore case
+    
+    Returns:
+        List of update results with file paths, fields and changes made, in file
+        order and then update order
+    
+    Raises:
+        ValueError: If the durability level is unknown, the write queue depth is
+                    negative or a where condition is invalid
+    """
+    context = EvaluationContext(now)
+    where_clauses = [WhereClause(expression, where_ignore_case) for expression in where or []]
+    files = _unique_files(get_files_from_patterns(patterns))
+    return _update_files(
+        files, updates, format_type, durability, jobs, journal_file, disk_budget, context, write_queue, where_clauses
+    )
+
+
+def _update_files(
+    files: List[str],
+    updates: List[Dict[str, Any]],
+    format_type: str,
+    durability: str,
+    jobs: int = 1,
+    journal_file: Optional[str] = None,
+    disk_budget: Optional[int] = None,
+    context: Optional[EvaluationContext] = None,
+    write_queue: int = DEFAULT_WRITE_QUEUE,
+    where: Optional[List[WhereClause]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Apply field updates to each of a list of distinct files and return the results.
+    
+    With one job, files are written behind by a WriteBehindWriter, so the next
+    file is parsed while the previous one is written; the results are complete
+    once it is closed. With more than one job, files are updated in a process
+    pool; results are still returned in file order. Each worker has a context
+    of its own, with the same now() as context.
+    """
+    if context is None:
+        context = EvaluationContext()
+    if journal_file:
+        return _update_files_transactionally(
+            files, updates, format_type, durability, jobs, journal_file, disk_budget, context, where
+        )
+    
+    results = []
+    with AtomicWriter(durability) as writer:
+        if jobs <= 1 or len(files) <= 1:
+            with WriteBehindWriter(writer.write, write_queue) as write_behind:
+                for file_path in files:
+                    results.extend(_update_file(file_path, updates, format_type, write_behind, context, where))
+        else:
+            # Workers sync their own writes, except for 'batch', which is done once here
+            worker_durability = DEFAULT_DURABILITY if durability == 'batch' else durability
+            with _worker_pool(jobs, context) as executor:
+                futures = [
+                    executor.submit(_update_file_in_worker, file_path, updates, format_type, worker_durability, where)
+                    for file_path in files
+                ]
+                for file_path, future in zip(files, futures):
+                    try:
+                        file_results = future.result()
+                    except Exception as e:
+                        file_results = _error_results(file_path, updates, f"Error processing file: {e}")
+                    if durability == 'batch' and any(result['changes_made'] for result in file_results):
+                        writer.sync_later(file_path)
+                    results.extend(file_results)
+    
+    return results
+
+
+def _update_files_transactionally(
+    files: List[str],
+    updates: List[Dict[str, Any]],
+    format_type: str,
+    durability: str,
+    jobs: int,
+    journal_file: str,
+    disk_budget: Optional[int],
+    context: EvaluationContext,
+    where: Optional[List[WhereClause]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Stage the new text of every file, then commit them all, or none if any file fails.
+    """
+    transaction = Transaction(journal_file, disk_budget, durability)
     results = []
+    try:
+        for file_results, staged in _stage_files(files, updates, format_type, jobs, context, where):
+            try:
+                transaction.add(staged)
+            except OSError as e:
+                for result in file_results:
+                    if result['changes_made']:
+                        result['changes_made'] = False
+                        result['reason'] = f"Error saving file: {e}"
+            results.extend(file_results)
+        
+        abort_reason = None
+        failed = {result['file_path'] for result in results if result['reason'].startswith(ERROR_REASONS)}
+        if failed:
+            abort_reason = f"{TRANSACTION_ABORTED_REASON}: {len(failed)} file(s) failed"
+        elif transaction.staged:
+            try:
+                transaction.commit()
+            except OSError as e:
+                abort_reason = f"{TRANSACTION_ABORTED_REASON}: {e}"
+    except BaseException:
+        transaction.discard()
+        raise
+    
+    if abort_reason:
+        transaction.discard()
+        for result in results:
+            if result['changes_made']:
+                result['changes_made'] = False
+                result['reason'] = abort_reason
+    return results
+
+
+def _stage_files(
+    files: List[str],
+    updates: List[Dict[str, Any]],
+    format_type: str,
+    jobs: int,
+    context: EvaluationContext,
+    where: Optional[List[WhereClause]] = None
+):
+    """Yield the results and staged files of each file in order, updating them in a process pool if jobs > 1."""
+    if jobs <= 1 or len(files) <= 1:
+        for file_path in files:
+            writer = StagingWriter()
+            yield _update_file(file_path, updates, format_type, writer, context, where), writer.staged
+        return
     
+    with _worker_pool(jobs, context) as executor:
+        futures = [
+            executor.submit(_stage_file_in_worker, file_path, updates, format_type, where)
+            for file_path in files
+        ]
+        for file_path, future in zip(files, futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield _error_results(file_path, updates, f"Error processing file: {e}"), []
+
+
+def _stage_file_in_worker(
+    file_path: str,
+    updates: List[Dict[str, Any]],
+    format_type: str,
+    where: Optional[List[WhereClause]] = None
+):
+    """Update one file in a worker process, staging its new text rather than writing it."""
+    writer = StagingWriter()
+    return _update_file(file_path, updates, format_type, writer, _worker_context, where), writer.staged
+
+
+def _unique_files(files: List[str]) -> List[str]:
+    """Drop other spellings of the same file, such as symlinks, so no two updates race on it."""
+    seen = set()
+    unique_files = []
     for file_path in files:
-        try:
-            # Parse the file
-            frontmatter_data, content = parse_file(file_path, format_type)
-            
-            if frontmatter_data is None:
-                frontmatter_data = {}
-            
-            # Track if any changes were made
-            changes_made = False
-            original_value = frontmatter_data.get(frontmatter_name)
-            
-            # Handle compute operations differently - they can create fields
-            has_compute_operation = any(op['type'] == 'compute' for op in operations)
-            
-            # Check if this is a "remove entire field" operation (remove with value=None)
-            # This can be the only operation, or combined with deduplication
-            non_dedup_operations = [op for op in operations if op['type'] != 'deduplication']
-            is_remove_entire_field = (
-                len(non_dedup_operations) == 1 and 
-                non_dedup_operations[0]['type'] == 'remove' and 
-                non_dedup_operations[0]['value'] is None
+        real_path = os.path.realpath(file_path)
+        if real_path not in seen:
+            seen.add(real_path)
+            unique_files.append(file_path)
+    return unique_files
+
+
+# Evaluation context of a worker process, set up by _init_worker
+_worker_context: Optional[EvaluationContext] = None
+
+
+def _worker_pool(jobs: int, context: EvaluationContext) -> ProcessPoolExecutor:
+    """Create a pool of worker processes that know the functions loaded with --functions and the time of the run."""
+    return ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_worker,
+        initargs=(loaded_function_files(), context.now)
+    )
+
+
+def _init_worker(function_files: List[str], now: str) -> None:
+    """Load the functions and create the evaluation context of a worker process."""
+    global _worker_context
+    load_function_files(function_files)
+    _worker_context = EvaluationContext(now)
+
+
+def _update_file_in_worker(
+    file_path: str,
+    updates: List[Dict[str, Any]],
+    format_type: str,
+    durability: str,
+    where: Optional[List[WhereClause]] = None
+) -> List[Dict[str, Any]]:
+    """Update one file in a worker process, with a writer of its own."""
+    with AtomicWriter(durability) as writer:
+        return _update_file(file_path, updates, format_type, writer, _worker_context, where)
+
+
+def _update_file(
+    file_path: str,
+    updates: List[Dict[str, Any]],
+    format_type: str,
+    writer: Union[AtomicWriter, WriteBehindWriter, StagingWriter],
+    context: Optional[EvaluationContext] = None,
+    where: Optional[List[WhereClause]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Apply field updates to one file, writing it if anything changed, and return its results.
+    
+    With a WriteBehindWriter, a failed write is recorded in the results when
+    the writer is closed. A file that does not meet every where condition is
+    reported as skipped; when the raw header rules it out, it is not even parsed.
+    """
+    results = []
+    try:
+        # Read the file once, keeping its line endings so that a rewrite only
+        # changes the updated fields; fields and content are parsed with '\n'
+        # line endings, as when the file is read anywhere else
+        original_content = read_file(file_path, newline='')
+        text = original_content.replace('\r\n', '\n').replace('\r', '\n')
+        if where:
+            header = extract_header(text, format_type)
+            if not all(clause.may_match(header) for clause in where):
+                return _error_results(file_path, updates, WHERE_SKIPPED_REASON)
+        frontmatter_data, content = parse_frontmatter(text, format_type)
+        if where and not all(clause.matches(frontmatter_data) for clause in where):
+            return _error_results(file_path, updates, WHERE_SKIPPED_REASON)
+        
+        if frontmatter_data is None:
+            frontmatter_data = {}
+        
+        if context is None:
+            context = EvaluationContext()
+        context.for_file(file_path, frontmatter_data, content)
+        
+        for update in updates:
+            result = _apply_field_update(
+                frontmatter_data,
+                update['name'],
+                update['operations'],
+                update.get('deduplication', True),
+                file_path,
+                content,
+                context
             )
+            if result is not None:
+                results.append(result)
+        
+        # Save changes back to file if any were made
+        changed = [result for result in results if result['changes_made']]
+        if changed:
+            try:
+                changed_fields = [result['field'] for result in changed]
+                new_content = _render_file(frontmatter_data, original_content, format_type, changed_fields)
+                if new_content == original_content:
+                    # Leave the file, and its modification time, alone
+                    for result in changed:
+                        result['changes_made'] = False
+                        result['reason'] = UNCHANGED_REASON
+                elif isinstance(writer, WriteBehindWriter):
+                    writer.write(file_path, new_content, on_error=functools.partial(_mark_save_error, changed))
+                else:
+                    writer.write(file_path, new_content)
+            except Exception as e:
+                _mark_save_error(changed, e)
+        
+    except Exception as e:
+        results = _error_results(file_path, updates, f"Error processing file: {e}")
+    
+    return results
+
+
+def _mark_save_error(results: List[Dict[str, Any]], error: Exception) -> None:
+    """Record in the results of a file that it could not be saved."""
+    for result in results:
+        result['changes_made'] = False
+        result['reason'] = f"Error saving file: {error}"
+
+
+def _error_results(file_path: str, updates: List[Dict[str, Any]], reason: str) -> List[Dict[str, Any]]:
+    """Build the results reporting a file that was not updated, one per field."""
+    return [
+        {
+            'file_path': file_path,
+            'field': update['name'],
+            'original_value': None,
+            'new_value': None,
+            'changes_made': False,
+            'reason': reason
+        }
+        for update in updates
+    ]
+
+
+def _apply_field_update(
+    frontmatter_data: Dict[str, Any],
+    frontmatter_name: str,
+    operations: List[Dict[str, Any]],
+    deduplication: bool,
+    file_path: str,
+    content: str,
+    context: Optional[EvaluationContext] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Apply the operations of one field update to parsed frontmatter, in place.
+    
+    Args:
+        frontmatter_data: Frontmatter dictionary, modified in place
+        frontmatter_name: Name of frontmatter field to update
+        operations: List of update operations to apply
+        deduplication: Whether to deduplicate array values (applied last)
+        file_path: Full path to the file
+        content: Content string
+        context: Evaluation context of the run, set to this file
+    
+    Returns:
+        Update result for the field, or None if there is nothing to report
+        (the field was unchanged, or an absent field was to be removed)
+    """
+    # Track if any changes were made
+    changes_made = False
+    original_value = frontmatter_data.get(frontmatter_name)
+    
+    # Handle compute operations differently - they can create fields
+    has_compute_operation = any(op['type'] == 'compute' for op in operations)
+    
+    # Check if this is a "remove entire field" operation (remove with value=None)
+    # This can be the only operation, or combined with deduplication
+    non_dedup_operations = [op for op in operations if op['type'] != 'deduplication']
+    is_remove_entire_field = (
+        len(non_dedup_operations) == 1 and 
+        non_dedup_operations[0]['type'] == 'remove' and 
+        non_dedup_operations[0]['value'] is None
+    )
+    
+    # Skip if frontmatter field doesn't exist AND no compute operation
+    if frontmatter_name not in frontmatter_data and not has_compute_operation:
+        # For "remove entire field" operations on non-existent fields, skip silently
+        if is_remove_entire_field:
+            return None
             
-            # Skip if frontmatter field doesn't exist AND no compute operation
-            if frontmatter_name not in frontmatter_data and not has_compute_operation:
-                # For "remove entire field" operations on non-existent fields, skip silently
-                if is_remove_entire_field:
-                    continue
-                    
-                results.append({
-                    'file_path': file_path,
-                    'field': frontmatter_name,
-                    'original_value': None,
-                    'new_value': None,
-                    'changes_made': False,
-                    'reason': f"Field '{frontmatter_name}' does not exist"
-                })
-                continue
-            
+        return {
+            'file_path': file_path,
+            'field': frontmatter_name,
+            'original_value': None,
+            'new_value': None,
+            'changes_made': False,
+            'reason': f"Field '{frontmatter_name}' does not exist"
+        }
+    
+    current_value = frontmatter_data.get(frontmatter_name)
+    
+    # Apply operations in order
+    for operation in operations:
+        op_type = operation['type']
+        
+        if op_type == 'compute':
+            # Compute operations can create fields, so handle specially
+            frontmatter_data, op_changes = apply_compute_operation(
+                frontmatter_data,
+                frontmatter_name,
+                operation['formula'],
+                file_path,
+                content,
+                context
+            )
+            if op_changes:
+                changes_made = True
             current_value = frontmatter_data.get(frontmatter_name)
             
-            # Apply operations in order
-            for operation in operations:
-                op_type = operation['type']
+        elif op_type in ('case', 'replace', 'remove'):
+            if current_value is not None:
+                new_value = _compiled_operation(operation, context)(current_value)
+                if new_value != current_value:
+                    current_value = new_value
+                    changes_made = True
                 
-                if op_type == 'compute':
-                    # Compute operations can create fields, so handle specially
-                    frontmatter_data, op_changes = apply_compute_operation(
-                        frontmatter_data,
-                        frontmatter_name,
-                        operation['formula'],
-                        file_path,
-                        content
-                    )
-                    if op_changes:
-                        changes_made = True
-                    current_value = frontmatter_data.get(frontmatter_name)
-                    
-                elif op_type == 'case':
-                    if current_value is not None:
-                        current_value = apply_case_transformation(current_value, operation['case_type'])
-                        changes_made = True
-                    
-                elif op_type == 'replace':
-                    if current_value is not None:
-                        new_value = apply_replace_operation(
-                            current_value,
-                            operation['from'],
-                            operation['to'],
-                            operation.get('ignore_case', False),
-                            operation.get('regex', False)
-                        )
-                        if new_value != current_value:
-                            current_value = new_value
-                            changes_made = True
-                        
-                elif op_type == 'remove':
-                    if current_value is not None:
-                        new_value = apply_remove_operation(
-                            current_value,
-                            operation['value'],
-                            operation.get('ignore_case', False),
-                            operation.get('regex', False)
-                        )
-                        if new_value != current_value:
-                            current_value = new_value
-                            changes_made = True
-                        
-                elif op_type == 'deduplication':
-                    # Handle deduplication as a standalone operation
-                    if isinstance(current_value, list):
-                        deduplicated_value = deduplicate_array(current_value)
-                        if deduplicated_value != current_value:
-                            current_value = deduplicated_value
-                            changes_made = True
-            
-            # Apply deduplication last if requested
-            if deduplication and isinstance(current_value, list):
+        elif op_type == 'deduplication':
+            # Handle deduplication as a standalone operation
+            if isinstance(current_value, list):
                 deduplicated_value = deduplicate_array(current_value)
-                if deduplicated_value != current_value:
+                # Deduplication only drops items, so comparing lengths is enough
+                if len(deduplicated_value) != len(current_value):
                     current_value = deduplicated_value
                     changes_made = True
-            
-            # Update frontmatter_data with current_value (except for compute which already updated it)
-            if not has_compute_operation or any(op['type'] != 'compute' for op in operations):
-                # Handle removal of fields when value becomes None
-                if current_value is None:
-                    # Remove the field entirely (works for both scalar and list values)
-                    if frontmatter_name in frontmatter_data:
-                        del frontmatter_data[frontmatter_name]
-                        changes_made = True
-                else:
-                    # Update the field
-                    if frontmatter_name in frontmatter_data or current_value is not None:
-                        frontmatter_data[frontmatter_name] = current_value
-            
-            # Save changes back to file if any were made
-            if changes_made:
-                try:
-                    # Read the original file content
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        original_content = f.read()
-                    
-                    # Reconstruct the file with updated frontmatter
-                    if format_type == 'yaml':
-                        # Extract the frontmatter delimiter
-                        if original_content.startswith('---\n'):
-                            # Find the closing delimiter
-                            end_pos = original_content.find('\n---\n', 4)
-                            if end_pos != -1:
-                                # Reconstruct with updated frontmatter
-                                new_frontmatter = yaml.dump(frontmatter_data, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                                new_content = f"---\n{new_frontmatter}---\n{content}"
-                            else:
-                                # No closing delimiter found, append to end
-                                new_frontmatter = yaml.dump(frontmatter_data, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                                new_content = f"---\n{new_frontmatter}---\n{content}"
-                        else:
-                            # No frontmatter originally, add it
-                            new_frontmatter = yaml.dump(frontmatter_data, default_flow_style=False, allow_unicode=True, sort_keys=False)
-                            new_content = f"---\n{new_frontmatter}---\n{original_content}"
-                    else:
-                        # For other formats, this would need additional implementation
-                        new_content = original_content
-                    
-                    # Write back to file
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        f.write(new_content)
-                    
-                except Exception as e:
-                    results.append({
-                        'file_path': file_path,
-                        'field': frontmatter_name,
-                        'original_value': original_value,
-                        'new_value': current_value,
-                        'changes_made': False,
-                        'reason': f"Error saving file: {e}"
-                    })
-                    continue
-            
-            if changes_made:
-                results.append({
-                    'file_path': file_path,
-                    'field': frontmatter_name,
-                    'original_value': original_value,
-                    'new_value': frontmatter_data.get(frontmatter_name),
-                    'changes_made': changes_made,
-                    'reason': 'Updated successfully'
-                })
-            
-        except Exception as e:
-            results.append({
-                'file_path': file_path,
-                'field': frontmatter_name,
-                'original_value': None,
-                'new_value': None,
-                'changes_made': False,
-                'reason': f"Error processing file: {e}"
-            })
     
-    return results
+    # Apply deduplication last if requested
+    if deduplication and isinstance(current_value, list):
+        deduplicated_value = deduplicate_array(current_value)
+        if len(deduplicated_value) != len(current_value):
+            current_value = deduplicated_value
+            changes_made = True
+    
+    # Update frontmatter_data with current_value (except for compute which already updated it)
+    if not has_compute_operation or any(op['type'] != 'compute' for op in operations):
+        # Handle removal of fields when value becomes None
+        if current_value is None:
+            # Remove the field entirely (works for both scalar and list values)
+            if frontmatter_name in frontmatter_data:
+                del frontmatter_data[frontmatter_name]
+                changes_made = True
+        else:
+            # Update the field
+            if frontmatter_name in frontmatter_data or current_value is not None:
+                frontmatter_data[frontmatter_name] = current_value
+    
+    if not changes_made:
+        return None
+    return {
+        'file_path': file_path,
+        'field': frontmatter_name,
+        'original_value': original_value,
+        'new_value': frontmatter_data.get(frontmatter_name),
+        'changes_made': changes_made,
+        'reason': 'Updated successfully'
+    }
+
+
+def _compiled_operation(operation: Dict[str, Any], context: Optional[EvaluationContext]) -> Callable[[Any], Any]:
+    """Return the compiled form of an operation, compiling it once per run (see compile_operation)."""
+    if context is None:
+        return compile_operation(operation)
+    try:
+        key = tuple(operation.items())
+        compiled = context.operations.get(key)
+    except TypeError:
+        # Operands that cannot be a cache key are compiled every time
+        return compile_operation(operation, context)
+    if compiled is None:
+        compiled = context.operations[key] = compile_operation(operation, context)
+    return compiled
+
+
+def _render_file(
+    frontmatter_data: Dict[str, Any],
+    original_content: str,
+    format_type: str,
+    changed_fields: List[str]
+) -> str:
+    """
+    Build the text of a file with updated frontmatter.
+    
+    Only the changed fields are rewritten where possible, keeping the rest of
+    the original text byte-identical; otherwise the whole header is re-dumped
+    with the line endings of the file's first line.
+    
+    Args:
+        frontmatter_data: Updated frontmatter dictionary
+        original_content: Original text of the file, with its line endings
+        format_type: Format type
+        changed_fields: Names of the fields that changed
+    
+    Returns:
+        New text of the file
+    """
+    if format_type != 'yaml':
+        # For other formats, this would need additional implementation
+        return original_content
+    
+    spliced = splice_frontmatter(original_content, frontmatter_data, changed_fields)
+    if spliced is not None:
+        return spliced
+    
+    first_line_end = original_content.find('\n')
+    newline = '\r\n' if first_line_end > 0 and original_content[first_line_end - 1] == '\r' else '\n'
+    new_frontmatter = yaml.dump(frontmatter_data, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    new_frontmatter = new_frontmatter.replace('\n', newline)
+    if extract_header(original_content, format_type) is not None:
+        # Replace the existing frontmatter, keeping the content after it
+        return f"---{newline}{new_frontmatter}---{newline}{extract_content(original_content, format_type)}"
+    # No frontmatter originally, add it
+    return f"---{newline}{new_frontmatter}---{newline}{original_content}"
 
 
 def update_and_output(
@@ -881,7 +919,15 @@ def update_and_output(
     frontmatter_name: str,
     operations: List[Dict[str, Any]],
     deduplication: bool = True,
-    format_type: str = "yaml"
+    format_type: str = "yaml",
+    durability: str = DEFAULT_DURABILITY,
+    jobs: int = 1,
+    journal_file: Optional[str] = None,
+    disk_budget: Optional[int] = None,
+    now: Optional[str] = None,
+    write_queue: int = DEFAULT_WRITE_QUEUE,
+    where: Optional[List[str]] = None,
+    where_ignore_case: bool = False
 ):
     """
     Update frontmatter and output results.
@@ -892,16 +938,91 @@ def update_and_output(
         operations: List of update operations to apply
         deduplication: Whether to deduplicate array values
         format_type: Format type (default: 'yaml')
+        durability: How written files are synced to disk: 'none', 'file' or 'batch'
+        jobs: Number of worker processes updating files in parallel (default: 1)
+        journal_file: If given, update transactionally: every file is written, or
+                      none if any fails, and the journal records how to roll back
+        disk_budget: Optional limit, in bytes, on the staged files and backups of
+                     a transactional update
+        now: Timestamp returned by now() for every file (default: the time the update starts)
+        write_queue: Number of files waiting to be written by a background thread;
+                     0 writes each file before going on
+        where: Conditions a file must all meet to be updated (see update_frontmatter)
+        where_ignore_case: Whether the where conditions ignore case
     """
-    results = update_frontmatter(patterns, frontmatter_name, operations, deduplication, format_type)
+    updates = [{'name': frontmatter_name, 'operations': operations, 'deduplication': deduplication}]
+    update_fields_and_output(
+        patterns, updates, format_type, durability, jobs, journal_file, disk_budget, now, write_queue,
+        where, where_ignore_case
+    )
+
+
+def update_fields_and_output(
+    patterns: List[str],
+    updates: List[Dict[str, Any]],
+    format_type: str = "yaml",
+    durability: str = DEFAULT_DURABILITY,
+    jobs: int = 1,
+    journal_file: Optional[str] = None,
+    disk_budget: Optional[int] = None,
+    now: Optional[str] = None,
+    write_queue: int = DEFAULT_WRITE_QUEUE,
+    where: Optional[List[str]] = None,
+    where_ignore_case: bool = False
+):
+    """
+    Update several frontmatter fields in one pass and output results.
+    
+    Args:
+        patterns: List of glob patterns or file paths
+        updates: List of field updates, as for update_frontmatter_fields
+        format_type: Format type (default: 'yaml')
+        durability: How written files are synced to disk: 'none', 'file' or 'batch'
+        jobs: Number of worker processes updating files in parallel (default: 1)
+        journal_file: If given, update transactionally: every file is written, or
+                      none if any fails, and the journal records how to roll back
+        disk_budget: Optional limit, in bytes, on the staged files and backups of
+                     a transactional update
+        now: Timestamp returned by now() for every file (default: the time the update starts)
+        write_queue: Number of files waiting to be written by a background thread;
+                     0 writes each file before going on
+        where: Conditions a file must all meet to be updated (see update_frontmatter)
+        where_ignore_case: Whether the where conditions ignore case
+    """
+    context = EvaluationContext(now)
+    where_clauses = [WhereClause(expression, where_ignore_case) for expression in where or []]
+    files = _unique_files(get_files_from_patterns(patterns))
+    results = _update_files(
+        files, updates, format_type, durability, jobs, journal_file, disk_budget, context, write_queue, where_clauses
+    )
     
     # Output results to console
     for result in results:
         file_path = result['file_path']
+        frontmatter_name = result['field']
         changes_made = result['changes_made']
         reason = result['reason']
         
         if changes_made:
             print(f"{file_path}: Updated '{frontmatter_name}' - {reason}")
         else:
-            print(f"{file_path}: No changes to '{frontmatter_name}' - {reason}")
\ No newline at end of file
+            print(f"{file_path}: No changes to '{frontmatter_name}' - {reason}")
+    
+    updated = {result['file_path'] for result in results if result['changes_made']}
+    failed = {result['file_path'] for result in results if result['reason'].startswith(ERROR_REASONS)}
+    skipped = {result['file_path'] for result in results if result['reason'] == WHERE_SKIPPED_REASON}
+    aborted = {
+        result['file_path'] for result in results
+        if result['reason'].startswith(TRANSACTION_ABORTED_REASON) and result['file_path'] not in failed
+    }
+    unchanged = len(files) - len(updated) - len(failed) - len(skipped) - len(aborted)
+    summary = f"{len(updated)} file(s) updated, {unchanged} unchanged"
+    if skipped:
+        summary += f", {len(skipped)} skipped"
+    if aborted:
+        summary += f", {len(aborted)} not written"
+    if failed:
+        summary += f", {len(failed)} failed"
+    print(summary)
+    if journal_file and updated:
+        print(f"Journal: {journal_file} (undo with: fmu rollback {journal_file})")
@@ -3,270 +3,793 @@ Validation functionality for frontmatter in files.
 """
 
 import csv
+import itertools
+import os
 import re
-from typing import List, Dict, Any, Optional, Tuple, Union
-from .core import parse_file, get_files_from_patterns
+from typing import List, Dict, Any, Optional, Tuple, Callable, Iterator
+from .core import parse_file, iter_files_from_patterns, FrontmatterKeys
+from .duplicates import DuplicateCollector, DEFAULT_MEMORY_BUDGET, iter_field_values
+from .formulas import evaluate_formula
+from .schema import load_schema_validator, iter_schema_failures, SchemaValidator
+from .validation_cache import ValidationCache, ruleset_hash
+from .reporters import ValidationReporter, create_reporters
+
+# Number of other files listed in a uniqueness failure before the rest are summarized
+UNIQUE_MAX_LISTED = 3
+
+# A compiled rule checks whether its field is present in a file and the field's
+# value, and returns a failure reason or None
+RuleCheck = Callable[[bool, Any], Optional[str]]
+
+# A failure followed by the index of the rule that produced it, None if no rule did
+TaggedFailure = Tuple[str, str, Any, str, Optional[int]]
+
+# Loaded vocabularies by (absolute path, ignore_case), with the (mtime_ns, size) they were read from
+_VOCABULARY_CACHE: Dict[Tuple[str, bool], Tuple[Tuple[int, int], frozenset]] = {}
 
 
 def validate_frontmatter(
     patterns: List[str],
     validations: List[Dict[str, Any]],
     ignore_case: bool = False,
-    format_type: str = "yaml"
+    format_type: str = "yaml",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    max_failures: Optional[int] = None,
+    max_failures_per_file: Optional[int] = None,
+    cache_file: Optional[str] = None
 ) -> List[Tuple[str, str, Any, str]]:
     """
     Validate frontmatter in files matching glob patterns.
     
+    Per-file rules are reported file by file, followed by the failures of any
+    'schema' rules. Failures of 'unique' rules, which can only be decided once
+    every file has been read, are reported after all files.
+    
     Args:
         patterns: List of glob patterns or file paths
         validations: List of validation rules
         ignore_case: Whether to perform case-insensitive matching
         format_type: The format of the frontmatter
+        memory_budget: Maximum number of values held in memory per 'unique' rule
+        max_failures: Optional number of failures after which validation stops;
+                      no further files are discovered or parsed
+        max_failures_per_file: Optional maximum number of rule failures reported per file
+        cache_file: Optional path to a validation cache; files unchanged since they were
+                    validated with the same rules are not parsed again
         
     Returns:
         List of tuples (file_path, field_name, field_value, failure_reason) for failed validations
+        
+    Raises:
+        ValueError: If a rule has an invalid regex pattern, or a schema is missing or invalid
     """
-    failures = []
-    files = get_files_from_patterns(patterns)
+    failures = iter_validation_failures(
+        patterns, validations, ignore_case, format_type, memory_budget, max_failures_per_file, cache_file
+    )
+    try:
+        return list(itertools.islice(failures, max_failures))
+    finally:
+        failures.close()
+
+
+def iter_validation_failures(
+    patterns: List[str],
+    validations: List[Dict[str, Any]],
+    ignore_case: bool = False,
+    format_type: str = "yaml",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    max_failures_per_file: Optional[int] = None,
+    cache_file: Optional[str] = None
+) -> Iterator[Tuple[str, str, Any, str]]:
+    """
+    Lazily validate frontmatter, yielding failures as files are checked.
     
-    for file_path in files:
-        try:
-            frontmatter, _ = parse_file(file_path, format_type)
-            if frontmatter is None:
-                frontmatter = {}
-                
-            # Apply each validation rule
-            for validation in validations:
-                validation_type = validation['type']
-                field_name = validation['field']
-                
-                if validation_type == 'exist':
-                    failure = _validate_exist(frontmatter, field_name, ignore_case)
-                elif validation_type == 'not':
-                    failure = _validate_not_exist(frontmatter, field_name, ignore_case)
-                elif validation_type == 'eq':
-                    failure = _validate_equal(frontmatter, field_name, validation['value'], ignore_case)
-                elif validation_type == 'ne':
-                    failure = _validate_not_equal(frontmatter, field_name, validation['value'], ignore_case)
-                elif validation_type == 'contain':
-                    failure = _validate_contain(frontmatter, field_name, validation['value'], ignore_case)
-                elif validation_type == 'not-contain':
-                    failure = _validate_not_contain(frontmatter, field_name, validation['value'], ignore_case)
-                elif validation_type == 'match':
-                    failure = _validate_match(frontmatter, field_name, validation['regex'], ignore_case)
-                elif validation_type == 'not-match':
-                    failure = _validate_not_match(frontmatter, field_name, validation['regex'], ignore_case)
-                elif validation_type == 'not-empty':
-                    failure = _validate_not_empty(frontmatter, field_name, ignore_case)
-                elif validation_type == 'list-size':
-                    failure = _validate_list_size(frontmatter, field_name, validation['min'], validation['max'], ignore_case)
-                else:
-                    continue
-                    
-                if failure:
-                    field_value = _get_field_value(frontmatter, field_name, ignore_case)
-                    failures.append((file_path, field_name, field_value, failure))
-                    
-        except ValueError as e:
-            # YAML parsing error or file encoding error - report as validation failure
-            error_msg = str(e)
-            # If the error message already starts with the prefix, use it as-is
-            # Otherwise, add the prefix to make it clear this is a YAML/frontmatter issue
-            if not error_msg.startswith("Invalid YAML frontmatter:"):
-                failure_reason = f"Invalid YAML frontmatter: {error_msg}"
-            else:
-                failure_reason = error_msg
-            failures.append((file_path, "frontmatter", None, failure_reason))
-        except FileNotFoundError as e:
-            # For file not found errors, report as validation failure
-            failure_reason = f"File error: {str(e)}"
-            failures.append((file_path, "file", None, failure_reason))
-            
-    return failures
+    Files are discovered and parsed only as failures are consumed, so a caller
+    that stops iterating stops all further work. Rules are compiled before
+    this function returns; the target indexes of 'references' rules are built
+    in a first pass when the first failure is requested.
+    
+    Args:
+        patterns: List of glob patterns or file paths
+        validations: List of validation rules
+        ignore_case: Whether to perform case-insensitive matching
+        format_type: The format of the frontmatter
+        memory_budget: Maximum number of values held in memory per 'unique' rule
+        max_failures_per_file: Optional maximum number of rule failures reported per file
+        cache_file: Optional path to a validation cache. It is not used when there are
+                    'references' rules, whose results depend on other files
+        
+    Returns:
+        Generator of tuples (file_path, field_name, field_value, failure_reason)
+        
+    Raises:
+        ValueError: If a rule has an invalid regex pattern, or a schema is missing or invalid
+    """
+    failures = _compile_failures(
+        patterns, validations, ignore_case, format_type, memory_budget, max_failures_per_file, cache_file
+    )
+    return _untagged(failures)
 
 
-def _get_field_value(frontmatter: Dict[str, Any], field_name: str, ignore_case: bool) -> Any:
-    """Get the value of a field from frontmatter, handling case sensitivity."""
-    if ignore_case:
-        for fm_name, fm_value in frontmatter.items():
-            if fm_name.lower() == field_name.lower():
-                return fm_value
-    else:
-        return frontmatter.get(field_name)
-    return None
+def _untagged(failures: Iterator[TaggedFailure]) -> Iterator[Tuple[str, str, Any, str]]:
+    """Drop the rule index from tagged failures, closing them when stopped early."""
+    try:
+        for failure in failures:
+            yield failure[:4]
+    finally:
+        failures.close()
 
 
-def _validate_exist(frontmatter: Dict[str, Any], field_name: str, ignore_case: bool) -> Optional[str]:
-    """Validate that a field exists."""
-    if ignore_case:
-        existing_fields = [name.lower() for name in frontmatter.keys()]
-        if field_name.lower() not in existing_fields:
-            return f"Field '{field_name}' does not exist"
-    else:
-        if field_name not in frontmatter:
-            return f"Field '{field_name}' does not exist"
-    return None
+def _compile_failures(
+    patterns: List[str],
+    validations: List[Dict[str, Any]],
+    ignore_case: bool,
+    format_type: str,
+    memory_budget: int,
+    max_failures_per_file: Optional[int],
+    cache_file: Optional[str],
+    files: Optional[Iterator[str]] = None
+) -> Iterator[TaggedFailure]:
+    """Compile the rules and return the tagged failure generator, checking files if given instead of patterns."""
+    reference_indexes = []
+    plan = _compile_plan(validations, ignore_case, reference_indexes)
+    schemas = [
+        (rule, load_schema_validator(validation['schema']))
+        for rule, validation in enumerate(validations) if validation['type'] == 'schema'
+    ]
+    unique_fields = [
+        (rule, validation['field']) for rule, validation in enumerate(validations) if validation['type'] == 'unique'
+    ]
+    cache = None
+    if cache_file and not reference_indexes:
+        cache = (ValidationCache(cache_file), ruleset_hash(validations, ignore_case, format_type, max_failures_per_file))
+    return _iter_failures(
+        patterns, plan, schemas, unique_fields, reference_indexes, ignore_case, format_type, memory_budget,
+        max_failures_per_file, cache, files
+    )
 
 
-def _validate_not_exist(frontmatter: Dict[str, Any], field_name: str, ignore_case: bool) -> Optional[str]:
-    """Validate that a field does not exist."""
-    if ignore_case:
-        existing_fields = [name.lower() for name in frontmatter.keys()]
-        if field_name.lower() in existing_fields:
-            return f"Field '{field_name}' should not exist"
-    else:
-        if field_name in frontmatter:
-            return f"Field '{field_name}' should not exist"
-    return None
+class _FileCursor:
+    """Iterator over file paths that can tell whether any are left without skipping them."""
+    
+    _END = object()
+    
+    def __init__(self, files: Iterator[str]):
+        self._files = files
+        self._next: Any = None
+    
+    def __iter__(self) -> '_FileCursor':
+        return self
+    
+    def __next__(self) -> str:
+        if self._next is None:
+            return next(self._files)
+        file_path, self._next = self._next, None
+        if file_path is self._END:
+            raise StopIteration
+        return file_path
+    
+    def has_more(self) -> bool:
+        """Whether another file follows, reading at most one path ahead."""
+        if self._next is None:
+            self._next = next(self._files, self._END)
+        return self._next is not self._END
 
 
-def _validate_equal(frontmatter: Dict[str, Any], field_name: str, expected_value: str, ignore_case: bool) -> Optional[str]:
-    """Validate that a field equals the expected value."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
+def _iter_failures(
+    patterns: List[str],
+    plan: List[Tuple[int, str, RuleCheck]],
+    schemas: List[Tuple[int, SchemaValidator]],
+    unique_fields: List[Tuple[int, str]],
+    reference_indexes: List['ReferenceIndex'],
+    ignore_case: bool,
+    format_type: str,
+    memory_budget: int,
+    max_failures_per_file: Optional[int],
+    cache: Optional[Tuple[ValidationCache, str]] = None,
+    files: Optional[Iterator[str]] = None
+) -> Iterator[TaggedFailure]:
+    """
+    Apply a compiled plan to each file in turn, yielding failures.
     
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for equality check)"
+    Each failure is tagged with the index of the rule that produced it, or
+    None for files that cannot be read or parsed.
+    """
+    # Cross-file 'references' rules need their target values before any file is checked
+    for index in reference_indexes:
+        index.build(patterns, format_type)
     
-    field_str = str(field_value)
-    if ignore_case:
-        if field_str.lower() != expected_value.lower():
-            return f"Field '{field_name}' value '{field_str}' does not equal '{expected_value}'"
-    else:
-        if field_str != expected_value:
-            return f"Field '{field_name}' value '{field_str}' does not equal '{expected_value}'"
-    return None
+    # Each distinct field is looked up once per file and shared by all of its rules
+    plan_fields = list(dict.fromkeys(field_name for _, field_name, _ in plan))
+    unique_collectors = [
+        (rule, field_name, DuplicateCollector(ignore_case, memory_budget)) for rule, field_name in unique_fields
+    ]
+    
+    try:
+        for file_path in files if files is not None else iter_files_from_patterns(patterns):
+            if cache is not None:
+                cached = cache[0].lookup(file_path, cache[1])
+                if cached is not None:
+                    cached_failures, unique_values = cached
+                    for field_name, field_value, failure, rule in cached_failures:
+                        yield (file_path, field_name, field_value, failure, rule)
+                    for _, field_name, collector in unique_collectors:
+                        if field_name in unique_values:
+                            collector.add(file_path, field_name, unique_values[field_name])
+                    continue
+            
+            # Failures of this file, recorded for the cache as they are yielded
+            file_results = []
+            try:
+                frontmatter, _ = parse_file(file_path, format_type)
+            except ValueError as e:
+                # YAML parsing error or file encoding error - report as validation failure
+                error_msg = str(e)
+                # If the error message already starts with the prefix, use it as-is
+                # Otherwise, add the prefix to make it clear this is a YAML/frontmatter issue
+                if not error_msg.startswith("Invalid YAML frontmatter:"):
+                    failure_reason = f"Invalid YAML frontmatter: {error_msg}"
+                else:
+                    failure_reason = error_msg
+                yield (file_path, "frontmatter", None, failure_reason, None)
+                if cache is not None:
+                    cache[0].store(file_path, cache[1], [("frontmatter", None, failure_reason, None)], {})
+                continue
+            except FileNotFoundError as e:
+                # For file not found errors, report as validation failure
+                failure_reason = f"File error: {str(e)}"
+                yield (file_path, "file", None, failure_reason, None)
+                continue
+            
+            # Case-folded key lookups are built once per file and shared by all rules
+            keys = FrontmatterKeys(frontmatter)
+            resolved = {field_name: _resolve_field(keys, field_name, ignore_case) for field_name in plan_fields}
+            
+            # Apply each compiled validation rule, in rule order, then any schemas
+            for rule, field_name, check in plan:
+                present, field_value = resolved[field_name]
+                failure = check(present, field_value)
+                if failure:
+                    yield (file_path, field_name, field_value, failure, rule)
+                    file_results.append((field_name, field_value, failure, rule))
+                    if len(file_results) == max_failures_per_file:
+                        break
+            for rule, schema in schemas:
+                if len(file_results) == max_failures_per_file:
+                    break
+                for field_name, field_value, failure in iter_schema_failures(schema, keys.frontmatter):
+                    yield (file_path, field_name, field_value, failure, rule)
+                    file_results.append((field_name, field_value, failure, rule))
+                    if len(file_results) == max_failures_per_file:
+                        break
+            
+            unique_values = {}
+            for _, field_name, collector in unique_collectors:
+                field_key = keys.find(field_name, ignore_case)
+                if field_key is not None:
+                    unique_values[field_name] = frontmatter[field_key]
+                    collector.add(file_path, field_name, frontmatter[field_key])
+            
+            if cache is not None:
+                cache[0].store(file_path, cache[1], file_results, unique_values)
+        
+        for rule, field_name, collector in unique_collectors:
+            yield from _unique_failures(collector, field_name, rule)
+    finally:
+        # Delete any spilled runs if iteration was stopped early
+        for _, _, collector in unique_collectors:
+            collector.close()
+        # Keep the results of the files validated so far, even if iteration was stopped early
+        if cache is not None and cache[0].dirty:
+            try:
+                cache[0].save()
+            except OSError:
+                pass
 
 
-def _validate_not_equal(frontmatter: Dict[str, Any], field_name: str, expected_value: str, ignore_case: bool) -> Optional[str]:
-    """Validate that a field does not equal the expected value."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
-    
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for non-equality check)"
-    
-    field_str = str(field_value)
-    if ignore_case:
-        if field_str.lower() == expected_value.lower():
-            return f"Field '{field_name}' value '{field_str}' should not equal '{expected_value}'"
-    else:
-        if field_str == expected_value:
-            return f"Field '{field_name}' value '{field_str}' should not equal '{expected_value}'"
-    return None
+def _unique_failures(collector: DuplicateCollector, field_name: str, rule: int) -> List[TaggedFailure]:
+    """Report every file sharing a value of a field with another file."""
+    failures = []
+    for _, entries in collector.duplicates():
+        # Entries have distinct paths, so one more than the listed count always
+        # leaves enough paths once the current file is excluded
+        head = [file_path for file_path, _, _ in entries[:UNIQUE_MAX_LISTED + 1]]
+        more = len(entries) - 1 - UNIQUE_MAX_LISTED
+        for file_path, _, value in entries:
+            listed = ', '.join([path for path in head if path != file_path][:UNIQUE_MAX_LISTED])
+            if more > 0:
+                listed += f" and {more} more"
+            failures.append((
+                file_path, field_name, value,
+                f"Field '{field_name}' value '{value}' is not unique (also in: {listed})", rule
+            ))
+    return failures
 
 
-def _validate_contain(frontmatter: Dict[str, Any], field_name: str, expected_value: str, ignore_case: bool) -> Optional[str]:
-    """Validate that an array field contains the expected value."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
-    
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for contain check)"
-    
-    if not isinstance(field_value, list):
-        return f"Field '{field_name}' is not an array (required for contain check)"
+def compile_validations(
+    validations: List[Dict[str, Any]],
+    ignore_case: bool = False,
+    reference_indexes: Optional[List['ReferenceIndex']] = None
+) -> List[Tuple[str, RuleCheck]]:
+    """
+    Compile validation rules into checks that can be applied to many files.
     
-    for item in field_value:
-        item_str = str(item)
-        if ignore_case:
-            if item_str.lower() == expected_value.lower():
-                return None
-        else:
-            if item_str == expected_value:
-                return None
+    Regex patterns are compiled and constants are case-folded once here rather
+    than for every file. Each check is called with whether the rule's field is
+    present in a file and its value (None if absent), so a field checked by
+    several rules only needs to be looked up once. Rule types that are not
+    checked per file (such as 'unique') or unknown rule types are left out.
     
-    return f"Field '{field_name}' array does not contain '{expected_value}'"
+    Args:
+        validations: List of validation rules
+        ignore_case: Whether to perform case-insensitive matching
+        reference_indexes: Optional list that receives the ReferenceIndex objects
+                           used by 'references' rules; they must be built before
+                           those checks are called. Rules with the same target
+                           share one index
+        
+    Returns:
+        List of tuples (field_name, check) in rule order
+        
+    Raises:
+        ValueError: If a rule has an invalid regex pattern or a missing vocabulary file
+    """
+    return [(field_name, check) for _, field_name, check in _compile_plan(validations, ignore_case, reference_indexes)]
 
 
-def _validate_not_contain(frontmatter: Dict[str, Any], field_name: str, expected_value: str, ignore_case: bool) -> Optional[str]:
-    """Validate that an array field does not contain the expected value."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
-    
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for not-contain check)"
-    
-    if not isinstance(field_value, list):
-        return f"Field '{field_name}' is not an array (required for not-contain check)"
-    
-    for item in field_value:
-        item_str = str(item)
-        if ignore_case:
-            if item_str.lower() == expected_value.lower():
-                return f"Field '{field_name}' array should not contain '{expected_value}'"
-        else:
-            if item_str == expected_value:
-                return f"Field '{field_name}' array should not contain '{expected_value}'"
-    
-    return None
+def _compile_plan(
+    validations: List[Dict[str, Any]],
+    ignore_case: bool,
+    reference_indexes: Optional[List['ReferenceIndex']]
+) -> List[Tuple[int, str, RuleCheck]]:
+    """Compile validation rules into (rule index, field_name, check) tuples in rule order."""
+    plan = []
+    indexes = {}
+    for rule, validation in enumerate(validations):
+        if validation['type'] == 'references':
+            target = (validation['target_field'], tuple(validation.get('target_patterns') or ()))
+            if target not in indexes:
+                indexes[target] = ReferenceIndex(target[0], list(target[1]) or None, ignore_case)
+            plan.append((rule, validation['field'], _compile_references(validation, indexes[target], ignore_case)))
+            continue
+        compiler = _RULE_COMPILERS.get(validation['type'])
+        if compiler is not None:
+            plan.append((rule, validation['field'], compiler(validation, ignore_case)))
+    if reference_indexes is not None:
+        reference_indexes.extend(indexes.values())
+    return plan
 
 
-def _validate_match(frontmatter: Dict[str, Any], field_name: str, regex_pattern: str, ignore_case: bool) -> Optional[str]:
-    """Validate that a field matches the regex pattern."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
-    
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for regex match)"
+class ReferenceIndex:
+    """
+    Set of the values of a target field across target files.
     
-    field_str = str(field_value)
-    flags = re.IGNORECASE if ignore_case else 0
+    Only the distinct target values are kept, so memory is bounded by the
+    number of target keys rather than by the size of the frontmatter.
+    """
     
+    def __init__(self, target_field: str, target_patterns: Optional[List[str]] = None, ignore_case: bool = False):
+        """
+        Args:
+            target_field: Field holding the target values, or a formula such as
+                          '=basename($filepath)' evaluated for each target file
+            target_patterns: Patterns of the target files; None means the files being validated
+            ignore_case: Whether to match field names and values case-insensitively
+        """
+        self.target_field = target_field
+        self.target_patterns = target_patterns
+        self.ignore_case = ignore_case
+        self.values = None
+    
+    def build(self, patterns: List[str], format_type: str = "yaml") -> None:
+        """
+        Collect the target values in one streaming pass over the target files.
+        
+        Files that cannot be parsed, and formulas that fail, are skipped.
+        
+        Args:
+            patterns: Patterns of the files being validated, used if no target patterns were given
+            format_type: The format of the frontmatter
+        """
+        is_formula = self.target_field.startswith(('$', '='))
+        values = set()
+        for file_path in iter_files_from_patterns(self.target_patterns or patterns):
+            try:
+                # Invalid frontmatter and encoding errors are ValueErrors, as in validation
+                frontmatter, content = parse_file(file_path, format_type)
+            except (FileNotFoundError, ValueError):
+                continue
+            if is_formula:
+                try:
+                    target_value = evaluate_formula(self.target_field, file_path, frontmatter, content)
+                except ValueError:
+                    # Unknown functions and invalid parameters
+                    continue
+            else:
+                target_value = FrontmatterKeys(frontmatter).get(self.target_field, self.ignore_case)
+            for item in iter_field_values(target_value):
+                values.add(_fold(str(item), self.ignore_case))
+        self.values = frozenset(values)
+    
+    def __contains__(self, value: Any) -> bool:
+        if self.values is None:
+            raise RuntimeError("ReferenceIndex.build() must be called before lookups")
+        return _fold(str(value), self.ignore_case) in self.values
+
+
+def _resolve_field(keys: FrontmatterKeys, field_name: str, ignore_case: bool) -> Tuple[bool, Any]:
+    """Look up a field once, returning whether it is present and its value."""
+    key = keys.find(field_name, ignore_case)
+    if key is None:
+        return False, None
+    return True, keys.frontmatter[key]
+
+
+def _fold(text: str, ignore_case: bool) -> str:
+    """Case-fold a string for comparison when matching case-insensitively, as FrontmatterKeys does for names."""
+    return text.casefold() if ignore_case else text
+
+
+def _item_strings(items: list, ignore_case: bool) -> set:
+    """Return the set of string forms of array items, for membership checks."""
+    return {_fold(str(item), ignore_case) for item in items}
+
+
+def _compile_regex(regex_pattern: str, ignore_case: bool):
+    """Compile a rule's regex pattern, reporting invalid patterns once."""
     try:
-        if not re.search(regex_pattern, field_str, flags):
-            return f"Field '{field_name}' value '{field_str}' does not match pattern '{regex_pattern}'"
+        return re.compile(regex_pattern, re.IGNORECASE if ignore_case else 0)
     except re.error as e:
-        return f"Invalid regex pattern '{regex_pattern}': {e}"
-    
-    return None
+        raise ValueError(f"Invalid regex pattern '{regex_pattern}': {e}")
 
 
-def _validate_not_match(frontmatter: Dict[str, Any], field_name: str, regex_pattern: str, ignore_case: bool) -> Optional[str]:
-    """Validate that a field does not match the regex pattern."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
+def _compile_exist(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field exists."""
+    field_name = validation['field']
     
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for regex non-match)"
-    
-    field_str = str(field_value)
-    flags = re.IGNORECASE if ignore_case else 0
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if not present:
+            return f"Field '{field_name}' does not exist"
+        return None
+    return check
+
+
+def _compile_not_exist(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field does not exist."""
+    field_name = validation['field']
     
-    try:
-        if re.search(regex_pattern, field_str, flags):
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if present:
+            return f"Field '{field_name}' should not exist"
+        return None
+    return check
+
+
+def _compile_equal(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field equals the expected value."""
+    field_name = validation['field']
+    expected_value = validation['value']
+    expected = _fold(expected_value, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for equality check)"
+        field_str = str(field_value)
+        if _fold(field_str, ignore_case) != expected:
+            return f"Field '{field_name}' value '{field_str}' does not equal '{expected_value}'"
+        return None
+    return check
+
+
+def _compile_not_equal(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field does not equal the expected value."""
+    field_name = validation['field']
+    expected_value = validation['value']
+    expected = _fold(expected_value, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for non-equality check)"
+        field_str = str(field_value)
+        if _fold(field_str, ignore_case) == expected:
+            return f"Field '{field_name}' value '{field_str}' should not equal '{expected_value}'"
+        return None
+    return check
+
+
+def _compile_contain(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that an array field contains the expected value."""
+    field_name = validation['field']
+    expected_value = validation['value']
+    expected = _fold(expected_value, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for contain check)"
+        if not isinstance(field_value, list):
+            return f"Field '{field_name}' is not an array (required for contain check)"
+        if expected not in _item_strings(field_value, ignore_case):
+            return f"Field '{field_name}' array does not contain '{expected_value}'"
+        return None
+    return check
+
+
+def _compile_not_contain(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that an array field does not contain the expected value."""
+    field_name = validation['field']
+    expected_value = validation['value']
+    expected = _fold(expected_value, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for not-contain check)"
+        if not isinstance(field_value, list):
+            return f"Field '{field_name}' is not an array (required for not-contain check)"
+        if expected in _item_strings(field_value, ignore_case):
+            return f"Field '{field_name}' array should not contain '{expected_value}'"
+        return None
+    return check
+
+
+def _compile_match(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field matches the regex pattern."""
+    field_name = validation['field']
+    regex_pattern = validation['regex']
+    compiled = _compile_regex(regex_pattern, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for regex match)"
+        field_str = str(field_value)
+        if not compiled.search(field_str):
+            return f"Field '{field_name}' value '{field_str}' does not match pattern '{regex_pattern}'"
+        return None
+    return check
+
+
+def _compile_not_match(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field does not match the regex pattern."""
+    field_name = validation['field']
+    regex_pattern = validation['regex']
+    compiled = _compile_regex(regex_pattern, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for regex non-match)"
+        field_str = str(field_value)
+        if compiled.search(field_str):
             return f"Field '{field_name}' value '{field_str}' should not match pattern '{regex_pattern}'"
-    except re.error as e:
-        return f"Invalid regex pattern '{regex_pattern}': {e}"
-    
-    return None
+        return None
+    return check
+
+
+def _compile_not_empty(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field is an array and has at least 1 value."""
+    field_name = validation['field']
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for not-empty check)"
+        if not isinstance(field_value, list):
+            return f"Field '{field_name}' is not an array (required for not-empty check)"
+        if len(field_value) == 0:
+            return f"Field '{field_name}' array is empty but should contain at least 1 value"
+        return None
+    return check
+
 
+def _compile_list_size(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that a field is an array with a count between min and max inclusively."""
+    field_name = validation['field']
+    min_size = validation['min']
+    max_size = validation['max']
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        if field_value is None:
+            return f"Field '{field_name}' does not exist (required for list-size check)"
+        if not isinstance(field_value, list):
+            return f"Field '{field_name}' is not an array (required for list-size check)"
+        actual_size = len(field_value)
+        if actual_size < min_size or actual_size > max_size:
+            return f"Field '{field_name}' array has {actual_size} items but should have between {min_size} and {max_size} items"
+        return None
+    return check
 
-def _validate_not_empty(frontmatter: Dict[str, Any], field_name: str, ignore_case: bool) -> Optional[str]:
-    """Validate that a field is an array and has at least 1 value."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
+
+def _compile_references(validation: Dict[str, Any], index: ReferenceIndex, ignore_case: bool) -> RuleCheck:
+    """Compile a check that every value of a field is a value of the target field."""
+    field_name = validation['field']
+    target = f"'{index.target_field}'"
+    if index.target_patterns:
+        target += f" in {', '.join(index.target_patterns)}"
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        # Absent fields are not references; combine with 'exist' to require them
+        missing = [str(item) for item in iter_field_values(field_value) if item not in index]
+        if missing:
+            listed = ', '.join(f"'{item}'" for item in missing)
+            return f"Field '{field_name}' references unknown {target} value(s): {listed}"
+        return None
+    return check
+
+
+def load_vocabulary(vocab_file: str, ignore_case: bool = False) -> frozenset:
+    """
+    Load a vocabulary file, reusing the loaded terms while the file is unchanged.
     
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for not-empty check)"
+    The file holds one term per line. Surrounding whitespace is stripped, and
+    blank lines and lines starting with '#' are skipped.
     
-    if not isinstance(field_value, list):
-        return f"Field '{field_name}' is not an array (required for not-empty check)"
+    Args:
+        vocab_file: Path to the vocabulary file
+        ignore_case: Whether terms are case-folded for case-insensitive lookups
+        
+    Returns:
+        Frozenset of terms
+        
+    Raises:
+        ValueError: If the vocabulary file is missing or unreadable
+    """
+    path = os.path.abspath(vocab_file)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise ValueError(f"Vocabulary file not found: {vocab_file}")
+    stat_key = (stat.st_mtime_ns, stat.st_size)
     
-    if len(field_value) == 0:
-        return f"Field '{field_name}' array is empty but should contain at least 1 value"
+    cached = _VOCABULARY_CACHE.get((path, ignore_case))
+    if cached is not None and cached[0] == stat_key:
+        return cached[1]
     
-    return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            terms = frozenset(
+                _fold(term, ignore_case)
+                for term in (line.strip() for line in f)
+                if term and not term.startswith('#')
+            )
+    except (OSError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid vocabulary file {vocab_file}: {e}")
+    _VOCABULARY_CACHE[(path, ignore_case)] = (stat_key, terms)
+    return terms
 
 
-def _validate_list_size(frontmatter: Dict[str, Any], field_name: str, min_size: int, max_size: int, ignore_case: bool) -> Optional[str]:
-    """Validate that a field is an array and has a count between min and max inclusively."""
-    field_value = _get_field_value(frontmatter, field_name, ignore_case)
-    
-    if field_value is None:
-        return f"Field '{field_name}' does not exist (required for list-size check)"
-    
-    if not isinstance(field_value, list):
-        return f"Field '{field_name}' is not an array (required for list-size check)"
-    
-    actual_size = len(field_value)
-    if actual_size < min_size or actual_size > max_size:
-        return f"Field '{field_name}' array has {actual_size} items but should have between {min_size} and {max_size} items"
+def _unknown_values(field_value: Any, vocabulary: frozenset, ignore_case: bool) -> List[str]:
+    """Return the values of a field (each array item, or the scalar) that are not in a vocabulary."""
+    return [
+        str(item) for item in iter_field_values(field_value)
+        if _fold(str(item), ignore_case) not in vocabulary
+    ]
+
+
+def _compile_in_vocab(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that every value of a field is in a vocabulary."""
+    field_name = validation['field']
+    vocab_file = validation['vocab']
+    vocabulary = load_vocabulary(vocab_file, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        # Absent fields have no values to check; combine with 'exist' to require them
+        unknown = _unknown_values(field_value, vocabulary, ignore_case)
+        if unknown:
+            listed = ', '.join(f"'{item}'" for item in unknown)
+            return f"Field '{field_name}' has value(s) not in vocabulary '{vocab_file}': {listed}"
+        return None
+    return check
+
+
+def _compile_not_in_vocab(validation: Dict[str, Any], ignore_case: bool) -> RuleCheck:
+    """Compile a check that no value of a field is in a vocabulary."""
+    field_name = validation['field']
+    vocab_file = validation['vocab']
+    vocabulary = load_vocabulary(vocab_file, ignore_case)
+    
+    def check(present: bool, field_value: Any) -> Optional[str]:
+        found = [
+            str(item) for item in iter_field_values(field_value)
+            if _fold(str(item), ignore_case) in vocabulary
+        ]
+        if found:
+            listed = ', '.join(f"'{item}'" for item in found)
+            return f"Field '{field_name}' has value(s) in excluded vocabulary '{vocab_file}': {listed}"
+        return None
+    return check
+
+
+# Rule type -> function compiling a rule of that type into a check
+_RULE_COMPILERS = {
+    'exist': _compile_exist,
+    'not': _compile_not_exist,
+    'eq': _compile_equal,
+    'ne': _compile_not_equal,
+    'contain': _compile_contain,
+    'not-contain': _compile_not_contain,
+    'match': _compile_match,
+    'not-match': _compile_not_match,
+    'not-empty': _compile_not_empty,
+    'list-size': _compile_list_size,
+    'in-vocab': _compile_in_vocab,
+    'not-in-vocab': _compile_not_in_vocab,
+}
+
+
+class UnknownValuesReporter(ValidationReporter):
+    """
+    Count the values rejected by 'in-vocab' rules and write them to a CSV report.
+    
+    The report is built from the failures as they are reported, so values of
+    files served from the validation cache are counted too. Each failure must
+    carry the index of the rule that produced it, as validate_and_output
+    passes; failures of other rules, or without an index, are not counted.
+    Values differing only in case are counted together when matching
+    case-insensitively.
+    """
     
-    return None
+    def __init__(self, report_file: str, validations: List[Dict[str, Any]], ignore_case: bool = False):
+        """
+        Args:
+            report_file: Path to the CSV report written on close
+            validations: List of validation rules; only 'in-vocab' rules are used
+            ignore_case: Whether matching is case-insensitive
+        
+        Raises:
+            ValueError: If a vocabulary file is missing or unreadable
+        """
+        self.report_file = report_file
+        self.ignore_case = ignore_case
+        # Rule index -> (vocab_file, vocabulary)
+        self._rules: Dict[int, Tuple[str, frozenset]] = {}
+        # (field_name, vocab_file) -> folded value -> [value as first seen, count]
+        self._counts: Dict[Tuple[str, str], Dict[str, list]] = {}
+        for rule, validation in enumerate(validations):
+            if validation['type'] == 'in-vocab':
+                self._rules[rule] = (validation['vocab'], load_vocabulary(validation['vocab'], ignore_case))
+    
+    def report(
+        self,
+        file_path: str,
+        field_name: str,
+        field_value: Any,
+        failure_reason: str,
+        rule: Optional[int] = None
+    ) -> None:
+        """
+        Count the unknown values of a failure.
+        
+        Args:
+            file_path: Path of the file that failed validation
+            field_name: Name of the frontmatter field
+            field_value: Value of the field, or None if it is absent
+            failure_reason: Description of the failure
+            rule: Index in validations of the rule that produced the failure
+        """
+        if rule not in self._rules:
+            return
+        vocab_file, vocabulary = self._rules[rule]
+        counts = self._counts.setdefault((field_name, vocab_file), {})
+        for value in _unknown_values(field_value, vocabulary, self.ignore_case):
+            entry = counts.setdefault(_fold(value, self.ignore_case), [value, 0])
+            entry[1] += 1
+    
+    def unknown_values(self) -> List[Tuple[str, str, str, int]]:
+        """
+        Return the unknown values counted so far.
+        
+        Returns:
+            List of tuples (field_name, vocab_file, value, count), most frequent first
+            for each rule
+        """
+        rows = []
+        for (field_name, vocab_file), counts in self._counts.items():
+            for value, count in sorted(counts.values(), key=lambda entry: (-entry[1], entry[0])):
+                rows.append((field_name, vocab_file, value, count))
+        return rows
+    
+    def close(self) -> None:
+        with open(self.report_file, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Front Matter Name', 'Vocabulary', 'Unknown Value', 'Count'])
+            writer.writerows(self.unknown_values())
 
 
 def output_validation_results(
@@ -280,20 +803,10 @@ def output_validation_results(
         failures: List of tuples (file_path, field_name, field_value, failure_reason)
         csv_file: Optional path to CSV file for output
     """
-    if csv_file:
-        # Output to CSV file
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            # Write header
-            writer.writerow(['File Path', 'Front Matter Name', 'Front Matter Value', 'Failure Reason'])
-            # Write results
-            for file_path, field_name, field_value, failure_reason in failures:
-                writer.writerow([file_path, field_name, field_value, failure_reason])
-    else:
-        # Output to console
-        for file_path, field_name, field_value, failure_reason in failures:
-            print(f"{file_path}:")
-            print(f"- \t{field_name}: {field_value} --> {failure_reason}")
+    for reporter in create_reporters(csv_file=csv_file):
+        with reporter:
+            for failure in failures:
+                reporter.report(*failure)
 
 
 def validate_and_output(
@@ -301,21 +814,70 @@ def validate_and_output(
     validations: List[Dict[str, Any]],
     ignore_case: bool = False,
     csv_file: Optional[str] = None,
-    format_type: str = "yaml"
+    format_type: str = "yaml",
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    max_failures: Optional[int] = None,
+    max_failures_per_file: Optional[int] = None,
+    cache_file: Optional[str] = None,
+    jsonl_file: Optional[str] = None,
+    junit_file: Optional[str] = None,
+    sarif_file: Optional[str] = None,
+    vocab_report: Optional[str] = None,
+    on_stop: Optional[Callable[[int], None]] = None
 ) -> int:
     """
     Validate frontmatter and output results.
     
+    Failures are passed to the reporters as they are found, so no output
+    format holds the full list of failures in memory. Results go to the
+    console unless at least one output file is given.
+    
     Args:
         patterns: List of glob patterns or file paths
         validations: List of validation rules
         ignore_case: Whether to perform case-insensitive matching
         csv_file: Optional path to CSV file for output
         format_type: The format of the frontmatter
+        memory_budget: Maximum number of values held in memory per 'unique' rule
+        max_failures: Optional number of failures after which validation stops
+        max_failures_per_file: Optional maximum number of rule failures reported per file
+        cache_file: Optional path to a validation cache
+        jsonl_file: Optional path to a JSON Lines file for output
+        junit_file: Optional path to a JUnit XML file for output
+        sarif_file: Optional path to a SARIF file for output
+        vocab_report: Optional path to a CSV file listing the values rejected by
+                      'in-vocab' rules, with their counts
+        on_stop: Called with the number of failures if validation stopped at
+                 max_failures while files were left unchecked
         
     Returns:
         Number of validation failures
+        
+    Raises:
+        ValueError: If a rule has an invalid regex pattern, or a schema is missing or invalid
     """
-    failures = validate_frontmatter(patterns, validations, ignore_case, format_type)
-    output_validation_results(failures, csv_file)
-    return len(failures)
\ No newline at end of file
+    files = _FileCursor(iter_files_from_patterns(patterns))
+    failures = _compile_failures(
+        patterns, validations, ignore_case, format_type, memory_budget, max_failures_per_file, cache_file, files
+    )
+    failure_count = 0
+    try:
+        reporters = create_reporters(csv_file, jsonl_file, junit_file, sarif_file)
+        unknown_values = UnknownValuesReporter(vocab_report, validations, ignore_case) if vocab_report else None
+        try:
+            for file_path, field_name, field_value, failure_reason, rule in itertools.islice(failures, max_failures):
+                for reporter in reporters:
+                    reporter.report(file_path, field_name, field_value, failure_reason)
+                if unknown_values is not None:
+                    unknown_values.report(file_path, field_name, field_value, failure_reason, rule)
+                failure_count += 1
+        finally:
+            for reporter in reporters:
+                reporter.close()
+            if unknown_values is not None:
+                unknown_values.close()
+    finally:
+        failures.close()
+    if on_stop is not None and failure_count == max_failures and files.has_more():
+        on_stop(failure_count)
+    return failure_count
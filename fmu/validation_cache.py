@@ -0,0 +1,262 @@
+"""
+Persistent cache of per-file validation results.
+"""
+
+import base64
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+# Bump when the cache layout or the validation semantics change so old results are discarded
+CACHE_VERSION = 3
+
+# Cache location used by the CLI when --cache-file is given without a path;
+# its directory is one of core.STATE_DIRS, so walks do not validate the cache
+DEFAULT_CACHE_FILE = '.fmu-cache/validate.json'
+
+# Rule type -> key of the file whose content the rule's results depend on
+_RULE_FILE_KEYS = {
+    'schema': 'schema',
+    'in-vocab': 'vocab',
+    'not-in-vocab': 'vocab',
+}
+
+
+def ruleset_hash(
+    validations: List[Dict[str, Any]],
+    ignore_case: bool,
+    format_type: str,
+    max_failures_per_file: Optional[int]
+) -> str:
+    """
+    Hash everything that determines the per-file results of a validation run.
+
+    Schema and vocabulary rules are hashed by the content of their files, so
+    editing a schema or vocabulary invalidates the results produced with it.
+
+    Args:
+        validations: List of validation rules
+        ignore_case: Whether matching is case-insensitive
+        format_type: The format of the frontmatter
+        max_failures_per_file: Optional cap on failures per file
+
+    Returns:
+        Hex digest identifying the ruleset
+    """
+    rules = []
+    for validation in validations:
+        rule = dict(validation)
+        file_key = _RULE_FILE_KEYS.get(rule.get('type'))
+        if file_key is not None:
+            with open(rule[file_key], 'rb') as f:
+                rule[file_key] = hashlib.sha256(f.read()).hexdigest()
+        rules.append(rule)
+
+    normalized = json.dumps({
+        'version': CACHE_VERSION,
+        'rules': rules,
+        'ignore_case': ignore_case,
+        'format': format_type,
+        'max_failures_per_file': max_failures_per_file
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+
+def _stat_key(file_path: str) -> Optional[List[int]]:
+    """Return the (mtime_ns, size) key used to detect changed files."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def _file_hash(file_path: str) -> Optional[str]:
+    """Return the sha256 of a file's bytes, or None if it cannot be read."""
+    try:
+        with open(file_path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _encode_value(value: Any) -> Any:
+    """Encode a frontmatter value as JSON, tagging the YAML types JSON lacks."""
+    if isinstance(value, datetime.datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'$bytes': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, list):
+        return [_encode_value(item) for item in value]
+    if isinstance(value, dict):
+        return {'$map': [[_encode_value(k), _encode_value(v)] for k, v in value.items()]}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    # Other YAML types (such as sets) are rare; they are cached as their string form
+    return str(value)
+
+
+def _decode_value(value: Any) -> Any:
+    """Decode a value encoded by _encode_value."""
+    if isinstance(value, list):
+        return [_decode_value(item) for item in value]
+    if isinstance(value, dict):
+        if '$datetime' in value:
+            return datetime.datetime.fromisoformat(value['$datetime'])
+        if '$date' in value:
+            return datetime.date.fromisoformat(value['$date'])
+        if '$bytes' in value:
+            return base64.b64decode(value['$bytes'])
+        return {_decode_value(k): _decode_value(v) for k, v in value['$map']}
+    return value
+
+
+class ValidationCache:
+    """
+    Per-file validation results keyed by file content and ruleset.
+
+    A file's results are reused while its (mtime_ns, size) is unchanged. When
+    the stat key changes, the file's sha256 is compared with the stored one,
+    so touched but unmodified files are still served from the cache. Results
+    are stored per ruleset hash, so changing the rules re-validates the files;
+    only the results of the rulesets used since the cache was loaded are saved.
+    """
+
+    def __init__(self, cache_file: str):
+        """
+        Load the cache file; a missing, unreadable or outdated file gives an empty cache.
+
+        Args:
+            cache_file: Path to the cache file
+        """
+        self.cache_file = cache_file
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        # Stat keys and hashes computed by lookup, reused when the results are stored
+        self._pending: Dict[str, Tuple[List[int], Optional[str]]] = {}
+        # Rulesets looked up or stored, whose results are kept on save
+        self._rulesets: Set[str] = set()
+
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == CACHE_VERSION:
+            self.files = data.get('files', {})
+
+    def lookup(
+        self,
+        file_path: str,
+        ruleset: str
+    ) -> Optional[Tuple[List[Tuple[str, Any, str, Optional[int]]], Dict[str, Any]]]:
+        """
+        Find the cached results of a file for a ruleset.
+
+        Args:
+            file_path: Path to the file
+            ruleset: Ruleset hash returned by ruleset_hash
+
+        Returns:
+            Tuple (failures, unique_values) where failures are (field_name,
+            field_value, failure_reason, rule) tuples, or None if the file must be validated
+        """
+        self._rulesets.add(ruleset)
+        stat_key = _stat_key(file_path)
+        if stat_key is None:
+            return None
+
+        entry = self.files.get(file_path)
+        if entry is not None and entry['stat'] != stat_key:
+            content_hash = _file_hash(file_path)
+            if content_hash is not None and content_hash == entry['sha256']:
+                entry['stat'] = stat_key
+                self.dirty = True
+            else:
+                # The content changed: results for every ruleset are stale
+                del self.files[file_path]
+                self.dirty = True
+                self._pending[file_path] = (stat_key, content_hash)
+                return None
+
+        if entry is None:
+            self._pending[file_path] = (stat_key, None)
+            return None
+
+        results = entry['results'].get(ruleset)
+        if results is None:
+            return None
+        failures = [
+            (field, _decode_value(value), reason, rule) for field, value, reason, rule in results['failures']
+        ]
+        unique_values = {field: _decode_value(value) for field, value in results['unique'].items()}
+        return failures, unique_values
+
+    def store(
+        self,
+        file_path: str,
+        ruleset: str,
+        failures: List[Tuple[str, Any, str, Optional[int]]],
+        unique_values: Dict[str, Any]
+    ) -> None:
+        """
+        Store the results of validating a file.
+
+        Args:
+            file_path: Path to the file
+            ruleset: Ruleset hash returned by ruleset_hash
+            failures: (field_name, field_value, failure_reason, rule) tuples in report order,
+                      rule being the index of the rule that produced the failure or None
+            unique_values: Values of the fields checked by 'unique' rules
+        """
+        self._rulesets.add(ruleset)
+        entry = self.files.get(file_path)
+        if entry is None:
+            stat_key, content_hash = self._pending.pop(file_path, (None, None))
+            if stat_key is None:
+                stat_key = _stat_key(file_path)
+            if content_hash is None:
+                content_hash = _file_hash(file_path)
+            if stat_key is None or content_hash is None:
+                return
+            entry = {'stat': stat_key, 'sha256': content_hash, 'results': {}}
+            self.files[file_path] = entry
+
+        entry['results'][ruleset] = {
+            'failures': [[field, _encode_value(value), reason, rule] for field, value, reason, rule in failures],
+            'unique': {field: _encode_value(value) for field, value in unique_values.items()}
+        }
+        self.dirty = True
+
+    def save(self) -> None:
+        """
+        Atomically write the cache file.
+
+        Entries for files that no longer exist are dropped, as are the results
+        of other rulesets, so the file does not grow with every rule change.
+        """
+        for file_path, entry in list(self.files.items()):
+            if self._rulesets:
+                entry['results'] = {
+                    ruleset: results for ruleset, results in entry['results'].items() if ruleset in self._rulesets
+                }
+            if not entry['results'] or not os.path.exists(file_path):
+                del self.files[file_path]
+
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.validate-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'files': self.files}, f, separators=(',', ':'))
+            os.replace(temp_path, self.cache_file)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self.dirty = False
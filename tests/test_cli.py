@@ -250,6 +250,84 @@ Line two""")
             self.assertIn(self.test_file, content)
             self.assertIn('title,Test Post', content)
     
+    def test_main_search_content(self):
+        """Test search command with --content and no --name."""
+        with patch('sys.argv', ['fmu', 'search', self.test_file, '--content', 'test content']):
+            output = self.capture_output(main)
+        self.assertIn(self.test_file, output)
+        self.assertIn('$content: test content', output)
+    
+    def test_main_search_requires_name_or_content(self):
+        """Test search command fails without --name or a content filter."""
+        with patch('sys.argv', ['fmu', 'search', self.test_file]):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 1)
+    
+    def test_cmd_search_exists(self):
+        """Test search --exists reports through the exit code only."""
+        captured = io.StringIO()
+        sys.stdout = captured
+        try:
+            found = cmd_search([self.test_file], 'author', 'Test Author', exists=True)
+            missing = cmd_search([self.test_file], 'author', 'Nobody', exists=True)
+        finally:
+            sys.stdout = sys.__stdout__
+        self.assertEqual(found, 0)
+        self.assertEqual(missing, 1)
+        self.assertEqual(captured.getvalue(), '')
+    
+    def test_main_search_exists_no_match_exits_nonzero(self):
+        """Test main exits with 1 when --exists finds nothing."""
+        with patch('sys.argv', ['fmu', 'search', self.test_file, '--name', 'missing', '--exists']):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 1)
+    
+    def test_main_search_first(self):
+        """Test search --first prints a single result."""
+        other_file = os.path.join(self.temp_dir, 'other.md')
+        with open(other_file, 'w') as f:
+            f.write("---\ntitle: Other Post\n---\n\nOther content.")
+        with patch('sys.argv', ['fmu', 'search', self.temp_dir, '--name', 'title', '--first']):
+            output = self.capture_output(main)
+        self.assertIn('title: Other Post', output)
+        self.assertNotIn('title: Test Post', output)
+    
+    def test_main_search_duplicates(self):
+        """Test search --duplicates lists files sharing a value and exits with 1."""
+        other_file = os.path.join(self.temp_dir, 'other.md')
+        with open(other_file, 'w') as f:
+            f.write("---\ntitle: Other Post\nauthor: Test Author\n---\n\nOther content.")
+        output = io.StringIO()
+        with patch('sys.argv', ['fmu', 'search', self.temp_dir, '--duplicates', 'author', '--memory-budget', '1']):
+            with patch('sys.stdout', output):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn(other_file, output.getvalue())
+        self.assertIn(self.test_file, output.getvalue())
+        self.assertEqual(output.getvalue().count('author: Test Author'), 2)
+    
+    def test_main_search_content_and_content_regex_rejected(self):
+        """Test that --content and --content-regex cannot be combined."""
+        with patch('sys.argv', ['fmu', 'search', self.temp_dir, '--content', 'hello', '--content-regex', 'moon']):
+            with patch('sys.stderr', io.StringIO()):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 2)
+    
+    def test_main_search_duplicates_rejects_limits(self):
+        """Test that --duplicates cannot be combined with --limit, --first or --exists."""
+        for extra in (['--limit', '1'], ['--first'], ['--exists']):
+            stderr = io.StringIO()
+            with patch('sys.argv', ['fmu', 'search', self.temp_dir, '--duplicates', 'author'] + extra):
+                with patch('sys.stdout', io.StringIO()), patch('sys.stderr', stderr):
+                    with self.assertRaises(SystemExit) as cm:
+                        main()
+            self.assertEqual(cm.exception.code, 1)
+            self.assertIn('--duplicates cannot be combined', stderr.getvalue())
+    
     @patch('sys.argv', ['fmu', 'version'])
     def test_main_version(self):
         """Test main function with version command."""
@@ -439,6 +517,76 @@ Test content for regex arrays.""")
         # CSV file should be created with the failure
         self.assertTrue(os.path.exists(csv_file))
     
+    def test_main_validate_invalid_regex_reported_once(self):
+        """Test that an invalid regex is reported once and exits with 1."""
+        stderr = io.StringIO()
+        with patch('sys.argv', ['fmu', 'validate', self.temp_dir, '--match', 'title', '[invalid']):
+            with patch('sys.stderr', stderr):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(stderr.getvalue().count("Invalid regex pattern '[invalid'"), 1)
+    
+    def test_main_validate_fail_fast(self):
+        """Test that --fail-fast reports a single failure and exits with 1."""
+        other_file = os.path.join(self.temp_dir, 'other.md')
+        with open(other_file, 'w') as f:
+            f.write("---\ntitle: Other Post\n---\n")
+        output = io.StringIO()
+        stderr = io.StringIO()
+        with patch('sys.argv', ['fmu', 'validate', self.temp_dir, '--exist', 'missing', '--fail-fast']):
+            with patch('sys.stdout', output), patch('sys.stderr', stderr):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(output.getvalue().count('does not exist'), 1)
+        self.assertIn('Stopped after 1 failure(s)', stderr.getvalue())
+    
+    def test_main_validate_fail_fast_on_last_file(self):
+        """Test that no early stop is reported when the last file produced the last failure."""
+        stderr = io.StringIO()
+        with patch('sys.argv', ['fmu', 'validate', self.temp_dir, '--exist', 'missing', '--fail-fast']):
+            with patch('sys.stdout', io.StringIO()), patch('sys.stderr', stderr):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertNotIn('Stopped after', stderr.getvalue())
+    
+    def test_main_validate_references(self):
+        """Test --references with a target pattern, and its argument count check."""
+        target_dir = os.path.join(self.temp_dir, 'authors')
+        os.makedirs(target_dir)
+        with open(os.path.join(target_dir, 'a.md'), 'w') as f:
+            f.write("---\nname: Test Author\n---\n")
+        with patch('sys.argv', ['fmu', 'validate', self.test_file, '--references', 'author', 'name', os.path.join(target_dir, '*.md')]):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 0)
+        
+        with patch('sys.argv', ['fmu', 'validate', self.test_file, '--references', 'author']):
+            with patch('sys.stderr', io.StringIO()) as stderr:
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn('--references requires FIELD TARGET_FIELD [TARGET_PATTERN]', stderr.getvalue())
+    
+    def test_main_validate_in_vocab(self):
+        """Test --in-vocab and --not-in-vocab with a vocabulary file."""
+        vocab_file = os.path.join(self.temp_dir, 'categories.txt')
+        with open(vocab_file, 'w') as f:
+            f.write("testing\nreference\n")
+        with patch('sys.argv', ['fmu', 'validate', self.test_file, '--in-vocab', 'category', vocab_file, '--no-cache']):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 0)
+        
+        with patch('sys.argv', ['fmu', 'validate', self.test_file, '--not-in-vocab', 'category', vocab_file, '--no-cache']):
+            with patch('sys.stdout', io.StringIO()) as output:
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("has value(s) in excluded vocabulary", output.getvalue())
+    
     def test_cmd_validate_returns_zero_with_csv_on_success(self):
         """Test cmd_validate returns zero when validations pass with CSV output."""
         validations = [
@@ -536,6 +684,32 @@ Test content.""")
             self.assertIn('"title": "Test Title"', content)
             self.assertIn('"tags": ["tag1", "tag2"]', content)
     
+    def test_cmd_read_individual_write_behind(self):
+        """Test that individual outputs are written in the background and write errors reported."""
+        folder1 = os.path.join(self.temp_dir, 'folder1')
+        folder2 = os.path.join(self.temp_dir, 'folder2')
+        os.makedirs(folder1)
+        os.makedirs(folder2)
+        # A file where the output directory should be makes the second output fail
+        with open(os.path.join(folder2, 'out'), 'w') as f:
+            f.write('')
+        files = []
+        for folder in (folder1, folder2):
+            file_path = os.path.join(folder, 'test.md')
+            with open(file_path, 'w') as f:
+                f.write("---\ntitle: Title\n---\nContent.")
+            files.append(file_path)
+        
+        for write_queue in (0, 4):
+            with patch('sys.stderr', new_callable=io.StringIO) as error:
+                cmd_read(files, 'frontmatter', True, 'yaml', False, None, os.path.join('out', 'output.txt'), True,
+                         write_queue=write_queue)
+            
+            with open(os.path.join(folder1, 'out', 'output.txt')) as f:
+                self.assertEqual(f.read(), "title: Title\n")
+            self.assertIn(f"Error: Cannot open file {os.path.join(folder2, 'out', 'output.txt')}", error.getvalue())
+            os.remove(os.path.join(folder1, 'out', 'output.txt'))
+    
     def test_cmd_read_without_individual_creates_single_file(self):
         """Test read command without individual option creates a single output file."""
         # Create two files in different directories
@@ -5,7 +5,10 @@ Unit tests for fmu core functionality.
 import unittest
 import tempfile
 import os
-from fmu.core import parse_frontmatter, extract_content, parse_file, get_files_from_patterns
+from fmu.core import (
+    parse_frontmatter, extract_content, parse_file, get_files_from_patterns,
+    iter_files_from_patterns, FrontmatterKeys
+)
 
 
 class TestCoreFunctionality(unittest.TestCase):
@@ -114,6 +117,62 @@ File content here.""")
             self.assertEqual(len(files), 2)
             self.assertIn(file1, files)
             self.assertIn(file2, files)
+    
+    def test_iter_files_from_patterns_sorted_and_deduplicated(self):
+        """Test lazy discovery yields sorted, unique paths across patterns."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = ['a-b.md', os.path.join('a', 'x.md'), 'b.md', os.path.join('a', 'c', 'y.md'), 'a.md']
+            for relative in paths:
+                full_path = os.path.join(temp_dir, relative)
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                with open(full_path, 'w') as f:
+                    f.write("test content")
+            
+            patterns = [temp_dir, os.path.join(temp_dir, 'b.md'), os.path.join(temp_dir, '*.md')]
+            files = list(iter_files_from_patterns(patterns))
+            
+            expected = sorted(os.path.join(temp_dir, relative) for relative in paths)
+            self.assertEqual(files, expected)
+            self.assertEqual(get_files_from_patterns(patterns), expected)
+    
+    def test_iter_files_from_patterns_is_lazy(self):
+        """Test that only the first directory is listed when iteration stops early."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ['one', 'two']:
+                os.makedirs(os.path.join(temp_dir, name))
+                with open(os.path.join(temp_dir, name, 'post.md'), 'w') as f:
+                    f.write("test content")
+            
+            from unittest.mock import patch
+            with patch('fmu.core.os.scandir', wraps=os.scandir) as scandir:
+                first = next(iter_files_from_patterns([temp_dir]))
+            
+            self.assertEqual(first, os.path.join(temp_dir, 'one', 'post.md'))
+            self.assertEqual(scandir.call_count, 2)
+
+    
+    def test_frontmatter_keys_lookup(self):
+        """Test case-sensitive and case-insensitive field lookups."""
+        keys = FrontmatterKeys({'Title': 'A', 'title': 'B', 'tags': ['x'], 1: 'one'})
+        
+        self.assertEqual(keys.find('title'), 'title')
+        self.assertIsNone(keys.find('TAGS'))
+        self.assertEqual(keys.find('TAGS', ignore_case=True), 'tags')
+        self.assertEqual(keys.find_all('TITLE', ignore_case=True), ['Title', 'title'])
+        self.assertEqual(keys.get('TITLE', ignore_case=True), 'A')
+        self.assertIsNone(keys.get('missing', ignore_case=True))
+    
+    def test_frontmatter_keys_map_built_once(self):
+        """Test that the case-folded key map is built at most once."""
+        keys = FrontmatterKeys({'Title': 'A', 'Author': 'B'})
+        
+        keys.find('title', ignore_case=True)
+        folded = keys._folded
+        keys.find('author', ignore_case=True)
+        keys.get('missing', ignore_case=True)
+        
+        self.assertIs(keys._folded, folded)
+        self.assertIsNone(FrontmatterKeys(None).find('title', ignore_case=True))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,227 @@
+"""
+Unit tests for fmu atomic file rewriting.
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import shutil
+import stat
+from unittest.mock import patch
+from fmu.fileio import AtomicWriter, WriteBehindWriter
+from fmu.update import update_frontmatter
+from fmu.cli import main
+
+
+class TestAtomicWriter(unittest.TestCase):
+    """Test AtomicWriter."""
+
+    def setUp(self):
+        """Set up a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'post.md')
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write("---\ntitle: Old\n---\n")
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def read(self, file_path=None):
+        with open(file_path or self.file_path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_write_replaces_content(self):
+        """Test that the file is replaced and no temporary file is left behind."""
+        with AtomicWriter() as writer:
+            writer.write(self.file_path, "---\ntitle: Новый\n---\n")
+
+        self.assertEqual(self.read(), "---\ntitle: Новый\n---\n")
+        self.assertEqual(os.listdir(self.temp_dir), ['post.md'])
+
+    @unittest.skipIf(os.name == 'nt', 'POSIX permission bits')
+    def test_write_preserves_mode(self):
+        """Test that the original's permission bits are kept."""
+        os.chmod(self.file_path, 0o640)
+
+        AtomicWriter().write(self.file_path, "new")
+
+        self.assertEqual(stat.S_IMODE(os.stat(self.file_path).st_mode), 0o640)
+
+    @unittest.skipIf(os.name == 'nt', 'POSIX permission bits')
+    def test_new_file_mode_leaves_umask_alone(self):
+        """Test that a new file gets 0o666 less the umask, without the umask being changed."""
+        umask = os.umask(0o027)
+        try:
+            with patch('fmu.fileio.os.umask', side_effect=AssertionError('umask changed')):
+                AtomicWriter().write(os.path.join(self.temp_dir, 'new.md'), "new")
+        finally:
+            os.umask(umask)
+
+        self.assertEqual(stat.S_IMODE(os.stat(os.path.join(self.temp_dir, 'new.md')).st_mode), 0o640)
+
+    @unittest.skipIf(os.name == 'nt', 'Symlinks need privileges on Windows')
+    def test_write_through_symlink(self):
+        """Test that a symlink is kept and its target is rewritten."""
+        link_path = os.path.join(self.temp_dir, 'link.md')
+        os.symlink(self.file_path, link_path)
+
+        AtomicWriter().write(link_path, "new")
+
+        self.assertTrue(os.path.islink(link_path))
+        self.assertEqual(self.read(), "new")
+
+    def test_failed_write_keeps_original(self):
+        """Test that a failure before the replace leaves the original intact."""
+        with patch('fmu.fileio.os.replace', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                AtomicWriter().write(self.file_path, "new")
+
+        self.assertEqual(self.read(), "---\ntitle: Old\n---\n")
+        self.assertEqual(os.listdir(self.temp_dir), ['post.md'])
+
+    def test_invalid_durability(self):
+        """Test that an unknown durability level is rejected."""
+        with self.assertRaises(ValueError) as cm:
+            AtomicWriter('always')
+        self.assertIn("Invalid durability 'always'", str(cm.exception))
+
+    def test_durability_none_does_not_sync(self):
+        """Test that nothing is synced by default."""
+        with patch('fmu.fileio.os.fsync') as fsync:
+            with AtomicWriter() as writer:
+                writer.write(self.file_path, "new")
+        fsync.assert_not_called()
+
+    def test_durability_file_syncs_each_write(self):
+        """Test that each file and its directory are synced as they are written."""
+        with patch('fmu.fileio.os.fsync') as fsync:
+            writer = AtomicWriter('file')
+            writer.write(self.file_path, "new")
+            self.assertEqual(fsync.call_count, 2)
+            writer.close()
+        self.assertEqual(fsync.call_count, 2)
+
+    def test_durability_batch_syncs_on_close(self):
+        """Test that files are synced once, when the writer is closed."""
+        other_path = os.path.join(self.temp_dir, 'other.md')
+        with patch('fmu.fileio.os.fsync') as fsync:
+            with AtomicWriter('batch') as writer:
+                writer.write(self.file_path, "new")
+                writer.write(other_path, "other")
+                fsync.assert_not_called()
+        # Two files and their shared directory
+        self.assertEqual(fsync.call_count, 3)
+        self.assertEqual(self.read(other_path), "other")
+
+
+class TestWriteBehindWriter(unittest.TestCase):
+    """Test WriteBehindWriter."""
+
+    def setUp(self):
+        """Set up a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_writes_in_order(self):
+        """Test that queued files are all written, in order, by the time it is closed."""
+        written = []
+        for queue_depth in (0, 1, 8):
+            del written[:]
+            with WriteBehindWriter(lambda file_path, text: written.append((file_path, text)), queue_depth) as writer:
+                for i in range(20):
+                    writer.write(f'{i}.md', str(i))
+            self.assertEqual(written, [(f'{i}.md', str(i)) for i in range(20)])
+
+    def test_errors_reported_on_close(self):
+        """Test that failed writes are reported to their callbacks when the writer is closed."""
+        def write_file(file_path, text):
+            if file_path == 'bad.md':
+                raise OSError('disk full')
+
+        errors = []
+        writer = WriteBehindWriter(write_file, 4)
+        writer.write('good.md', 'text', on_error=errors.append)
+        writer.write('bad.md', 'text', on_error=errors.append)
+        writer.close()
+        self.assertEqual([str(e) for e in errors], ['disk full'])
+
+        # Without a callback the failure is raised by close
+        writer = WriteBehindWriter(write_file, 4)
+        writer.write('bad.md', 'text')
+        with self.assertRaises(OSError):
+            writer.close()
+        with self.assertRaises(OSError):
+            WriteBehindWriter(write_file, 0).write('bad.md', 'text')
+
+    def test_invalid_queue_depth(self):
+        """Test that a negative queue depth is rejected."""
+        with self.assertRaises(ValueError):
+            WriteBehindWriter(AtomicWriter().write, -1)
+
+
+class TestAtomicUpdate(unittest.TestCase):
+    """Test atomic rewriting through update."""
+
+    def setUp(self):
+        """Set up a test file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'post.md')
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write("---\ntags: [A]\n---\nBody\n")
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_update_save_error_keeps_original(self):
+        """Test that a failed save is reported and the original is left intact."""
+        with patch('fmu.fileio.os.replace', side_effect=OSError('disk full')):
+            results = update_frontmatter([self.file_path], 'tags', [{'type': 'case', 'case_type': 'lower'}])
+
+        self.assertIn('Error saving file: disk full', results[0]['reason'])
+        with open(self.file_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), "---\ntags: [A]\n---\nBody\n")
+
+    def test_update_save_error_without_write_queue(self):
+        """Test that a failed save is reported when files are written synchronously."""
+        with patch('fmu.fileio.os.replace', side_effect=OSError('disk full')):
+            results = update_frontmatter([self.file_path], 'tags', [{'type': 'case', 'case_type': 'lower'}],
+                                         write_queue=0)
+
+        self.assertEqual(results[0]['reason'], 'Error saving file: disk full')
+        self.assertFalse(results[0]['changes_made'])
+
+    def test_main_update_write_queue(self):
+        """Test the --write-queue option."""
+        other_path = os.path.join(self.temp_dir, 'other.md')
+        shutil.copy(self.file_path, other_path)
+        argv = ['fmu', 'update', self.file_path, other_path, '--name', 'tags', '--case', 'lower', '--write-queue', '1']
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', new_callable=io.StringIO) as output:
+                main()
+
+        self.assertIn("2 file(s) updated", output.getvalue())
+        for file_path in (self.file_path, other_path):
+            with open(file_path, encoding='utf-8') as f:
+                self.assertIn("- a", f.read())
+
+    def test_main_update_durability(self):
+        """Test the --durability option."""
+        argv = ['fmu', 'update', self.file_path, '--name', 'tags', '--case', 'lower', '--durability', 'batch']
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', io.StringIO()):
+                with patch('fmu.fileio.os.fsync') as fsync:
+                    main()
+
+        self.assertEqual(fsync.call_count, 2)
+        with open(self.file_path, encoding='utf-8') as f:
+            self.assertIn("- a", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+"""
+Unit tests for the fmu formula function registry.
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import re
+import shutil
+import sys
+from unittest.mock import patch
+from fmu.functions import (
+    register_function, unregister_function, get_function, call_function,
+    load_function_files, loaded_function_files, parse_timestamp, EvaluationContext
+)
+from fmu.formulas import evaluate_formula
+from fmu.cli import main
+
+
+FUNCTIONS_FILE = """
+from fmu.functions import register_function
+
+@register_function('shout', min_args=1, max_args=1, pure=True)
+def shout(text):
+    return str(text).upper() + '!'
+"""
+
+
+class TestFunctionRegistry(unittest.TestCase):
+    """Test registering and calling functions."""
+
+    def tearDown(self):
+        """Remove the functions registered by a test."""
+        unregister_function('double')
+        unregister_function('counter')
+
+    def test_register_and_call(self):
+        """Test a function registered with the decorator."""
+        @register_function('double', min_args=1, max_args=1, pure=True)
+        def double(value):
+            return int(value) * 2
+
+        self.assertEqual(call_function('double', ['21']), 42)
+        self.assertEqual(evaluate_formula('=double(4)', '/a.md', {}, ''), 8)
+
+    def test_arity(self):
+        """Test that parameter counts are checked against the declared arity."""
+        register_function('double', lambda value: value * 2, min_args=1, max_args=1)
+
+        with self.assertRaises(ValueError) as cm:
+            call_function('double', [])
+        self.assertEqual(str(cm.exception), "double() requires at least 1 parameter(s)")
+        with self.assertRaises(ValueError) as cm:
+            call_function('double', [1, 2])
+        self.assertEqual(str(cm.exception), "double() takes at most 1 parameter(s)")
+        with self.assertRaises(ValueError) as cm:
+            call_function('hash', ['only'])
+        self.assertEqual(str(cm.exception), "hash() requires 2 parameters: string and hash_length")
+
+    def test_duplicate_name(self):
+        """Test that a name cannot be registered twice."""
+        with self.assertRaises(ValueError):
+            register_function('hash', lambda *parameters: '')
+
+    def test_unknown_function(self):
+        """Test that unknown names are reported once entry points are searched."""
+        with self.assertRaises(ValueError) as cm:
+            call_function('no_such_function', [])
+        self.assertEqual(str(cm.exception), "Unknown function: no_such_function")
+
+    def test_pure_functions_are_memoized(self):
+        """Test that pure results are reused for identical parameters only."""
+        calls = []
+
+        def counter(*parameters):
+            calls.append(parameters)
+            return len(calls)
+
+        register_function('counter', counter, pure=True)
+        context = EvaluationContext()
+        self.assertEqual(call_function('counter', ['a', 1], context), 1)
+        self.assertEqual(call_function('counter', ['a', 1], context), 1)
+        # Parameters of another type are a different call
+        self.assertEqual(call_function('counter', ['a', 1.0], context), 2)
+        # Unhashable parameters are not memoized
+        self.assertEqual(call_function('counter', [['a']], context), 3)
+        self.assertEqual(call_function('counter', [['a']], context), 4)
+        # Results are memoized per run
+        self.assertEqual(call_function('counter', ['a', 1], EvaluationContext()), 5)
+        self.assertEqual(call_function('counter', ['a', 1]), 6)
+
+    def test_impure_functions_are_not_memoized(self):
+        """Test that impure functions are called every time."""
+        self.assertFalse(get_function('now').pure)
+        self.assertTrue(get_function('hash').pure)
+
+        first = call_function('flat_list', [['a'], 'b'])
+        first.append('c')
+        self.assertEqual(call_function('flat_list', [['a'], 'b']), ['a', 'b'])
+
+
+class TestEvaluationContext(unittest.TestCase):
+    """Test the state shared by the evaluations of a run."""
+
+    def test_now_is_frozen(self):
+        """Test that now() returns the time of the context."""
+        context = EvaluationContext('2024-05-01T12:00:00Z')
+
+        self.assertEqual(call_function('now', [], context), '2024-05-01T12:00:00Z')
+        self.assertEqual(evaluate_formula('=concat(v, $now())', '/a.md', {}, '', context), 'v2024-05-01T12:00:00Z')
+        context = EvaluationContext()
+        self.assertEqual(call_function('now', [], context), context.now)
+
+    def test_parse_timestamp(self):
+        """Test that timestamps are normalized to UTC."""
+        self.assertEqual(parse_timestamp('2024-05-01'), '2024-05-01T00:00:00Z')
+        self.assertEqual(parse_timestamp('2024-05-01T12:30:00Z'), '2024-05-01T12:30:00Z')
+        self.assertEqual(parse_timestamp('2024-05-01T14:30:00+02:00'), '2024-05-01T12:30:00Z')
+        with self.assertRaises(ValueError) as cm:
+            parse_timestamp('yesterday')
+        self.assertEqual(str(cm.exception), "Invalid timestamp: yesterday")
+
+    def test_path_parts(self):
+        """Test that path parts follow the file of the context."""
+        context = EvaluationContext().for_file(os.path.join('site', 'posts', 'a.md'), {}, '')
+        self.assertEqual((context.filename, context.folderpath, context.foldername),
+                         ('a.md', os.path.join('site', 'posts'), 'posts'))
+        context.for_file(os.path.join('docs', 'b.md'), {}, '')
+        self.assertEqual((context.filename, context.foldername), ('b.md', 'docs'))
+
+    def test_regex_cache(self):
+        """Test that patterns are compiled once per context."""
+        context = EvaluationContext()
+        self.assertIs(context.regex('^a', 0), context.regex('^a', 0))
+        self.assertIsNot(context.regex('^a', 0), context.regex('^a', re.IGNORECASE))
+
+
+class TestFunctionFiles(unittest.TestCase):
+    """Test loading functions from Python files."""
+
+    def setUp(self):
+        """Set up a functions file and a test file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.functions_file = os.path.join(self.temp_dir, 'site_functions.py')
+        with open(self.functions_file, 'w', encoding='utf-8') as f:
+            f.write(FUNCTIONS_FILE)
+        self.file_path = os.path.join(self.temp_dir, 'post.md')
+        self.other_file_path = os.path.join(self.temp_dir, 'other.md')
+        for file_path in (self.file_path, self.other_file_path):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                f.write("---\ntitle: hello\n---\nBody\n")
+
+    def tearDown(self):
+        """Clean up test files and the registered function."""
+        shutil.rmtree(self.temp_dir)
+        unregister_function('shout')
+
+    def test_load_function_files(self):
+        """Test that a file is loaded once and its functions registered."""
+        with patch('fmu.functions._LOADED_FILES', {}):
+            load_function_files([self.functions_file])
+            load_function_files([self.functions_file])
+            self.assertEqual(loaded_function_files(), [self.functions_file])
+        self.assertEqual(call_function('shout', ['hi']), 'HI!')
+
+    def test_load_files_with_the_same_name(self):
+        """Test that files with the same name in different directories are separate modules."""
+        paths = []
+        for directory, name in [('a', 'whisper'), ('b', 'murmur')]:
+            os.makedirs(os.path.join(self.temp_dir, directory))
+            paths.append(os.path.join(self.temp_dir, directory, 'helpers.py'))
+            with open(paths[-1], 'w', encoding='utf-8') as f:
+                f.write(f"from fmu.functions import register_function\n"
+                        f"HELPER = {name!r}\n"
+                        f"register_function({name!r}, lambda text: str(text).lower(), min_args=1, max_args=1)\n")
+        self.addCleanup(unregister_function, 'whisper')
+        self.addCleanup(unregister_function, 'murmur')
+
+        with patch('fmu.functions._LOADED_FILES', {}), patch.dict('sys.modules'):
+            load_function_files(paths)
+            helpers = sorted(module.HELPER for name, module in sys.modules.items() if name.startswith('fmu_functions_helpers'))
+        self.assertEqual(helpers, ['murmur', 'whisper'])
+        self.assertEqual(call_function('murmur', ['Hi']), 'hi')
+
+    def test_load_invalid_file(self):
+        """Test that a file that fails to load is reported."""
+        broken = os.path.join(self.temp_dir, 'broken.py')
+        with open(broken, 'w', encoding='utf-8') as f:
+            f.write("raise RuntimeError('boom')\n")
+
+        with self.assertRaises(ValueError) as cm:
+            load_function_files([broken])
+        self.assertIn("Cannot load functions from", str(cm.exception))
+        self.assertIn("boom", str(cm.exception))
+
+    def test_main_update_with_functions(self):
+        """Test update --functions, in worker processes too."""
+        argv = [
+            'fmu', 'update', self.file_path, self.other_file_path, '--name', 'title',
+            '--compute', '=shout($frontmatter.title)', '--functions', self.functions_file, '--jobs', '2'
+        ]
+        with patch('fmu.functions._LOADED_FILES', {}):
+            with patch('sys.argv', argv):
+                with patch('sys.stdout', new_callable=io.StringIO):
+                    main()
+
+        for file_path in (self.file_path, self.other_file_path):
+            with open(file_path, encoding='utf-8') as f:
+                self.assertIn("title: HELLO!", f.read())
+
+    def test_main_invalid_functions_file(self):
+        """Test that a missing functions file is reported."""
+        argv = ['fmu', 'update', self.file_path, '--name', 'title', '--compute', 'x',
+                '--functions', os.path.join(self.temp_dir, 'missing.py')]
+        with patch('sys.argv', argv):
+            with patch('sys.stderr', new_callable=io.StringIO) as error:
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("Error: Cannot load functions from", error.getvalue())
+        with open(self.file_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), "---\ntitle: hello\n---\nBody\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
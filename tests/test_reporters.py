@@ -0,0 +1,182 @@
+"""
+Unit tests for fmu validation reporters.
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import json
+import shutil
+import datetime
+import xml.etree.ElementTree as ET
+from unittest.mock import patch
+from fmu.reporters import (
+    ConsoleReporter,
+    JsonlReporter,
+    JUnitReporter,
+    SarifReporter,
+    ValidationReporter,
+    create_reporters
+)
+from fmu.validation import validate_and_output
+from fmu.cli import main
+
+
+FAILURES = [
+    ('posts/a b.md', 'title', None, "Field 'title' does not exist"),
+    ('posts/c.md', 'date', datetime.date(2024, 1, 2), "Field 'date' value '2024-01-02' <is> \"bad\""),
+    ('posts/c.md', 'note', 'bell\x07 & tab\t', "Field 'note' has a control character"),
+]
+
+
+class TestReporters(unittest.TestCase):
+    """Test the output of each reporter."""
+
+    def setUp(self):
+        """Set up a temporary directory."""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, reporter_class, failures=FAILURES):
+        """Report failures with a reporter and return the output file path."""
+        output = os.path.join(self.temp_dir, 'report')
+        with reporter_class(output) as reporter:
+            for failure in failures:
+                reporter.report(*failure)
+        return output
+
+    def test_jsonl(self):
+        """Test that each failure is one JSON object per line."""
+        with open(self.write(JsonlReporter), encoding='utf-8') as f:
+            records = [json.loads(line) for line in f]
+
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0], {'file': 'posts/a b.md', 'field': 'title', 'value': None,
+                                      'reason': "Field 'title' does not exist"})
+        self.assertEqual(records[1]['value'], '2024-01-02')
+
+    def test_junit(self):
+        """Test that the JUnit report is well-formed and counts the failures."""
+        root = ET.parse(self.write(JUnitReporter)).getroot()
+
+        self.assertEqual(root.tag, 'testsuites')
+        suite = root.find('testsuite')
+        self.assertEqual(suite.get('tests'), '3')
+        self.assertEqual(suite.get('failures'), '3')
+        cases = suite.findall('testcase')
+        self.assertEqual([(c.get('classname'), c.get('name')) for c in cases], [
+            ('posts/a b.md', 'title'), ('posts/c.md', 'date'), ('posts/c.md', 'note')
+        ])
+        self.assertEqual(cases[1].find('failure').get('message'), FAILURES[1][3])
+        self.assertEqual(cases[2].find('failure').text, "note: bell & tab\t --> Field 'note' has a control character")
+
+    def test_junit_without_failures(self):
+        """Test that an empty run gives an empty suite."""
+        suite = ET.parse(self.write(JUnitReporter, [])).getroot().find('testsuite')
+
+        self.assertEqual(suite.get('tests'), '0')
+        self.assertEqual(suite.findall('testcase'), [])
+
+    def test_sarif(self):
+        """Test that the SARIF log is valid JSON with one result per failure."""
+        with open(self.write(SarifReporter), encoding='utf-8') as f:
+            log = json.load(f)
+
+        self.assertEqual(log['version'], '2.1.0')
+        run = log['runs'][0]
+        self.assertEqual(run['tool']['driver']['name'], 'fmu')
+        self.assertEqual(len(run['results']), 3)
+        result = run['results'][0]
+        self.assertEqual(result['ruleId'], run['tool']['driver']['rules'][0]['id'])
+        self.assertEqual(result['message']['text'], "Field 'title' does not exist")
+        self.assertEqual(result['locations'][0]['physicalLocation']['artifactLocation']['uri'], 'posts/a%20b.md')
+        self.assertEqual(run['results'][1]['properties'], {'field': 'date', 'value': '2024-01-02'})
+
+    def test_sarif_without_failures(self):
+        """Test that an empty run gives an empty results array."""
+        with open(self.write(SarifReporter, []), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['runs'][0]['results'], [])
+
+    def test_reporter_must_implement_report(self):
+        """Test that the base class cannot be used without report()."""
+        with self.assertRaises(TypeError):
+            ValidationReporter()
+
+    def test_create_reporters(self):
+        """Test that the console is used only when no output file is given."""
+        self.assertIsInstance(create_reporters()[0], ConsoleReporter)
+
+        reporters = create_reporters(jsonl_file=os.path.join(self.temp_dir, 'a.jsonl'),
+                                     sarif_file=os.path.join(self.temp_dir, 'a.sarif'))
+        for reporter in reporters:
+            reporter.close()
+        self.assertEqual([type(r) for r in reporters], [JsonlReporter, SarifReporter])
+
+
+class TestStreamingOutput(unittest.TestCase):
+    """Test validation output through reporters."""
+
+    def setUp(self):
+        """Set up test files."""
+        self.temp_dir = tempfile.mkdtemp()
+        for i in range(3):
+            with open(os.path.join(self.temp_dir, f'post{i}.md'), 'w') as f:
+                f.write(f"---\ntitle: Post {i}\n---\n")
+        self.pattern = [os.path.join(self.temp_dir, '*.md')]
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_failures_are_reported_as_found(self):
+        """Test that each failure reaches the reporter before the next file is validated."""
+        from fmu import validation as validation_module
+        events = []
+        reporter = ConsoleReporter()
+        reporter.report = lambda file_path, *_: events.append(('report', os.path.basename(file_path)))
+        parse_file = validation_module.parse_file
+
+        def parse(file_path, *args):
+            events.append(('parse', os.path.basename(file_path)))
+            return parse_file(file_path, *args)
+
+        with patch.object(validation_module, 'create_reporters', return_value=[reporter]):
+            with patch.object(validation_module, 'parse_file', side_effect=parse):
+                count = validate_and_output(self.pattern, [{'type': 'exist', 'field': 'author'}])
+
+        self.assertEqual(count, 3)
+        self.assertEqual(events, [
+            ('parse', 'post0.md'), ('report', 'post0.md'),
+            ('parse', 'post1.md'), ('report', 'post1.md'),
+            ('parse', 'post2.md'), ('report', 'post2.md'),
+        ])
+
+    def test_main_validate_report_files(self):
+        """Test the --jsonl, --junit and --sarif options together, with no console output."""
+        jsonl_file = os.path.join(self.temp_dir, 'out.jsonl')
+        junit_file = os.path.join(self.temp_dir, 'out.xml')
+        sarif_file = os.path.join(self.temp_dir, 'out.sarif')
+        stdout = io.StringIO()
+        argv = ['fmu', 'validate', *self.pattern, '--exist', 'author', '--no-cache',
+                '--jsonl', jsonl_file, '--junit', junit_file, '--sarif', sarif_file]
+
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', stdout):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+
+        self.assertEqual(cm.exception.code, 1)
+        self.assertEqual(stdout.getvalue(), '')
+        with open(jsonl_file, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 3)
+        self.assertEqual(ET.parse(junit_file).getroot().find('testsuite').get('failures'), '3')
+        with open(sarif_file, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)['runs'][0]['results']), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Unit tests for fmu format-preserving frontmatter rewriting.
+"""
+
+import unittest
+import tempfile
+import os
+import shutil
+import yaml
+from fmu.rewrite import splice_frontmatter
+from fmu.update import update_frontmatter
+
+
+ORIGINAL = """---
+# Post metadata
+title: 'Hello'   # shown in the feed
+tags: [Python, yaml]
+aliases:
+  - /old
+
+# Publishing
+date: 2024-01-01
+---
+Body
+"""
+
+
+def load(text):
+    """Parse the frontmatter of a file's text."""
+    return yaml.safe_load(text.split('---\n')[1])
+
+
+class TestSpliceFrontmatter(unittest.TestCase):
+    """Test splice_frontmatter."""
+
+    def test_replace_keeps_other_bytes(self):
+        """Test that only the changed key is rewritten."""
+        data = load(ORIGINAL)
+        data['tags'] = ['python', 'yaml']
+
+        result = splice_frontmatter(ORIGINAL, data, ['tags'])
+
+        self.assertEqual(result, ORIGINAL.replace("tags: [Python, yaml]\n", "tags:\n- python\n- yaml\n"))
+
+    def test_replace_block_value_keeps_following_comment(self):
+        """Test that comments after a multi-line value stay in place."""
+        data = load(ORIGINAL)
+        data['aliases'] = ['/new']
+
+        result = splice_frontmatter(ORIGINAL, data, ['aliases'])
+
+        self.assertEqual(result, ORIGINAL.replace("  - /old\n", "- /new\n"))
+
+    def test_remove_and_add(self):
+        """Test that removed keys are deleted and new keys appended."""
+        data = load(ORIGINAL)
+        del data['title']
+        data['slug'] = 'hello'
+
+        result = splice_frontmatter(ORIGINAL, data, ['title', 'slug'])
+
+        self.assertNotIn('title', result)
+        self.assertIn("# Post metadata\ntags: [Python, yaml]\n", result)
+        self.assertTrue(result.endswith("date: 2024-01-01\nslug: hello\n---\nBody\n"))
+
+    def test_crlf_line_endings(self):
+        """Test that spliced lines use the file's line endings."""
+        original = ORIGINAL.replace('\n', '\r\n')
+        data = load(ORIGINAL)
+        data['title'] = 'Bye'
+
+        result = splice_frontmatter(original, data, ['title'])
+
+        self.assertEqual(result, original.replace("title: 'Hello'   # shown in the feed", "title: Bye"))
+
+    def test_unsupported_headers(self):
+        """Test that headers that cannot be spliced are left to the caller."""
+        flow = "---\n{title: Hello}\n---\n"
+        self.assertIsNone(splice_frontmatter(flow, {'title': 'Bye'}, ['title']))
+        duplicate = "---\ntitle: A\ntitle: B\n---\n"
+        self.assertIsNone(splice_frontmatter(duplicate, {'title': 'C'}, ['title']))
+        self.assertIsNone(splice_frontmatter("No frontmatter\n", {'title': 'C'}, ['title']))
+
+    def test_anchor_falls_back(self):
+        """Test that a splice that would break an alias is rejected."""
+        original = "---\nbase: &b hello\ncopy: *b\n---\n"
+
+        self.assertIsNone(splice_frontmatter(original, {'copy': 'hello'}, ['base']))
+
+
+class TestMinimalDiffUpdate(unittest.TestCase):
+    """Test that update rewrites only what it changes."""
+
+    def setUp(self):
+        """Set up a test file."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.temp_dir, 'post.md')
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            f.write(ORIGINAL)
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_update_preserves_untouched_keys(self):
+        """Test that comments, quoting and flow style survive an update."""
+        update_frontmatter([self.file_path], 'date', [{'type': 'compute', 'formula': '2024-02-02'}])
+
+        with open(self.file_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), ORIGINAL.replace("date: 2024-01-01", "date: '2024-02-02'"))
+
+    def test_update_keeps_crlf_line_endings(self):
+        """Test that an update of a CRLF file leaves every other line as it was."""
+        original = ORIGINAL.replace('\n', '\r\n') + "More body\r\n"
+        with open(self.file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(original)
+
+        update_frontmatter([self.file_path], 'date', [{'type': 'compute', 'formula': '2024-02-02'}])
+
+        with open(self.file_path, encoding='utf-8', newline='') as f:
+            self.assertEqual(f.read(), original.replace("date: 2024-01-01", "date: '2024-02-02'"))
+
+    def test_update_adds_frontmatter_with_crlf_line_endings(self):
+        """Test that frontmatter added to a CRLF file uses CRLF line endings."""
+        with open(self.file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write("Body\r\nMore body\r\n")
+
+        update_frontmatter([self.file_path], 'title', [{'type': 'compute', 'formula': 'Hello'}])
+
+        with open(self.file_path, encoding='utf-8', newline='') as f:
+            self.assertEqual(f.read(), "---\r\ntitle: Hello\r\n---\r\nBody\r\nMore body\r\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
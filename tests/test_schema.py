@@ -0,0 +1,195 @@
+"""
+Unit tests for fmu schema validation.
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import shutil
+from unittest.mock import patch
+from fmu.schema import compile_schema, iter_schema_failures, load_schema_validator
+from fmu.validation import validate_frontmatter
+from fmu.cli import main
+
+
+SCHEMA = """
+type: object
+required: [title, date, tags]
+additionalProperties: false
+properties:
+  title: {type: string, minLength: 3, maxLength: 60}
+  date: {type: string, pattern: '^\\d{4}-\\d{2}-\\d{2}$'}
+  draft: {type: boolean}
+  status: {enum: [draft, published]}
+  weight: {type: integer, minimum: 0, exclusiveMaximum: 100}
+  tags:
+    type: array
+    minItems: 1
+    uniqueItems: true
+    items: {$ref: '#/definitions/tag'}
+  author: {$ref: '#/$defs/person'}
+definitions:
+  tag: {type: string, pattern: '^[a-z0-9-]+$'}
+$defs:
+  person:
+    type: object
+    required: [name]
+    properties:
+      name: {type: string}
+"""
+
+
+class TestCompileSchema(unittest.TestCase):
+    """Test compiling and applying schemas."""
+
+    def failures(self, schema, frontmatter):
+        return list(iter_schema_failures(compile_schema(schema), frontmatter))
+
+    def test_valid_frontmatter(self):
+        """Test that matching frontmatter has no failures, with dates validated as strings."""
+        import datetime
+        import yaml
+        schema = yaml.safe_load(SCHEMA)
+        frontmatter = {
+            'title': 'Hello', 'date': datetime.date(2024, 1, 31), 'draft': False,
+            'status': 'published', 'weight': 10, 'tags': ['a', 'b-c'], 'author': {'name': 'Jo'}
+        }
+
+        self.assertEqual(self.failures(schema, frontmatter), [])
+
+    def test_failures_report_field_paths(self):
+        """Test that failures use the existing (field, value, reason) form with nested paths."""
+        import yaml
+        schema = yaml.safe_load(SCHEMA)
+        frontmatter = {
+            'title': 'Hi', 'date': 'Jan 1', 'status': 'gone', 'weight': 100,
+            'tags': ['ok', 'Not OK', 'ok'], 'author': {}, 'extra': 1
+        }
+
+        failures = self.failures(schema, frontmatter)
+
+        self.assertEqual(failures, [
+            ('title', 'Hi', "Field 'title' value 'Hi' is shorter than 3 characters"),
+            ('date', 'Jan 1', "Field 'date' value 'Jan 1' does not match pattern '^\\d{4}-\\d{2}-\\d{2}$'"),
+            ('status', 'gone', "Field 'status' value 'gone' is not one of 'draft', 'published'"),
+            ('weight', 100, "Field 'weight' value '100' is not less than 100"),
+            ('tags', ['ok', 'Not OK', 'ok'], "Field 'tags' array has duplicate items"),
+            ('tags[1]', 'Not OK', "Field 'tags[1]' value 'Not OK' does not match pattern '^[a-z0-9-]+$'"),
+            ('author.name', None, "Field 'author.name' is required"),
+            ('extra', 1, "Field 'extra' is not allowed by schema"),
+        ])
+
+    def test_required_and_type(self):
+        """Test required fields and type unions."""
+        schema = {'required': ['slug'], 'properties': {'id': {'type': ['integer', 'string']}}}
+
+        self.assertEqual(self.failures(schema, {'id': True}), [
+            ('slug', None, "Field 'slug' is required"),
+            ('id', True, "Field 'id' value 'True' is not of type 'integer or string'"),
+        ])
+
+    def test_combinators_and_recursive_ref(self):
+        """Test anyOf, oneOf, not and a recursive local reference."""
+        schema = {
+            'properties': {
+                'menu': {'$ref': '#/definitions/node'},
+                'id': {'anyOf': [{'type': 'integer'}, {'pattern': '^id-'}]},
+                'kind': {'oneOf': [{'const': 'a'}, {'type': 'string', 'maxLength': 1}]},
+                'name': {'not': {'const': 'admin'}},
+            },
+            'definitions': {
+                'node': {'type': 'object', 'properties': {'children': {'type': 'array', 'items': {'$ref': '#/definitions/node'}}}}
+            }
+        }
+        frontmatter = {'menu': {'children': [{'children': ['leaf']}]}, 'id': 'x', 'kind': 'a', 'name': 'admin'}
+
+        self.assertEqual([f[0] for f in self.failures(schema, frontmatter)], [
+            'menu.children[0].children[0]', 'id', 'kind', 'name'
+        ])
+
+    def test_invalid_schemas(self):
+        """Test that invalid schemas and remote references are rejected at compile time."""
+        with self.assertRaises(ValueError):
+            compile_schema({'$ref': 'https://example.com/schema.json'})
+        with self.assertRaises(ValueError):
+            compile_schema({'$ref': '#/definitions/missing'})
+        with self.assertRaises(ValueError):
+            compile_schema({'type': 'text'})
+        with self.assertRaises(ValueError):
+            compile_schema({'pattern': '('})
+
+
+class TestSchemaValidation(unittest.TestCase):
+    """Test schema rules in validate."""
+
+    def setUp(self):
+        """Set up test files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.schema_file = os.path.join(self.temp_dir, 'schema.yaml')
+        with open(self.schema_file, 'w') as f:
+            f.write(SCHEMA)
+        self.good = os.path.join(self.temp_dir, 'good.md')
+        with open(self.good, 'w') as f:
+            f.write("---\ntitle: Good Post\ndate: 2024-01-31\ntags: [python]\n---\n")
+        self.bad = os.path.join(self.temp_dir, 'bad.md')
+        with open(self.bad, 'w') as f:
+            f.write("---\ntitle: Bad Post\ntags: []\n---\n")
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_validate_with_schema(self):
+        """Test that schema failures are reported as validation failures."""
+        failures = validate_frontmatter([self.good, self.bad], [{'type': 'schema', 'schema': self.schema_file}])
+
+        self.assertEqual(failures, [
+            (self.bad, 'date', None, "Field 'date' is required"),
+            (self.bad, 'tags', [], "Field 'tags' array has 0 items but should have at least 1 items"),
+        ])
+
+    def test_file_without_frontmatter(self):
+        """Test that a file without frontmatter is checked as an empty object."""
+        plain = os.path.join(self.temp_dir, 'plain.md')
+        with open(plain, 'w') as f:
+            f.write("No frontmatter\n")
+        schema_file = os.path.join(self.temp_dir, 'required.yaml')
+        with open(schema_file, 'w') as f:
+            f.write("required: [title]\n")
+
+        failures = validate_frontmatter([plain, self.good], [{'type': 'schema', 'schema': schema_file}])
+
+        self.assertEqual(failures, [(plain, 'title', None, "Field 'title' is required")])
+
+    def test_compiled_validator_is_cached_until_file_changes(self):
+        """Test that the schema file is compiled once per modification."""
+        first = load_schema_validator(self.schema_file)
+        self.assertIs(load_schema_validator(self.schema_file), first)
+
+        with open(self.schema_file, 'w') as f:
+            f.write("type: object\nrequired: [title, author]\n")
+        os.utime(self.schema_file, ns=(1, 1))
+        second = load_schema_validator(self.schema_file)
+
+        self.assertIsNot(second, first)
+        self.assertEqual([f[0] for f in iter_schema_failures(second, {'title': 'x'})], ['author'])
+
+    def test_main_validate_schema(self):
+        """Test the --schema option and its error reporting."""
+        with patch('sys.argv', ['fmu', 'validate', self.good, '--schema', self.schema_file]):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 0)
+
+        stderr = io.StringIO()
+        with patch('sys.argv', ['fmu', 'validate', self.good, '--schema', os.path.join(self.temp_dir, 'missing.yaml')]):
+            with patch('sys.stderr', stderr):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn('Schema file not found', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,7 +6,9 @@ import unittest
 import tempfile
 import os
 import csv
-from fmu.search import search_frontmatter, output_search_results, search_and_output
+import yaml
+from fmu.search import search_frontmatter, output_search_results, search_duplicates, WhereClause
+from fmu.duplicates import DuplicateCollector
 
 
 class TestSearchFunctionality(unittest.TestCase):
@@ -235,5 +237,223 @@ Content of third post.""")
         self.assertEqual(results[0][0], self.file1)
 
 
+    def test_search_content_phrase(self):
+        """Test content-only search for a phrase in the content body."""
+        results = search_frontmatter([self.temp_dir], None, content='second post')
+        
+        self.assertEqual(results, [(self.file2, '$content', 'second post')])
+
+    def test_search_content_phrase_ignore_case(self):
+        """Test case-insensitive content search reports the text as written."""
+        results = search_frontmatter([self.temp_dir], None, content='CONTENT OF', ignore_case=True)
+        
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0][2], 'Content of')
+
+    def test_search_content_phrase_ignore_case_length_change(self):
+        """Test that text whose lowercase form is longer does not shift the reported match."""
+        file_path = os.path.join(self.temp_dir, 'istanbul.md')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write("---\ntitle: Trip\n---\n\nİİ Hello World")
+        
+        results = search_frontmatter([file_path], None, content='hello', ignore_case=True)
+        
+        self.assertEqual(results, [(file_path, '$content', 'Hello')])
+
+    def test_search_content_regex(self):
+        """Test content search with a regex."""
+        results = search_frontmatter([self.temp_dir], None, content_regex=r'(first|third) post')
+        
+        file_paths = [result[0] for result in results]
+        self.assertEqual(file_paths, [self.file1, self.file3])
+
+    def test_search_content_combined_with_name_and_value(self):
+        """Test that content filters combine with --name/--value filters."""
+        results = search_frontmatter([self.temp_dir], 'author', 'john doe', ignore_case=True, content='third')
+        
+        self.assertEqual(results, [(self.file3, 'author', 'john doe')])
+
+    def test_search_content_with_trigram_index(self):
+        """Test that the trigram index is built, narrows candidates and stays fresh."""
+        index_path = os.path.join(self.temp_dir, 'search.idx')
+        patterns = [self.file1, self.file2, self.file3]
+        
+        results = search_frontmatter(patterns, None, content='first post', index_path=index_path)
+        self.assertEqual([r[0] for r in results], [self.file1])
+        self.assertTrue(os.path.exists(index_path))
+        
+        # A warm search only parses candidate files
+        from fmu import search as search_module
+        from unittest.mock import patch
+        with patch.object(search_module, 'parse_file', wraps=search_module.parse_file) as parse:
+            results = search_frontmatter(patterns, None, content='second post', index_path=index_path)
+        self.assertEqual([r[0] for r in results], [self.file2])
+        self.assertEqual(parse.call_count, 1)
+        
+        # Modified files are re-verified and re-indexed
+        with open(self.file3, 'w') as f:
+            f.write("---\ntitle: Third Post\n---\n\nNow mentions the second post too.")
+        results = search_frontmatter(patterns, None, content='second post', index_path=index_path)
+        self.assertEqual([r[0] for r in results], [self.file2, self.file3])
+
+    def test_search_content_same_with_and_without_index(self):
+        """Test that the trigram index never changes the results of a content search."""
+        corpus = os.path.join(self.temp_dir, 'corpus')
+        os.makedirs(corpus)
+        for name, body in [('a.md', 'hello world'), ('b.md', 'goodbye moon'), ('c.md', 'a [broken regex')]:
+            with open(os.path.join(corpus, name), 'w') as f:
+                f.write(f"---\ntitle: {name}\n---\n\n{body}")
+        index_path = os.path.join(self.temp_dir, 'search.idx')
+        
+        queries = [
+            {'content': 'hello'},
+            {'content': 'HELLO', 'ignore_case': True},
+            {'content_regex': 'mo+n'},
+            {'content_regex': '[broken'},
+        ]
+        for query in queries:
+            expected = search_frontmatter([corpus], None, **query)
+            self.assertEqual(len(expected), 1, query)
+            # Once to build the index, once with it warm
+            for _ in range(2):
+                self.assertEqual(search_frontmatter([corpus], None, index_path=index_path, **query), expected, query)
+    
+    def test_search_content_and_content_regex_rejected(self):
+        """Test that a phrase and a regex cannot both filter the content."""
+        with self.assertRaises(ValueError):
+            search_frontmatter([self.temp_dir], None, content='hello', content_regex='moon')
+
+    def test_search_limit_returns_first_matches_in_path_order(self):
+        """Test that --limit keeps the first matches in sorted path order."""
+        results = search_frontmatter([self.temp_dir], 'title', limit=2)
+        
+        self.assertEqual([r[0] for r in results], [self.file1, self.file2])
+
+    def test_search_limit_stops_parsing(self):
+        """Test that the search stops parsing files once the limit is reached."""
+        from fmu import search as search_module
+        from unittest.mock import patch
+        with patch.object(search_module, 'parse_file', wraps=search_module.parse_file) as parse:
+            results = search_frontmatter([self.temp_dir], 'author', 'Jane Smith', limit=1)
+        
+        self.assertEqual([r[0] for r in results], [self.file2])
+        self.assertEqual(parse.call_count, 2)
+
+    def test_required_literal(self):
+        """Test extraction of required literals used for regex narrowing."""
+        from fmu.trigram import required_literal
+        
+        self.assertEqual(required_literal(r'hello\.world'), 'hello.world')
+        self.assertEqual(required_literal(r'^release v\d+ notes'), 'release v')
+        self.assertEqual(required_literal(r'colou?r chart'), 'r chart')
+        self.assertIsNone(required_literal(r'(a|b)'))
+    
+    def test_search_duplicates(self):
+        """Test finding files that share a field value."""
+        self.assertEqual(search_duplicates([self.temp_dir], 'author'), [])
+        
+        results = search_duplicates([self.temp_dir], 'author', ignore_case=True)
+        
+        self.assertEqual(results, [
+            (self.file1, 'author', 'John Doe'),
+            (self.file3, 'author', 'john doe'),
+        ])
+    
+    def test_search_duplicates_array_items(self):
+        """Test that each array item counts as a value, once per file."""
+        file4 = os.path.join(self.temp_dir, 'post4.md')
+        with open(file4, 'w') as f:
+            f.write("---\ntitle: Fourth Post\ntags: [ux, python, python]\n---\n")
+        
+        results = search_duplicates([self.temp_dir], 'tags')
+        
+        self.assertEqual(results, [
+            (self.file1, 'tags', 'python'),
+            (file4, 'tags', 'python'),
+            (self.file2, 'tags', 'ux'),
+            (file4, 'tags', 'ux'),
+        ])
+    
+    def test_search_duplicates_spills_to_disk(self):
+        """Test that a tiny memory budget gives the same result via sorted runs."""
+        expected = search_duplicates([self.temp_dir], 'category', ignore_case=True)
+        
+        results = search_duplicates([self.temp_dir], 'category', ignore_case=True, memory_budget=1)
+        
+        self.assertEqual(results, expected)
+        self.assertEqual([r[0] for r in results], [self.file1, self.file3])
+    
+    def test_duplicate_collector_removes_runs(self):
+        """Test that spilled run files are deleted once duplicates are read."""
+        collector = DuplicateCollector(memory_budget=2)
+        for i in range(5):
+            collector.add(f'file{i}.md', 'slug', f'slug-{i % 2}')
+        runs = list(collector._runs)
+        
+        groups = list(collector.duplicates())
+        
+        self.assertEqual([key for key, _ in groups], ['slug-0', 'slug-1'])
+        self.assertEqual(len(groups[0][1]), 3)
+        self.assertTrue(runs)
+        self.assertFalse(any(os.path.exists(run) for run in runs))
+    
+    def test_duplicate_collector_case_folds(self):
+        """Test that ignore_case folds values like field names, so 'Straße' and 'STRASSE' collide."""
+        collector = DuplicateCollector(ignore_case=True)
+        collector.add('a.md', 'author', 'Straße')
+        collector.add('b.md', 'author', 'STRASSE')
+        
+        groups = list(collector.duplicates())
+        
+        self.assertEqual(groups, [('strasse', [('a.md', 'author', 'Straße'), ('b.md', 'author', 'STRASSE')])])
+
+
+
+class TestWhereClause(unittest.TestCase):
+    """Test update --where conditions."""
+    
+    def test_matches(self):
+        """Test the three forms of condition against parsed frontmatter."""
+        frontmatter = {'status': 'Published', 'tags': ['a', 'b'], 'draft': True}
+        self.assertTrue(WhereClause('tags').matches(frontmatter))
+        self.assertFalse(WhereClause('missing').matches(frontmatter))
+        self.assertTrue(WhereClause('tags=b').matches(frontmatter))
+        self.assertFalse(WhereClause('status=published').matches(frontmatter))
+        self.assertTrue(WhereClause('STATUS=published', ignore_case=True).matches(frontmatter))
+        self.assertTrue(WhereClause('draft=True').matches(frontmatter))
+        self.assertTrue(WhereClause('status~^Pub').matches(frontmatter))
+        self.assertTrue(WhereClause('status~a=b|lish').matches(frontmatter))
+        self.assertFalse(WhereClause('status').matches(None))
+    
+    def test_invalid(self):
+        """Test that a missing name or an invalid regex is rejected."""
+        with self.assertRaises(ValueError):
+            WhereClause('=published')
+        with self.assertRaises(ValueError):
+            WhereClause('status~[')
+    
+    def test_may_match(self):
+        """Test that only headers that cannot contain a safe literal are ruled out."""
+        clause = WhereClause('status=published')
+        self.assertTrue(clause.may_match("status: published"))
+        self.assertFalse(clause.may_match("status: draft"))
+        self.assertFalse(clause.may_match(None))
+        # Escape sequences can spell the value differently
+        self.assertTrue(clause.may_match('status: "publ\\x69shed"'))
+        self.assertTrue(WhereClause('STATUS=PUBLISHED', ignore_case=True).may_match("status: published"))
+        # Values that YAML loads as other types, or that can be folded over lines, are not prefiltered
+        self.assertTrue(WhereClause('draft=True').may_match("draft: yes"))
+        self.assertTrue(WhereClause('title=Hello world').may_match("title: Hello\n  world"))
+        # Values matched by the str() of other YAML types
+        for expression, header in [('x=None', "x: null"), ('x=True', "x: yes"), ('x=False', "x: off"),
+                                   ('x=1e+30', "x: 1.0e+30"), ('x=inf', "x: .inf"), ('x=nan', "x: .NaN"),
+                                   ('x=10', "x: 0xA"), ('x=1.0', "x: 1.")]:
+            clause = WhereClause(expression)
+            self.assertTrue(clause.matches(yaml.safe_load(header)), expression)
+            self.assertTrue(clause.may_match(header), expression)
+        self.assertTrue(WhereClause('status~^pub').may_match("status: draft"))
+        self.assertFalse(WhereClause('status~^pub').may_match("title: x"))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -17,6 +17,7 @@ from fmu.specs import (
     convert_update_args_to_options,
     load_specs_file,
     format_command_text,
+    convert_specs_to_args,
     execute_specs_file,
     print_execution_stats
 )
@@ -339,6 +340,223 @@ class TestSpecsFunctionality(unittest.TestCase):
         expected = 'fmu validate *.md --exist title --exist author --eq status published --ignore-case'
         self.assertEqual(result, expected)
 
+    def test_format_command_text_validate_cross_file_rules(self):
+        """Test formatting validate command text with unique and references rules."""
+        command_entry = {
+            'command': 'validate',
+            'description': 'test validate',
+            'patterns': ['posts/*.md'],
+            'unique': ['slug'],
+            'references': [['related', 'slug'], ['series', '=basename($filepath)', 'series/*.md']],
+            'fail_fast': True
+        }
+        
+        result = format_command_text(command_entry)
+        expected = ('fmu validate posts/*.md --unique slug --references related slug '
+                    '--references series =basename($filepath) series/*.md --fail-fast')
+        self.assertEqual(result, expected)
+        
+        args = convert_specs_to_args(command_entry)
+        self.assertEqual(args.references, command_entry['references'])
+        self.assertTrue(args.fail_fast)
+
+    def test_format_command_text_validate_cache_options(self):
+        """Test formatting and converting validate cache options."""
+        command_entry = {
+            'command': 'validate',
+            'description': 'test validate',
+            'patterns': ['*.md'],
+            'exist': ['title'],
+            'cache_file': 'build/validate.json',
+            'no_cache': True
+        }
+        
+        result = format_command_text(command_entry)
+        expected = 'fmu validate *.md --exist title --cache-file build/validate.json --no-cache'
+        self.assertEqual(result, expected)
+        
+        args = convert_specs_to_args(command_entry)
+        self.assertEqual(args.cache_file, 'build/validate.json')
+        self.assertTrue(args.no_cache)
+        self.assertIsNone(convert_specs_to_args({'command': 'validate', 'patterns': ['*.md']}).cache_file)
+
+    def test_format_command_text_validate_report_files(self):
+        """Test formatting and converting validate report file options."""
+        command_entry = {
+            'command': 'validate',
+            'description': 'test validate',
+            'patterns': ['*.md'],
+            'exist': ['title'],
+            'jsonl': 'out.jsonl',
+            'junit': 'out.xml',
+            'sarif': 'out.sarif'
+        }
+        
+        result = format_command_text(command_entry)
+        expected = 'fmu validate *.md --exist title --jsonl out.jsonl --junit out.xml --sarif out.sarif'
+        self.assertEqual(result, expected)
+        
+        args = convert_specs_to_args(command_entry)
+        self.assertEqual((args.jsonl_file, args.junit_file, args.sarif_file), ('out.jsonl', 'out.xml', 'out.sarif'))
+
+    def test_format_command_text_validate_vocab_rules(self):
+        """Test formatting and converting validate vocabulary rules."""
+        command_entry = {
+            'command': 'validate',
+            'description': 'test validate',
+            'patterns': ['*.md'],
+            'in_vocab': ['tags', 'tags.txt'],
+            'not_in_vocab': ['tags', 'banned.txt'],
+            'vocab_report': 'unknown.csv'
+        }
+        
+        result = format_command_text(command_entry)
+        expected = ('fmu validate *.md --in-vocab tags tags.txt --not-in-vocab tags banned.txt '
+                    '--vocab-report unknown.csv')
+        self.assertEqual(result, expected)
+        
+        args = convert_specs_to_args(command_entry)
+        self.assertEqual(args.in_vocab, [('tags', 'tags.txt')])
+        self.assertEqual(args.not_in_vocab, [('tags', 'banned.txt')])
+        self.assertEqual(args.vocab_report, 'unknown.csv')
+
+    def test_update_groups_round_trip(self):
+        """Test saving, formatting and converting an update of several fields."""
+        from fmu.cli import create_parser
+        from fmu.specs import convert_update_args_to_options, split_update_args
+        args = create_parser().parse_args([
+            'update', '*.md', '--case', 'lower', '--name', 'title',
+            '--name', 'tags', '--replace', 'a', 'b', '--regex', '--deduplication', 'false'
+        ])
+        
+        options = convert_update_args_to_options(args)
+        self.assertEqual(options, {'updates': [
+            {'name': 'title', 'case': 'lower'},
+            {'name': 'tags', 'deduplication': 'false', 'replace': ['a', 'b'], 'regex': True},
+        ]})
+        
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        self.assertEqual(
+            format_command_text(command_entry),
+            'fmu update *.md --name title --case lower --name tags --deduplication false --replace a b --regex'
+        )
+        groups = split_update_args(convert_specs_to_args(command_entry))
+        self.assertEqual([(g.name, g.case, g.replace, g.regex, g.deduplication) for g in groups], [
+            ('title', 'lower', None, False, 'true'),
+            ('tags', None, [['a', 'b']], True, 'false'),
+        ])
+
+    def test_update_durability_round_trip(self):
+        """Test that durability, jobs and transaction options are saved once for all update groups."""
+        from fmu.cli import create_parser
+        from fmu.specs import convert_update_args_to_options
+        args = create_parser().parse_args([
+            'update', '*.md', '--name', 'title', '--case', 'lower',
+            '--durability', 'batch', '--name', 'tags', '--case', 'upper'
+        ])
+        
+        options = convert_update_args_to_options(args)
+        self.assertEqual(options['durability'], 'batch')
+        self.assertEqual(len(options['updates']), 2)
+        self.assertNotIn('durability', options['updates'][1])
+        
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        self.assertIn('--durability batch', format_command_text(command_entry))
+        self.assertEqual(convert_specs_to_args(command_entry).durability, 'batch')
+        
+        args = create_parser().parse_args(['update', '*.md', '--name', 'title', '--case', 'lower', '--jobs', '4'])
+        options = convert_update_args_to_options(args)
+        self.assertEqual(options['jobs'], 4)
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        self.assertIn('--jobs 4', format_command_text(command_entry))
+        self.assertEqual(convert_specs_to_args(command_entry).jobs, 4)
+        
+        args = create_parser().parse_args([
+            'update', '*.md', '--name', 'title', '--case', 'lower', '--transactional', '--disk-budget', '1000'
+        ])
+        options = convert_update_args_to_options(args)
+        self.assertEqual((options['transactional'], options['disk_budget']), (True, 1000))
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        self.assertIn('--transactional --disk-budget 1000', format_command_text(command_entry))
+        args = convert_specs_to_args(command_entry)
+        self.assertEqual((args.transactional, args.journal_file, args.disk_budget), (True, None, 1000))
+        self.assertEqual(
+            convert_specs_to_args({'command': 'update', 'patterns': ['*.md'], 'name': 'title'}).durability,
+            'none'
+        )
+
+    def test_functions_round_trip(self):
+        """Test that --functions files are saved for read and update commands."""
+        from fmu.cli import create_parser
+        from fmu.specs import convert_update_args_to_options
+        args = create_parser().parse_args([
+            'update', '*.md', '--name', 'slug', '--compute', '=slugify($frontmatter.title)',
+            '--functions', 'site.py', '--functions', 'more functions.py'
+        ])
+        
+        options = convert_update_args_to_options(args)
+        self.assertEqual(options['functions'], ['site.py', 'more functions.py'])
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        self.assertIn('--functions site.py --functions "more functions.py"', format_command_text(command_entry))
+        self.assertEqual(convert_specs_to_args(command_entry).functions, ['site.py', 'more functions.py'])
+        
+        args = create_parser().parse_args(['read', '*.md', '--functions', 'site.py'])
+        options = convert_read_args_to_options(args)
+        command_entry = {'command': 'read', 'patterns': ['*.md'], **options}
+        self.assertEqual(convert_specs_to_args(command_entry).functions, ['site.py'])
+    
+    def test_now_round_trip(self):
+        """Test that --now is saved normalized and formatted back."""
+        from fmu.cli import create_parser
+        from fmu.specs import convert_update_args_to_options
+        args = create_parser().parse_args([
+            'update', '*.md', '--name', 'date', '--compute', '=now()', '--now', '2024-05-01'
+        ])
+        
+        options = convert_update_args_to_options(args)
+        self.assertEqual(options['now'], '2024-05-01T00:00:00Z')
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        self.assertIn('--now 2024-05-01T00:00:00Z', format_command_text(command_entry))
+        self.assertEqual(convert_specs_to_args(command_entry).now, '2024-05-01T00:00:00Z')
+        
+        args = create_parser().parse_args(['read', '*.md', '--output', 'json', '--map', 'at', '=now()', '--now', '2024-05-01'])
+        options = convert_read_args_to_options(args)
+        self.assertEqual(options['now'], '2024-05-01T00:00:00Z')
+
+    def test_write_queue_round_trip(self):
+        """Test that a non-default --write-queue is saved and formatted back."""
+        from fmu.cli import create_parser
+        from fmu.specs import convert_update_args_to_options
+        args = create_parser().parse_args(['update', '*.md', '--name', 'tags', '--case', 'lower', '--write-queue', '0'])
+        
+        options = convert_update_args_to_options(args)
+        self.assertEqual(options['write_queue'], 0)
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        self.assertIn('--write-queue 0', format_command_text(command_entry))
+        self.assertEqual(convert_specs_to_args(command_entry).write_queue, 0)
+        
+        args = create_parser().parse_args(['read', '*.md', '--file', 'out.txt', '--individual'])
+        self.assertNotIn('write_queue', convert_read_args_to_options(args))
+        self.assertEqual(convert_specs_to_args({'command': 'read', 'patterns': ['*.md']}).write_queue, 16)
+
+    def test_where_round_trip(self):
+        """Test that --where conditions are saved and formatted back."""
+        from fmu.cli import create_parser
+        from fmu.specs import convert_update_args_to_options
+        args = create_parser().parse_args([
+            'update', '*.md', '--name', 'draft', '--compute', 'false',
+            '--where', 'status=published', '--where', 'tags', '--where-ignore-case'
+        ])
+        
+        options = convert_update_args_to_options(args)
+        self.assertEqual(options['where'], ['status=published', 'tags'])
+        self.assertTrue(options['where_ignore_case'])
+        command_entry = {'command': 'update', 'patterns': ['*.md'], **options}
+        command_text = format_command_text(command_entry)
+        self.assertIn('--where status=published --where tags --where-ignore-case', command_text)
+        args = convert_specs_to_args(command_entry)
+        self.assertEqual((args.where, args.where_ignore_case), (['status=published', 'tags'], True))
+
     def test_format_command_text_update(self):
         """Test formatting update command text."""
         command_entry = {
@@ -0,0 +1,166 @@
+"""
+Unit tests for fmu stats functionality.
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import shutil
+from unittest.mock import patch
+from fmu.stats import (
+    HyperLogLog, cardinality_frontmatter, save_sketches, load_sketches, merge_sketches
+)
+from fmu.cli import main
+
+
+class TestHyperLogLog(unittest.TestCase):
+    """Test the HyperLogLog sketch."""
+
+    def test_small_cardinality_is_exact_enough(self):
+        """Test that small sets are counted accurately by linear counting."""
+        sketch = HyperLogLog()
+        for i in range(100):
+            sketch.add(f"value-{i % 25}")
+
+        self.assertEqual(sketch.count(), 25)
+        self.assertEqual(sketch.total, 100)
+
+    def test_large_cardinality_within_error_bounds(self):
+        """Test that the estimate stays within four standard errors."""
+        sketch = HyperLogLog(precision=12)
+        for i in range(50000):
+            sketch.add(str(i))
+
+        error = abs(sketch.count() - 50000) / 50000
+        self.assertLess(error, 4 * sketch.standard_error)
+
+    def test_merge_equals_union(self):
+        """Test that merging sketches estimates the union of their values."""
+        first = HyperLogLog(precision=10)
+        second = HyperLogLog(precision=10)
+        union = HyperLogLog(precision=10)
+        for i in range(3000):
+            (first if i % 2 else second).add(str(i % 2000))
+            union.add(str(i % 2000))
+
+        first.merge(second)
+
+        self.assertEqual(first.registers, union.registers)
+        self.assertEqual(first.count(), union.count())
+
+    def test_merge_requires_same_precision(self):
+        """Test that sketches of different precision cannot be merged."""
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=10).merge(HyperLogLog(precision=12))
+
+    def test_invalid_precision(self):
+        """Test that out-of-range precision is rejected."""
+        with self.assertRaises(ValueError):
+            HyperLogLog(precision=3)
+
+
+class TestStatsFunctionality(unittest.TestCase):
+    """Test cardinality statistics over files."""
+
+    def setUp(self):
+        """Set up test files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.shard1 = os.path.join(self.temp_dir, 'shard1')
+        self.shard2 = os.path.join(self.temp_dir, 'shard2')
+        for shard, offset in [(self.shard1, 0), (self.shard2, 30)]:
+            os.makedirs(shard)
+            for i in range(60):
+                with open(os.path.join(shard, f'post{i}.md'), 'w') as f:
+                    f.write(f"---\nauthor: Author {(i + offset) % 40}\ntags: [tag{i % 5}, common]\n---\n\nContent.")
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def test_cardinality_frontmatter(self):
+        """Test counting distinct scalar and array values."""
+        sketches = cardinality_frontmatter([self.shard1], ['author', 'tags', 'missing'])
+
+        self.assertEqual(sketches['author'].count(), 40)
+        self.assertEqual(sketches['tags'].count(), 6)
+        self.assertEqual(sketches['tags'].total, 120)
+        self.assertEqual(sketches['missing'].count(), 0)
+
+    def test_cardinality_ignore_case(self):
+        """Test that ignore_case folds field names and values."""
+        with open(os.path.join(self.shard1, 'upper.md'), 'w') as f:
+            f.write("---\nAUTHOR: AUTHOR 1\n---\n")
+
+        sketches = cardinality_frontmatter([self.shard1], ['author'], ignore_case=True)
+
+        self.assertEqual(sketches['author'].count(), 40)
+        self.assertEqual(sketches['author'].total, 61)
+
+    def test_cardinality_ignore_case_folds_like_keys(self):
+        """Test that values are case-folded, so 'Straße' and 'STRASSE' are one value."""
+        for name, author in [('a.md', 'Straße'), ('b.md', 'STRASSE')]:
+            with open(os.path.join(self.temp_dir, name), 'w', encoding='utf-8') as f:
+                f.write(f"---\nauthor: {author}\n---\n")
+
+        sketches = cardinality_frontmatter([os.path.join(self.temp_dir, '*.md')], ['author'], ignore_case=True)
+
+        self.assertEqual(sketches['author'].count(), 1)
+
+    def test_save_load_and_merge_shards(self):
+        """Test that per-shard sketches merge into the corpus-wide estimate."""
+        sketch_file1 = os.path.join(self.temp_dir, 'shard1.json')
+        sketch_file2 = os.path.join(self.temp_dir, 'shard2.json')
+        save_sketches(sketch_file1, cardinality_frontmatter([self.shard1], ['author']))
+        save_sketches(sketch_file2, cardinality_frontmatter([self.shard2], ['author']))
+
+        merged = {}
+        merge_sketches(merged, load_sketches(sketch_file1))
+        merge_sketches(merged, load_sketches(sketch_file2))
+
+        self.assertEqual(merged['author'].count(), 40)
+        self.assertEqual(merged['author'].total, 120)
+
+    def test_load_sketches_invalid_file(self):
+        """Test that invalid sketch files are reported."""
+        bad_file = os.path.join(self.temp_dir, 'bad.json')
+        with open(bad_file, 'w') as f:
+            f.write('{"version": 99}')
+
+        with self.assertRaises(ValueError):
+            load_sketches(bad_file)
+        with self.assertRaises(FileNotFoundError):
+            load_sketches(os.path.join(self.temp_dir, 'missing.json'))
+
+    def test_main_stats_cardinality_and_merge(self):
+        """Test the stats command with --sketch-out and --merge-sketches."""
+        sketch_file = os.path.join(self.temp_dir, 'shard1.json')
+        output = io.StringIO()
+        with patch('sys.argv', ['fmu', 'stats', self.shard1, '--cardinality', 'author', '--sketch-out', sketch_file]):
+            with patch('sys.stdout', output):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 0)
+        self.assertIn('author: ~40 distinct values', output.getvalue())
+        self.assertIn('standard error: ±0.81%', output.getvalue())
+        self.assertTrue(os.path.exists(sketch_file))
+
+        output = io.StringIO()
+        with patch('sys.argv', ['fmu', 'stats', self.shard2, '--merge-sketches', sketch_file]):
+            with patch('sys.stdout', output):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 0)
+        self.assertIn('author: ~40 distinct values (120 values counted)', output.getvalue())
+
+    def test_main_stats_requires_fields(self):
+        """Test that stats requires --cardinality or --merge-sketches."""
+        with patch('sys.argv', ['fmu', 'stats', self.shard1]):
+            with patch('sys.stderr', io.StringIO()):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
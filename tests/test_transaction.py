@@ -0,0 +1,180 @@
+"""
+Unit tests for fmu transactional updates and rollback.
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import json
+import shutil
+from unittest.mock import patch
+from fmu.transaction import rollback_transaction, backup_file_for
+from fmu.update import update_frontmatter, update_frontmatter_fields, TRANSACTION_ABORTED_REASON
+from fmu.cli import main
+
+
+UPPER_TITLE = [{'type': 'case', 'case_type': 'upper'}]
+
+
+class TestTransactionalUpdate(unittest.TestCase):
+    """Test update with a journal."""
+
+    def setUp(self):
+        """Set up test files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.docs_dir = os.path.join(self.temp_dir, 'docs')
+        os.makedirs(self.docs_dir)
+        self.originals = {}
+        for name, text in [('a.md', "---\ntitle: Alpha\n---\nA\n"),
+                           ('b.md', "---\r\ntitle: Beta\r\n---\r\nB\r\n")]:
+            file_path = os.path.join(self.docs_dir, name)
+            with open(file_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            self.originals[file_path] = text
+        self.pattern = [os.path.join(self.docs_dir, '*.md')]
+        self.journal = os.path.join(self.temp_dir, 'update.jsonl')
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def read(self, file_path):
+        with open(file_path, encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def assert_untouched(self):
+        """Assert that every file is as it was and no staged file is left."""
+        for file_path, text in self.originals.items():
+            self.assertEqual(self.read(file_path), text)
+        self.assertEqual(sorted(os.listdir(self.docs_dir)), ['a.md', 'b.md'])
+
+    def test_commit_and_rollback(self):
+        """Test that a committed update is journaled and can be rolled back exactly."""
+        results = update_frontmatter(self.pattern, 'title', UPPER_TITLE, journal_file=self.journal)
+
+        self.assertTrue(all(r['changes_made'] for r in results))
+        self.assertIn('title: ALPHA', self.read(os.path.join(self.docs_dir, 'a.md')))
+        with open(self.journal, encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[0]['backup'], os.path.abspath(backup_file_for(self.journal)))
+        self.assertEqual(len([line for line in lines if 'path' in line]), 2)
+        self.assertEqual(lines[-1], {'status': 'committed'})
+
+        self.assertEqual(rollback_transaction(self.journal), 2)
+        self.assert_untouched()
+        # Rolling back again restores the same originals
+        self.assertEqual(rollback_transaction(self.journal), 2)
+        self.assert_untouched()
+
+    def test_failure_leaves_tree_untouched(self):
+        """Test that one failing file aborts the whole update."""
+        updates = [{'name': 'title', 'operations': [
+            {'type': 'compute', 'formula': '=concat($frontmatter.title, !)'}
+        ]}]
+        broken = os.path.join(self.docs_dir, 'c.md')
+        with open(broken, 'w', encoding='utf-8') as f:
+            f.write("---\ntitle: [unclosed\n---\n")
+        self.originals[broken] = "---\ntitle: [unclosed\n---\n"
+
+        results = update_frontmatter_fields(self.pattern, updates, journal_file=self.journal)
+
+        reasons = [r['reason'] for r in results]
+        self.assertTrue(reasons[0].startswith(TRANSACTION_ABORTED_REASON))
+        self.assertTrue(reasons[2].startswith('Error processing file'))
+        self.assertFalse(any(r['changes_made'] for r in results))
+        self.assertEqual(sorted(os.listdir(self.docs_dir)), ['a.md', 'b.md', 'c.md'])
+        self.assertEqual(self.read(os.path.join(self.docs_dir, 'a.md')), self.originals[os.path.join(self.docs_dir, 'a.md')])
+        self.assertFalse(os.path.exists(self.journal))
+
+    def test_disk_budget(self):
+        """Test that exceeding the disk budget aborts the update."""
+        results = update_frontmatter(self.pattern, 'title', UPPER_TITLE, journal_file=self.journal, disk_budget=30)
+
+        self.assertFalse(any(r['changes_made'] for r in results))
+        self.assert_untouched()
+        self.assertFalse(os.path.exists(self.journal))
+        self.assertFalse(os.path.exists(backup_file_for(self.journal)))
+
+    def test_failed_commit_is_rolled_back(self):
+        """Test that files already replaced are restored if a rename fails."""
+        real_replace = os.replace
+        calls = []
+
+        def replace(source, target):
+            calls.append(target)
+            if len(calls) == 2:
+                raise OSError('device busy')
+            real_replace(source, target)
+
+        with patch('fmu.transaction.os.replace', side_effect=replace):
+            results = update_frontmatter(self.pattern, 'title', UPPER_TITLE, journal_file=self.journal)
+
+        self.assertEqual(results[0]['reason'], f"{TRANSACTION_ABORTED_REASON}: device busy")
+        self.assert_untouched()
+
+    def test_parallel(self):
+        """Test a transactional update in worker processes."""
+        results = update_frontmatter(self.pattern, 'title', UPPER_TITLE, jobs=2, journal_file=self.journal)
+
+        self.assertTrue(all(r['changes_made'] for r in results))
+        self.assertEqual(rollback_transaction(self.journal), 2)
+        self.assert_untouched()
+
+    def test_main_update_and_rollback(self):
+        """Test update --journal and the rollback command."""
+        argv = ['fmu', 'update', *self.pattern, '--name', 'title', '--case', 'upper', '--journal', self.journal]
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', new_callable=io.StringIO) as output:
+                main()
+        self.assertIn(f"Journal: {self.journal} (undo with: fmu rollback {self.journal})", output.getvalue())
+
+        with patch('sys.argv', ['fmu', 'rollback', self.journal]):
+            with patch('sys.stdout', new_callable=io.StringIO) as output:
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(output.getvalue(), f"Restored 2 file(s) from {self.journal}\n")
+        self.assert_untouched()
+
+    def test_main_transactional_updates_in_a_row(self):
+        """Test that the default journal directory is not collected by the next update of the tree."""
+        argv = ['fmu', 'update', '.', '--name', 'title', '--case', 'upper', '--transactional']
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            outputs = []
+            for _ in range(2):
+                with patch('sys.argv', argv):
+                    with patch('sys.stdout', new_callable=io.StringIO) as output:
+                        main()
+                outputs.append(output.getvalue())
+        finally:
+            os.chdir(cwd)
+
+        self.assertIn("2 file(s) updated, 0 unchanged\n", outputs[0])
+        self.assertIn("0 file(s) updated, 2 unchanged\n", outputs[1])
+        self.assertTrue(os.listdir(os.path.join(self.temp_dir, '.fmu-journal')))
+
+    def test_main_summary_counts_aborted_files(self):
+        """Test that files left unwritten by an aborted transaction are not counted as unchanged."""
+        with open(os.path.join(self.docs_dir, 'c.md'), 'w', encoding='utf-8') as f:
+            f.write("---\ntitle: [unclosed\n---\n")
+        argv = ['fmu', 'update', *self.pattern, '--name', 'title', '--case', 'upper', '--journal', self.journal]
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', new_callable=io.StringIO) as output:
+                main()
+        self.assertIn("0 file(s) updated, 0 unchanged, 2 not written, 1 failed", output.getvalue())
+
+    def test_main_rollback_invalid_journal(self):
+        """Test that an unreadable journal is reported."""
+        with patch('sys.argv', ['fmu', 'rollback', os.path.join(self.temp_dir, 'missing.jsonl')]):
+            with patch('sys.stderr', new_callable=io.StringIO) as error:
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("Error: Cannot read journal", error.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,10 +12,12 @@ import sys
 from fmu.core import parse_file
 from fmu.update import (
     transform_case, apply_replace_operation, apply_remove_operation,
-    apply_case_transformation, deduplicate_array, update_frontmatter,
+    deduplicate_array, update_frontmatter,
     update_and_output, evaluate_formula, apply_compute_operation,
-    _resolve_placeholder, _parse_function_call, _execute_function
+    update_frontmatter_fields, WHERE_SKIPPED_REASON
 )
+from fmu.formulas import _resolve_placeholder, _parse_function_call, _execute_function
+from fmu.functions import EvaluationContext
 from fmu.cli import cmd_update, main
 
 
@@ -446,6 +448,57 @@ Content here.""")
         result = evaluate_formula('=concat(/post/, $frontmatter.content_id)', '/path/to/test.md', frontmatter, '')
         self.assertEqual(result, '/post/abc123')
     
+    def test_compile_formula_tree(self):
+        """Test that formulas compile once into a tree of nodes."""
+        from fmu.formulas import compile_formula, LiteralNode, PlaceholderNode, FunctionNode
+        formula = '=concat($slice($frontmatter.tags, 0, 2), $hash($filepath, 8))'
+        
+        tree = compile_formula(formula)
+        
+        self.assertIs(compile_formula(formula), tree)
+        self.assertIsInstance(tree, FunctionNode)
+        self.assertEqual(tree.function_name, 'concat')
+        slice_node, hash_node = tree.arguments
+        self.assertEqual(slice_node.function_name, 'slice')
+        self.assertIsInstance(slice_node.arguments[0], PlaceholderNode)
+        self.assertEqual(slice_node.arguments[0].field_name, 'tags')
+        self.assertIsInstance(slice_node.arguments[1], LiteralNode)
+        self.assertIsInstance(compile_formula(3), LiteralNode)
+        
+        value = tree.evaluate(EvaluationContext().for_file('/posts/a.md', {'tags': ['x', 'y', 'z']}, ''))
+        self.assertEqual(value, "['x', 'y']" + _execute_function('hash', ['/posts/a.md', 8]))
+    
+    def test_compiled_formula_is_not_parsed_per_file(self):
+        """Test that evaluating a formula for many files parses it once."""
+        from fmu import formulas
+        formula = '=concat($frontmatter.title, -, $frontmatter.tags[1], -, $foldername)'
+        formulas._compile_formula_text.cache_clear()
+        
+        with patch.object(formulas, '_parse_function_call', wraps=_parse_function_call) as parse:
+            values = [
+                evaluate_formula(formula, f'/site/posts/{i}.md', {'title': f'T{i}', 'tags': ['a', 'b']}, '')
+                for i in range(3)
+            ]
+        
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(values, ['T0-b-posts', 'T1-b-posts', 'T2-b-posts'])
+    
+    def test_compiled_placeholders_unresolved(self):
+        """Test that placeholders that cannot be resolved evaluate to themselves."""
+        frontmatter = {'tags': ['a']}
+        self.assertEqual(evaluate_formula('$frontmatter.missing', '/a.md', frontmatter, ''), '$frontmatter.missing')
+        self.assertEqual(evaluate_formula('$frontmatter.tags[5]', '/a.md', frontmatter, ''), '$frontmatter.tags[5]')
+        self.assertEqual(evaluate_formula('$unknown', '/a.md', frontmatter, ''), '$unknown')
+    
+    def test_compile_formula_unknown_function_fails_on_evaluation(self):
+        """Test that unknown functions are reported when evaluated, not compiled."""
+        from fmu.formulas import compile_formula
+        tree = compile_formula('=no_such_function($filename)')
+        
+        with self.assertRaises(ValueError) as cm:
+            tree.evaluate(EvaluationContext().for_file('/a.md', {}, ''))
+        self.assertIn('Unknown function: no_such_function', str(cm.exception))
+    
     def test_apply_compute_operation_create_field(self):
         """Test compute operation creating a new field."""
         frontmatter = {'title': 'Test'}
@@ -1020,6 +1073,281 @@ Content.""")
         self.assertIn('automation', results[0]['new_value'])
         self.assertNotIn('python', results[0]['new_value'])
 
+    
+    def test_update_frontmatter_fields_single_pass(self):
+        """Test that several field updates are applied in order with one write per file."""
+        from fmu.fileio import AtomicWriter
+        updates = [
+            {'name': 'title', 'operations': [{'type': 'case', 'case_type': 'upper'}]},
+            {'name': 'slug', 'operations': [{'type': 'compute', 'formula': '=concat($frontmatter.title, -x)'}]},
+            {'name': 'status', 'operations': [{'type': 'remove', 'value': None}]},
+            {'name': 'tags', 'operations': [], 'deduplication': False},
+        ]
+        
+        with patch.object(AtomicWriter, 'write', autospec=True, side_effect=AtomicWriter.write) as write:
+            with patch('builtins.open', wraps=open) as opened:
+                results = update_frontmatter_fields([self.test_file1, self.test_file2], updates)
+        
+        # One read per file, and one atomic write through a temporary file
+        self.assertEqual(write.call_count, 2)
+        self.assertEqual(opened.call_count, 2)
+        self.assertEqual([(r['file_path'], r['field']) for r in results], [
+            (self.test_file1, 'title'), (self.test_file1, 'slug'), (self.test_file1, 'status'),
+            (self.test_file2, 'title'), (self.test_file2, 'slug'),
+        ])
+        frontmatter_data, _ = parse_file(self.test_file1)
+        self.assertEqual(frontmatter_data['title'], 'TEST DOCUMENT')
+        # Later updates see the result of earlier ones
+        self.assertEqual(frontmatter_data['slug'], 'TEST DOCUMENT-x')
+        self.assertNotIn('status', frontmatter_data)
+        self.assertEqual(frontmatter_data['tags'], ['python', 'testing', 'python', 'automation'])
+    
+    def test_update_frontmatter_fields_error_reports_every_field(self):
+        """Test that a failing update leaves the file unwritten and is reported for every field."""
+        updates = [
+            {'name': 'title', 'operations': [{'type': 'case', 'case_type': 'upper'}]},
+            {'name': 'slug', 'operations': [{'type': 'compute', 'formula': '=no_such_function()'}]},
+        ]
+        
+        results = update_frontmatter_fields([self.test_file1], updates)
+        
+        self.assertEqual([r['field'] for r in results], ['title', 'slug'])
+        self.assertTrue(all(r['reason'].startswith('Error processing file') for r in results))
+        frontmatter_data, _ = parse_file(self.test_file1)
+        self.assertEqual(frontmatter_data['title'], 'Test Document')
+    
+    def test_main_update_multiple_names(self):
+        """Test that options apply to the nearest --name before them."""
+        argv = [
+            'fmu', 'update', self.test_file1,
+            '--name', 'title', '--case', 'upper',
+            '--name', 'status', '--replace', 'DRAFT', 'published', '--ignore-case',
+            '--name', 'tags', '--remove', 'testing', '--deduplication', 'false'
+        ]
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', new_callable=StringIO) as output:
+                main()
+        
+        frontmatter_data, _ = parse_file(self.test_file1)
+        self.assertEqual(frontmatter_data['title'], 'TEST DOCUMENT')
+        self.assertEqual(frontmatter_data['status'], 'published')
+        self.assertEqual(frontmatter_data['tags'], ['python', 'python', 'automation'])
+        self.assertEqual(output.getvalue().count("Updated '"), 3)
+
+    
+    def test_update_case_without_change_is_not_written(self):
+        """Test that a case operation that changes nothing does not rewrite the file."""
+        from fmu.fileio import AtomicWriter
+        operations = [{'type': 'case', 'case_type': 'Title Case'}]
+        
+        with patch.object(AtomicWriter, 'write') as write:
+            results = update_frontmatter([self.test_file1], 'title', operations)
+        
+        self.assertEqual(results, [])
+        write.assert_not_called()
+    
+    def test_update_identical_bytes_are_not_written(self):
+        """Test that updates which cancel out leave the file and its mtime alone."""
+        from fmu.update import UNCHANGED_REASON
+        os.utime(self.test_file1, (1000000000, 1000000000))
+        updates = [
+            {'name': 'title', 'operations': [{'type': 'replace', 'from': 'Test', 'to': 'Best'}]},
+            {'name': 'title', 'operations': [{'type': 'replace', 'from': 'Best', 'to': 'Test'}]},
+        ]
+        
+        results = update_frontmatter_fields([self.test_file1], updates)
+        
+        self.assertEqual([r['reason'] for r in results], [UNCHANGED_REASON, UNCHANGED_REASON])
+        self.assertFalse(any(r['changes_made'] for r in results))
+        self.assertEqual(os.stat(self.test_file1).st_mtime, 1000000000)
+    
+    def test_update_and_output_summary(self):
+        """Test that updated and unchanged files are counted separately."""
+        operations = [{'type': 'case', 'case_type': 'upper'}]
+        update_frontmatter([self.test_file2], 'title', operations)
+        
+        with patch('sys.stdout', new_callable=StringIO) as output:
+            update_and_output([self.test_file1, self.test_file2], 'title', operations)
+        
+        self.assertEqual(output.getvalue().splitlines()[-1], "1 file(s) updated, 1 unchanged")
+
+    
+    def test_update_frontmatter_fields_parallel(self):
+        """Test that parallel updates give the same results, in file order."""
+        link = os.path.join(self.temp_dir, 'link.md')
+        os.symlink(self.test_file1, link)
+        broken = os.path.join(self.temp_dir, 'broken.md')
+        with open(broken, 'w', encoding='utf-8') as f:
+            f.write("---\ntitle: [unclosed\n---\n")
+        files = [broken, self.test_file1, link, self.test_file2]
+        updates = [{'name': 'title', 'operations': [{'type': 'case', 'case_type': 'upper'}]}]
+        
+        results = update_frontmatter_fields(files, updates, jobs=2)
+        
+        # Files are sorted, and test_file1 is the same file as the symlink, so it is updated once
+        self.assertEqual([r['file_path'] for r in results], [broken, link, self.test_file2])
+        self.assertTrue(results[0]['reason'].startswith('Error processing file'))
+        self.assertTrue(results[1]['changes_made'])
+        self.assertEqual(parse_file(self.test_file1)[0]['title'], 'TEST DOCUMENT')
+        self.assertEqual(parse_file(self.test_file2)[0]['title'], 'ANOTHER TEST')
+    
+    def test_main_update_jobs(self):
+        """Test the --jobs option with batched durability."""
+        argv = ['fmu', 'update', self.test_file1, self.test_file2, '--name', 'title', '--case', 'lower',
+                '--jobs', '2', '--durability', 'batch']
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', new_callable=StringIO) as output:
+                with patch('fmu.fileio.os.fsync') as fsync:
+                    main()
+        
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines, [
+            f"{self.test_file1}: Updated 'title' - Updated successfully",
+            f"{self.test_file2}: Updated 'title' - Updated successfully",
+            "2 file(s) updated, 0 unchanged",
+        ])
+        # Both files and their directory are synced once, by the main process
+        self.assertEqual(fsync.call_count, 3)
+    
+    def test_compile_operation(self):
+        """Test that compiled operations transform lists in one pass, like the apply_* functions."""
+        from fmu.update import compile_operation
+        aliases = ['/Old/a', 'keep', 3, '/old/b', None]
+        
+        replace = compile_operation({'type': 'replace', 'from': '^/old/', 'to': '/new/', 'ignore_case': True, 'regex': True})
+        self.assertEqual(replace(aliases), ['/new/a', 'keep', 3, '/new/b', None])
+        remove = compile_operation({'type': 'remove', 'value': 'KEEP', 'ignore_case': True})
+        self.assertEqual(remove(aliases), ['/Old/a', 3, '/old/b', None])
+        self.assertIsNone(remove('keep'))
+        self.assertIsNone(compile_operation({'type': 'remove', 'value': None})(aliases))
+        case = compile_operation({'type': 'case', 'case_type': 'Title Case'})
+        self.assertEqual(case(["can't stop", 'it\'s o\'clock', 7]), ["Can't Stop", "It's O'clock", 7])
+        # An invalid regex leaves values as they are
+        self.assertEqual(compile_operation({'type': 'replace', 'from': '(', 'to': 'x', 'regex': True})(['(a']), ['(a'])
+        with self.assertRaises(ValueError):
+            compile_operation({'type': 'compute', 'formula': 'x'})
+    
+    def test_operations_compiled_once_per_run(self):
+        """Test that an update compiles each operation once for all files."""
+        from fmu import update as update_module
+        updates = [{'name': 'tags', 'operations': [
+            {'type': 'replace', 'from': 'PYTHON', 'to': 'py', 'ignore_case': True, 'regex': False}
+        ]}]
+        
+        with patch.object(update_module, 'compile_operation', wraps=update_module.compile_operation) as compile_operation:
+            results = update_frontmatter_fields([self.test_file1, self.test_file2], updates)
+        
+        self.assertEqual(compile_operation.call_count, 1)
+        self.assertEqual(parse_file(self.test_file1)[0]['tags'], ['py', 'testing', 'automation'])
+        self.assertTrue(all(result['changes_made'] for result in results))
+    
+    def test_update_now_is_frozen_per_run(self):
+        """Test that every file of an update, in any worker, gets the same now()."""
+        updates = [{'name': 'updated', 'operations': [{'type': 'compute', 'formula': '=now()'}]}]
+        
+        update_frontmatter_fields([self.test_file1, self.test_file2], updates, jobs=2, now='2024-05-01T12:00:00Z')
+        
+        self.assertEqual(parse_file(self.test_file1)[0]['updated'], '2024-05-01T12:00:00Z')
+        self.assertEqual(parse_file(self.test_file2)[0]['updated'], '2024-05-01T12:00:00Z')
+        
+        with patch('fmu.functions.datetime') as clock:
+            clock.now.return_value.strftime.return_value = '2025-01-01T00:00:00Z'
+            update_frontmatter_fields([self.test_file1, self.test_file2], updates)
+        # The clock is read once for the whole run
+        self.assertEqual(clock.now.call_count, 1)
+        self.assertEqual(parse_file(self.test_file2)[0]['updated'], '2025-01-01T00:00:00Z')
+    
+    def test_main_update_now(self):
+        """Test the --now option, and that an invalid timestamp is rejected."""
+        argv = ['fmu', 'update', self.test_file1, '--name', 'updated', '--compute', '=now()',
+                '--now', '2024-05-01T14:00:00+02:00']
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', new_callable=StringIO):
+                main()
+        self.assertEqual(parse_file(self.test_file1)[0]['updated'], '2024-05-01T12:00:00Z')
+        
+        with patch('sys.argv', argv[:-1] + ['yesterday']):
+            with patch('sys.stderr', new_callable=StringIO) as error:
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn("Invalid timestamp: yesterday", error.getvalue())
+
+
+class TestUpdateWhere(unittest.TestCase):
+    """Test conditional updates with where."""
+    
+    def setUp(self):
+        """Set up test files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.texts = {
+            'published.md': "---\nstatus: published\ndraft: true\n---\nBody\n",
+            'escaped.md': '---\nstatus: "publ\\x69shed"\ndraft: true\n---\nBody\n',
+            'draft.md': "---\nstatus: draft\ndraft: true\n---\nThe published version\n",
+            'plain.md': "No frontmatter\n",
+        }
+        for name, text in self.texts.items():
+            with open(os.path.join(self.temp_dir, name), 'w', encoding='utf-8') as f:
+                f.write(text)
+        self.pattern = [os.path.join(self.temp_dir, '*.md')]
+        self.operations = [{'type': 'case', 'case_type': 'upper'}]
+    
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+    
+    def read(self, name):
+        with open(os.path.join(self.temp_dir, name), encoding='utf-8') as f:
+            return f.read()
+    
+    def test_where(self):
+        """Test that only matching files are updated and the others reported as skipped."""
+        results = update_frontmatter(self.pattern, 'status', self.operations, where=['status=published'])
+        
+        reasons = {os.path.basename(r['file_path']): r['reason'] for r in results}
+        self.assertEqual(reasons['draft.md'], WHERE_SKIPPED_REASON)
+        self.assertEqual(reasons['plain.md'], WHERE_SKIPPED_REASON)
+        self.assertNotEqual(reasons['escaped.md'], WHERE_SKIPPED_REASON)
+        self.assertIn("status: PUBLISHED", self.read('published.md'))
+        self.assertIn("status: PUBLISHED", self.read('escaped.md'))
+        self.assertEqual(self.read('draft.md'), self.texts['draft.md'])
+    
+    def test_where_prefilter_skips_parsing(self):
+        """Test that headers without the literal value are not parsed."""
+        from fmu import update
+        with patch('fmu.update.parse_frontmatter', wraps=update.parse_frontmatter) as parse:
+            update_frontmatter(self.pattern, 'status', self.operations, where=['status=published'])
+        parsed = sorted(os.path.basename(call.args[0].split('\n')[1]) for call in parse.call_args_list)
+        self.assertEqual(parsed, ['status: "publ\\x69shed"', 'status: published'])
+    
+    def test_where_conditions_combine(self):
+        """Test that every condition must match, with and without case."""
+        results = update_frontmatter_fields(
+            self.pattern, [{'name': 'status', 'operations': self.operations}],
+            where=['STATUS~^PUB', 'draft'], where_ignore_case=True, jobs=2
+        )
+        updated = sorted(os.path.basename(r['file_path']) for r in results if r['changes_made'])
+        self.assertEqual(updated, ['escaped.md', 'published.md'])
+        
+        with self.assertRaises(ValueError):
+            update_frontmatter(self.pattern, 'status', self.operations, where=['~x'])
+    
+    def test_main_update_where(self):
+        """Test update --where and its summary."""
+        argv = ['fmu', 'update', *self.pattern, '--name', 'status', '--case', 'upper', '--where', 'status=published']
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', new_callable=StringIO) as output:
+                main()
+        self.assertIn("2 file(s) updated, 0 unchanged, 2 skipped", output.getvalue())
+        
+        argv = ['fmu', 'update', *self.pattern, '--name', 'status', '--case', 'upper', '--where', 'status~(']
+        with patch('sys.argv', argv):
+            with patch('sys.stderr', new_callable=StringIO) as error:
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn("Error: Invalid --where regex", error.getvalue())
+
 
 class TestVersion023Functions(unittest.TestCase):
     """Test version 0.23.0 built-in variables and functions."""
@@ -6,7 +6,10 @@ import unittest
 import tempfile
 import os
 import csv
-from fmu.validation import validate_frontmatter, output_validation_results, validate_and_output
+from fmu.validation import (
+    validate_frontmatter, output_validation_results, validate_and_output, compile_validations,
+    iter_validation_failures
+)
 
 
 class TestValidationFunctionality(unittest.TestCase):
@@ -248,16 +251,49 @@ This is the content of the second post.""")
         self.assertEqual(len(failures), 0)
     
     def test_validate_invalid_regex(self):
-        """Test validation with invalid regex."""
+        """Test that an invalid regex is reported once, before any file is checked."""
         validations = [
             {'type': 'match', 'field': 'author', 'regex': r'[invalid'}
         ]
         
-        failures = validate_frontmatter([self.file1], validations)
-        self.assertEqual(len(failures), 1)
+        with self.assertRaises(ValueError) as cm:
+            validate_frontmatter([self.file1, self.file2], validations)
         
-        # Check failure
-        self.assertIn("Invalid regex pattern", failures[0][3])
+        self.assertIn("Invalid regex pattern '[invalid'", str(cm.exception))
+    
+    def test_compile_validations(self):
+        """Test that rules compile into reusable checks in rule order."""
+        plan = compile_validations([
+            {'type': 'contain', 'field': 'tags', 'value': 'TECH'},
+            {'type': 'unique', 'field': 'slug'},
+            {'type': 'not-match', 'field': 'title', 'regex': '^first'},
+        ], ignore_case=True)
+        
+        self.assertEqual([field for field, _ in plan], ['tags', 'title'])
+        
+        self.assertIsNone(plan[0][1](True, ['tech', 'python']))
+        self.assertEqual(plan[0][1](False, None), "Field 'tags' does not exist (required for contain check)")
+        self.assertEqual(plan[1][1](True, 'First Post'), "Field 'title' value 'First Post' should not match pattern '^first'")
+    
+    def test_validate_rules_sharing_a_field_keep_rule_order(self):
+        """Test that rules grouped by field still report failures in rule order."""
+        validations = [
+            {'type': 'list-size', 'field': 'TAGS', 'min': 3, 'max': 5},
+            {'type': 'eq', 'field': 'title', 'value': 'x'},
+            {'type': 'contain', 'field': 'tags', 'value': 'missing'},
+            {'type': 'exist', 'field': 'Tags'},
+            {'type': 'not', 'field': 'tags'},
+        ]
+        
+        failures = validate_frontmatter([self.file1], validations, ignore_case=True)
+        
+        self.assertEqual([(f[1], f[2]) for f in failures], [
+            ('TAGS', ['tech', 'programming']),
+            ('title', 'First Post'),
+            ('tags', ['tech', 'programming']),
+            ('tags', ['tech', 'programming']),
+        ])
+        self.assertEqual(failures[3][3], "Field 'tags' should not exist")
     
     def test_validate_missing_field_for_value_checks(self):
         """Test validation on missing field for value-based checks."""
@@ -578,6 +614,214 @@ Content""")
         self.assertEqual(failures[0][1], "frontmatter")
         self.assertIn("Invalid YAML frontmatter", failures[0][3])
 
+    
+    def test_validate_max_failures_stops_parsing(self):
+        """Test that validation stops parsing files once the failure budget is hit."""
+        from fmu import validation as validation_module
+        from unittest.mock import patch
+        validations = [{'type': 'exist', 'field': 'nonexistent'}]
+        with patch.object(validation_module, 'parse_file', wraps=validation_module.parse_file) as parse:
+            failures = validate_frontmatter([self.temp_dir], validations, max_failures=1)
+        
+        self.assertEqual([f[0] for f in failures], [self.file1])
+        self.assertEqual(parse.call_count, 1)
+    
+    def test_validate_and_output_on_stop(self):
+        """Test that on_stop is called only when files were left unchecked."""
+        import io
+        from unittest.mock import patch
+        validations = [{'type': 'exist', 'field': 'nonexistent'}]
+        stops = []
+        with patch('sys.stdout', io.StringIO()):
+            validate_and_output([self.file1, self.file2], validations, max_failures=1, on_stop=stops.append)
+            validate_and_output([self.file1, self.file2], validations, max_failures=2, on_stop=stops.append)
+            validate_and_output([self.file1], validations, max_failures=1, on_stop=stops.append)
+        self.assertEqual(stops, [1])
+    
+    def test_validate_max_failures_per_file(self):
+        """Test that noisy files are capped without affecting other files."""
+        validations = [
+            {'type': 'exist', 'field': 'a'},
+            {'type': 'exist', 'field': 'b'},
+            {'type': 'exist', 'field': 'c'},
+        ]
+        
+        failures = validate_frontmatter([self.file1, self.file2], validations, max_failures_per_file=2)
+        
+        self.assertEqual([(f[0], f[1]) for f in failures], [
+            (self.file1, 'a'), (self.file1, 'b'), (self.file2, 'a'), (self.file2, 'b'),
+        ])
+    
+    def test_iter_validation_failures_is_lazy(self):
+        """Test that failures are produced as files are checked, and regexes compile eagerly."""
+        failures = iter_validation_failures([self.temp_dir], [{'type': 'exist', 'field': 'status'}])
+        
+        self.assertEqual(next(failures)[0], self.file2)
+        failures.close()
+        
+        with self.assertRaises(ValueError):
+            iter_validation_failures([self.temp_dir], [{'type': 'match', 'field': 'title', 'regex': '('}])
+    
+    def test_validate_references(self):
+        """Test that every referenced value must exist in the target field."""
+        with open(os.path.join(self.temp_dir, 'test4.md'), 'w') as f:
+            f.write("---\ntitle: Related\nrelated: [First Post, Missing Post]\nauthor: Nobody\n---\n")
+        validations = [
+            {'type': 'references', 'field': 'related', 'target_field': 'title'},
+            {'type': 'references', 'field': 'author', 'target_field': 'author'},
+        ]
+        
+        failures = validate_frontmatter([self.temp_dir], validations)
+        
+        self.assertEqual(failures, [(
+            os.path.join(self.temp_dir, 'test4.md'), 'related', ['First Post', 'Missing Post'],
+            "Field 'related' references unknown 'title' value(s): 'Missing Post'"
+        )])
+    
+    def test_validate_references_formula_and_target_pattern(self):
+        """Test references to file names of files matching a target pattern."""
+        series_dir = os.path.join(self.temp_dir, 'series')
+        os.makedirs(series_dir)
+        with open(os.path.join(series_dir, 'python-basics.md'), 'w') as f:
+            f.write("---\ntitle: Python Basics\n---\n")
+        validations = [{
+            'type': 'references', 'field': 'series', 'target_field': '=basename($filepath)',
+            'target_patterns': [os.path.join(series_dir, '*.md')]
+        }]
+        
+        post = os.path.join(self.temp_dir, 'post.md')
+        with open(post, 'w') as f:
+            f.write("---\nseries: Python-Basics\n---\n")
+        
+        self.assertEqual(len(validate_frontmatter([post], validations)), 1)
+        self.assertEqual(validate_frontmatter([post], validations, ignore_case=True), [])
+        
+        failure = validate_frontmatter([self.file1, post], validations)[0]
+        self.assertEqual(failure[0], post)
+        self.assertIn(f"unknown '=basename($filepath)' in {os.path.join(series_dir, '*.md')} value(s)", failure[3])
+    
+    def test_validate_unique(self):
+        """Test that files sharing a value of a unique field are all reported."""
+        file4 = os.path.join(self.temp_dir, 'test4.md')
+        with open(file4, 'w') as f:
+            f.write("---\ntitle: first post\nauthor: Jane Smith\n---\n")
+        
+        validations = [{'type': 'unique', 'field': 'author'}, {'type': 'exist', 'field': 'status'}]
+        failures = validate_frontmatter([self.temp_dir], validations)
+        
+        # Per-file failures come first, uniqueness failures after all files are read
+        self.assertEqual([f[3] for f in failures[:3]], ["Field 'status' does not exist"] * 3)
+        self.assertEqual(failures[3:], [
+            (self.file2, 'author', 'Jane Smith', f"Field 'author' value 'Jane Smith' is not unique (also in: {file4})"),
+            (file4, 'author', 'Jane Smith', f"Field 'author' value 'Jane Smith' is not unique (also in: {self.file2})"),
+        ])
+        
+        # Case-insensitive uniqueness also applies to values, and spilling keeps the result
+        failures = validate_frontmatter([self.temp_dir], [{'type': 'unique', 'field': 'title'}], ignore_case=True, memory_budget=1)
+        self.assertEqual([f[0] for f in failures], [self.file1, file4])
+    
+    def test_validate_unique_summarizes_many_files(self):
+        """Test that long lists of other files are summarized."""
+        for i in range(6):
+            with open(os.path.join(self.temp_dir, f'dup{i}.md'), 'w') as f:
+                f.write("---\nslug: same\n---\n")
+        
+        failures = validate_frontmatter([self.temp_dir], [{'type': 'unique', 'field': 'slug'}])
+        
+        self.assertEqual(len(failures), 6)
+        paths = [os.path.join(self.temp_dir, f'dup{i}.md') for i in range(6)]
+        self.assertTrue(failures[0][3].endswith(f"(also in: {', '.join(paths[1:4])} and 2 more)"))
+        self.assertTrue(failures[2][3].endswith(f"(also in: {', '.join(paths[0:2] + paths[3:4])} and 2 more)"))
+        self.assertTrue(failures[5][3].endswith(f"(also in: {', '.join(paths[0:3])} and 2 more)"))
+
+    
+    def _write_vocab(self, *terms):
+        """Write a vocabulary file and return its path."""
+        vocab_file = os.path.join(self.temp_dir, 'vocab.txt')
+        with open(vocab_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(terms) + '\n')
+        return vocab_file
+    
+    def test_validate_in_vocab(self):
+        """Test that array items and scalars must be vocabulary terms."""
+        vocab_file = self._write_vocab('# topics', '', 'tech', ' programming ', 'Science', 'Jane Smith')
+        validations = [
+            {'type': 'in-vocab', 'field': 'tags', 'vocab': vocab_file},
+            {'type': 'in-vocab', 'field': 'author', 'vocab': vocab_file}
+        ]
+        
+        failures = validate_frontmatter([self.file1, self.file2], validations)
+        
+        self.assertEqual(failures, [
+            (self.file1, 'author', 'John Doe', f"Field 'author' has value(s) not in vocabulary '{vocab_file}': 'John Doe'"),
+            (self.file2, 'tags', ['science', 'research'],
+             f"Field 'tags' has value(s) not in vocabulary '{vocab_file}': 'science', 'research'"),
+        ])
+        
+        failures = validate_frontmatter([self.file2], validations[:1], ignore_case=True)
+        self.assertEqual([f[3] for f in failures], [f"Field 'tags' has value(s) not in vocabulary '{vocab_file}': 'research'"])
+    
+    def test_validate_ignore_case_folds_values(self):
+        """Test that ignore_case folds values like field names, so 'STRASSE' matches 'Straße'."""
+        file_path = os.path.join(self.temp_dir, 'street.md')
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write("---\nstreet: HAUPTSTRASSE\n---\n")
+        vocab_file = self._write_vocab('Hauptstraße')
+        validations = [
+            {'type': 'in-vocab', 'field': 'street', 'vocab': vocab_file},
+            {'type': 'eq', 'field': 'street', 'value': 'hauptstraße'},
+        ]
+        
+        self.assertEqual(validate_frontmatter([file_path], validations, ignore_case=True), [])
+        self.assertEqual(len(validate_frontmatter([file_path], validations)), 2)
+    
+    def test_validate_not_in_vocab(self):
+        """Test that no value may be a term of an excluded vocabulary."""
+        vocab_file = self._write_vocab('research', 'draft')
+        validations = [{'type': 'not-in-vocab', 'field': 'tags', 'vocab': vocab_file}]
+        
+        failures = validate_frontmatter([self.file1, self.file2, self.file3], validations)
+        
+        self.assertEqual(failures, [(
+            self.file2, 'tags', ['science', 'research'],
+            f"Field 'tags' has value(s) in excluded vocabulary '{vocab_file}': 'research'"
+        )])
+    
+    def test_validate_in_vocab_missing_file(self):
+        """Test that a missing vocabulary is reported before any file is read."""
+        with self.assertRaises(ValueError) as cm:
+            validate_frontmatter([self.file1], [{'type': 'in-vocab', 'field': 'tags', 'vocab': 'missing.txt'}])
+        self.assertIn('Vocabulary file not found: missing.txt', str(cm.exception))
+    
+    def test_validate_and_output_vocab_report(self):
+        """Test that unknown values are counted across files, once per in-vocab failure."""
+        file4 = os.path.join(self.temp_dir, 'test4.md')
+        with open(file4, 'w') as f:
+            f.write("---\ntags: [Research, tech, misc]\n---\n")
+        vocab_file = self._write_vocab('tech', 'programming', 'science')
+        report_file = os.path.join(self.temp_dir, 'unknown.csv')
+        validations = [
+            {'type': 'in-vocab', 'field': 'tags', 'vocab': vocab_file},
+            {'type': 'contain', 'field': 'tags', 'value': 'tech'}
+        ]
+        
+        # The second run reports the failures from the cache, with the rules that produced them
+        for _ in range(2):
+            count = validate_and_output(
+                [self.file1, self.file2, file4], validations, ignore_case=True,
+                csv_file=os.path.join(self.temp_dir, 'failures.csv'), vocab_report=report_file,
+                cache_file=os.path.join(self.temp_dir, 'cache', 'validate.json')
+            )
+            
+            self.assertEqual(count, 3)
+            with open(report_file, newline='', encoding='utf-8') as f:
+                rows = list(csv.reader(f))
+            self.assertEqual(rows, [
+                ['Front Matter Name', 'Vocabulary', 'Unknown Value', 'Count'],
+                ['tags', vocab_file, 'research', '2'],
+                ['tags', vocab_file, 'misc', '1'],
+            ])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
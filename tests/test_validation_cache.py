@@ -0,0 +1,183 @@
+"""
+Unit tests for fmu validation cache.
+"""
+
+import unittest
+import tempfile
+import os
+import io
+import json
+import shutil
+import datetime
+from unittest.mock import patch
+from fmu import validation as validation_module
+from fmu.validation import validate_frontmatter
+from fmu.validation_cache import ValidationCache, ruleset_hash
+from fmu.cli import main
+
+
+class TestValidationCache(unittest.TestCase):
+    """Test cached validation runs."""
+
+    def setUp(self):
+        """Set up test files."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.temp_dir, 'cache', 'validate.json')
+        self.files = []
+        for i, (status, tags) in enumerate([('draft', '[a, b]'), ('published', '[]'), ('draft', '[c]')]):
+            file_path = os.path.join(self.temp_dir, f'post{i}.md')
+            with open(file_path, 'w') as f:
+                f.write(f"---\ntitle: Post {i}\nstatus: {status}\ndate: 2024-01-0{i + 1}\ntags: {tags}\n---\n")
+            self.files.append(file_path)
+        self.pattern = [os.path.join(self.temp_dir, '*.md')]
+        self.rules = [
+            {'type': 'eq', 'field': 'status', 'value': 'published'},
+            {'type': 'not-empty', 'field': 'tags'},
+            {'type': 'unique', 'field': 'status'}
+        ]
+
+    def tearDown(self):
+        """Clean up test files."""
+        shutil.rmtree(self.temp_dir)
+
+    def validate(self, rules=None):
+        """Validate the test files, returning the failures and the number of files parsed."""
+        with patch.object(validation_module, 'parse_file', wraps=validation_module.parse_file) as parse:
+            failures = validate_frontmatter(self.pattern, rules or self.rules, cache_file=self.cache_file)
+        return failures, parse.call_count
+
+    def test_warm_run_reports_cached_failures(self):
+        """Test that a warm run parses nothing and reports the same failures."""
+        cold, parsed = self.validate()
+        self.assertEqual(parsed, 3)
+        self.assertTrue(os.path.exists(self.cache_file))
+
+        warm, parsed = self.validate()
+
+        self.assertEqual(parsed, 0)
+        self.assertEqual(warm, cold)
+        self.assertEqual(warm, validate_frontmatter(self.pattern, self.rules))
+
+    def test_changed_file_is_revalidated(self):
+        """Test that only a modified file is parsed again."""
+        self.validate()
+        with open(self.files[1], 'w') as f:
+            f.write("---\ntitle: Post 1\nstatus: draft\ntags: [x]\n---\n")
+
+        failures, parsed = self.validate()
+
+        self.assertEqual(parsed, 1)
+        self.assertEqual(failures, validate_frontmatter(self.pattern, self.rules))
+
+    def test_touched_file_is_not_revalidated(self):
+        """Test that a file with a new mtime but the same content is served from the cache."""
+        self.validate()
+        os.utime(self.files[0], ns=(1, 1))
+
+        _, parsed = self.validate()
+
+        self.assertEqual(parsed, 0)
+
+    def test_changed_rules_revalidate(self):
+        """Test that results are cached per ruleset."""
+        self.validate()
+        rules = [{'type': 'exist', 'field': 'author'}]
+
+        failures, parsed = self.validate(rules)
+        self.assertEqual(parsed, 3)
+        self.assertEqual(len(failures), 3)
+
+        # Only the results of the last ruleset are kept
+        _, parsed = self.validate()
+        self.assertEqual(parsed, 3)
+        with open(self.cache_file) as f:
+            entries = json.load(f)['files'].values()
+        self.assertTrue(all(len(entry['results']) == 1 for entry in entries))
+
+    def test_changed_vocabulary_revalidates(self):
+        """Test that editing a vocabulary file invalidates the results produced with it."""
+        vocab_file = os.path.join(self.temp_dir, 'tags.txt')
+        with open(vocab_file, 'w') as f:
+            f.write("a\nb\n")
+        rules = [{'type': 'in-vocab', 'field': 'tags', 'vocab': vocab_file}]
+        failures, _ = self.validate(rules)
+        self.assertEqual(len(failures), 1)
+
+        with open(vocab_file, 'w') as f:
+            f.write("a\nb\nc\n")
+        failures, parsed = self.validate(rules)
+
+        self.assertEqual(parsed, 3)
+        self.assertEqual(failures, [])
+
+    def test_references_bypass_cache(self):
+        """Test that cross-file rules are always validated from the files."""
+        rules = [{'type': 'references', 'field': 'status', 'target_field': 'status'}]
+        self.validate(rules)
+
+        _, parsed = self.validate(rules)
+
+        # Once to build the reference index and once to validate
+        self.assertEqual(parsed, 6)
+
+    def test_values_round_trip(self):
+        """Test that cached failure values keep their YAML types."""
+        cache = ValidationCache(self.cache_file)
+        ruleset = ruleset_hash(self.rules, False, 'yaml', None)
+        value = {'when': datetime.date(2024, 1, 2), 'at': datetime.datetime(2024, 1, 2, 3, 4), 'n': [1, 2.5, None]}
+        cache.store(self.files[0], ruleset, [('meta', value, 'reason', 0)], {'status': 'draft'})
+        cache.save()
+
+        cached = ValidationCache(self.cache_file).lookup(self.files[0], ruleset)
+
+        self.assertEqual(cached, ([('meta', value, 'reason', 0)], {'status': 'draft'}))
+
+    def test_corrupt_cache_is_ignored(self):
+        """Test that an unreadable cache file gives an empty cache."""
+        os.makedirs(os.path.dirname(self.cache_file))
+        with open(self.cache_file, 'w') as f:
+            f.write('{not json')
+
+        failures, parsed = self.validate()
+
+        self.assertEqual(parsed, 3)
+        self.assertEqual(failures, validate_frontmatter(self.pattern, self.rules))
+
+    def test_main_cache_is_opt_in(self):
+        """Test that validate only caches with --cache-file, and never validates the cache itself."""
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            for argv in (['fmu', 'validate', '.', '--exist', 'title'],
+                         ['fmu', 'validate', '.', '--exist', 'title', '--cache-file'],
+                         ['fmu', 'validate', '.', '--exist', 'title', '--cache-file']):
+                with patch('sys.argv', argv):
+                    with patch('sys.stdout', io.StringIO()):
+                        with self.assertRaises(SystemExit) as cm:
+                            main()
+                self.assertEqual(cm.exception.code, 0)
+                if '--cache-file' not in argv:
+                    self.assertFalse(os.path.exists('.fmu-cache'))
+            self.assertTrue(os.path.exists(os.path.join('.fmu-cache', 'validate.json')))
+        finally:
+            os.chdir(cwd)
+
+    def test_main_no_cache(self):
+        """Test that --no-cache neither reads nor writes the cache file."""
+        argv = ['fmu', 'validate', self.files[0], '--exist', 'title', '--cache-file', self.cache_file]
+        with patch('sys.argv', argv + ['--no-cache']):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+        self.assertEqual(cm.exception.code, 0)
+        self.assertFalse(os.path.exists(self.cache_file))
+
+        with patch('sys.argv', argv):
+            with patch('sys.stdout', io.StringIO()):
+                with self.assertRaises(SystemExit) as cm:
+                    main()
+        self.assertEqual(cm.exception.code, 0)
+        self.assertTrue(os.path.exists(self.cache_file))
+
+
+if __name__ == '__main__':
+    unittest.main()